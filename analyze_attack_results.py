@@ -7,66 +7,143 @@ Generates comparative analysis and visualizations
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
+import argparse
 import os
 import sys
+import time
 from pathlib import Path
 
+from delay_histograms import summarize_values
+from detection_accuracy import detection_accuracy, run_detection_summary
+from latency_sketch import PERCENTILES
+from metric_values import load_metric_table
+from metrics_store import reduce_runs
+from packet_loader import DEFAULT_CHUNK_ROWS
+from packet_metrics import (ALL, BLACKHOLE, NORMAL, WORMHOLE, PacketAccumulator, delay_percentiles,
+                            delivered_throughput_mbps, empty_sketches, merge_sketches, packet_stats, summarize)
+from plot_scheduler import RenderJob, load_pyplot, print_render_timings, render_figures
+from replicate_stats import (DEFAULT_CONFIDENCE, DEFAULT_RESAMPLES, MIN_CI_RUNS, ci_verdict, error_bars, format_ci,
+                             grouped_ci_table, latex_ci)
+from results_dataset import open_source
+from scenario_catalog import PACKET_FILE, ScenarioCatalog, replicate_labels, run_key, unique_labels
+from snapshot_loader import load_snapshots, snapshot_files, snapshot_summary
+
+# Per-run summary columns averaged over the seeds of each scenario
+REPLICATE_COLUMNS = ['Avg_PDR', 'Avg_Delay_ms', 'Avg_Throughput_Mbps', 'Packet_Loss_Rate',
+                     'Detection_Rate', 'False_Positive_Rate', 'Routing_Overhead']
+
+# Paired with-minus-without mitigation differences of one seed, all "higher is better":
+# (column, summary column, sign, scale, label, unit)
+MITIGATION_EFFECTS = [
+    ('PDR_Improvement', 'Avg_PDR', 1, 100, 'PDR', '%'),
+    ('Delay_Reduction', 'Avg_Delay_ms', -1, 1, 'Delay reduction', 'ms'),
+    ('Loss_Reduction', 'Packet_Loss_Rate', -1, 100, 'Loss reduction', '%'),
+    ('Throughput_Gain', 'Avg_Throughput_Mbps', 1, 1, 'Throughput gain', 'Mbps'),
+]
+
 class AttackAnalyzer:
-    def __init__(self, results_dir):
+    def __init__(self, results_dir, streaming=False, chunksize=DEFAULT_CHUNK_ROWS, use_store=True,
+                 n_resamples=DEFAULT_RESAMPLES, confidence=DEFAULT_CONFIDENCE, dataset=None, filters=None):
         self.results_dir = results_dir
+        # Optional results_dataset.ResultsDataset read instead of scanning
+        # results_dir, restricted to the partitions matching filters
+        self.dataset = dataset
+        self.filters = filters or {}
+        # Packet traces are reduced to PacketAccumulator objects at load time
+        # (chunk by chunk when streaming=True); alternate result CSVs stay DataFrames
+        self.streaming = streaming
+        self.chunksize = chunksize
+        # use_store=True reuses reductions of unchanged runs from metrics_store.sqlite
+        self.use_store = use_store
         self.metrics = {}
-        # SDVN test scenarios matching test_sdvn_attacks.sh output
-        self.scenarios = [
-            ('test1_sdvn_baseline', 'Baseline (No Attack)'),
-            ('test2_sdvn_wormhole_10', 'Wormhole 10%'),
-            ('test3_sdvn_wormhole_20', 'Wormhole 20%'),
-            ('test4_sdvn_blackhole_10', 'Blackhole 10%'),
-            ('test5_sdvn_blackhole_20', 'Blackhole 20%'),
-            ('test6_sdvn_sybil_10', 'Sybil 10%'),
-            ('test7_sdvn_combined_10', 'Combined 10%')
-        ]
+        # Per-scenario delay sketches (packet_metrics.packet_sketches)
+        self.sketches = {}
+        # (RunInfo, scenario name) for every run discovered under results_dir
+        self.catalog = None
+        self.scenarios = []
+        # Final-snapshot overhead / detection metrics per scenario (snapshot_loader)
+        self.snapshot_metrics = None
+        # Wide scenario x '<file>.<Metric>' table of the runs' Metric,Value files (metric_values)
+        self.run_metrics = None
+        # Ground truth vs detector verdicts (detection_accuracy): per run and
+        # attack accuracy rows, the per-node blackhole join, and the per-run
+        # Detection_Rate / False_Positive_Rate preferred over the snapshot estimates
+        self.detection = None
+        self.detection_nodes = None
+        self.detection_summary = None
+        # Bootstrap settings and results (replicate_stats): seed means / CIs of
+        # REPLICATE_COLUMNS per scenario, and paired mitigation effects
+        self.n_resamples = n_resamples
+        self.confidence = confidence
+        self.replicates = None
+        self.effects = None
+    
+    def discover_scenarios(self):
+        """Build the scenario list from the runs found under results_dir"""
+        if self.dataset is not None:
+            self.catalog = self.dataset.catalog(**self.filters)
+        else:
+            self.catalog = ScenarioCatalog.discover(self.results_dir)
+        runs = list(self.catalog)
+        self.scenarios = list(zip(runs, unique_labels(runs)))
+        print(f"  Discovered {len(self.scenarios)} run(s) in {self.results_dir}")
         
-    def load_metrics(self):
-        """Load all CSV metric files from test_sdvn_attacks.sh output"""
+    def load_metrics(self, jobs=1):
+        """Load all CSV metric files from test_sdvn_attacks.sh output (jobs > 1 loads runs in parallel)"""
         print("Loading metric files from SDVN attack test results...")
+        self.discover_scenarios()
         
-        for scenario_id, scenario_name in self.scenarios:
+        loaded = {}
+        packet_files = {}
+        for run, scenario_name in self.scenarios:
             # Primary CSV file to look for (packet delivery analysis)
-            csv_file = os.path.join(self.results_dir, f'{scenario_id}_packet-delivery-analysis.csv')
+            csv_file = run.files.get(PACKET_FILE)
             
-            if os.path.exists(csv_file):
-                try:
-                    df = pd.read_csv(csv_file)
-                    self.metrics[scenario_name] = df
-                    print(f"  ✓ Loaded: {scenario_name} ({len(df)} rows)")
-                except Exception as e:
-                    print(f"  ✗ Error loading {scenario_name}: {e}")
+            if csv_file is not None:
+                packet_files[scenario_name] = csv_file
             else:
                 # Try alternate CSV names that might exist
                 alternate_files = [
-                    f'{scenario_id}_blackhole-attack-results.csv',
-                    f'{scenario_id}_sybil-attack-results.csv',
-                    f'{scenario_id}_wormhole-detection-results.csv'
+                    'blackhole-attack-results.csv',
+                    'sybil-attack-results.csv',
+                    'wormhole-detection-results.csv'
                 ]
                 
-                loaded = False
                 for alt_file in alternate_files:
-                    alt_path = os.path.join(self.results_dir, alt_file)
-                    if os.path.exists(alt_path):
+                    alt_path = run.files.get(alt_file)
+                    if alt_path is not None:
                         try:
                             df = pd.read_csv(alt_path)
-                            self.metrics[scenario_name] = df
+                            loaded[scenario_name] = df
                             print(f"  ✓ Loaded: {scenario_name} from {alt_file} ({len(df)} rows)")
-                            loaded = True
                             break
                         except Exception as e:
                             continue
                 
-                if not loaded:
+                if scenario_name not in loaded:
                     print(f"  ⚠ No CSV files found for: {scenario_name}")
         
+        # Packet traces are parsed and reduced concurrently; results arrive as they finish
+        verb = 'Streamed' if self.streaming else 'Loaded'
+        if self.dataset is not None:
+            # Reductions were stored at ingest time
+            reduced = self.dataset.reduce_runs(packet_files)
+        else:
+            reduced = reduce_runs(self.results_dir, packet_files, jobs, self.streaming, self.chunksize, self.use_store)
+        for scenario_name, accumulator, error in reduced:
+            if error is not None:
+                print(f"  ✗ Error loading {scenario_name}: {error}")
+                continue
+            loaded[scenario_name] = accumulator
+            self.sketches[scenario_name] = accumulator.sketches
+            print(f"  ✓ {verb}: {scenario_name} ({accumulator.rows} rows)")
+        
+        # Keep scenario order regardless of completion order
+        self.metrics = {name: loaded[name] for _, name in self.scenarios if name in loaded}
+        self.load_snapshot_metrics()
+        self.load_run_metrics()
+        self.load_detection_metrics()
+        
         if not self.metrics:
             print("\n⚠ No metric files loaded. Checking directory contents...")
             self._list_available_files()
@@ -74,6 +151,68 @@ class AttackAnalyzer:
             print("\n⚠ No metric files loaded. Checking directory contents...")
             self._list_available_files()
     
+    def load_snapshot_metrics(self):
+        """Read every run's periodic snapshot CSVs and keep their final overhead/detection values"""
+        files_by_run = {name: snapshot_files(run.files) for run, name in self.scenarios}
+        files_by_run = {name: files for name, files in files_by_run.items() if files}
+        snapshots = load_snapshots(files_by_run)
+        self.snapshot_metrics = snapshot_summary(snapshots)
+        if files_by_run:
+            print(f"  ✓ Snapshots: {len(snapshots)} rows from "
+                  f"{sum(len(files) for files in files_by_run.values())} file(s) in {len(files_by_run)} run(s)")
+    
+    def load_run_metrics(self):
+        """Read every run's Metric,Value result files into one scenario x metric table"""
+        self.run_metrics = load_metric_table({name: run.files for run, name in self.scenarios})
+        if not self.run_metrics.empty and len(self.run_metrics.columns):
+            print(f"  ✓ Run metrics: {len(self.run_metrics.columns)} metric(s) from "
+                  f"{int(self.run_metrics.notna().any(axis=1).sum())} run(s)")
+    
+    def load_detection_metrics(self):
+        """Score every run's detector verdicts against the attackers it actually had"""
+        self.detection, self.detection_nodes = detection_accuracy({name: run.files for run, name in self.scenarios})
+        self.detection_summary = run_detection_summary(self.detection)
+        if not self.detection.empty:
+            print(f"  ✓ Detection accuracy: {len(self.detection)} verdict set(s) from "
+                  f"{self.detection['Run'].nunique()} run(s)")
+    
+    def export_detection_accuracy(self):
+        """Save the per-run confusion matrices and the per-node detection latencies"""
+        if self.detection is None or self.detection.empty:
+            return
+        accuracy_file = os.path.join(self.results_dir, 'detection_accuracy.csv')
+        self.detection.to_csv(accuracy_file, index=False)
+        print(f"  ✓ Detection accuracy saved to: {accuracy_file}")
+        if not self.detection_nodes.empty:
+            nodes_file = os.path.join(self.results_dir, 'detection_nodes.csv')
+            self.detection_nodes.to_csv(nodes_file, index=False)
+            print(f"  ✓ Per-node detection latency saved to: {nodes_file}")
+    
+    def export_run_metrics(self, summary_df):
+        """Save the summary joined with the runs' Metric,Value results"""
+        if self.run_metrics is None or not len(self.run_metrics.columns):
+            return None
+        joined = summary_df.merge(self.run_metrics, left_on='Scenario', right_index=True, how='left')
+        joined_file = os.path.join(self.results_dir, 'summary_with_run_metrics.csv')
+        joined.to_csv(joined_file, index=False)
+        print(f"  ✓ Summary with run metrics saved to: {joined_file}")
+        return joined
+    
+    def _snapshot_value(self, scenario_name, column):
+        """A scenario's snapshot metric, 0 when no snapshot reports it"""
+        if self.snapshot_metrics is None or scenario_name not in self.snapshot_metrics.index:
+            return 0
+        value = self.snapshot_metrics.at[scenario_name, column]
+        return float(value) if pd.notna(value) else 0
+    
+    def _detection_value(self, scenario_name, column):
+        """A scenario's detection metric from the ground-truth join, else from its snapshots"""
+        if self.detection_summary is not None and scenario_name in self.detection_summary.index:
+            value = self.detection_summary.at[scenario_name, column]
+            if pd.notna(value):
+                return float(value)
+        return self._snapshot_value(scenario_name, column)
+    
     def _list_available_files(self):
         """List all CSV files in the results directory for debugging"""
         try:
@@ -95,87 +234,94 @@ class AttackAnalyzer:
         
         summary_data = []
         
-        for scenario_name, df in self.metrics.items():
-            if df.empty:
+        for scenario_name, data in self.metrics.items():
+            if isinstance(data, PacketAccumulator):
+                columns, stats = data.columns, data.stats
+            else:
+                columns, stats = list(data.columns), packet_stats(data)
+            total_rows = int(stats['packets'].sum())
+            if total_rows == 0:
                 continue
             
             print(f"\n  Processing {scenario_name}:")
-            print(f"    CSV columns: {', '.join(df.columns)}")
-            print(f"    Total rows: {len(df)}")
+            print(f"    CSV columns: {', '.join(columns)}")
+            print(f"    Total rows: {total_rows}")
             
             # Calculate metrics from packet-delivery-analysis.csv format
             # Columns: PacketID,SourceNode,DestNode,SendTime,ReceiveTime,DelayMs,Delivered,WormholeOnPath,BlackholeOnPath
             
             summary = {'Scenario': scenario_name}
             
-            # Calculate PDR (Packet Delivery Ratio)
-            if 'Delivered' in df.columns:
-                total_packets = len(df)
-                delivered_packets = df['Delivered'].sum()
-                pdr = (delivered_packets / total_packets) if total_packets > 0 else 0
-                summary['Avg_PDR'] = pdr
-                print(f"    PDR: {pdr:.4f} ({delivered_packets}/{total_packets})")
-            else:
-                summary['Avg_PDR'] = 0
-            
-            # Calculate Average Delay (only for delivered packets)
-            if 'DelayMs' in df.columns and 'Delivered' in df.columns:
-                delivered_df = df[df['Delivered'] == 1]
-                if len(delivered_df) > 0:
-                    avg_delay = delivered_df['DelayMs'].mean()
-                    summary['Avg_Delay_ms'] = avg_delay
-                    print(f"    Avg Delay: {avg_delay:.2f} ms")
+            if 'Delivered' in columns:
+                overall = summarize(stats)
+                total_packets = overall['packets']
+                delivered_packets = overall['delivered']
+                
+                # Calculate PDR (Packet Delivery Ratio)
+                summary['Avg_PDR'] = overall['pdr']
+                print(f"    PDR: {overall['pdr']:.4f} ({delivered_packets}/{total_packets})")
+                
+                # Calculate Average Delay (only for delivered packets)
+                if 'DelayMs' in columns and delivered_packets > 0:
+                    summary['Avg_Delay_ms'] = overall['delay_mean']
+                    print(f"    Avg Delay: {overall['delay_mean']:.2f} ms")
                 else:
                     summary['Avg_Delay_ms'] = 0
-            else:
-                summary['Avg_Delay_ms'] = 0
-            
-            # Calculate Throughput (approximate based on delivered packets and simulation time)
-            if 'Delivered' in df.columns and 'ReceiveTime' in df.columns:
-                delivered_df = df[df['Delivered'] == 1]
-                if len(delivered_df) > 0:
-                    sim_duration = df['ReceiveTime'].max() - df['SendTime'].min() if 'SendTime' in df.columns else 100
-                    if sim_duration > 0:
-                        # Assume average packet size of 512 bytes
-                        packet_size_bytes = 512
-                        total_bytes = delivered_df.shape[0] * packet_size_bytes
-                        throughput_mbps = (total_bytes * 8) / (sim_duration * 1_000_000)
-                        summary['Avg_Throughput_Mbps'] = throughput_mbps
+                
+                # Tail latency from the run's delay sketch
+                tail = self.delay_percentiles([scenario_name])
+                for p in PERCENTILES:
+                    value = tail[f'p{p}']
+                    summary[f'Delay_P{p}_ms'] = value if np.isfinite(value) else 0
+                if delivered_packets > 0 and np.isfinite(tail['p50']):
+                    print(f"    Delay p50/p95/p99: {tail['p50']:.2f} / {tail['p95']:.2f} / {tail['p99']:.2f} ms")
+                
+                # Calculate Throughput (approximate based on delivered packets and simulation time)
+                # Assume average packet size of 512 bytes
+                if 'ReceiveTime' in columns and delivered_packets > 0:
+                    duration = None if 'SendTime' in columns else 100
+                    throughput_mbps = delivered_throughput_mbps(stats, duration=duration)
+                    summary['Avg_Throughput_Mbps'] = throughput_mbps
+                    if throughput_mbps > 0:
                         print(f"    Throughput: {throughput_mbps:.4f} Mbps")
-                    else:
-                        summary['Avg_Throughput_Mbps'] = 0
                 else:
                     summary['Avg_Throughput_Mbps'] = 0
-            else:
-                summary['Avg_Throughput_Mbps'] = 0
-            
-            # Calculate Packet Loss Rate
-            if 'Delivered' in df.columns:
-                total_packets = len(df)
-                dropped_packets = total_packets - df['Delivered'].sum()
-                loss_rate = (dropped_packets / total_packets) if total_packets > 0 else 0
+                
+                # Calculate Packet Loss Rate
+                loss_rate = (overall['dropped'] / total_packets) if total_packets > 0 else 0
                 summary['Packet_Loss_Rate'] = loss_rate
                 print(f"    Packet Loss Rate: {loss_rate:.4f}")
             else:
+                summary['Avg_PDR'] = 0
+                summary['Avg_Delay_ms'] = 0
+                for p in PERCENTILES:
+                    summary[f'Delay_P{p}_ms'] = 0
+                summary['Avg_Throughput_Mbps'] = 0
                 summary['Packet_Loss_Rate'] = 0
             
             # Check for attack indicators
-            if 'WormholeOnPath' in df.columns:
-                wormhole_affected = df['WormholeOnPath'].sum()
+            if 'WormholeOnPath' in columns:
+                wormhole_affected = summarize(stats, WORMHOLE)['packets']
                 summary['Wormhole_Affected_Packets'] = wormhole_affected
                 print(f"    Wormhole affected: {wormhole_affected} packets")
             
-            if 'BlackholeOnPath' in df.columns:
-                blackhole_affected = df['BlackholeOnPath'].sum()
+            if 'BlackholeOnPath' in columns:
+                blackhole_affected = summarize(stats, BLACKHOLE)['packets']
                 summary['Blackhole_Affected_Packets'] = blackhole_affected
                 print(f"    Blackhole affected: {blackhole_affected} packets")
             
-            # Routing overhead (not in packet-delivery file, set to 0)
-            summary['Routing_Overhead'] = 0
-            
-            # Detection metrics (would need separate detection CSV files)
-            summary['Detection_Rate'] = 0
-            summary['False_Positive_Rate'] = 0
+            # Routing overhead from the run's snapshot CSVs; detection metrics from
+            # the ground-truth join when the run has one, else the snapshots (0 when absent)
+            summary['Routing_Overhead'] = self._snapshot_value(scenario_name, 'Routing_Overhead')
+            summary['Detection_Rate'] = self._detection_value(scenario_name, 'Detection_Rate')
+            summary['False_Positive_Rate'] = self._detection_value(scenario_name, 'False_Positive_Rate')
+            summary['Detection_Latency_s'] = np.nan
+            if self.detection_summary is not None and scenario_name in self.detection_summary.index:
+                summary['Detection_Latency_s'] = self.detection_summary.at[scenario_name, 'Detection_Latency_s']
+            if (self.snapshot_metrics is not None and scenario_name in self.snapshot_metrics.index) or \
+                    (self.detection_summary is not None and scenario_name in self.detection_summary.index):
+                print(f"    Overhead: {summary['Routing_Overhead']:.4f}, Detection rate: "
+                      f"{summary['Detection_Rate']:.4f}, False positive rate: {summary['False_Positive_Rate']:.4f}")
             summary['Energy_Consumption_J'] = 0
             
             summary_data.append(summary)
@@ -189,6 +335,106 @@ class AttackAnalyzer:
         
         return summary_df
     
+    def replicate_statistics(self, summary_df):
+        """
+        Seed means and bootstrap CIs of REPLICATE_COLUMNS, one row per
+        scenario (the seeds of one sweep point), saved to replicate_statistics.csv.
+        """
+        if summary_df.empty:
+            return None
+        runs = dict((name, run) for run, name in self.scenarios)
+        labels = dict(zip(runs, replicate_labels(list(runs.values()))))
+        frame = summary_df[REPLICATE_COLUMNS].assign(Scenario=summary_df['Scenario'].map(labels))
+        self.replicates = grouped_ci_table(frame, 'Scenario', REPLICATE_COLUMNS, self.n_resamples, self.confidence)
+        
+        replicate_file = os.path.join(self.results_dir, 'replicate_statistics.csv')
+        self.replicates.to_csv(replicate_file, index=False)
+        print(f"  ✓ Replicate statistics ({len(self.replicates)} scenario(s), "
+              f"{self.confidence:.0%} bootstrap CI) saved to: {replicate_file}")
+        return self.replicates
+    
+    def mitigation_effects(self, summary_df):
+        """
+        Paired with-vs-without mitigation differences (MITIGATION_EFFECTS) of
+        every seed with both runs, averaged per scenario with bootstrap CIs;
+        saved to attack_mitigation_effects.csv.  None without such pairs.
+        """
+        names = {run_key(run): name for run, name in self.scenarios}
+        rows = summary_df.set_index('Scenario')
+        pairs = [(without_run, names[run_key(without_run)], names[run_key(with_run)])
+                 for without_run, with_run in self.catalog.mitigation_pairs()
+                 if names[run_key(without_run)] in rows.index and names[run_key(with_run)] in rows.index]
+        if not pairs:
+            return None
+        
+        differences = pd.DataFrame({
+            'Scenario': replicate_labels([run for run, _, _ in pairs], include_mitigation=False)})
+        for column, source, sign, scale, _, _ in MITIGATION_EFFECTS:
+            without = rows.loc[[w for _, w, _ in pairs], source].to_numpy(dtype=np.float64)
+            with_ = rows.loc[[w for _, _, w in pairs], source].to_numpy(dtype=np.float64)
+            differences[column] = sign * (with_ - without) * scale
+        columns = [column for column, *_ in MITIGATION_EFFECTS]
+        self.effects = grouped_ci_table(differences, 'Scenario', columns, self.n_resamples, self.confidence)
+        
+        effects_file = os.path.join(self.results_dir, 'attack_mitigation_effects.csv')
+        self.effects.to_csv(effects_file, index=False)
+        print(f"  ✓ Paired mitigation effects saved to: {effects_file}")
+        return self.effects
+    
+    def print_replicate_statistics(self):
+        """Print seed means with CIs per scenario, and the paired mitigation effects"""
+        if self.replicates is not None and not self.replicates.empty:
+            print("\n" + "="*60)
+            print(f"REPLICATE STATISTICS (mean over seeds, {self.confidence:.0%} bootstrap CI)")
+            print("="*60)
+            for _, row in self.replicates.iterrows():
+                print(f"  {row['Scenario']} ({row['N_Runs']} run(s))")
+                for column, fmt in (('Avg_PDR', '.4f'), ('Avg_Delay_ms', '.2f'),
+                                    ('Avg_Throughput_Mbps', '.4f'), ('Packet_Loss_Rate', '.4f')):
+                    ci = format_ci(row[column], row[f'{column}_CI_Low'], row[f'{column}_CI_High'], fmt)
+                    print(f"    {column:<20} {ci}")
+        
+        if self.effects is not None and not self.effects.empty:
+            print("\n" + "="*60)
+            print("MITIGATION EFFECT (paired with - without, per seed)")
+            print("="*60)
+            print(f"  ✓ CI above 0   ✗ CI below 0   ~ CI spans 0   ? fewer than {MIN_CI_RUNS} runs (no CI)")
+            for _, row in self.effects.iterrows():
+                print(f"  {row['Scenario']} ({row['N_Runs']} pair(s))")
+                for column, _, _, _, label, unit in MITIGATION_EFFECTS:
+                    low, high = row[f'{column}_CI_Low'], row[f'{column}_CI_High']
+                    print(f"    {label:<20} {format_ci(row[column], low, high, '+.2f')} {unit} "
+                          f"{ci_verdict(low, high)}")
+    
+    def delay_percentiles(self, scenario_names=None, categories=ALL):
+        """
+        p50/p95/p99 delay (ms) pooled over the given scenarios (all when None).
+
+        Merges the persisted per-run sketches, so no packet data is reread.
+        """
+        if scenario_names is None:
+            scenario_names = list(self.sketches)
+        pooled = empty_sketches()
+        for name in scenario_names:
+            if name in self.sketches:
+                merge_sketches(pooled, self.sketches[name])
+        return delay_percentiles(pooled, categories)
+    
+    def print_tail_latency(self):
+        """Print pooled tail latency of all attack runs per traffic category"""
+        attack_runs = [name for name in self.sketches if 'Baseline' not in name]
+        if not attack_runs:
+            return
+        
+        print("\n" + "="*60)
+        print("TAIL LATENCY (all attack scenarios pooled)")
+        print("="*60)
+        for label, categories in (('All packets', ALL), ('Normal', NORMAL),
+                                  ('Wormhole path', WORMHOLE), ('Blackhole path', BLACKHOLE)):
+            tail = self.delay_percentiles(attack_runs, categories)
+            if np.isfinite(tail['p50']):
+                print(f"  {label:<16} p50 {tail['p50']:8.2f} ms   p95 {tail['p95']:8.2f} ms   p99 {tail['p99']:8.2f} ms")
+    
     def generate_comparison_table(self, summary_df):
         """Generate detailed comparison table"""
         print("\nGenerating comparison table...")
@@ -239,112 +485,59 @@ class AttackAnalyzer:
         else:
             return "Low"
     
-    def generate_visualizations(self, summary_df):
-        """Generate visualization plots"""
+    def generate_visualizations(self, summary_df, jobs=1):
+        """Generate visualization plots (jobs > 1 renders them in parallel)"""
         print("\nGenerating visualizations...")
         
         if summary_df.empty:
             print("  ⚠ No data available for visualization")
             return
         
-        # Set style
-        sns.set_style("whitegrid")
-        plt.rcParams['figure.figsize'] = (15, 10)
-        
-        # Create figure with subplots
-        fig, axes = plt.subplots(2, 3, figsize=(18, 12))
-        fig.suptitle('SDVN Attack Performance Analysis', fontsize=16, fontweight='bold')
-        
-        scenarios = summary_df['Scenario'].tolist()
-        
-        # Plot 1: PDR Comparison
-        ax1 = axes[0, 0]
-        ax1.bar(range(len(scenarios)), summary_df['Avg_PDR'], color='steelblue')
-        ax1.set_xlabel('Scenario')
-        ax1.set_ylabel('Packet Delivery Ratio')
-        ax1.set_title('PDR Comparison')
-        ax1.set_xticks(range(len(scenarios)))
-        ax1.set_xticklabels([s.replace(' ', '\n') for s in scenarios], rotation=45, ha='right', fontsize=8)
-        ax1.grid(axis='y', alpha=0.3)
-        
-        # Plot 2: Delay Comparison
-        ax2 = axes[0, 1]
-        ax2.bar(range(len(scenarios)), summary_df['Avg_Delay_ms'], color='coral')
-        ax2.set_xlabel('Scenario')
-        ax2.set_ylabel('Average Delay (ms)')
-        ax2.set_title('End-to-End Delay Comparison')
-        ax2.set_xticks(range(len(scenarios)))
-        ax2.set_xticklabels([s.replace(' ', '\n') for s in scenarios], rotation=45, ha='right', fontsize=8)
-        ax2.grid(axis='y', alpha=0.3)
-        
-        # Plot 3: Throughput Comparison
-        ax3 = axes[0, 2]
-        ax3.bar(range(len(scenarios)), summary_df['Avg_Throughput_Mbps'], color='lightgreen')
-        ax3.set_xlabel('Scenario')
-        ax3.set_ylabel('Throughput (Mbps)')
-        ax3.set_title('Network Throughput Comparison')
-        ax3.set_xticks(range(len(scenarios)))
-        ax3.set_xticklabels([s.replace(' ', '\n') for s in scenarios], rotation=45, ha='right', fontsize=8)
-        ax3.grid(axis='y', alpha=0.3)
-        
-        # Plot 4: Packet Loss Rate
-        ax4 = axes[1, 0]
-        ax4.bar(range(len(scenarios)), summary_df['Packet_Loss_Rate'], color='salmon')
-        ax4.set_xlabel('Scenario')
-        ax4.set_ylabel('Packet Loss Rate')
-        ax4.set_title('Packet Loss Rate Comparison')
-        ax4.set_xticks(range(len(scenarios)))
-        ax4.set_xticklabels([s.replace(' ', '\n') for s in scenarios], rotation=45, ha='right', fontsize=8)
-        ax4.grid(axis='y', alpha=0.3)
-        
-        # Plot 5: Detection Rate
-        ax5 = axes[1, 1]
-        detection_rates = summary_df['Detection_Rate'].fillna(0)
-        ax5.bar(range(len(scenarios)), detection_rates, color='mediumseagreen')
-        ax5.set_xlabel('Scenario')
-        ax5.set_ylabel('Detection Rate')
-        ax5.set_title('Attack Detection Rate')
-        ax5.set_xticks(range(len(scenarios)))
-        ax5.set_xticklabels([s.replace(' ', '\n') for s in scenarios], rotation=45, ha='right', fontsize=8)
-        ax5.grid(axis='y', alpha=0.3)
-        
-        # Plot 6: Routing Overhead
-        ax6 = axes[1, 2]
-        ax6.bar(range(len(scenarios)), summary_df['Routing_Overhead'], color='mediumpurple')
-        ax6.set_xlabel('Scenario')
-        ax6.set_ylabel('Routing Overhead')
-        ax6.set_title('Routing Overhead Comparison')
-        ax6.set_xticks(range(len(scenarios)))
-        ax6.set_xticklabels([s.replace(' ', '\n') for s in scenarios], rotation=45, ha='right', fontsize=8)
-        ax6.grid(axis='y', alpha=0.3)
-        
-        plt.tight_layout()
-        
-        # Save figure
+        # One bar per scenario (seed mean) with its bootstrap CI
+        replicates = self.replicates if self.replicates is not None else self.replicate_statistics(summary_df)
+        scenarios = replicates['Scenario'].tolist()
+        panels = [
+            ('Avg_PDR', 'Packet Delivery Ratio', 'PDR Comparison', 'steelblue'),
+            ('Avg_Delay_ms', 'Average Delay (ms)', 'End-to-End Delay Comparison', 'coral'),
+            ('Avg_Throughput_Mbps', 'Throughput (Mbps)', 'Network Throughput Comparison', 'lightgreen'),
+            ('Packet_Loss_Rate', 'Packet Loss Rate', 'Packet Loss Rate Comparison', 'salmon'),
+            ('Detection_Rate', 'Detection Rate', 'Attack Detection Rate', 'mediumseagreen'),
+            ('Routing_Overhead', 'Routing Overhead', 'Routing Overhead Comparison', 'mediumpurple'),
+        ]
+        panels = [(replicates[column].fillna(0).to_numpy(), error_bars(replicates, column), *labels)
+                  for column, *labels in panels]
         plot_file = os.path.join(self.results_dir, 'performance_comparison.png')
-        plt.savefig(plot_file, dpi=300, bbox_inches='tight')
-        print(f"  ✓ Visualization saved to: {plot_file}")
-        plt.close()
+        render_jobs = [RenderJob('performance_comparison.png', render_performance_comparison,
+                                 (scenarios, panels, plot_file))]
         
         # Generate additional attack-specific plots
-        self._generate_attack_impact_plot(summary_df)
+        impact = self._attack_impact_data(summary_df)
+        if impact is not None:
+            impact_file = os.path.join(self.results_dir, 'attack_impact_comparison.png')
+            render_jobs.append(RenderJob('attack_impact_comparison.png', render_attack_impact_comparison,
+                                         (*impact, impact_file)))
+        
+        detection = self._detection_plot_data()
+        if detection is not None:
+            detection_file = os.path.join(self.results_dir, 'detection_accuracy.png')
+            render_jobs.append(RenderJob('detection_accuracy.png', render_detection_accuracy,
+                                         (*detection, detection_file)))
+        
+        start = time.perf_counter()
+        timings = render_figures(render_jobs, jobs)
+        print_render_timings(timings, time.perf_counter() - start, jobs)
     
-    def _generate_attack_impact_plot(self, summary_df):
-        """Generate attack impact comparison plot"""
+    def _attack_impact_data(self, summary_df):
+        """Per-attack degradation percentages relative to the baseline, or None"""
         baseline_idx = summary_df[summary_df['Scenario'].str.contains('Baseline')].index
         if len(baseline_idx) == 0:
-            return
+            return None
         
         baseline = summary_df.iloc[baseline_idx[0]]
         attack_scenarios = summary_df[~summary_df['Scenario'].str.contains('Baseline')]
         
         if attack_scenarios.empty:
-            return
-        
-        fig, ax = plt.subplots(figsize=(12, 6))
-        
-        x = np.arange(len(attack_scenarios))
-        width = 0.25
+            return None
         
         pdr_impact = [(baseline['Avg_PDR'] - row['Avg_PDR']) / baseline['Avg_PDR'] * 100 
                      for _, row in attack_scenarios.iterrows()]
@@ -353,42 +546,50 @@ class AttackAnalyzer:
         throughput_impact = [(baseline['Avg_Throughput_Mbps'] - row['Avg_Throughput_Mbps']) / baseline['Avg_Throughput_Mbps'] * 100 
                             for _, row in attack_scenarios.iterrows()]
         
-        ax.bar(x - width, pdr_impact, width, label='PDR Degradation', color='steelblue')
-        ax.bar(x, delay_impact, width, label='Delay Increase', color='coral')
-        ax.bar(x + width, throughput_impact, width, label='Throughput Degradation', color='lightgreen')
-        
-        ax.set_xlabel('Attack Scenario')
-        ax.set_ylabel('Impact (%)')
-        ax.set_title('Attack Impact Comparison (vs Baseline)')
-        ax.set_xticks(x)
-        ax.set_xticklabels([s.replace(' ', '\n') for s in attack_scenarios['Scenario']], rotation=45, ha='right', fontsize=9)
-        ax.legend()
-        ax.grid(axis='y', alpha=0.3)
-        
-        plt.tight_layout()
-        impact_file = os.path.join(self.results_dir, 'attack_impact_comparison.png')
-        plt.savefig(impact_file, dpi=300, bbox_inches='tight')
-        print(f"  ✓ Attack impact plot saved to: {impact_file}")
-        plt.close()
+        return attack_scenarios['Scenario'].tolist(), pdr_impact, delay_impact, throughput_impact
+    
+    def _detection_plot_data(self):
+        """Per-run precision / recall / FPR rows and per-run box stats of the per-node latencies, or None"""
+        if self.detection is None or self.detection.empty:
+            return None
+        rates = self.detection[['Run', 'Attack', 'Precision', 'Recall', 'False_Positive_Rate']]
+        latency = self.detection_nodes.dropna(subset=['Detection_Latency_s']) \
+            if self.detection_nodes is not None and not self.detection_nodes.empty else pd.DataFrame()
+        boxes = []
+        if not latency.empty:
+            for run, values in latency.groupby('Run', sort=False)['Detection_Latency_s']:
+                s = summarize_values(values.to_numpy())
+                boxes.append(dict(label=run, mean=s['mean'], med=s['med'], q1=s['q1'], q3=s['q3'],
+                                  whislo=s['whislo'], whishi=s['whishi'], fliers=np.zeros(0)))
+        return rates, boxes
     
     def generate_latex_table(self, summary_df):
         """Generate LaTeX table for research paper"""
         print("\nGenerating LaTeX table...")
         
         latex_file = os.path.join(self.results_dir, 'results_latex_table.tex')
+        replicates = self.replicates if self.replicates is not None else self.replicate_statistics(summary_df)
+        
+        def cell(row, column, fmt):
+            return latex_ci(row[column], row[f'{column}_CI_Low'], row[f'{column}_CI_High'], fmt)
         
         with open(latex_file, 'w') as f:
+            confidence = f"{self.confidence * 100:g}\\%"
             f.write("\\begin{table}[htbp]\n")
             f.write("\\centering\n")
-            f.write("\\caption{Performance Comparison Under Different Attack Scenarios}\n")
+            f.write("\\caption{Performance Comparison Under Different Attack Scenarios "
+                    f"(mean over $n$ seeds, {confidence} bootstrap CI)}}\n")
             f.write("\\label{tab:attack_performance}\n")
-            f.write("\\begin{tabular}{|l|c|c|c|c|}\n")
+            f.write("\\begin{tabular}{|l|c|c|c|c|c|c|}\n")
             f.write("\\hline\n")
-            f.write("\\textbf{Scenario} & \\textbf{PDR} & \\textbf{Delay (ms)} & \\textbf{Throughput (Mbps)} & \\textbf{Detection Rate} \\\\\n")
+            f.write("\\textbf{Scenario} & \\textbf{$n$} & \\textbf{PDR} & \\textbf{Delay (ms)} & \\textbf{Throughput (Mbps)} & \\textbf{Detection Rate} & \\textbf{FPR} \\\\\n")
             f.write("\\hline\n")
             
-            for _, row in summary_df.iterrows():
-                f.write(f"{row['Scenario']} & {row['Avg_PDR']:.3f} & {row['Avg_Delay_ms']:.2f} & {row['Avg_Throughput_Mbps']:.2f} & {row['Detection_Rate']:.3f} \\\\\n")
+            for _, row in replicates.iterrows():
+                scenario = row['Scenario'].replace('%', '\\%')
+                f.write(f"{scenario} & {row['N_Runs']} & {cell(row, 'Avg_PDR', '.3f')} & {cell(row, 'Avg_Delay_ms', '.2f')} & "
+                        f"{cell(row, 'Avg_Throughput_Mbps', '.2f')} & {cell(row, 'Detection_Rate', '.3f')} & "
+                        f"{cell(row, 'False_Positive_Rate', '.3f')} \\\\\n")
             
             f.write("\\hline\n")
             f.write("\\end{tabular}\n")
@@ -396,13 +597,13 @@ class AttackAnalyzer:
         
         print(f"  ✓ LaTeX table saved to: {latex_file}")
     
-    def generate_report(self):
+    def generate_report(self, jobs=1, plots=True):
         """Generate comprehensive analysis report"""
         print("\n" + "="*60)
         print("SDVN ATTACK ANALYSIS REPORT")
         print("="*60)
         
-        self.load_metrics()
+        self.load_metrics(jobs=jobs)
         
         if not self.metrics:
             print("\n⚠ No metric files found. Please check the results directory.")
@@ -412,7 +613,12 @@ class AttackAnalyzer:
         
         if not summary_df.empty:
             comparison_df = self.generate_comparison_table(summary_df)
-            self.generate_visualizations(summary_df)
+            self.export_run_metrics(summary_df)
+            self.export_detection_accuracy()
+            self.replicate_statistics(summary_df)
+            self.mitigation_effects(summary_df)
+            if plots:
+                self.generate_visualizations(summary_df, jobs=jobs)
             self.generate_latex_table(summary_df)
             
             print("\n" + "="*60)
@@ -425,6 +631,9 @@ class AttackAnalyzer:
                 print("ATTACK IMPACT ANALYSIS")
                 print("="*60)
                 print(comparison_df.to_string(index=False))
+            
+            self.print_replicate_statistics()
+            self.print_tail_latency()
         
         print("\n" + "="*60)
         print("ANALYSIS COMPLETE")
@@ -432,20 +641,152 @@ class AttackAnalyzer:
         print(f"\nAll results saved to: {self.results_dir}")
         print("\nGenerated files:")
         print("  - summary_statistics.csv")
+        if self.run_metrics is not None and len(self.run_metrics.columns):
+            print("  - summary_with_run_metrics.csv")
         print("  - attack_impact_comparison.csv")
-        print("  - performance_comparison.png")
-        print("  - attack_impact_comparison.png")
+        if self.detection is not None and not self.detection.empty:
+            print("  - detection_accuracy.csv")
+            if not self.detection_nodes.empty:
+                print("  - detection_nodes.csv")
+        print("  - replicate_statistics.csv")
+        if self.effects is not None:
+            print("  - attack_mitigation_effects.csv")
+        if plots:
+            print("  - performance_comparison.png")
+            print("  - attack_impact_comparison.png")
+            if self.detection is not None and not self.detection.empty:
+                print("  - detection_accuracy.png")
         print("  - results_latex_table.tex")
 
+
+def render_performance_comparison(scenarios, panels, plot_file):
+    """Render the 2x3 grid of per-scenario bar charts with (2, n) CI error bars"""
+    # Set style
+    plt = load_pyplot({'figure.figsize': (15, 10)})
+    
+    # Create figure with subplots
+    fig, axes = plt.subplots(2, 3, figsize=(18, 12))
+    fig.suptitle('SDVN Attack Performance Analysis', fontsize=16, fontweight='bold')
+    
+    for ax, (values, errors, ylabel, title, color) in zip(axes.flat, panels):
+        ax.bar(range(len(scenarios)), values, yerr=errors, capsize=3, color=color)
+        ax.set_xlabel('Scenario')
+        ax.set_ylabel(ylabel)
+        ax.set_title(title)
+        ax.set_xticks(range(len(scenarios)))
+        ax.set_xticklabels([s.replace(' ', '\n') for s in scenarios], rotation=45, ha='right', fontsize=8)
+        ax.grid(axis='y', alpha=0.3)
+    
+    plt.tight_layout()
+    
+    # Save figure
+    plt.savefig(plot_file, dpi=300, bbox_inches='tight')
+    print(f"  ✓ Visualization saved to: {plot_file}")
+    plt.close()
+
+
+def render_attack_impact_comparison(attack_names, pdr_impact, delay_impact, throughput_impact, impact_file):
+    """Render grouped degradation bars for each attack scenario"""
+    plt = load_pyplot()
+    fig, ax = plt.subplots(figsize=(12, 6))
+    
+    x = np.arange(len(attack_names))
+    width = 0.25
+    
+    ax.bar(x - width, pdr_impact, width, label='PDR Degradation', color='steelblue')
+    ax.bar(x, delay_impact, width, label='Delay Increase', color='coral')
+    ax.bar(x + width, throughput_impact, width, label='Throughput Degradation', color='lightgreen')
+    
+    ax.set_xlabel('Attack Scenario')
+    ax.set_ylabel('Impact (%)')
+    ax.set_title('Attack Impact Comparison (vs Baseline)')
+    ax.set_xticks(x)
+    ax.set_xticklabels([s.replace(' ', '\n') for s in attack_names], rotation=45, ha='right', fontsize=9)
+    ax.legend()
+    ax.grid(axis='y', alpha=0.3)
+    
+    plt.tight_layout()
+    plt.savefig(impact_file, dpi=300, bbox_inches='tight')
+    print(f"  ✓ Attack impact plot saved to: {impact_file}")
+    plt.close()
+
+
+def render_detection_accuracy(rates, boxes, detection_file):
+    """Render per-run precision / recall / FPR bars and, when known, per-node detection latency boxes"""
+    plt = load_pyplot()
+    fig, axes = plt.subplots(1, 2 if boxes else 1, figsize=(16 if boxes else 10, 6), squeeze=False)
+    
+    ax = axes[0, 0]
+    x = np.arange(len(rates))
+    width = 0.25
+    ax.bar(x - width, rates['Precision'].fillna(0), width, label='Precision', color='steelblue')
+    ax.bar(x, rates['Recall'].fillna(0), width, label='Recall (detection rate)', color='mediumseagreen')
+    ax.bar(x + width, rates['False_Positive_Rate'].fillna(0), width, label='False positive rate', color='salmon')
+    ax.set_xlabel('Run')
+    ax.set_ylabel('Rate')
+    ax.set_ylim(0, 1.05)
+    ax.set_title('Detection Accuracy vs Ground Truth')
+    ax.set_xticks(x)
+    ax.set_xticklabels([f"{run}\n({attack})" for run, attack in zip(rates['Run'], rates['Attack'])],
+                       rotation=45, ha='right', fontsize=8)
+    ax.legend()
+    ax.grid(axis='y', alpha=0.3)
+    
+    if boxes:
+        ax = axes[0, 1]
+        ax.bxp(boxes, showmeans=True, showfliers=False)
+        ax.set_xlabel('Run')
+        ax.set_ylabel('Detection Latency (s)')
+        ax.set_title('Per-Node Time to Detect (blackhole)')
+        ax.set_xticks(range(1, len(boxes) + 1))
+        ax.set_xticklabels([box['label'] for box in boxes], rotation=45, ha='right', fontsize=8)
+        ax.grid(axis='y', alpha=0.3)
+    
+    plt.tight_layout()
+    plt.savefig(detection_file, dpi=300, bbox_inches='tight')
+    print(f"  ✓ Detection accuracy plot saved to: {detection_file}")
+    plt.close()
+
+
 def main():
-    if len(sys.argv) < 2:
+    parser = argparse.ArgumentParser(description='Analyze SDVN attack test results', add_help=False)
+    parser.add_argument('results_dir', nargs='?')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Worker processes for loading runs and rendering figures (0 = all cores, default: 1)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Aggregate packet traces in bounded chunks instead of loading them')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument('--no-store', action='store_true',
+                        help='Re-reduce every run instead of reusing metrics_store.sqlite')
+    parser.add_argument('--no-plots', '--metrics-only', dest='no_plots', action='store_true',
+                        help='Write the tables only (never imports matplotlib/seaborn)')
+    parser.add_argument('--resamples', type=int, default=DEFAULT_RESAMPLES,
+                        help=f'Bootstrap resamples per confidence interval (default: {DEFAULT_RESAMPLES})')
+    parser.add_argument('--confidence', type=float, default=DEFAULT_CONFIDENCE,
+                        help=f'Confidence level of the intervals (default: {DEFAULT_CONFIDENCE})')
+    parser.add_argument('--where', action='append', metavar='KEY=V1[,V2]',
+                        help='Partition filter when results_dir is a results_dataset.py dataset (repeatable)')
+    parser.add_argument('--help', '-h', action='store_true')
+    args = parser.parse_args()
+    
+    if args.results_dir is None or args.help:
         print("="*70)
         print("SDVN Attack Results Analyzer")
         print("="*70)
         print("\nUsage:")
-        print("  python3 analyze_attack_results.py <results_directory>")
+        print("  python3 analyze_attack_results.py <results_directory> [--jobs N] [--stream [--chunksize ROWS]] [--no-store] [--no-plots] [--resamples N] [--confidence C] [--where KEY=V1[,V2]]")
+        print("\nOptions:")
+        print("  --jobs N, -j N   Load runs and render figures in N parallel processes (0 = all cores)")
+        print("  --stream         Reduce packet CSVs in bounded chunks (traces larger than RAM)")
+        print(f"  --chunksize ROWS Rows per chunk in --stream mode (default: {DEFAULT_CHUNK_ROWS})")
+        print("  --no-store       Re-reduce every run instead of reusing metrics_store.sqlite")
+        print("  --no-plots       Tables only, no figures (alias --metrics-only; fast startup)")
+        print(f"  --resamples N    Bootstrap resamples per seed-replicate CI (default: {DEFAULT_RESAMPLES})")
+        print(f"  --confidence C   Confidence level of the CIs (default: {DEFAULT_CONFIDENCE})")
+        print("  --where K=V[,V]  With a results dataset: only partitions matching (e.g. attack=blackhole)")
         print("\nExample:")
         print("  python3 analyze_attack_results.py sdvn_attack_results_20251031_143022")
+        print("  python3 analyze_attack_results.py results_dataset --where attack=baseline,blackhole")
         print("\nThis tool analyzes CSV files generated by test_sdvn_attacks.sh")
         print("Expected files:")
         print("  - test1_sdvn_baseline_packet-delivery-analysis.csv")
@@ -462,7 +803,7 @@ def main():
         print("="*70)
         sys.exit(1)
     
-    results_dir = sys.argv[1]
+    results_dir = args.results_dir
     
     if not os.path.exists(results_dir):
         print(f"Error: Directory '{results_dir}' not found")
@@ -479,8 +820,16 @@ def main():
             pass
         sys.exit(1)
     
-    analyzer = AttackAnalyzer(results_dir)
-    analyzer.generate_report()
+    try:
+        dataset, filters = open_source(results_dir, args.where)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    
+    analyzer = AttackAnalyzer(results_dir, streaming=args.stream, chunksize=args.chunksize,
+                              use_store=not args.no_store, n_resamples=args.resamples, confidence=args.confidence,
+                              dataset=dataset, filters=filters)
+    analyzer.generate_report(jobs=args.jobs, plots=not args.no_plots)
 
 if __name__ == "__main__":
     main()
@@ -6,91 +6,213 @@ Compares attack impact WITH and WITHOUT mitigation solutions
 
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import seaborn as sns
+import argparse
 import os
 import sys
+import time
 from pathlib import Path
 
+from metric_values import load_metric_table
+from metrics_store import reduce_runs
+from packet_metrics import (PacketAccumulator, delay_percentiles, delivered_throughput_mbps, empty_sketches,
+                            merge_sketches, packet_stats, summarize)
+from plot_scheduler import RenderJob, load_pyplot, print_render_timings, render_figures
+from replicate_stats import (DEFAULT_CONFIDENCE, DEFAULT_RESAMPLES, MIN_CI_RUNS, ci_verdict, error_bars, format_ci,
+                             grouped_ci_table, latex_ci)
+from results_dataset import open_source
+from scenario_catalog import PACKET_FILE, ScenarioCatalog, replicate_labels, run_key
+
+# Per-pair columns averaged over the seeds of a scenario.  The *_Improvement /
+# *_Reduction / *_Gain columns are with-minus-without differences of one seed,
+# so their bootstrap intervals are paired-difference intervals.
+EFFECT_COLUMNS = ['PDR_Without', 'PDR_With', 'PDR_Improvement',
+                  'Delay_Without', 'Delay_With', 'Delay_Reduction',
+                  'Loss_Rate_Without', 'Loss_Rate_With', 'Loss_Reduction',
+                  'Throughput_Without', 'Throughput_With', 'Throughput_Gain']
+
+# (column, label, unit) of the paired differences, all "higher is better"
+EFFECT_DIFFERENCES = [('PDR_Improvement', 'PDR', '%'), ('Delay_Reduction', 'Delay reduction', 'ms'),
+                      ('Loss_Reduction', 'Loss reduction', '%'), ('Throughput_Gain', 'Throughput gain', 'Mbps')]
+
 class MitigationAnalyzer:
-    def __init__(self, results_dir):
+    def __init__(self, results_dir, use_store=True, n_resamples=DEFAULT_RESAMPLES, confidence=DEFAULT_CONFIDENCE,
+                 dataset=None, filters=None):
         self.results_dir = results_dir
-        self.test_pairs = [
-            # (without_mitigation, with_mitigation, attack_name, percentage)
-            ('test02_wormhole_10_no_mitigation', 'test03_wormhole_10_with_mitigation', 'Wormhole', '10%'),
-            ('test04_wormhole_20_no_mitigation', 'test05_wormhole_20_with_mitigation', 'Wormhole', '20%'),
-            ('test06_blackhole_10_no_mitigation', 'test07_blackhole_10_with_mitigation', 'Blackhole', '10%'),
-            ('test08_blackhole_20_no_mitigation', 'test09_blackhole_20_with_mitigation', 'Blackhole', '20%'),
-            ('test10_sybil_10_no_mitigation', 'test11_sybil_10_with_mitigation', 'Sybil', '10%'),
-            ('test12_combined_10_no_mitigation', 'test13_combined_10_with_mitigation', 'Combined', '10%'),
-        ]
-        self.baseline_dir = 'test01_baseline'
+        # Optional results_dataset.ResultsDataset read instead of scanning
+        # results_dir, restricted to the partitions matching filters
+        self.dataset = dataset
+        self.filters = filters or {}
+        # use_store=True reuses reductions of unchanged runs from metrics_store.sqlite
+        self.use_store = use_store
+        # Bootstrap settings of the per-scenario confidence intervals (replicate_stats)
+        self.n_resamples = n_resamples
+        self.confidence = confidence
+        # (without_mitigation, with_mitigation, attack_name, percentage), filled
+        # from the runs discovered under results_dir by discover_test_pairs()
+        self.catalog = None
+        self.test_pairs = []
+        self.baseline_dir = None
+        self.csv_files = {}
         self.results = []
+        # (without_dir, with_dir) of each row in self.results
+        self.result_runs = []
+        # Seedless scenario label of each no-mitigation run (seeds of a scenario share it)
+        self.pair_scenarios = {}
+        # One row per scenario: seed means and bootstrap CIs of EFFECT_COLUMNS
+        self.effects = None
+        # Wide run x '<file>.<Metric>' table of the Metric,Value result files (metric_values)
+        self.run_metrics = None
+        # Per-test-directory reductions (PacketAccumulator, None if unavailable) and delay sketches
+        self.runs = {}
+        self.sketches = {}
+        
+    def discover_test_pairs(self):
+        """Pair every no-mitigation run with its with-mitigation counterpart"""
+        if self.dataset is not None:
+            self.catalog = self.dataset.catalog(**self.filters)
+        else:
+            self.catalog = ScenarioCatalog.discover(self.results_dir)
+        for run in self.catalog:
+            if PACKET_FILE in run.files:
+                self.csv_files[run_key(run)] = run.files[PACKET_FILE]
         
+        baseline = self.catalog.baseline()
+        self.baseline_dir = run_key(baseline) if baseline is not None else None
+        
+        self.test_pairs = []
+        pairs = self.catalog.mitigation_pairs()
+        scenarios = replicate_labels([without_run for without_run, _ in pairs], include_mitigation=False)
+        for (without_run, with_run), scenario in zip(pairs, scenarios):
+            self.pair_scenarios[run_key(without_run)] = scenario
+            percentage = f'{without_run.percentage}%' if without_run.percentage is not None else 'n/a'
+            if without_run.seed is not None:
+                percentage += f', seed {without_run.seed}'
+            self.test_pairs.append((run_key(without_run), run_key(with_run),
+                                    without_run.attack.title(), percentage))
+        print(f"  Discovered {len(self.catalog)} run(s), {len(self.test_pairs)} with/without mitigation pair(s)")
+    
+    def _csv_path(self, test_dir):
+        return self.csv_files.get(test_dir, os.path.join(self.results_dir, test_dir, PACKET_FILE))
+    
+    def _reduce_runs(self, csv_files, jobs=1):
+        """(key, accumulator, error) per run, from the dataset's stored reductions or metrics_store"""
+        if self.dataset is not None:
+            return self.dataset.reduce_runs(csv_files)
+        return reduce_runs(self.results_dir, csv_files, jobs, use_store=self.use_store)
+    
+    def load_all_runs(self, jobs=1):
+        """
+        Reduce the baseline and every test-pair run, jobs at a time in worker processes.
+        
+        Each worker parses one CSV and returns only its PacketAccumulator, so
+        no more than `jobs` full DataFrames exist at once.
+        """
+        test_dirs = [self.baseline_dir] if self.baseline_dir else []
+        for without_dir, with_dir, _, _ in self.test_pairs:
+            test_dirs += [without_dir, with_dir]
+        
+        csv_files = {}
+        for test_dir in test_dirs:
+            if test_dir in self.runs or test_dir in csv_files:
+                continue
+            csv_path = self._csv_path(test_dir)
+            if os.path.exists(csv_path):
+                csv_files[test_dir] = csv_path
+            else:
+                print(f"  ⚠ File not found: {csv_path}")
+                self.runs[test_dir] = None
+        
+        for test_dir, accumulator, error in self._reduce_runs(csv_files, jobs):
+            if error is not None:
+                print(f"  ⚠ Error loading {test_dir}: {error}")
+                self.runs[test_dir] = None
+                continue
+            self.runs[test_dir] = accumulator
+            self.sketches[test_dir] = accumulator.sketches
+            print(f"  ✓ Loaded {test_dir} ({accumulator.rows} packets)")
+    
     def load_packet_data(self, test_dir):
-        """Load packet-delivery-analysis.csv from a test directory"""
-        csv_path = os.path.join(self.results_dir, test_dir, 'packet-delivery-analysis.csv')
-        if os.path.exists(csv_path):
-            try:
-                df = pd.read_csv(csv_path)
-                return df
-            except Exception as e:
-                print(f"  ⚠ Error loading {test_dir}: {e}")
+        """Reduced packet data (PacketAccumulator) of a test directory, or None"""
+        if test_dir not in self.runs:
+            self.runs[test_dir] = None
+            csv_path = self._csv_path(test_dir)
+            if not os.path.exists(csv_path):
+                print(f"  ⚠ File not found: {csv_path}")
                 return None
-        else:
-            print(f"  ⚠ File not found: {csv_path}")
-            return None
+            for _, accumulator, error in self._reduce_runs({test_dir: csv_path}):
+                if error is not None:
+                    print(f"  ⚠ Error loading {test_dir}: {error}")
+                    return None
+                self.runs[test_dir] = accumulator
+                self.sketches[test_dir] = accumulator.sketches
+        return self.runs[test_dir]
     
-    def calculate_metrics(self, df):
-        """Calculate performance metrics from packet data"""
-        if df is None or df.empty:
+    def calculate_metrics(self, data, sketches=None):
+        """Calculate performance metrics from packet data (DataFrame or PacketAccumulator)"""
+        if data is None:
             return None
+        if isinstance(data, PacketAccumulator):
+            columns, stats = data.columns, data.stats
+            if sketches is None:
+                sketches = data.sketches
+        else:
+            columns, stats = list(data.columns), packet_stats(data)
         
-        total_packets = len(df)
-        delivered_packets = df['Delivered'].sum() if 'Delivered' in df.columns else 0
+        overall = summarize(stats)
+        if overall['packets'] == 0:
+            return None
+        total_packets = overall['packets']
+        delivered_packets = overall['delivered']
         
         metrics = {
             'total_packets': total_packets,
             'delivered_packets': delivered_packets,
             'dropped_packets': total_packets - delivered_packets,
-            'pdr': (delivered_packets / total_packets) if total_packets > 0 else 0,
-            'packet_loss_rate': 1 - (delivered_packets / total_packets) if total_packets > 0 else 0,
+            'pdr': overall['pdr'],
+            'packet_loss_rate': 1 - overall['pdr'] if total_packets > 0 else 0,
         }
         
         # Calculate delay for delivered packets only
-        if 'DelayMs' in df.columns and 'Delivered' in df.columns:
-            delivered_df = df[df['Delivered'] == 1]
-            if len(delivered_df) > 0:
-                metrics['avg_delay_ms'] = delivered_df['DelayMs'].mean()
-                metrics['max_delay_ms'] = delivered_df['DelayMs'].max()
-                metrics['min_delay_ms'] = delivered_df['DelayMs'].min()
+        if 'DelayMs' in columns and 'Delivered' in columns:
+            if delivered_packets > 0:
+                metrics['avg_delay_ms'] = overall['delay_mean']
+                metrics['max_delay_ms'] = overall['delay_max']
+                metrics['min_delay_ms'] = overall['delay_min']
             else:
                 metrics['avg_delay_ms'] = 0
                 metrics['max_delay_ms'] = 0
                 metrics['min_delay_ms'] = 0
+            
+            if sketches is not None:
+                tail = delay_percentiles(sketches)
+                metrics['p95_delay_ms'] = tail['p95'] if delivered_packets > 0 else 0
+                metrics['p99_delay_ms'] = tail['p99'] if delivered_packets > 0 else 0
         
         # Calculate throughput (approximate)
-        if 'ReceiveTime' in df.columns and 'SendTime' in df.columns:
-            sim_duration = df['ReceiveTime'].max() - df['SendTime'].min()
-            if sim_duration > 0:
-                packet_size_bytes = 512
-                total_bytes = delivered_packets * packet_size_bytes
-                metrics['throughput_mbps'] = (total_bytes * 8) / (sim_duration * 1_000_000)
-            else:
-                metrics['throughput_mbps'] = 0
+        if 'ReceiveTime' in columns and 'SendTime' in columns:
+            metrics['throughput_mbps'] = delivered_throughput_mbps(stats)
         
         return metrics
     
-    def analyze_mitigation_effectiveness(self):
-        """Analyze effectiveness of mitigation for each attack"""
+    def analyze_mitigation_effectiveness(self, jobs=1):
+        """Analyze effectiveness of mitigation for each attack (jobs > 1 loads runs in parallel)"""
         print("\n" + "="*80)
         print("SDVN MITIGATION EFFECTIVENESS ANALYSIS")
         print("="*80)
         
+        print("\nLoading runs...")
+        self.discover_test_pairs()
+        self.load_all_runs(jobs)
+        self.load_run_metrics()
+        
         # Load baseline
         print("\nLoading baseline (no attacks)...")
-        baseline_df = self.load_packet_data(self.baseline_dir)
-        baseline_metrics = self.calculate_metrics(baseline_df)
+        if self.baseline_dir is None:
+            print("  ⚠ No baseline run found")
+            baseline_metrics = None
+        else:
+            baseline_df = self.load_packet_data(self.baseline_dir)
+            baseline_metrics = self.calculate_metrics(baseline_df, self.sketches.get(self.baseline_dir))
         
         if baseline_metrics:
             print(f"  ✓ Baseline PDR: {baseline_metrics['pdr']:.4f} ({baseline_metrics['delivered_packets']}/{baseline_metrics['total_packets']})")
@@ -113,8 +235,8 @@ class MitigationAnalyzer:
                 continue
             
             # Calculate metrics
-            metrics_without = self.calculate_metrics(df_without)
-            metrics_with = self.calculate_metrics(df_with)
+            metrics_without = self.calculate_metrics(df_without, self.sketches.get(without_dir))
+            metrics_with = self.calculate_metrics(df_with, self.sketches.get(with_dir))
             
             if not metrics_without or not metrics_with:
                 print("  ✗ Could not calculate metrics")
@@ -124,41 +246,127 @@ class MitigationAnalyzer:
             pdr_improvement = (metrics_with['pdr'] - metrics_without['pdr']) * 100
             delay_reduction = metrics_without['avg_delay_ms'] - metrics_with['avg_delay_ms']
             loss_reduction = (metrics_without['packet_loss_rate'] - metrics_with['packet_loss_rate']) * 100
+            throughput_gain = metrics_with.get('throughput_mbps', 0) - metrics_without.get('throughput_mbps', 0)
             
             # Store results
             result = {
                 'Attack': f"{attack_name} {percentage}",
+                'Scenario': self.pair_scenarios.get(without_dir, f"{attack_name} {percentage}"),
                 'PDR_Without': metrics_without['pdr'],
                 'PDR_With': metrics_with['pdr'],
                 'PDR_Improvement': pdr_improvement,
                 'Delay_Without': metrics_without['avg_delay_ms'],
                 'Delay_With': metrics_with['avg_delay_ms'],
                 'Delay_Reduction': delay_reduction,
+                'P95_Delay_Without': metrics_without.get('p95_delay_ms', 0),
+                'P95_Delay_With': metrics_with.get('p95_delay_ms', 0),
+                'P99_Delay_Without': metrics_without.get('p99_delay_ms', 0),
+                'P99_Delay_With': metrics_with.get('p99_delay_ms', 0),
                 'Loss_Rate_Without': metrics_without['packet_loss_rate'],
                 'Loss_Rate_With': metrics_with['packet_loss_rate'],
                 'Loss_Reduction': loss_reduction,
+                'Throughput_Without': metrics_without.get('throughput_mbps', 0),
+                'Throughput_With': metrics_with.get('throughput_mbps', 0),
+                'Throughput_Gain': throughput_gain,
                 'Packets_Without': metrics_without['delivered_packets'],
                 'Packets_With': metrics_with['delivered_packets'],
             }
             self.results.append(result)
+            self.result_runs.append((without_dir, with_dir))
             
             # Print comparison
             print(f"  WITHOUT Mitigation:")
             print(f"    PDR: {metrics_without['pdr']:.4f} ({metrics_without['delivered_packets']}/{metrics_without['total_packets']})")
             print(f"    Delay: {metrics_without['avg_delay_ms']:.2f} ms")
+            if 'p95_delay_ms' in metrics_without:
+                print(f"    Delay p95/p99: {metrics_without['p95_delay_ms']:.2f} / {metrics_without['p99_delay_ms']:.2f} ms")
             print(f"    Packet Loss: {metrics_without['packet_loss_rate']:.4f}")
             
             print(f"  WITH Mitigation:")
             print(f"    PDR: {metrics_with['pdr']:.4f} ({metrics_with['delivered_packets']}/{metrics_with['total_packets']})")
             print(f"    Delay: {metrics_with['avg_delay_ms']:.2f} ms")
+            if 'p95_delay_ms' in metrics_with:
+                print(f"    Delay p95/p99: {metrics_with['p95_delay_ms']:.2f} / {metrics_with['p99_delay_ms']:.2f} ms")
             print(f"    Packet Loss: {metrics_with['packet_loss_rate']:.4f}")
             
-            print(f"  IMPROVEMENT:")
-            print(f"    PDR: +{pdr_improvement:.2f}% {'✓' if pdr_improvement > 0 else '✗'}")
-            print(f"    Delay: -{delay_reduction:.2f} ms {'✓' if delay_reduction > 0 else '✗'}")
-            print(f"    Loss Rate: -{loss_reduction:.2f}% {'✓' if loss_reduction > 0 else '✗'}")
+            # A single seed's difference is not evidence either way; verdicts come from the CIs below
+            print(f"  DIFFERENCE (this run):")
+            print(f"    PDR: {pdr_improvement:+.2f}%")
+            print(f"    Delay: {-delay_reduction:+.2f} ms")
+            print(f"    Loss Rate: {-loss_reduction:+.2f}%")
+        
+        df = pd.DataFrame(self.results)
+        self.effects = self.mitigation_effects(df)
+        self.print_mitigation_effects()
+        self.print_pooled_tail_latency()
         
-        return pd.DataFrame(self.results)
+        return df
+    
+    def mitigation_effects(self, df):
+        """Seed means and bootstrap CIs of EFFECT_COLUMNS per scenario (paired for the differences)"""
+        if df.empty:
+            return None
+        return grouped_ci_table(df, 'Scenario', EFFECT_COLUMNS, self.n_resamples, self.confidence)
+    
+    def print_mitigation_effects(self):
+        """Print each scenario's paired with-vs-without differences with their CIs"""
+        if self.effects is None or self.effects.empty:
+            return
+        
+        print("\n" + "-"*80)
+        print(f"Mitigation Effect per Scenario (mean over seeds, {self.confidence:.0%} bootstrap CI)")
+        print("-"*80)
+        print(f"  ✓ CI above 0   ✗ CI below 0   ~ CI spans 0   ? fewer than {MIN_CI_RUNS} runs (no CI)")
+        for _, row in self.effects.iterrows():
+            print(f"\n{row['Scenario']} ({row['N_Runs']} run(s)):")
+            for column, label, unit in EFFECT_DIFFERENCES:
+                low, high = row[f'{column}_CI_Low'], row[f'{column}_CI_High']
+                print(f"    {label:<16} {format_ci(row[column], low, high, '+.2f')} {unit} "
+                      f"{ci_verdict(low, high)}")
+    
+    def load_run_metrics(self):
+        """Read the Metric,Value result files of every discovered run"""
+        self.run_metrics = load_metric_table({run_key(run): run.files for run in self.catalog})
+        if len(self.run_metrics.columns):
+            print(f"  ✓ Run metrics: {len(self.run_metrics.columns)} metric(s) from "
+                  f"{int(self.run_metrics.notna().any(axis=1).sum())} run(s)")
+    
+    def export_run_metrics(self, df):
+        """Save the comparison joined with both runs' Metric,Value results (_Without / _With suffixes)"""
+        if self.run_metrics is None or not len(self.run_metrics.columns) or df.empty:
+            return None
+        runs = pd.DataFrame(self.result_runs, columns=['Run_Without', 'Run_With'], index=df.index)
+        joined = pd.concat([df, runs], axis=1)
+        for side in ('Without', 'With'):
+            joined = joined.merge(self.run_metrics.add_suffix(f'_{side}'), left_on=f'Run_{side}',
+                                  right_index=True, how='left')
+        output_file = os.path.join(self.results_dir, 'mitigation_with_run_metrics.csv')
+        joined.to_csv(output_file, index=False)
+        print(f"  ✓ Comparison with run metrics saved to: {output_file}")
+        return joined
+    
+    def pooled_delay_percentiles(self, test_dirs):
+        """p50/p95/p99 delay (ms) over several runs, merged from their sketches"""
+        pooled = empty_sketches()
+        for test_dir in test_dirs:
+            if test_dir in self.sketches:
+                merge_sketches(pooled, self.sketches[test_dir])
+        return delay_percentiles(pooled)
+    
+    def print_pooled_tail_latency(self):
+        """Print tail latency of all no-mitigation vs all with-mitigation runs"""
+        without = [pair[0] for pair in self.test_pairs if pair[0] in self.sketches]
+        with_ = [pair[1] for pair in self.test_pairs if pair[1] in self.sketches]
+        if not without or not with_:
+            return
+        
+        print("\n" + "-"*80)
+        print("Tail Latency Across All Attacks (pooled runs)")
+        print("-"*80)
+        for label, dirs in (('WITHOUT Mitigation', without), ('WITH Mitigation', with_)):
+            tail = self.pooled_delay_percentiles(dirs)
+            if np.isfinite(tail['p50']):
+                print(f"  {label:<20} p50 {tail['p50']:8.2f} ms   p95 {tail['p95']:8.2f} ms   p99 {tail['p99']:8.2f} ms")
     
     def generate_comparison_table(self, df):
         """Generate comparison table"""
@@ -169,83 +377,35 @@ class MitigationAnalyzer:
         df.to_csv(output_file, index=False)
         print(f"\n✓ Comparison table saved to: {output_file}")
         
+        if self.effects is not None:
+            effects_file = os.path.join(self.results_dir, 'mitigation_effect_ci.csv')
+            self.effects.to_csv(effects_file, index=False)
+            print(f"✓ Per-scenario confidence intervals saved to: {effects_file}")
+        
         # Print formatted table
         print("\n" + "="*80)
         print("MITIGATION EFFECTIVENESS SUMMARY")
         print("="*80)
         print(df.to_string(index=False))
     
-    def generate_visualizations(self, df):
+    def generate_visualizations(self, df, jobs=1):
         """Generate comparison visualizations"""
         if df.empty:
             return
         
         print("\nGenerating visualizations...")
         
-        # Set style
-        sns.set_style("whitegrid")
-        fig, axes = plt.subplots(2, 2, figsize=(16, 12))
-        fig.suptitle('SDVN Mitigation Effectiveness Analysis', fontsize=16, fontweight='bold')
-        
-        attacks = df['Attack'].tolist()
-        x = np.arange(len(attacks))
-        width = 0.35
-        
-        # Plot 1: PDR Comparison
-        ax1 = axes[0, 0]
-        ax1.bar(x - width/2, df['PDR_Without'], width, label='Without Mitigation', color='salmon', alpha=0.8)
-        ax1.bar(x + width/2, df['PDR_With'], width, label='With Mitigation', color='lightgreen', alpha=0.8)
-        ax1.set_xlabel('Attack Scenario')
-        ax1.set_ylabel('Packet Delivery Ratio (PDR)')
-        ax1.set_title('PDR: With vs Without Mitigation')
-        ax1.set_xticks(x)
-        ax1.set_xticklabels(attacks, rotation=45, ha='right', fontsize=9)
-        ax1.legend()
-        ax1.grid(axis='y', alpha=0.3)
-        ax1.set_ylim(0, 1.0)
-        
-        # Plot 2: Delay Comparison
-        ax2 = axes[0, 1]
-        ax2.bar(x - width/2, df['Delay_Without'], width, label='Without Mitigation', color='coral', alpha=0.8)
-        ax2.bar(x + width/2, df['Delay_With'], width, label='With Mitigation', color='lightblue', alpha=0.8)
-        ax2.set_xlabel('Attack Scenario')
-        ax2.set_ylabel('Average Delay (ms)')
-        ax2.set_title('Delay: With vs Without Mitigation')
-        ax2.set_xticks(x)
-        ax2.set_xticklabels(attacks, rotation=45, ha='right', fontsize=9)
-        ax2.legend()
-        ax2.grid(axis='y', alpha=0.3)
-        
-        # Plot 3: PDR Improvement
-        ax3 = axes[1, 0]
-        colors = ['green' if val > 0 else 'red' for val in df['PDR_Improvement']]
-        ax3.bar(x, df['PDR_Improvement'], color=colors, alpha=0.7)
-        ax3.set_xlabel('Attack Scenario')
-        ax3.set_ylabel('PDR Improvement (%)')
-        ax3.set_title('PDR Improvement with Mitigation')
-        ax3.set_xticks(x)
-        ax3.set_xticklabels(attacks, rotation=45, ha='right', fontsize=9)
-        ax3.axhline(y=0, color='black', linestyle='--', linewidth=0.5)
-        ax3.grid(axis='y', alpha=0.3)
-        
-        # Plot 4: Packet Loss Reduction
-        ax4 = axes[1, 1]
-        colors = ['green' if val > 0 else 'red' for val in df['Loss_Reduction']]
-        ax4.bar(x, df['Loss_Reduction'], color=colors, alpha=0.7)
-        ax4.set_xlabel('Attack Scenario')
-        ax4.set_ylabel('Packet Loss Reduction (%)')
-        ax4.set_title('Packet Loss Reduction with Mitigation')
-        ax4.set_xticks(x)
-        ax4.set_xticklabels(attacks, rotation=45, ha='right', fontsize=9)
-        ax4.axhline(y=0, color='black', linestyle='--', linewidth=0.5)
-        ax4.grid(axis='y', alpha=0.3)
-        
-        plt.tight_layout()
-        
+        effects = self.effects if self.effects is not None else self.mitigation_effects(df)
+        names = ('PDR_Without', 'PDR_With', 'Delay_Without', 'Delay_With', 'PDR_Improvement', 'Loss_Reduction')
+        columns = {col: effects[col].to_numpy() for col in names}
+        errors = {col: error_bars(effects, col) for col in names}
         output_file = os.path.join(self.results_dir, 'mitigation_effectiveness_comparison.png')
-        plt.savefig(output_file, dpi=300, bbox_inches='tight')
-        print(f"  ✓ Visualization saved to: {output_file}")
-        plt.close()
+        render_jobs = [RenderJob('mitigation_effectiveness_comparison.png', render_mitigation_comparison,
+                                 (effects['Scenario'].tolist(), columns, output_file, errors))]
+        
+        start = time.perf_counter()
+        timings = render_figures(render_jobs, jobs)
+        print_render_timings(timings, time.perf_counter() - start, jobs)
     
     def generate_latex_table(self, df):
         """Generate LaTeX table for publication"""
@@ -253,23 +413,31 @@ class MitigationAnalyzer:
             return
         
         output_file = os.path.join(self.results_dir, 'mitigation_effectiveness_latex.tex')
+        effects = self.effects if self.effects is not None else self.mitigation_effects(df)
+        
+        def cell(row, column, fmt):
+            return latex_ci(row[column], row[f'{column}_CI_Low'], row[f'{column}_CI_High'], fmt)
         
         with open(output_file, 'w') as f:
             f.write("\\begin{table}[htbp]\n")
             f.write("\\centering\n")
-            f.write("\\caption{SDVN Mitigation Effectiveness: Performance Comparison}\n")
+            confidence = f"{self.confidence * 100:g}\\%"
+            f.write("\\caption{SDVN Mitigation Effectiveness: Performance Comparison "
+                    f"(mean over $n$ seeds, {confidence} bootstrap CI; improvements are paired differences)}}\n")
             f.write("\\label{tab:mitigation_effectiveness}\n")
-            f.write("\\begin{tabular}{|l|c|c|c|c|c|c|}\n")
+            f.write("\\begin{tabular}{|l|c|c|c|c|c|c|c|}\n")
             f.write("\\hline\n")
-            f.write("\\textbf{Attack} & \\multicolumn{2}{c|}{\\textbf{PDR}} & \\multicolumn{2}{c|}{\\textbf{Delay (ms)}} & \\multicolumn{2}{c|}{\\textbf{Improvement}} \\\\\n")
-            f.write("\\cline{2-7}\n")
-            f.write(" & No Mit. & With Mit. & No Mit. & With Mit. & PDR (\\%) & Loss (\\%) \\\\\n")
+            f.write("\\textbf{Attack} & \\textbf{$n$} & \\multicolumn{2}{c|}{\\textbf{PDR}} & \\multicolumn{2}{c|}{\\textbf{Delay (ms)}} & \\multicolumn{2}{c|}{\\textbf{Improvement}} \\\\\n")
+            f.write("\\cline{3-8}\n")
+            f.write(" & & No Mit. & With Mit. & No Mit. & With Mit. & PDR (\\%) & Loss (\\%) \\\\\n")
             f.write("\\hline\n")
             
-            for _, row in df.iterrows():
-                f.write(f"{row['Attack']} & {row['PDR_Without']:.3f} & {row['PDR_With']:.3f} & ")
-                f.write(f"{row['Delay_Without']:.2f} & {row['Delay_With']:.2f} & ")
-                f.write(f"+{row['PDR_Improvement']:.2f} & -{row['Loss_Reduction']:.2f} \\\\\n")
+            for _, row in effects.iterrows():
+                scenario = row['Scenario'].replace('%', '\\%')
+                f.write(f"{scenario} & {row['N_Runs']} & {cell(row, 'PDR_Without', '.3f')} & ")
+                f.write(f"{cell(row, 'PDR_With', '.3f')} & ")
+                f.write(f"{cell(row, 'Delay_Without', '.2f')} & {cell(row, 'Delay_With', '.2f')} & ")
+                f.write(f"{cell(row, 'PDR_Improvement', '+.2f')} & {cell(row, 'Loss_Reduction', '+.2f')} \\\\\n")
             
             f.write("\\hline\n")
             f.write("\\end{tabular}\n")
@@ -277,13 +445,15 @@ class MitigationAnalyzer:
         
         print(f"  ✓ LaTeX table saved to: {output_file}")
     
-    def generate_report(self):
+    def generate_report(self, jobs=1, plots=True):
         """Generate comprehensive analysis report"""
-        df = self.analyze_mitigation_effectiveness()
+        df = self.analyze_mitigation_effectiveness(jobs=jobs)
         
         if not df.empty:
             self.generate_comparison_table(df)
-            self.generate_visualizations(df)
+            self.export_run_metrics(df)
+            if plots:
+                self.generate_visualizations(df, jobs=jobs)
             self.generate_latex_table(df)
             
             print("\n" + "="*80)
@@ -292,31 +462,135 @@ class MitigationAnalyzer:
             print(f"\nAll results saved to: {self.results_dir}/")
             print("\nGenerated files:")
             print("  - mitigation_effectiveness_summary.csv")
-            print("  - mitigation_effectiveness_comparison.png")
+            print("  - mitigation_effect_ci.csv")
+            if self.run_metrics is not None and len(self.run_metrics.columns):
+                print("  - mitigation_with_run_metrics.csv")
+            if plots:
+                print("  - mitigation_effectiveness_comparison.png")
             print("  - mitigation_effectiveness_latex.tex")
             print("\n" + "="*80)
 
+
+def render_mitigation_comparison(attacks, columns, output_file, errors=None):
+    """Render the 2x2 with/without mitigation comparison figure (errors: per-column (2, n) CI bars)"""
+    errors = errors or {}
+    # Set style
+    plt = load_pyplot()
+    fig, axes = plt.subplots(2, 2, figsize=(16, 12))
+    fig.suptitle('SDVN Mitigation Effectiveness Analysis', fontsize=16, fontweight='bold')
+    
+    x = np.arange(len(attacks))
+    width = 0.35
+    
+    # Plot 1: PDR Comparison
+    ax1 = axes[0, 0]
+    ax1.bar(x - width/2, columns['PDR_Without'], width, yerr=errors.get('PDR_Without'), capsize=3, label='Without Mitigation', color='salmon', alpha=0.8)
+    ax1.bar(x + width/2, columns['PDR_With'], width, yerr=errors.get('PDR_With'), capsize=3, label='With Mitigation', color='lightgreen', alpha=0.8)
+    ax1.set_xlabel('Attack Scenario')
+    ax1.set_ylabel('Packet Delivery Ratio (PDR)')
+    ax1.set_title('PDR: With vs Without Mitigation')
+    ax1.set_xticks(x)
+    ax1.set_xticklabels(attacks, rotation=45, ha='right', fontsize=9)
+    ax1.legend()
+    ax1.grid(axis='y', alpha=0.3)
+    ax1.set_ylim(0, 1.0)
+    
+    # Plot 2: Delay Comparison
+    ax2 = axes[0, 1]
+    ax2.bar(x - width/2, columns['Delay_Without'], width, yerr=errors.get('Delay_Without'), capsize=3, label='Without Mitigation', color='coral', alpha=0.8)
+    ax2.bar(x + width/2, columns['Delay_With'], width, yerr=errors.get('Delay_With'), capsize=3, label='With Mitigation', color='lightblue', alpha=0.8)
+    ax2.set_xlabel('Attack Scenario')
+    ax2.set_ylabel('Average Delay (ms)')
+    ax2.set_title('Delay: With vs Without Mitigation')
+    ax2.set_xticks(x)
+    ax2.set_xticklabels(attacks, rotation=45, ha='right', fontsize=9)
+    ax2.legend()
+    ax2.grid(axis='y', alpha=0.3)
+    
+    # Plot 3: PDR Improvement
+    ax3 = axes[1, 0]
+    colors = ['green' if val > 0 else 'red' for val in columns['PDR_Improvement']]
+    ax3.bar(x, columns['PDR_Improvement'], yerr=errors.get('PDR_Improvement'), capsize=3, color=colors, alpha=0.7)
+    ax3.set_xlabel('Attack Scenario')
+    ax3.set_ylabel('PDR Improvement (%)')
+    ax3.set_title('PDR Improvement with Mitigation')
+    ax3.set_xticks(x)
+    ax3.set_xticklabels(attacks, rotation=45, ha='right', fontsize=9)
+    ax3.axhline(y=0, color='black', linestyle='--', linewidth=0.5)
+    ax3.grid(axis='y', alpha=0.3)
+    
+    # Plot 4: Packet Loss Reduction
+    ax4 = axes[1, 1]
+    colors = ['green' if val > 0 else 'red' for val in columns['Loss_Reduction']]
+    ax4.bar(x, columns['Loss_Reduction'], yerr=errors.get('Loss_Reduction'), capsize=3, color=colors, alpha=0.7)
+    ax4.set_xlabel('Attack Scenario')
+    ax4.set_ylabel('Packet Loss Reduction (%)')
+    ax4.set_title('Packet Loss Reduction with Mitigation')
+    ax4.set_xticks(x)
+    ax4.set_xticklabels(attacks, rotation=45, ha='right', fontsize=9)
+    ax4.axhline(y=0, color='black', linestyle='--', linewidth=0.5)
+    ax4.grid(axis='y', alpha=0.3)
+    
+    plt.tight_layout()
+    
+    plt.savefig(output_file, dpi=300, bbox_inches='tight')
+    print(f"  ✓ Visualization saved to: {output_file}")
+    plt.close()
+
+
 def main():
-    if len(sys.argv) < 2:
+    parser = argparse.ArgumentParser(description='Compare SDVN attack impact with and without mitigation', add_help=False)
+    parser.add_argument('results_dir', nargs='?')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Worker processes for loading runs and rendering figures (0 = all cores, default: 1)')
+    parser.add_argument('--no-store', action='store_true',
+                        help='Re-reduce every run instead of reusing metrics_store.sqlite')
+    parser.add_argument('--no-plots', '--metrics-only', dest='no_plots', action='store_true',
+                        help='Write the tables only (never imports matplotlib/seaborn)')
+    parser.add_argument('--resamples', type=int, default=DEFAULT_RESAMPLES,
+                        help=f'Bootstrap resamples per confidence interval (default: {DEFAULT_RESAMPLES})')
+    parser.add_argument('--confidence', type=float, default=DEFAULT_CONFIDENCE,
+                        help=f'Confidence level of the intervals (default: {DEFAULT_CONFIDENCE})')
+    parser.add_argument('--where', action='append', metavar='KEY=V1[,V2]',
+                        help='Partition filter when results_dir is a results_dataset.py dataset (repeatable)')
+    parser.add_argument('--help', '-h', action='store_true')
+    args = parser.parse_args()
+    
+    if args.results_dir is None or args.help:
         print("="*80)
         print("SDVN Mitigation Effectiveness Analyzer")
         print("="*80)
         print("\nUsage:")
-        print("  python3 analyze_mitigation_comparison.py <results_directory>")
+        print("  python3 analyze_mitigation_comparison.py <results_directory> [--jobs N] [--no-store] [--no-plots] [--resamples N] [--confidence C] [--where KEY=V1[,V2]]")
+        print("\nOptions:")
+        print("  --jobs N, -j N   Load runs and render figures in N parallel processes (0 = all cores)")
+        print("  --no-store       Re-reduce every run instead of reusing metrics_store.sqlite")
+        print("  --no-plots       Tables only, no figures (alias --metrics-only; fast startup)")
+        print(f"  --resamples N    Bootstrap resamples per seed-replicate CI (default: {DEFAULT_RESAMPLES})")
+        print(f"  --confidence C   Confidence level of the CIs (default: {DEFAULT_CONFIDENCE})")
+        print("  --where K=V[,V]  With a results dataset: only partitions matching (e.g. attack=blackhole)")
         print("\nExample:")
         print("  python3 analyze_mitigation_comparison.py sdvn_mitigation_comparison_20251103_120000")
+        print("  python3 analyze_mitigation_comparison.py results_dataset --where attack=baseline,wormhole")
         print("\nThis tool compares attack impact WITH and WITHOUT mitigation solutions.")
         print("="*80)
         sys.exit(1)
     
-    results_dir = sys.argv[1]
+    results_dir = args.results_dir
     
     if not os.path.exists(results_dir):
         print(f"Error: Directory '{results_dir}' not found")
         sys.exit(1)
     
-    analyzer = MitigationAnalyzer(results_dir)
-    analyzer.generate_report()
+    try:
+        dataset, filters = open_source(results_dir, args.where)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    
+    analyzer = MitigationAnalyzer(results_dir, use_store=not args.no_store, n_resamples=args.resamples,
+                                  confidence=args.confidence, dataset=dataset, filters=filters)
+    analyzer.generate_report(jobs=args.jobs, plots=not args.no_plots)
 
 if __name__ == "__main__":
     main()
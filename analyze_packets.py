@@ -10,36 +10,306 @@ Date: October 2025
 """
 
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
 from pathlib import Path
+import argparse
+import os
+import time
 import warnings
+
+from comm_matrix import DEFAULT_VEHICLES, CommMatrix, role_groups
+from delay_histograms import BOXPLOT_VIEWS, DelayDistribution
+from flow_metrics import flow_table, join_node_results, worst_flows
+from packet_loader import (DEFAULT_CHUNK_ROWS, CsvTail, load_packet_csv, load_packet_sketches, source_signature,
+                           stream_packet_stats)
+from packet_metrics import (ALL, BLACKHOLE, NORMAL, WORMHOLE, PacketAccumulator, category_codes, delay_percentiles,
+                            packet_stats, summarize)
+from plot_scheduler import RenderJob, load_pyplot, print_render_timings, render_figures
+from time_series import (DEFAULT_RESOLUTION_S, VIEWS, WINDOWS, TimeSeriesAccumulator, cached_time_series,
+                         load_time_series, save_time_series, series_table)
+
 warnings.filterwarnings('ignore')
 
-# Set style for publication-quality plots
-sns.set_style("whitegrid")
-plt.rcParams['figure.figsize'] = (12, 8)
-plt.rcParams['font.size'] = 11
-plt.rcParams['axes.labelsize'] = 12
-plt.rcParams['axes.titlesize'] = 14
-plt.rcParams['xtick.labelsize'] = 10
-plt.rcParams['ytick.labelsize'] = 10
-plt.rcParams['legend.fontsize'] = 10
+# Column names of the periodic snapshot CSVs (SDVN / blackhole / sybil
+# performance monitors in routing.cc) shown by --follow
+SNAPSHOT_TIME_COLUMNS = ('Timestamp', 'Time', 'Time(s)')
+SNAPSHOT_PDR_COLUMNS = ('PDR', 'PDR(%)')
+SNAPSHOT_LATENCY_COLUMNS = ('AvgLatency', 'AvgLatencyMs', 'Latency_Avg(ms)')
+
+# Communication matrices up to this many nodes are drawn as a per-cell
+# seaborn heatmap; larger ones as a rasterized image of at most
+# MATRIX_MAX_PLOT_NODES rows (contiguous node blocks beyond that)
+MATRIX_HEATMAP_MAX_NODES = 60
+MATRIX_MAX_PLOT_NODES = 1000
+
+# Style for publication-quality plots (applied by load_pyplot() when a figure is drawn)
+PLOT_RC = {
+    'figure.figsize': (12, 8),
+    'font.size': 11,
+    'axes.labelsize': 12,
+    'axes.titlesize': 14,
+    'xtick.labelsize': 10,
+    'ytick.labelsize': 10,
+    'legend.fontsize': 10,
+}
+
+
+# ----------------------------------------------------------------------------
+# Figure renderers
+#
+# Module-level so plot_scheduler can run them in worker processes; each takes
+# only the pre-aggregated arrays its figure needs.
+# ----------------------------------------------------------------------------
+
+def render_pdr_comparison(categories, pdr_values, colors, output_dir):
+    """Render the PDR comparison bar chart"""
+    plt = load_pyplot(PLOT_RC)
+    fig, ax = plt.subplots(figsize=(10, 6))
+    bars = ax.bar(categories, pdr_values, color=colors, alpha=0.8, edgecolor='black', linewidth=1.5)
+    
+    # Add value labels on bars
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+               f'{height:.1f}%',
+               ha='center', va='bottom', fontweight='bold', fontsize=12)
+    
+    ax.set_ylabel('Packet Delivery Ratio (%)', fontweight='bold')
+    ax.set_title('PDR Comparison: Normal vs Attack-Affected Packets', fontweight='bold', pad=20)
+    ax.set_ylim(0, 110)
+    ax.grid(axis='y', alpha=0.3)
+    
+    plt.tight_layout()
+    plt.savefig(f'{output_dir}/pdr_comparison.png', dpi=300, bbox_inches='tight')
+    print(f"✅ Saved: {output_dir}/pdr_comparison.png")
+    plt.close()
+
+
+def render_delay_comparison(categories, delay_values, colors, output_dir):
+    """Render the average delay comparison bar chart"""
+    plt = load_pyplot(PLOT_RC)
+    fig, ax = plt.subplots(figsize=(10, 6))
+    bars = ax.bar(categories, delay_values, color=colors, alpha=0.8, edgecolor='black', linewidth=1.5)
+    
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+               f'{height:.2f}ms',
+               ha='center', va='bottom', fontweight='bold', fontsize=11)
+    
+    ax.set_ylabel('Average End-to-End Delay (ms)', fontweight='bold')
+    ax.set_title('Delay Comparison: Normal vs Attack-Affected Packets', fontweight='bold', pad=20)
+    ax.grid(axis='y', alpha=0.3)
+    
+    plt.tight_layout()
+    plt.savefig(f'{output_dir}/delay_comparison.png', dpi=300, bbox_inches='tight')
+    print(f"✅ Saved: {output_dir}/delay_comparison.png")
+    plt.close()
+
+
+def render_delay_distribution(edges, histograms, output_dir):
+    """Render overlaid delay histograms from precomputed per-type counts"""
+    plt = load_pyplot(PLOT_RC)
+    fig, ax = plt.subplots(figsize=(12, 6))
+    
+    colors = {'Normal': '#2ecc71', 'Wormhole': '#e74c3c', 'Blackhole': '#e67e22'}
+    for label, counts in histograms:
+        ax.stairs(counts, edges, fill=True, alpha=0.5, label=label,
+                  color=colors[label], edgecolor='black')
+    
+    ax.set_xlabel('End-to-End Delay (ms)', fontweight='bold')
+    ax.set_ylabel('Frequency', fontweight='bold')
+    ax.set_title('Delay Distribution by Packet Type', fontweight='bold', pad=20)
+    ax.legend()
+    ax.grid(axis='y', alpha=0.3)
+    
+    plt.tight_layout()
+    plt.savefig(f'{output_dir}/delay_distribution.png', dpi=300, bbox_inches='tight')
+    print(f"✅ Saved: {output_dir}/delay_distribution.png")
+    plt.close()
+
+
+def render_packet_timeline(pdr_values, time_labels, output_dir):
+    """Render PDR per send-time bin"""
+    plt = load_pyplot(PLOT_RC)
+    fig, ax = plt.subplots(figsize=(14, 6))
+    ax.plot(range(len(pdr_values)), pdr_values, marker='o', linewidth=2, 
+            markersize=8, color='#3498db', markerfacecolor='#e74c3c', markeredgecolor='black')
+    
+    ax.set_xlabel('Simulation Time (seconds)', fontweight='bold')
+    ax.set_ylabel('Packet Delivery Ratio (%)', fontweight='bold')
+    ax.set_title('PDR Over Simulation Time', fontweight='bold', pad=20)
+    ax.set_xticks(range(len(time_labels)))
+    ax.set_xticklabels(time_labels, rotation=45, ha='right')
+    ax.grid(alpha=0.3)
+    ax.set_ylim(0, 110)
+    
+    plt.tight_layout()
+    plt.savefig(f'{output_dir}/pdr_timeline.png', dpi=300, bbox_inches='tight')
+    print(f"✅ Saved: {output_dir}/pdr_timeline.png")
+    plt.close()
+
+
+def render_time_series(table, window, output_dir):
+    """Render PDR, goodput and p95 delay per attack category over time"""
+    plt = load_pyplot(PLOT_RC)
+    colors = {'All': '#34495e', 'Normal': '#2ecc71', 'Wormhole': '#e74c3c', 'Blackhole': '#e67e22'}
+    fig, axes = plt.subplots(3, 1, figsize=(14, 10), sharex=True)
+    
+    for view in VIEWS:
+        if f'{view}_PDR' not in table:
+            continue
+        style = dict(color=colors[view], linewidth=1.2 if view == 'All' else 1.0, label=view)
+        axes[0].plot(table['Time'], table[f'{view}_PDR'], **style)
+        axes[1].plot(table['Time'], table[f'{view}_GoodputMbps'], **style)
+        axes[2].plot(table['Time'], table[f'{view}_DelayP95Ms'], **style)
+    
+    axes[0].set_ylabel('PDR (%)', fontweight='bold')
+    axes[0].set_ylim(0, 105)
+    axes[1].set_ylabel('Goodput (Mbps)', fontweight='bold')
+    axes[2].set_ylabel('P95 Delay (ms)', fontweight='bold')
+    axes[2].set_xlabel('Simulation Time (seconds)', fontweight='bold')
+    for ax in axes:
+        ax.grid(alpha=0.3)
+    axes[0].legend(loc='lower left', ncol=len(VIEWS))
+    axes[0].set_title(f'PDR, Goodput and Delay Over Time ({window})', fontweight='bold', pad=20)
+    
+    plt.tight_layout()
+    plt.savefig(f'{output_dir}/pdr_time_series.png', dpi=300, bbox_inches='tight')
+    print(f"✅ Saved: {output_dir}/pdr_time_series.png")
+    plt.close()
+
+
+def render_attack_impact(type_counts, delivery_counts, output_dir):
+    """Render the attack-type and delivery-status pie charts"""
+    plt = load_pyplot(PLOT_RC)
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
+    
+    # Pie chart 1: Packet distribution
+    labels1 = ['Normal', 'Wormhole', 'Blackhole']
+    colors1 = ['#2ecc71', '#e74c3c', '#e67e22']
+    explode1 = (0.05, 0.1, 0.1)
+    
+    ax1.pie(type_counts, explode=explode1, labels=labels1, colors=colors1, autopct='%1.1f%%',
+            shadow=True, startangle=90, textprops={'fontsize': 12, 'fontweight': 'bold'})
+    ax1.set_title('Packet Distribution by Attack Type', fontweight='bold', pad=20)
+    
+    # Pie chart 2: Delivery status
+    labels2 = ['Delivered', 'Dropped']
+    colors2 = ['#2ecc71', '#e74c3c']
+    explode2 = (0.05, 0.1)
+    
+    ax2.pie(delivery_counts, explode=explode2, labels=labels2, colors=colors2, autopct='%1.1f%%',
+            shadow=True, startangle=90, textprops={'fontsize': 12, 'fontweight': 'bold'})
+    ax2.set_title('Overall Packet Delivery Status', fontweight='bold', pad=20)
+    
+    plt.tight_layout()
+    plt.savefig(f'{output_dir}/attack_impact_pie.png', dpi=300, bbox_inches='tight')
+    print(f"✅ Saved: {output_dir}/attack_impact_pie.png")
+    plt.close()
+
+
+def render_communication_matrix(matrix, sources, dests, output_dir):
+    """Render the source-destination packet-count heatmap"""
+    plt = load_pyplot(PLOT_RC)
+    import seaborn as sns
+    from matplotlib.colors import LogNorm
+    fig, ax = plt.subplots(figsize=(12, 10))
+    
+    if len(sources) <= MATRIX_HEATMAP_MAX_NODES:
+        pivot = pd.DataFrame(matrix, index=sources, columns=dests)
+        sns.heatmap(pivot, annot=False, cmap='YlOrRd', cbar_kws={'label': 'Packet Count'}, ax=ax)
+    else:
+        # Large fleets: one rasterized image on a log scale instead of N x N patches
+        masked = np.ma.masked_equal(matrix, 0)
+        norm = LogNorm(vmin=1, vmax=max(float(matrix.max()), 1.0))
+        image = ax.imshow(masked, cmap='YlOrRd', norm=norm, aspect='auto', interpolation='nearest',
+                          rasterized=True)
+        fig.colorbar(image, ax=ax, label='Packet Count')
+        ax.grid(False)
+        ticks = np.linspace(0, len(sources) - 1, min(len(sources), 20)).astype(int)
+        ax.set_yticks(ticks)
+        ax.set_yticklabels([sources[i] for i in ticks])
+        ax.set_xticks(ticks)
+        ax.set_xticklabels([dests[i] for i in ticks], rotation=90)
+    
+    ax.set_xlabel('Destination Node', fontweight='bold')
+    ax.set_ylabel('Source Node', fontweight='bold')
+    ax.set_title('Node-to-Node Communication Matrix', fontweight='bold', pad=20)
+    
+    plt.tight_layout()
+    plt.savefig(f'{output_dir}/communication_matrix.png', dpi=300, bbox_inches='tight')
+    print(f"✅ Saved: {output_dir}/communication_matrix.png")
+    plt.close()
+
+
+def render_delay_boxplot(box_stats, output_dir):
+    """Render delay box plots from precomputed box statistics"""
+    plt = load_pyplot(PLOT_RC)
+    fig, ax = plt.subplots(figsize=(10, 6))
+    
+    bp = ax.bxp(box_stats, patch_artist=True, showmeans=True)
+    
+    colors = {'Normal': '#2ecc71', 'Wormhole': '#e74c3c', 'Blackhole': '#e67e22'}
+    for patch, stats in zip(bp['boxes'], box_stats):
+        patch.set_facecolor(colors.get(stats['label'], '#3498db'))
+        patch.set_alpha(0.7)
+    
+    ax.set_ylabel('End-to-End Delay (ms)', fontweight='bold')
+    ax.set_title('Delay Distribution Box Plot by Packet Type', fontweight='bold', pad=20)
+    ax.grid(axis='y', alpha=0.3)
+    
+    plt.tight_layout()
+    plt.savefig(f'{output_dir}/delay_boxplot.png', dpi=300, bbox_inches='tight')
+    print(f"✅ Saved: {output_dir}/delay_boxplot.png")
+    plt.close()
+
 
 class PacketAnalyzer:
     """Analyzes packet delivery data from VANET simulation"""
     
-    def __init__(self, csv_file):
-        """Initialize analyzer with CSV file path"""
+    def __init__(self, csv_file, use_cache=True, streaming=False, chunksize=DEFAULT_CHUNK_ROWS):
+        """
+        Initialize analyzer with CSV file path.
+        
+        With streaming=True the trace is never held in memory: load_data()
+        folds it chunk by chunk into a PacketAccumulator and only the
+        aggregate-based plots are available.
+        """
         self.csv_file = csv_file
+        self.use_cache = use_cache
+        self.streaming = streaming
+        self.chunksize = chunksize
         self.df = None
+        self.accumulator = None
+        self.stats = None
         self.metrics = {}
+        # Sparse communication matrix (built on first use) and its plotted view:
+        # matrix_top_k keeps the busiest nodes, matrix_rollup = (n_vehicles,
+        # vehicle_group) merges vehicles into blocks next to individual RSUs
+        self.comm_matrix = None
+        self.delay_dist = None
+        self.matrix_top_k = None
+        self.matrix_rollup = None
+        # Per-flow table (flow_metrics.flow_table), built on first use
+        self.flow_metrics = None
+        # Time-series stage: bin width (s) and count smoothing ('none',
+        # 'sliding' or 'ewma' over window_s seconds)
+        self.resolution_s = DEFAULT_RESOLUTION_S
+        self.window = 'none'
+        self.window_s = 1.0
+        self.series = None
         
     def load_data(self):
         """Load and validate CSV data"""
         try:
-            self.df = pd.read_csv(self.csv_file)
+            if self.streaming:
+                self._stream_data()
+                print(f"✅ Streamed {self.accumulator.rows} packet records from {self.csv_file} "
+                      f"(chunks of {self.chunksize} rows)")
+                print(f"   Columns: {self.accumulator.columns}")
+                return True
+            self.df = load_packet_csv(self.csv_file, use_cache=self.use_cache)
             print(f"✅ Loaded {len(self.df)} packet records from {self.csv_file}")
             print(f"   Columns: {list(self.df.columns)}")
             return True
@@ -51,53 +321,149 @@ class PacketAnalyzer:
             print(f"❌ Error loading file: {e}")
             return False
     
+    def _stream_data(self):
+        """Stream the CSV once into the accumulator, binning the time series in the same pass"""
+        signature = source_signature(self.csv_file)
+        self.series = cached_time_series(self.csv_file, self.resolution_s) if self.use_cache else None
+        binned = TimeSeriesAccumulator(self.resolution_s) if self.series is None else None
+        self.accumulator = stream_packet_stats(self.csv_file, self.chunksize, self.use_cache, series=binned)
+        if binned is None:
+            return
+        self.series = binned
+        if self.use_cache:
+            try:
+                save_time_series(self.csv_file, binned, signature)
+            except OSError as e:
+                print(f"⚠ Could not write time series cache for {os.path.basename(self.csv_file)}: {e}")
+    
+    def follow(self, snapshot_files=(), interval=2.0, idle_timeout=None):
+        """
+        Tail the CSV (and snapshot CSVs) while the simulation writes them.
+        
+        Each poll folds only the newly appended rows into a PacketAccumulator
+        and the time series, one bounded CsvTail block at a time until caught
+        up, and prints a rolling PDR / delay / attack-impact line.  The file
+        is never reread, so a half-written last row is harmless.  Stops on
+        Ctrl+C, or after idle_timeout seconds without new rows; the metrics
+        then cover everything read so far.
+        """
+        self.streaming = True
+        self.accumulator = PacketAccumulator()
+        self.series = TimeSeriesAccumulator(self.resolution_s)
+        tail = CsvTail(self.csv_file)
+        snapshot_tails = {path: CsvTail(path, typed=False) for path in snapshot_files}
+        latest_snapshots = {}
+        idle = 0.0
+        
+        print(f"👀 Following {self.csv_file} every {interval:g}s (Ctrl+C to stop)...")
+        try:
+            while True:
+                grew = False
+                while True:
+                    rows, restarted = tail.read_new()
+                    if restarted:
+                        print(f"↺ {self.csv_file} was truncated or replaced; starting over")
+                        self.accumulator = PacketAccumulator()
+                        self.series = TimeSeriesAccumulator(self.resolution_s)
+                    if rows is not None and len(rows) > 0:
+                        self.accumulator.update(rows)
+                        self.series.update(rows)
+                        grew = True
+                    if not tail.remaining:
+                        break
+                
+                for path, snapshot_tail in snapshot_tails.items():
+                    while True:
+                        snapshot_rows, _ = snapshot_tail.read_new()
+                        if snapshot_rows is not None and len(snapshot_rows) > 0:
+                            latest_snapshots[path] = snapshot_rows.iloc[-1]
+                            grew = True
+                        if not snapshot_tail.remaining:
+                            break
+                
+                if grew:
+                    idle = 0.0
+                    self._print_rolling_summary(latest_snapshots)
+                else:
+                    idle += interval
+                    if idle_timeout is not None and idle >= idle_timeout:
+                        print(f"⏹ No new rows for {idle_timeout:g}s; stopping")
+                        break
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            print("\n⏹ Stopped following")
+        
+        if not self.accumulator.columns:
+            print(f"❌ No rows read from '{self.csv_file}'")
+            return False
+        return True
+    
+    def _print_rolling_summary(self, latest_snapshots):
+        """One status line for the packets so far, plus the latest row of each snapshot CSV"""
+        stats = self.accumulator.stats
+        overall = summarize(stats)
+        line = f"[{time.strftime('%H:%M:%S')}] {overall['packets']:>10,} pkts  PDR {overall['pdr'] * 100:6.2f}%"
+        if overall['delivered'] > 0:
+            tail = delay_percentiles(self.accumulator.sketches)
+            line += f"  delay {overall['delay_mean']:7.2f} ms (p95 {tail['p95']:.2f})"
+        for label, categories in (('wormhole', WORMHOLE), ('blackhole', BLACKHOLE)):
+            view = summarize(stats, categories)
+            if view['packets'] > 0:
+                line += f"  {label} {view['packets'] / overall['packets'] * 100:5.1f}% (PDR {view['pdr'] * 100:.1f}%)"
+        print(line)
+        
+        for path, row in latest_snapshots.items():
+            fields = []
+            for label, candidates in (('t', SNAPSHOT_TIME_COLUMNS), ('PDR', SNAPSHOT_PDR_COLUMNS),
+                                      ('latency', SNAPSHOT_LATENCY_COLUMNS)):
+                column = next((c for c in candidates if c in row.index), None)
+                if column is not None:
+                    fields.append(f"{label}={row[column]}")
+            print(f"    {os.path.basename(path)}: {'  '.join(fields)}")
+    
     def calculate_metrics(self):
         """Calculate key performance metrics"""
-        if self.df is None:
+        if self.accumulator is not None:
+            self.stats = self.accumulator.stats
+        elif self.df is not None:
+            self.stats = packet_stats(self.df)
+        else:
             print("❌ No data loaded!")
             return
-        
-        total_packets = len(self.df)
-        delivered_packets = self.df['Delivered'].sum()
-        dropped_packets = total_packets - delivered_packets
-        
-        self.metrics = {
+
+        self.metrics = self._metrics_from_stats(self.stats)
+    
+    def _metrics_from_stats(self, stats):
+        """Build the named metrics dict from packet_stats() output"""
+        overall = summarize(stats, ALL)
+        total_packets = overall['packets']
+        wormhole_count = summarize(stats, WORMHOLE)['packets']
+        blackhole_count = summarize(stats, BLACKHOLE)['packets']
+        
+        metrics = {
             'Total Packets': total_packets,
-            'Delivered Packets': delivered_packets,
-            'Dropped Packets': dropped_packets,
-            'Packet Delivery Ratio (%)': (delivered_packets / total_packets) * 100 if total_packets > 0 else 0,
-            'Average Delay (ms)': self.df[self.df['Delivered'] == 1]['DelayMs'].mean(),
-            'Min Delay (ms)': self.df[self.df['Delivered'] == 1]['DelayMs'].min(),
-            'Max Delay (ms)': self.df[self.df['Delivered'] == 1]['DelayMs'].max(),
-            'Std Delay (ms)': self.df[self.df['Delivered'] == 1]['DelayMs'].std(),
-            'Wormhole Affected Packets': self.df['WormholeOnPath'].sum(),
-            'Blackhole Affected Packets': self.df['BlackholeOnPath'].sum(),
-            'Wormhole Impact (%)': (self.df['WormholeOnPath'].sum() / total_packets) * 100,
-            'Blackhole Impact (%)': (self.df['BlackholeOnPath'].sum() / total_packets) * 100,
+            'Delivered Packets': overall['delivered'],
+            'Dropped Packets': overall['dropped'],
+            'Packet Delivery Ratio (%)': overall['pdr'] * 100,
+            'Average Delay (ms)': overall['delay_mean'],
+            'Min Delay (ms)': overall['delay_min'],
+            'Max Delay (ms)': overall['delay_max'],
+            'Std Delay (ms)': overall['delay_std'],
+            'Wormhole Affected Packets': wormhole_count,
+            'Blackhole Affected Packets': blackhole_count,
+            'Wormhole Impact (%)': (wormhole_count / total_packets) * 100 if total_packets > 0 else 0,
+            'Blackhole Impact (%)': (blackhole_count / total_packets) * 100 if total_packets > 0 else 0,
         }
         
         # Additional metrics for attacked packets
-        wormhole_packets = self.df[self.df['WormholeOnPath'] == 1]
-        blackhole_packets = self.df[self.df['BlackholeOnPath'] == 1]
-        normal_packets = self.df[(self.df['WormholeOnPath'] == 0) & (self.df['BlackholeOnPath'] == 0)]
-        
-        if len(wormhole_packets) > 0:
-            self.metrics['Wormhole PDR (%)'] = (wormhole_packets['Delivered'].sum() / len(wormhole_packets)) * 100
-            delivered_wormhole = wormhole_packets[wormhole_packets['Delivered'] == 1]
-            if len(delivered_wormhole) > 0:
-                self.metrics['Avg Delay - Wormhole (ms)'] = delivered_wormhole['DelayMs'].mean()
-        
-        if len(blackhole_packets) > 0:
-            self.metrics['Blackhole PDR (%)'] = (blackhole_packets['Delivered'].sum() / len(blackhole_packets)) * 100
-            delivered_blackhole = blackhole_packets[blackhole_packets['Delivered'] == 1]
-            if len(delivered_blackhole) > 0:
-                self.metrics['Avg Delay - Blackhole (ms)'] = delivered_blackhole['DelayMs'].mean()
-        
-        if len(normal_packets) > 0:
-            self.metrics['Normal PDR (%)'] = (normal_packets['Delivered'].sum() / len(normal_packets)) * 100
-            delivered_normal = normal_packets[normal_packets['Delivered'] == 1]
-            if len(delivered_normal) > 0:
-                self.metrics['Avg Delay - Normal (ms)'] = delivered_normal['DelayMs'].mean()
+        for label, categories in (('Wormhole', WORMHOLE), ('Blackhole', BLACKHOLE), ('Normal', NORMAL)):
+            view = summarize(stats, categories)
+            if view['packets'] > 0:
+                metrics[f'{label} PDR (%)'] = view['pdr'] * 100
+                if view['delivered'] > 0:
+                    metrics[f'Avg Delay - {label} (ms)'] = view['delay_mean']
+        
+        return metrics
     
     def print_summary(self):
         """Print summary statistics"""
@@ -113,10 +479,46 @@ class PacketAnalyzer:
         
         print("="*70 + "\n")
     
+    def calculate_flow_metrics(self):
+        """Per-(source, destination) flow metrics table"""
+        if self.flow_metrics is None:
+            sketch = load_packet_sketches(self.csv_file, self.df, self.use_cache)['flow']
+            self.flow_metrics = flow_table(self.df, sketch=sketch)
+        return self.flow_metrics
+    
+    def print_worst_flows(self, n=10):
+        """Print the n flows with the lowest PDR"""
+        flows = worst_flows(self.calculate_flow_metrics(), n)
+        
+        print("="*70)
+        print(f"🔻 {len(flows)} WORST FLOWS (by PDR, of {len(self.flow_metrics)} flows)")
+        print("="*70)
+        print(f"  {'Flow':<14} {'Packets':>8} {'PDR (%)':>8} {'P95 (ms)':>9} {'MaxBurst':>9} {'WH (%)':>7} {'BH (%)':>7}")
+        for _, row in flows.iterrows():
+            flow = f"{int(row['SourceNode'])} → {int(row['DestNode'])}"
+            print(f"  {flow:<14} {int(row['Packets']):>8} {row['PDR'] * 100:>8.2f} {row['P95DelayMs']:>9.2f} "
+                  f"{int(row['MaxLossBurst']):>9} {row['WormholeExposure'] * 100:>7.1f} "
+                  f"{row['BlackholeExposure'] * 100:>7.1f}")
+        print("="*70 + "\n")
+    
+    def export_flow_metrics(self, output_file='flow_metrics.csv', node_results=None):
+        """Export the per-flow table, joined with per-node results (NodeID column) if given"""
+        table = self.calculate_flow_metrics()
+        if node_results is not None:
+            try:
+                table = join_node_results(table, node_results)
+            except (OSError, KeyError, pd.errors.ParserError) as e:
+                print(f"⚠ Could not join node results {node_results}: {e}")
+        table.to_csv(output_file, index=False)
+        print(f"✅ Flow metrics exported to: {output_file} ({len(table)} flows)")
+    
     def plot_pdr_comparison(self, output_dir='plots'):
         """Plot PDR comparison between normal, wormhole, and blackhole packets"""
         Path(output_dir).mkdir(exist_ok=True)
-        
+        render_pdr_comparison(*self._pdr_comparison_data(), output_dir)
+    
+    def _pdr_comparison_data(self):
+        """Bar labels, heights and colors for the PDR comparison plot"""
         categories = []
         pdr_values = []
         colors = []
@@ -141,30 +543,15 @@ class PacketAnalyzer:
             pdr_values.append(self.metrics['Packet Delivery Ratio (%)'])
             colors.append('#3498db')  # Blue
         
-        fig, ax = plt.subplots(figsize=(10, 6))
-        bars = ax.bar(categories, pdr_values, color=colors, alpha=0.8, edgecolor='black', linewidth=1.5)
-        
-        # Add value labels on bars
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                   f'{height:.1f}%',
-                   ha='center', va='bottom', fontweight='bold', fontsize=12)
-        
-        ax.set_ylabel('Packet Delivery Ratio (%)', fontweight='bold')
-        ax.set_title('PDR Comparison: Normal vs Attack-Affected Packets', fontweight='bold', pad=20)
-        ax.set_ylim(0, 110)
-        ax.grid(axis='y', alpha=0.3)
-        
-        plt.tight_layout()
-        plt.savefig(f'{output_dir}/pdr_comparison.png', dpi=300, bbox_inches='tight')
-        print(f"✅ Saved: {output_dir}/pdr_comparison.png")
-        plt.close()
+        return categories, pdr_values, colors
     
     def plot_delay_comparison(self, output_dir='plots'):
         """Plot delay comparison between different packet types"""
         Path(output_dir).mkdir(exist_ok=True)
-        
+        render_delay_comparison(*self._delay_comparison_data(), output_dir)
+    
+    def _delay_comparison_data(self):
+        """Bar labels, heights and colors for the delay comparison plot"""
         categories = []
         delay_values = []
         colors = []
@@ -189,179 +576,171 @@ class PacketAnalyzer:
             delay_values.append(self.metrics['Average Delay (ms)'])
             colors.append('#3498db')
         
-        fig, ax = plt.subplots(figsize=(10, 6))
-        bars = ax.bar(categories, delay_values, color=colors, alpha=0.8, edgecolor='black', linewidth=1.5)
-        
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                   f'{height:.2f}ms',
-                   ha='center', va='bottom', fontweight='bold', fontsize=11)
-        
-        ax.set_ylabel('Average End-to-End Delay (ms)', fontweight='bold')
-        ax.set_title('Delay Comparison: Normal vs Attack-Affected Packets', fontweight='bold', pad=20)
-        ax.grid(axis='y', alpha=0.3)
-        
-        plt.tight_layout()
-        plt.savefig(f'{output_dir}/delay_comparison.png', dpi=300, bbox_inches='tight')
-        print(f"✅ Saved: {output_dir}/delay_comparison.png")
-        plt.close()
+        return categories, delay_values, colors
+    
+    def delay_distribution(self):
+        """Histogram counts and summaries of delivered delays per packet type (computed once)"""
+        if self.delay_dist is None:
+            delivered = self.df['Delivered'].to_numpy(dtype=bool)
+            codes = category_codes(self.df)[delivered]
+            delays = self.df['DelayMs'].to_numpy(dtype=np.float64)[delivered]
+            self.delay_dist = DelayDistribution.from_categories(codes, delays, box_views=BOXPLOT_VIEWS)
+        return self.delay_dist
     
     def plot_delay_distribution(self, output_dir='plots'):
         """Plot delay distribution histogram with attack indicators"""
         Path(output_dir).mkdir(exist_ok=True)
-        
-        delivered = self.df[self.df['Delivered'] == 1]
-        
-        fig, ax = plt.subplots(figsize=(12, 6))
-        
-        # Plot histograms for different packet types
-        normal = delivered[(delivered['WormholeOnPath'] == 0) & (delivered['BlackholeOnPath'] == 0)]
-        wormhole = delivered[delivered['WormholeOnPath'] == 1]
-        blackhole = delivered[delivered['BlackholeOnPath'] == 1]
-        
-        bins = np.linspace(0, delivered['DelayMs'].max(), 50)
-        
-        if len(normal) > 0:
-            ax.hist(normal['DelayMs'], bins=bins, alpha=0.5, label='Normal', color='#2ecc71', edgecolor='black')
-        if len(wormhole) > 0:
-            ax.hist(wormhole['DelayMs'], bins=bins, alpha=0.5, label='Wormhole', color='#e74c3c', edgecolor='black')
-        if len(blackhole) > 0:
-            ax.hist(blackhole['DelayMs'], bins=bins, alpha=0.5, label='Blackhole', color='#e67e22', edgecolor='black')
-        
-        ax.set_xlabel('End-to-End Delay (ms)', fontweight='bold')
-        ax.set_ylabel('Frequency', fontweight='bold')
-        ax.set_title('Delay Distribution by Packet Type', fontweight='bold', pad=20)
-        ax.legend()
-        ax.grid(axis='y', alpha=0.3)
-        
-        plt.tight_layout()
-        plt.savefig(f'{output_dir}/delay_distribution.png', dpi=300, bbox_inches='tight')
-        print(f"✅ Saved: {output_dir}/delay_distribution.png")
-        plt.close()
+        render_delay_distribution(*self._delay_distribution_data(), output_dir)
+    
+    def _delay_distribution_data(self):
+        """Shared bin edges and per-type histogram counts of delivered delays"""
+        distribution = self.delay_distribution()
+        return distribution.edges, distribution.histograms()
     
     def plot_packet_timeline(self, output_dir='plots'):
         """Plot packet delivery over time"""
         Path(output_dir).mkdir(exist_ok=True)
-        
-        # Create time bins
-        time_bins = pd.cut(self.df['SendTime'], bins=20)
-        
-        # Calculate PDR per time bin
-        pdr_over_time = self.df.groupby(time_bins)['Delivered'].mean() * 100
-        time_labels = [f"{interval.left:.1f}-{interval.right:.1f}" for interval in pdr_over_time.index]
-        
-        fig, ax = plt.subplots(figsize=(14, 6))
-        ax.plot(range(len(pdr_over_time)), pdr_over_time.values, marker='o', linewidth=2, 
-                markersize=8, color='#3498db', markerfacecolor='#e74c3c', markeredgecolor='black')
-        
-        ax.set_xlabel('Simulation Time (seconds)', fontweight='bold')
-        ax.set_ylabel('Packet Delivery Ratio (%)', fontweight='bold')
-        ax.set_title('PDR Over Simulation Time', fontweight='bold', pad=20)
-        ax.set_xticks(range(len(time_labels)))
-        ax.set_xticklabels(time_labels, rotation=45, ha='right')
-        ax.grid(alpha=0.3)
-        ax.set_ylim(0, 110)
-        
-        plt.tight_layout()
-        plt.savefig(f'{output_dir}/pdr_timeline.png', dpi=300, bbox_inches='tight')
-        print(f"✅ Saved: {output_dir}/pdr_timeline.png")
-        plt.close()
+        render_packet_timeline(*self._packet_timeline_data(), output_dir)
+    
+    def _packet_timeline_data(self):
+        """PDR per send-time bin and the bin labels"""
+        if self.accumulator is not None:
+            return self._streamed_timeline_data()
+        
+        # 20 equal-width SendTime bins, counted with integer bin indices
+        n_bins = 20
+        send = self.df['SendTime'].to_numpy(dtype=np.float64)
+        if len(send) == 0:
+            return np.array([]), []
+        start, end = send.min(), send.max()
+        width = (end - start) / n_bins if end > start else 1.0
+        bins = np.minimum(((send - start) / width).astype(np.int64), n_bins - 1)
+        sent = np.bincount(bins, minlength=n_bins)
+        delivered = np.bincount(bins, weights=self.df['Delivered'].to_numpy(dtype=bool), minlength=n_bins)
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            pdr = delivered / sent * 100
+        edges = start + width * np.arange(n_bins + 1)
+        time_labels = [f"{edges[i]:.1f}-{edges[i + 1]:.1f}" for i in range(n_bins)]
+        return pdr, time_labels
+    
+    def _streamed_timeline_data(self, n_bins=20):
+        """Timeline from the accumulator's fixed-width bins, regrouped into ~n_bins"""
+        sent = self.accumulator.sent_by_bin
+        delivered = np.zeros_like(sent)
+        delivered[:len(self.accumulator.delivered_by_bin)] = self.accumulator.delivered_by_bin
+        
+        nonzero = np.flatnonzero(sent)
+        if len(nonzero) == 0:
+            return np.array([]), []
+        first, last = nonzero[0], nonzero[-1] + 1
+        group = max(1, -(-(last - first) // n_bins))
+        starts = np.arange(first, last, group)
+        sent_g = np.add.reduceat(sent[first:last], starts - first)
+        delivered_g = np.add.reduceat(delivered[first:last], starts - first)
+        
+        with np.errstate(invalid='ignore', divide='ignore'):
+            pdr = delivered_g / sent_g * 100
+        width = self.accumulator.time_bin_s
+        time_labels = [f"{s * width:.1f}-{min(s + group, last) * width:.1f}" for s in starts]
+        return pdr, time_labels
+    
+    def time_series(self):
+        """
+        Binned per-category series at self.resolution_s (cached next to the
+        CSV); --stream and --follow bin it while reading the trace
+        """
+        if self.series is None or self.series.resolution_s != self.resolution_s:
+            self.series = load_time_series(self.csv_file, self.resolution_s, self.df, self.chunksize,
+                                           self.use_cache)
+        return self.series
+    
+    def time_series_table(self):
+        """PDR / goodput / delay-percentile series with the configured window"""
+        return series_table(self.time_series(), self.window, self.window_s)
+    
+    def plot_time_series(self, output_dir='plots'):
+        """Plot high-resolution PDR, goodput and p95 delay per attack category"""
+        Path(output_dir).mkdir(exist_ok=True)
+        render_time_series(*self._time_series_data(), output_dir)
+    
+    def _time_series_data(self):
+        """Series table and a description of its binning for the title"""
+        description = f'{self.resolution_s * 1000:g} ms bins'
+        if self.window != 'none':
+            description += f', {self.window} {self.window_s:g} s'
+        return self.time_series_table(), description
+    
+    def export_time_series_csv(self, output_file='time_series.csv'):
+        """Export the time series table to CSV"""
+        table = self.time_series_table()
+        table.to_csv(output_file, index=False)
+        print(f"✅ Time series exported to: {output_file} ({len(table)} bins of {self.resolution_s:g} s)")
     
     def plot_attack_impact(self, output_dir='plots'):
         """Plot attack impact pie chart"""
         Path(output_dir).mkdir(exist_ok=True)
-        
-        wormhole_count = self.df['WormholeOnPath'].sum()
-        blackhole_count = self.df['BlackholeOnPath'].sum()
-        normal_count = len(self.df) - wormhole_count - blackhole_count
-        
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(14, 6))
-        
-        # Pie chart 1: Packet distribution
-        labels1 = ['Normal', 'Wormhole', 'Blackhole']
-        sizes1 = [normal_count, wormhole_count, blackhole_count]
-        colors1 = ['#2ecc71', '#e74c3c', '#e67e22']
-        explode1 = (0.05, 0.1, 0.1)
-        
-        ax1.pie(sizes1, explode=explode1, labels=labels1, colors=colors1, autopct='%1.1f%%',
-                shadow=True, startangle=90, textprops={'fontsize': 12, 'fontweight': 'bold'})
-        ax1.set_title('Packet Distribution by Attack Type', fontweight='bold', pad=20)
-        
-        # Pie chart 2: Delivery status
-        delivered = self.df['Delivered'].sum()
-        dropped = len(self.df) - delivered
-        
-        labels2 = ['Delivered', 'Dropped']
-        sizes2 = [delivered, dropped]
-        colors2 = ['#2ecc71', '#e74c3c']
-        explode2 = (0.05, 0.1)
-        
-        ax2.pie(sizes2, explode=explode2, labels=labels2, colors=colors2, autopct='%1.1f%%',
-                shadow=True, startangle=90, textprops={'fontsize': 12, 'fontweight': 'bold'})
-        ax2.set_title('Overall Packet Delivery Status', fontweight='bold', pad=20)
-        
-        plt.tight_layout()
-        plt.savefig(f'{output_dir}/attack_impact_pie.png', dpi=300, bbox_inches='tight')
-        print(f"✅ Saved: {output_dir}/attack_impact_pie.png")
-        plt.close()
+        render_attack_impact(*self._attack_impact_data(), output_dir)
+    
+    def _attack_impact_data(self):
+        """Packet counts by attack type and by delivery status"""
+        wormhole_count = self.metrics['Wormhole Affected Packets']
+        blackhole_count = self.metrics['Blackhole Affected Packets']
+        normal_count = self.metrics['Total Packets'] - wormhole_count - blackhole_count
+        
+        delivered = self.metrics['Delivered Packets']
+        dropped = self.metrics['Dropped Packets']
+        return [normal_count, wormhole_count, blackhole_count], [delivered, dropped]
     
     def plot_node_communication_matrix(self, output_dir='plots'):
         """Plot source-destination communication heatmap"""
         Path(output_dir).mkdir(exist_ok=True)
-        
-        # Create communication matrix
-        comm_matrix = self.df.groupby(['SourceNode', 'DestNode']).size().reset_index(name='Count')
-        pivot = comm_matrix.pivot(index='SourceNode', columns='DestNode', values='Count').fillna(0)
-        
-        fig, ax = plt.subplots(figsize=(12, 10))
-        sns.heatmap(pivot, annot=False, cmap='YlOrRd', cbar_kws={'label': 'Packet Count'}, ax=ax)
-        
-        ax.set_xlabel('Destination Node', fontweight='bold')
-        ax.set_ylabel('Source Node', fontweight='bold')
-        ax.set_title('Node-to-Node Communication Matrix', fontweight='bold', pad=20)
-        
-        plt.tight_layout()
-        plt.savefig(f'{output_dir}/communication_matrix.png', dpi=300, bbox_inches='tight')
-        print(f"✅ Saved: {output_dir}/communication_matrix.png")
-        plt.close()
+        render_communication_matrix(*self._communication_matrix_data(), output_dir)
+    
+    def communication_matrix(self):
+        """Sparse source x destination CommMatrix of the loaded trace"""
+        if self.comm_matrix is None:
+            self.comm_matrix = CommMatrix.from_dataframe(self.df)
+        return self.comm_matrix
+    
+    def _communication_matrix_data(self):
+        """Dense packet counts of the plotted matrix view with its row/column labels"""
+        view = self.communication_matrix()
+        if self.matrix_rollup is not None:
+            view = view.rollup(*role_groups(view.nodes, *self.matrix_rollup))
+        if self.matrix_top_k is not None:
+            view = view.top_k(self.matrix_top_k)
+        view = view.plot_view(MATRIX_MAX_PLOT_NODES)
+        labels = view.labels.tolist()
+        return view.to_dense(), labels, labels
+    
+    def export_communication_matrix(self, output_file='communication_matrix.npz'):
+        """Save the full sparse communication matrix (scipy.sparse CSR .npz layout)"""
+        if self.df is None:
+            print("⚠ Streaming mode: communication matrix not exported")
+            return
+        matrix = self.communication_matrix()
+        matrix.save_npz(output_file)
+        print(f"✅ Communication matrix exported to: {output_file} "
+              f"({matrix.n_nodes} nodes, {matrix.nnz} active flows)")
     
     def plot_delay_boxplot(self, output_dir='plots'):
         """Plot delay box plot comparing packet types"""
         Path(output_dir).mkdir(exist_ok=True)
-        
-        delivered = self.df[self.df['Delivered'] == 1].copy()
-        
-        # Create packet type labels
-        delivered['PacketType'] = 'Normal'
-        delivered.loc[delivered['WormholeOnPath'] == 1, 'PacketType'] = 'Wormhole'
-        delivered.loc[delivered['BlackholeOnPath'] == 1, 'PacketType'] = 'Blackhole'
-        
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        # Create box plot
-        box_data = [
-            delivered[delivered['PacketType'] == 'Normal']['DelayMs'],
-            delivered[delivered['PacketType'] == 'Wormhole']['DelayMs'],
-            delivered[delivered['PacketType'] == 'Blackhole']['DelayMs']
-        ]
-        
-        bp = ax.boxplot(box_data, labels=['Normal', 'Wormhole', 'Blackhole'],
-                        patch_artist=True, showmeans=True)
-        
-        colors = ['#2ecc71', '#e74c3c', '#e67e22']
-        for patch, color in zip(bp['boxes'], colors):
-            patch.set_facecolor(color)
-            patch.set_alpha(0.7)
-        
-        ax.set_ylabel('End-to-End Delay (ms)', fontweight='bold')
-        ax.set_title('Delay Distribution Box Plot by Packet Type', fontweight='bold', pad=20)
-        ax.grid(axis='y', alpha=0.3)
-        
-        plt.tight_layout()
-        plt.savefig(f'{output_dir}/delay_boxplot.png', dpi=300, bbox_inches='tight')
-        print(f"✅ Saved: {output_dir}/delay_boxplot.png")
-        plt.close()
+        render_delay_boxplot(self._delay_boxplot_data(), output_dir)
+    
+    def _delay_boxplot_data(self):
+        """Box-plot statistics (quartiles, whiskers, mean) per packet type"""
+        return self.delay_distribution().box_stats()
+    
+    def export_delay_summary(self, output_file='delay_summary.csv'):
+        """Export per-type delay quantiles, whiskers and outlier counts to CSV"""
+        if self.df is None:
+            print("⚠ Streaming mode: delay summary not exported")
+            return
+        table = self.delay_distribution().summary_table()
+        table.to_csv(output_file, index=False)
+        print(f"✅ Delay summary exported to: {output_file}")
     
     def export_metrics_csv(self, output_file='analysis_metrics.csv'):
         """Export calculated metrics to CSV"""
@@ -393,35 +772,116 @@ class PacketAnalyzer:
         
         print(f"✅ LaTeX table exported to: {output_file}")
     
-    def generate_all_plots(self, output_dir='plots'):
-        """Generate all visualization plots"""
+    def _render_jobs(self, output_dir):
+        """One render job per figure, each carrying only its pre-aggregated data"""
+        if self.streaming:
+            # Per-packet figures need the full trace, which streaming mode never holds
+            print("⚠ Streaming mode: skipping delay distribution, communication matrix and box plot")
+            return [
+                RenderJob('pdr_comparison.png', render_pdr_comparison,
+                          (*self._pdr_comparison_data(), output_dir)),
+                RenderJob('delay_comparison.png', render_delay_comparison,
+                          (*self._delay_comparison_data(), output_dir)),
+                RenderJob('pdr_timeline.png', render_packet_timeline,
+                          (*self._packet_timeline_data(), output_dir)),
+                RenderJob('pdr_time_series.png', render_time_series,
+                          (*self._time_series_data(), output_dir)),
+                RenderJob('attack_impact_pie.png', render_attack_impact,
+                          (*self._attack_impact_data(), output_dir)),
+            ]
+        
+        return [
+            RenderJob('pdr_comparison.png', render_pdr_comparison,
+                      (*self._pdr_comparison_data(), output_dir)),
+            RenderJob('delay_comparison.png', render_delay_comparison,
+                      (*self._delay_comparison_data(), output_dir)),
+            RenderJob('delay_distribution.png', render_delay_distribution,
+                      (*self._delay_distribution_data(), output_dir)),
+            RenderJob('pdr_timeline.png', render_packet_timeline,
+                      (*self._packet_timeline_data(), output_dir)),
+            RenderJob('pdr_time_series.png', render_time_series,
+                      (*self._time_series_data(), output_dir)),
+            RenderJob('attack_impact_pie.png', render_attack_impact,
+                      (*self._attack_impact_data(), output_dir)),
+            RenderJob('communication_matrix.png', render_communication_matrix,
+                      (*self._communication_matrix_data(), output_dir)),
+            RenderJob('delay_boxplot.png', render_delay_boxplot,
+                      (self._delay_boxplot_data(), output_dir)),
+        ]
+    
+    def generate_all_plots(self, output_dir='plots', jobs=1):
+        """Generate all visualization plots (jobs > 1 renders them in parallel); returns how many rendered"""
         print("\n📊 Generating all plots...")
         print("-" * 70)
         
-        self.plot_pdr_comparison(output_dir)
-        self.plot_delay_comparison(output_dir)
-        self.plot_delay_distribution(output_dir)
-        self.plot_packet_timeline(output_dir)
-        self.plot_attack_impact(output_dir)
-        self.plot_node_communication_matrix(output_dir)
-        self.plot_delay_boxplot(output_dir)
+        Path(output_dir).mkdir(exist_ok=True)
+        start = time.perf_counter()
+        timings = render_figures(self._render_jobs(output_dir), jobs)
+        wall = time.perf_counter() - start
         
         print("-" * 70)
+        print_render_timings(timings, wall, jobs)
         print(f"✅ All plots saved to '{output_dir}/' directory\n")
-
+        return len(timings)
 
 def main():
     """Main execution function"""
+    parser = argparse.ArgumentParser(description='Analyze packet-delivery-analysis.csv from the ns-3 routing simulation')
+    parser.add_argument('csv_file', nargs='?', default='packet-delivery-analysis.csv',
+                        help='Packet trace CSV (default: packet-delivery-analysis.csv)')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Figures to render in parallel (0 = all cores, default: 1)')
+    parser.add_argument('--no-plots', '--metrics-only', dest='no_plots', action='store_true',
+                        help='Compute and export metrics only (never imports matplotlib/seaborn)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Aggregate the CSV in bounded chunks instead of loading it (for traces larger than RAM)')
+    parser.add_argument('--chunksize', type=int, default=DEFAULT_CHUNK_ROWS,
+                        help=f'Rows per chunk in --stream mode (default: {DEFAULT_CHUNK_ROWS})')
+    parser.add_argument('--follow', '-f', action='store_true',
+                        help='Tail the CSV while the simulation is writing it and print a rolling summary')
+    parser.add_argument('--snapshot', action='append', default=[], metavar='CSV',
+                        help='Periodic snapshot CSV (Timestamp,Scenario,PacketsSent,...) to tail in --follow mode; repeatable')
+    parser.add_argument('--interval', type=float, default=2.0,
+                        help='Seconds between polls in --follow mode (default: 2)')
+    parser.add_argument('--idle-timeout', type=float, default=None,
+                        help='Stop --follow after this many seconds without new rows (default: run until Ctrl+C)')
+    parser.add_argument('--resolution', type=float, default=DEFAULT_RESOLUTION_S,
+                        help=f'Time-series bin width in seconds (default: {DEFAULT_RESOLUTION_S})')
+    parser.add_argument('--window', choices=WINDOWS, default='none',
+                        help='Smoothing of the time series: sliding window or EWMA (default: none)')
+    parser.add_argument('--window-s', type=float, default=1.0,
+                        help='Sliding window length / EWMA time constant in seconds (default: 1)')
+    parser.add_argument('--flows', type=int, default=10, metavar='N',
+                        help='Number of worst flows to list (default: 10)')
+    parser.add_argument('--node-results', default=None, metavar='CSV',
+                        help='Per-node CSV (e.g. blackhole-mitigation-results.csv) to join into flow_metrics.csv')
+    parser.add_argument('--matrix-top-k', type=int, default=None, metavar='K',
+                        help='Plot the communication matrix of the K busiest nodes only')
+    parser.add_argument('--matrix-rollup', type=int, default=None, metavar='G',
+                        help='Plot the communication matrix with vehicles merged into groups of G (RSUs kept individually)')
+    parser.add_argument('--vehicles', type=int, default=DEFAULT_VEHICLES,
+                        help=f'Vehicle count; node IDs from here on are RSUs (default: {DEFAULT_VEHICLES})')
+    args = parser.parse_args()
+    
     print("\n" + "="*70)
     print("🚗 VANET Packet Delivery Analysis Tool")
     print("="*70 + "\n")
     
     # Initialize analyzer
-    csv_file = 'packet-delivery-analysis.csv'
-    analyzer = PacketAnalyzer(csv_file)
+    analyzer = PacketAnalyzer(args.csv_file, streaming=args.stream, chunksize=args.chunksize)
+    analyzer.matrix_top_k = args.matrix_top_k
+    analyzer.resolution_s = args.resolution
+    analyzer.window = args.window
+    analyzer.window_s = args.window_s
+    if args.matrix_rollup:
+        analyzer.matrix_rollup = (args.vehicles, args.matrix_rollup)
     
     # Load data
-    if not analyzer.load_data():
+    if args.follow:
+        loaded = analyzer.follow(args.snapshot, args.interval, args.idle_timeout)
+    else:
+        loaded = analyzer.load_data()
+    if not loaded:
         print("\n💡 TIP: Run the simulation first:")
         print("   ./waf --run \"routing --enable_packet_tracking --simTime=10\"\n")
         return
@@ -432,22 +892,39 @@ def main():
     
     # Print summary
     analyzer.print_summary()
+    if not analyzer.streaming:
+        analyzer.print_worst_flows(args.flows)
     
     # Generate visualizations
-    analyzer.generate_all_plots('plots')
+    n_plots = 0
+    if not args.no_plots:
+        n_plots = analyzer.generate_all_plots('plots', jobs=args.jobs)
     
     # Export results
     print("📄 Exporting results...")
     analyzer.export_metrics_csv('analysis_metrics.csv')
     analyzer.export_latex_table('metrics_table.tex')
+    analyzer.export_time_series_csv('time_series.csv')
+    analyzer.export_communication_matrix('communication_matrix.npz')
+    analyzer.export_delay_summary('delay_summary.csv')
+    if not analyzer.streaming:
+        analyzer.export_flow_metrics('flow_metrics.csv', args.node_results)
     
     print("\n" + "="*70)
     print("✅ Analysis Complete!")
     print("="*70)
     print("\n📁 Generated Files:")
-    print("   📊 Plots: plots/*.png (7 visualization files)")
+    if n_plots:
+        print(f"   📊 Plots: plots/*.png ({n_plots} visualization files)")
     print("   📈 Metrics: analysis_metrics.csv")
     print("   📄 LaTeX Table: metrics_table.tex")
+    print("   ⏱  Time Series: time_series.csv")
+    if not analyzer.streaming:
+        print("   🔢 Communication Matrix: communication_matrix.npz")
+    if not analyzer.streaming:
+        print("   📦 Delay Summary: delay_summary.csv")
+    if not analyzer.streaming:
+        print("   🔀 Flow Metrics: flow_metrics.csv")
     print("\n💡 Use these files in your research paper!\n")
 
 
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+Analysis Benchmark Suite
+========================
+
+Times and memory-profiles the analysis entry points on synthetic traces
+(synthetic_traces.py) so regressions show up before real traces hit them:
+
+- PacketAnalyzer.calculate_metrics and every PacketAnalyzer.plot_* method
+- AttackAnalyzer.generate_report        (test_sdvn_attacks.sh layout)
+- MitigationAnalyzer.generate_report    (with/without mitigation layout)
+- ScenarioComparator.compare_all_scenarios
+- wormhole_analysis.parse_csv
+- replicate_stats.bootstrap_means (10k resamples of 100 scenarios x 10 seeds,
+  independent of --rows)
+- wormhole_replay.FlowDelayTrace.sweep (201 multipliers x 4 baseline windows
+  over the packet trace; preparing the trace is setup)
+- detection_accuracy.blackhole_accuracy (ground truth / verdict join of
+  1000 runs x 60 nodes, independent of --rows)
+- blackhole_tuning.NodeCounters.grid (101 PDR thresholds x 6 minimum samples
+  over the same 1000 runs; loading them is setup)
+- startup: importing each CLI module, --help, and the --metrics-only paths,
+  each in a fresh interpreter; these cases fail if matplotlib or seaborn
+  got imported (peak_mb covers only this process, so it is ~0 for them)
+
+Each case runs once under tracemalloc (peak Python/NumPy allocation, also
+warming the column caches) and then --repeat times untimed by tracemalloc;
+the median and best wall-clock times are reported.  Loading the input is
+part of the setup and is not timed, except for generate_report, which owns
+its loading.
+
+Results are written as JSON ("case@rows" keys), and can be compared against
+a previous JSON baseline: a case slower or hungrier than baseline by more
+than --tolerance is flagged as a REGRESSION and the exit status is 1.
+
+Usage:
+    python3 benchmark_analysis.py [--rows 10000,100000] [--nodes 28] [--repeat 3]
+                                  [--workdir .bench_data] [--output bench.json]
+                                  [--baseline bench.json] [--tolerance 0.25]
+                                  [--cases calculate_metrics,parse_csv]
+
+Author: VANET Security Research
+Date: October 2025
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import matplotlib
+matplotlib.use('Agg')
+
+import numpy as np
+import pandas as pd
+
+import synthetic_traces
+from analyze_attack_results import AttackAnalyzer
+from blackhole_tuning import NodeCounters
+from analyze_mitigation_comparison import MitigationAnalyzer
+from analyze_packets import PacketAnalyzer
+from compare_scenarios import ScenarioComparator
+from detection_accuracy import BLACKHOLE_ATTACK_FILE, BLACKHOLE_MITIGATION_FILE, blackhole_accuracy
+from replicate_stats import bootstrap_means
+from packet_loader import load_packet_csv
+from wormhole_analysis import parse_csv
+from wormhole_replay import FlowDelayTrace
+
+DEFAULT_ROWS = '10000,100000'
+DEFAULT_TOLERANCE = 0.25
+DEFAULT_WORKDIR = '.bench_data'
+
+# Absolute changes below these are timer/allocator noise, never regressions
+NOISE_FLOOR_S = 0.005
+NOISE_FLOOR_MB = 1.0
+
+PLOT_METHODS = ['plot_pdr_comparison', 'plot_delay_comparison', 'plot_delay_distribution',
+                'plot_packet_timeline', 'plot_time_series', 'plot_attack_impact', 'plot_node_communication_matrix',
+                'plot_delay_boxplot']
+
+# Runs of the attack tree loaded by the ScenarioComparator case
+COMPARATOR_RUNS = ['test1_sdvn_baseline', 'test2_sdvn_wormhole_10', 'test4_sdvn_blackhole_10']
+
+# bootstrap_ci case: scenarios x seeds x metrics of per-run statistics
+BOOTSTRAP_SHAPE = (100, 10, 4)
+
+# detection_join case: runs x nodes of per-node blackhole results
+DETECTION_SHAPE = (1000, 60)
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# CLI modules whose import time is measured, and the modules that a
+# metrics-only invocation must never load
+STARTUP_MODULES = ['analyze_packets', 'analyze_attack_results', 'analyze_mitigation_comparison',
+                   'compare_scenarios', 'wormhole_analysis']
+HEAVY_MODULES = ('matplotlib', 'seaborn')
+
+_STARTUP_CODE = '''
+import runpy, sys
+sys.path.insert(0, {repo!r})
+{body}
+heavy = [name for name in {heavy!r} if name in sys.modules]
+if heavy:
+    sys.exit('imported ' + ', '.join(heavy))
+'''
+
+
+# ----------------------------------------------------------------------------
+# Synthetic inputs
+# ----------------------------------------------------------------------------
+
+def prepare_data(workdir, rows, nodes, seed=0):
+    """
+    Generate (or reuse) the synthetic inputs for one size and return their paths.
+
+    Data sets are kept per (rows, nodes, seed) under workdir; a marker file
+    records that generation finished, so an interrupted run is regenerated.
+    """
+    root = os.path.join(workdir, f'rows{rows}_nodes{nodes}_seed{seed}')
+    marker = os.path.join(root, '.complete')
+    run_dir = os.path.join(root, 'run')
+    paths = {
+        'packet_csv': os.path.join(run_dir, 'packet-delivery-analysis.csv'),
+        'wormhole_csv': os.path.join(run_dir, 'wormhole-attack-results.csv'),
+        'attack_tree': os.path.join(root, 'attack'),
+        'mitigation_tree': os.path.join(root, 'mitigation'),
+    }
+    if os.path.exists(marker):
+        return paths
+
+    print(f"  ⚙ Generating synthetic data: {rows} packets/run, {nodes} nodes -> {root}/")
+    synthetic_traces.generate_run(run_dir, rows, nodes, wormhole_fraction=0.1, blackhole_fraction=0.1, seed=seed)
+    synthetic_traces.generate_results_tree(paths['attack_tree'], 'attack', rows, nodes, seed=seed)
+    synthetic_traces.generate_results_tree(paths['mitigation_tree'], 'mitigation', rows, nodes, seed=seed)
+    with open(marker, 'w') as f:
+        f.write(f'{time.time()}\n')
+    return paths
+
+
+# ----------------------------------------------------------------------------
+# Cases
+#
+# Each case is (setup, run): setup(paths, scratch) builds the untimed state,
+# run(state) is the measured call.
+# ----------------------------------------------------------------------------
+
+def _loaded_packet_analyzer(paths, scratch):
+    analyzer = PacketAnalyzer(paths['packet_csv'])
+    analyzer.load_data()
+    analyzer.calculate_metrics()
+    return analyzer
+
+
+def _plot_case(method):
+    def run(analyzer):
+        getattr(analyzer, method)(analyzer.bench_plot_dir)
+
+    def setup(paths, scratch):
+        analyzer = _loaded_packet_analyzer(paths, scratch)
+        analyzer.bench_plot_dir = scratch
+        return analyzer
+
+    return setup, run
+
+
+def _loaded_comparator(paths, scratch):
+    comparator = ScenarioComparator()
+    for run_id in COMPARATOR_RUNS:
+        comparator.load_scenario(run_id, os.path.join(paths['attack_tree'],
+                                                      f'{run_id}_packet-delivery-analysis.csv'))
+    return comparator
+
+
+def _bootstrap_groups(paths, scratch):
+    n_scenarios, n_seeds, n_metrics = BOOTSTRAP_SHAPE
+    rng = np.random.default_rng(0)
+    return [rng.normal(size=(n_seeds, n_metrics)) for _ in range(n_scenarios)]
+
+
+def _detection_files(paths, scratch):
+    n_runs, n_nodes = DETECTION_SHAPE
+    files_by_run = {}
+    for i in range(n_runs):
+        files = {name: os.path.join(scratch, f'run{i}_{name}')
+                 for name in (BLACKHOLE_ATTACK_FILE, BLACKHOLE_MITIGATION_FILE)}
+        synthetic_traces.generate_blackhole_attack_results(files[BLACKHOLE_ATTACK_FILE], n_nodes, 0.1, seed=i)
+        synthetic_traces.generate_blackhole_mitigation_results(files[BLACKHOLE_MITIGATION_FILE], n_nodes, 0.1, seed=i)
+        files_by_run[f'run{i}'] = files
+    return files_by_run
+
+
+def _startup_case(body):
+    """
+    Case run in a fresh interpreter: body(paths) is the Python code to time.
+    The case fails if that code imported any of HEAVY_MODULES.
+    """
+    def setup(paths, scratch):
+        code = _STARTUP_CODE.format(repo=REPO_DIR, body=body(paths), heavy=HEAVY_MODULES)
+        return [sys.executable, '-c', code], scratch
+
+    def run(state):
+        command, cwd = state
+        result = subprocess.run(command, cwd=cwd, capture_output=True, text=True)
+        if result.returncode != 0:
+            lines = (result.stderr or result.stdout).strip().splitlines()
+            raise RuntimeError(lines[-1] if lines else f'exit status {result.returncode}')
+
+    return setup, run
+
+
+def _cli(script, *args):
+    """Code running a CLI script's main with the given arguments (its sys.exit is ignored)"""
+    return (f"sys.argv = {[script, *args]!r}\n"
+            f"try:\n    runpy.run_path({os.path.join(REPO_DIR, script)!r}, run_name='__main__')\n"
+            f"except SystemExit:\n    pass")
+
+
+CASES = {
+    'calculate_metrics': (_loaded_packet_analyzer, lambda analyzer: analyzer.calculate_metrics()),
+    **{method: _plot_case(method) for method in PLOT_METHODS},
+    'attack_generate_report': (
+        lambda paths, scratch: AttackAnalyzer(paths['attack_tree'], use_store=False),
+        lambda analyzer: analyzer.generate_report()),
+    'mitigation_generate_report': (
+        lambda paths, scratch: MitigationAnalyzer(paths['mitigation_tree'], use_store=False),
+        lambda analyzer: analyzer.generate_report()),
+    'compare_all_scenarios': (_loaded_comparator, lambda comparator: comparator.compare_all_scenarios()),
+    'parse_csv': (lambda paths, scratch: paths['wormhole_csv'], parse_csv),
+    'bootstrap_ci': (_bootstrap_groups, bootstrap_means),
+    'detection_join': (_detection_files, blackhole_accuracy),
+    'threshold_grid': (lambda paths, scratch: NodeCounters.load(_detection_files(paths, scratch)),
+                       lambda counters: counters.grid()),
+    'wormhole_replay': (lambda paths, scratch: FlowDelayTrace.from_frame(load_packet_csv(paths['packet_csv'])),
+                        lambda trace: trace.sweep()),
+    **{f'import_{module}': _startup_case(lambda paths, module=module: f'import {module}')
+       for module in STARTUP_MODULES},
+    'startup_help': _startup_case(lambda paths: _cli('analyze_packets.py', '--help')),
+    'metrics_only_packets': _startup_case(
+        lambda paths: _cli('analyze_packets.py', paths['packet_csv'], '--metrics-only')),
+    'metrics_only_attack_report': _startup_case(
+        lambda paths: _cli('analyze_attack_results.py', paths['attack_tree'], '--metrics-only', '--no-store')),
+}
+
+
+def _quiet(func, *args):
+    """Call func with its console output swallowed"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        return func(*args)
+
+
+def run_case(name, paths, repeat):
+    """{'seconds': median, 'min_seconds': best, 'peak_mb': tracemalloc peak, 'repeat': n}"""
+    setup, run = CASES[name]
+    with tempfile.TemporaryDirectory(prefix='bench_') as scratch:
+        # Profiled pass: peak memory of the measured call only
+        state = _quiet(setup, paths, scratch)
+        tracemalloc.start()
+        try:
+            _quiet(run, state)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        timings = []
+        for _ in range(repeat):
+            state = _quiet(setup, paths, scratch)
+            start = time.perf_counter()
+            _quiet(run, state)
+            timings.append(time.perf_counter() - start)
+
+    return {
+        'seconds': statistics.median(timings),
+        'min_seconds': min(timings),
+        'peak_mb': peak / 1e6,
+        'repeat': repeat,
+    }
+
+
+# ----------------------------------------------------------------------------
+# Baselines
+# ----------------------------------------------------------------------------
+
+def environment():
+    """Interpreter / library versions recorded with every result file"""
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'matplotlib': matplotlib.__version__,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """
+    Print a comparison table and return the keys that regressed.
+
+    A case regresses when its median time or its peak memory exceeds the
+    baseline by more than tolerance (0.25 = 25%) and by more than the
+    noise floor in absolute terms.
+    """
+    regressions = []
+    print(f"\n{'Case':<42} {'Time':>9} {'Base':>9} {'Δ':>8} {'Peak MB':>9} {'Base':>9} {'Δ':>8}")
+    print("-" * 100)
+    for key, result in results.items():
+        base = baseline.get(key)
+        if base is None:
+            print(f"{key:<42} {result['seconds']:>8.3f}s {'-':>9} {'new':>8} {result['peak_mb']:>9.1f}")
+            continue
+
+        time_change = result['seconds'] / base['seconds'] - 1 if base['seconds'] > 0 else 0.0
+        mem_change = result['peak_mb'] / base['peak_mb'] - 1 if base['peak_mb'] > 0 else 0.0
+        flag = ''
+        slower = time_change > tolerance and result['seconds'] - base['seconds'] > NOISE_FLOOR_S
+        hungrier = mem_change > tolerance and result['peak_mb'] - base['peak_mb'] > NOISE_FLOOR_MB
+        if slower or hungrier:
+            regressions.append(key)
+            flag = '  ⚠ REGRESSION'
+        print(f"{key:<42} {result['seconds']:>8.3f}s {base['seconds']:>8.3f}s {time_change:>+8.1%} "
+              f"{result['peak_mb']:>9.1f} {base['peak_mb']:>9.1f} {mem_change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the analysis scripts on synthetic traces')
+    parser.add_argument('--rows', default=DEFAULT_ROWS,
+                        help=f'Comma-separated packets per trace (default: {DEFAULT_ROWS})')
+    parser.add_argument('--nodes', type=int, default=28, help='Number of nodes (default: 28)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3, help='Timed repetitions per case (default: 3)')
+    parser.add_argument('--cases', default=None,
+                        help=f'Comma-separated subset of: {", ".join(CASES)}')
+    parser.add_argument('--workdir', default=DEFAULT_WORKDIR,
+                        help=f'Where synthetic data is generated and reused (default: {DEFAULT_WORKDIR})')
+    parser.add_argument('--output', '-o', default=None, help='Write results as JSON to this file')
+    parser.add_argument('--baseline', default=None, help='JSON results file to compare against')
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f'Allowed slowdown/memory growth before flagging (default: {DEFAULT_TOLERANCE})')
+    args = parser.parse_args()
+
+    sizes = [int(value) for value in args.rows.split(',') if value.strip()]
+    cases = list(CASES) if args.cases is None else [c.strip() for c in args.cases.split(',') if c.strip()]
+    unknown = [c for c in cases if c not in CASES]
+    if unknown:
+        print(f"Error: unknown case(s): {', '.join(unknown)}")
+        sys.exit(2)
+
+    baseline = None
+    if args.baseline:
+        try:
+            with open(args.baseline) as f:
+                baseline = json.load(f)['results']
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Error: cannot read baseline {args.baseline}: {e}")
+            sys.exit(2)
+
+    print("=" * 70)
+    print("⏱  ANALYSIS BENCHMARKS")
+    print("=" * 70)
+
+    results = {}
+    for rows in sizes:
+        paths = prepare_data(args.workdir, rows, args.nodes, args.seed)
+        for name in cases:
+            key = f'{name}@{rows}'
+            try:
+                results[key] = run_case(name, paths, args.repeat)
+            except Exception as e:
+                print(f"  ❌ {key}: {e}")
+                continue
+            result = results[key]
+            print(f"  {key:<42} {result['seconds']:>8.3f}s (best {result['min_seconds']:.3f}s) "
+                  f"peak {result['peak_mb']:>8.1f} MB")
+
+    report = {
+        'meta': dict(environment(), rows=sizes, nodes=args.nodes, seed=args.seed, repeat=args.repeat),
+        'results': results,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n✓ Results saved to: {args.output}")
+
+    if baseline is not None:
+        regressions = compare_to_baseline(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n⚠ {len(regressions)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        print(f"\n✓ No regressions beyond {args.tolerance:.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+"""
+Offline Blackhole PDR-Threshold Tuning
+======================================
+
+BlackholeMitigationManager (routing.cc) blacklists a relay once at least
+10 packets were sent via it and its delivery ratio is below
+--blackhole_pdr_threshold (0.5 by default).  Trying another threshold or
+minimum sample size otherwise means re-running the sweep; this tool replays
+the rule on the recorded per-node counters of every run instead:
+
+    blackhole-attack-results.csv      NodeID of the attackers (ground truth)
+    blackhole-mitigation-results.csv  PacketsSentVia, PacketsDelivered, PDR,
+                                      Blacklisted of every relay with traffic
+    blackhole snapshot CSV            PDRBefore, PDRAfter, RecoveryPct,
+                                      DetectionTime of the recorded setting
+
+A node is flagged under (threshold, min_samples) when PacketsSentVia >=
+min_samples and PacketsDelivered / PacketsSentVia < threshold.  The rule is
+replayed on the end-of-run counters, so a node whose ratio dipped below the
+threshold mid-run and recovered counts as not flagged.  Attackers without
+traffic are not in the mitigation file and count as missed.
+
+All runs are pooled and the whole threshold x min-sample grid is scored in
+one pass: nodes are sorted by delivery ratio once, eligibility per min
+sample is a (nodes x min_samples) mask whose cumulative sums give, for
+every threshold, the flagged attackers / honest nodes (and their traffic)
+through one np.searchsorted.
+
+Outputs blackhole_threshold_grid.csv (confusion counts, TPR / FPR,
+precision, attack drops isolated and honest traffic diverted per setting),
+blackhole_threshold_runs.csv (the recorded verdicts and snapshot recovery of
+each run), the recommended operating point (highest TPR with FPR <=
+--max-fpr) and detection / false positive curves.
+
+Usage:
+    python3 blackhole_tuning.py <results_dir | dataset> [--where KEY=V1[,V2]]
+                                [--thresholds 0:1:0.01] [--min-samples 1,5,10,20,50,100]
+                                [--max-fpr 0.05] [-o DIR] [--no-plots]
+
+Author: VANET Security Research
+Date: October 2025
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from detection_accuracy import join_blackhole_nodes
+from metric_values import DEFAULT_IO_THREADS
+from plot_scheduler import load_pyplot
+from snapshot_loader import load_snapshots, snapshot_files
+from wormhole_replay import parse_grid
+
+# routing.cc defaults: --blackhole_pdr_threshold and CheckAndBlacklistNode's minimum sample
+RECORDED_THRESHOLD = 0.5
+RECORDED_MIN_SAMPLES = 10
+
+DEFAULT_THRESHOLDS = np.round(np.arange(0.0, 1.0 + 1e-9, 0.01), 2)
+DEFAULT_MIN_SAMPLES = (1, 5, 10, 20, 50, 100)
+DEFAULT_MAX_FPR = 0.05
+
+NODE_COLUMNS = ('PacketsSentVia', 'PacketsDelivered', 'PacketsDropped', 'Blacklisted')
+SNAPSHOT_COLUMNS = ['PDRBefore', 'PDRAfter', 'RecoveryPct', 'DetectionTime']
+
+
+class NodeCounters:
+    """Pooled per-node mitigation counters of many runs, with ground truth"""
+
+    def __init__(self, runs, run, attacker, sent, delivered, dropped, blacklisted):
+        self.runs = runs
+        # Per node; nodes absent from the mitigation file have sent == 0
+        self.run = run
+        self.attacker = attacker
+        self.sent = sent
+        self.delivered = delivered
+        self.dropped = dropped
+        self.blacklisted = blacklisted
+
+    @classmethod
+    def load(cls, files_by_run, n_threads=DEFAULT_IO_THREADS):
+        """From {run: {csv name: path}} (runs without a blackhole-mitigation-results.csv are skipped)"""
+        names, scored, nodes = join_blackhole_nodes(files_by_run, NODE_COLUMNS, n_threads)
+        keep = np.isin(nodes['Run'], scored)
+        counters = {column: np.nan_to_num(nodes[column][keep]) for column in NODE_COLUMNS}
+        # Runs renumbered to positions in scored
+        return cls([names[i] for i in scored], np.searchsorted(scored, nodes['Run'][keep]), nodes['Attacker'][keep],
+                   counters['PacketsSentVia'], counters['PacketsDelivered'], counters['PacketsDropped'],
+                   counters['Blacklisted'] > 0)
+
+    @property
+    def delivery_ratio(self):
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(self.sent > 0, self.delivered / np.maximum(self.sent, 1), np.nan)
+
+    def grid(self, thresholds=DEFAULT_THRESHOLDS, min_samples=DEFAULT_MIN_SAMPLES):
+        """One row per (threshold, min_samples) with the pooled confusion counts and rates"""
+        thresholds = np.asarray(thresholds, dtype=np.float64)
+        min_samples = np.asarray(min_samples, dtype=np.float64)
+        ratio = self.delivery_ratio
+        listed = ~np.isnan(ratio)
+        order = np.argsort(ratio[listed], kind='stable')
+        ratio_sorted = ratio[listed][order]
+        attacker = self.attacker[listed][order]
+        sent = self.sent[listed][order]
+        dropped = self.dropped[listed][order]
+
+        # (nodes + 1, min_samples) cumulative counts in delivery-ratio order
+        eligible = sent[:, None] >= min_samples[None, :]
+
+        def cumulative(weights):
+            return np.vstack([np.zeros((1, len(min_samples))), np.cumsum(eligible * weights[:, None], axis=0)])
+
+        below = np.searchsorted(ratio_sorted, thresholds, side='left')
+        tp = cumulative(attacker.astype(np.float64))[below]
+        fp = cumulative((~attacker).astype(np.float64))[below]
+        isolated = cumulative(np.where(attacker, dropped, 0.0))[below]
+        diverted = cumulative(np.where(attacker, 0.0, sent))[below]
+
+        positives = int(self.attacker.sum())
+        negatives = int((~self.attacker).sum())
+        attack_drops = float(dropped[attacker].sum())
+        honest_traffic = float(sent[~attacker].sum())
+        with np.errstate(invalid='ignore', divide='ignore'):
+            table = {
+                'Threshold': np.repeat(thresholds, len(min_samples)),
+                'Min_Samples': np.tile(min_samples.astype(np.int64), len(thresholds)),
+                'TP': tp.ravel().astype(np.int64), 'FP': fp.ravel().astype(np.int64),
+                'FN': (positives - tp).ravel().astype(np.int64), 'TN': (negatives - fp).ravel().astype(np.int64),
+                'TPR': (tp / positives if positives else np.full(tp.shape, np.nan)).ravel(),
+                'FPR': (fp / negatives if negatives else np.full(fp.shape, np.nan)).ravel(),
+                'Precision': np.where(tp + fp > 0, tp / (tp + fp), np.nan).ravel(),
+                'Attack_Drops_Isolated': (isolated / attack_drops if attack_drops else
+                                          np.full(tp.shape, np.nan)).ravel(),
+                'Honest_Traffic_Diverted': (diverted / honest_traffic if honest_traffic else
+                                            np.full(tp.shape, np.nan)).ravel(),
+            }
+        return pd.DataFrame(table)
+
+    def recorded_rates(self):
+        """Pooled TPR / FPR of the Blacklisted verdicts the simulations actually produced"""
+        positives = self.attacker.sum()
+        negatives = (~self.attacker).sum()
+        tp = (self.blacklisted & self.attacker).sum()
+        fp = (self.blacklisted & ~self.attacker).sum()
+        return (tp / positives if positives else np.nan), (fp / negatives if negatives else np.nan)
+
+    def run_table(self):
+        """Per run: attackers, relays and the recorded verdicts' TP / FP / FN"""
+        def per_run(mask):
+            return np.bincount(self.run[mask], minlength=len(self.runs))
+
+        flagged = self.blacklisted
+        return pd.DataFrame({
+            'Run': self.runs,
+            'Attackers': per_run(self.attacker),
+            'Relays': per_run(self.sent > 0),
+            'Recorded_TP': per_run(flagged & self.attacker),
+            'Recorded_FP': per_run(flagged & ~self.attacker),
+            'Recorded_FN': per_run(~flagged & self.attacker),
+        })
+
+
+def snapshot_recovery(files_by_run):
+    """Final blackhole snapshot PDRBefore / PDRAfter / RecoveryPct / DetectionTime per run"""
+    files = {run: {path: schema for path, schema in snapshot_files(run_files).items() if schema == 'blackhole'}
+             for run, run_files in files_by_run.items()}
+    snapshots = load_snapshots({run: paths for run, paths in files.items() if paths})
+    if snapshots.empty:
+        return pd.DataFrame(columns=SNAPSHOT_COLUMNS)
+    final = snapshots.sort_values('Time', kind='stable').groupby('Run', sort=False).tail(1).set_index('Run')
+    final = final.reindex(columns=SNAPSHOT_COLUMNS)
+    final['DetectionTime'] = final['DetectionTime'].where(final['DetectionTime'] > 0)
+    return final
+
+
+def recommend(grid, max_fpr=DEFAULT_MAX_FPR):
+    """
+    Operating point with the highest TPR among FPR <= max_fpr (ties: lower
+    FPR, then the larger min sample, then the middle of the tied thresholds,
+    the setting furthest from both edges); the maximum of TPR - FPR when no
+    setting meets max_fpr.
+    """
+    scored = grid.dropna(subset=['TPR', 'FPR'])
+    if scored.empty:
+        return None
+    allowed = scored[scored['FPR'] <= max_fpr]
+    if allowed.empty:
+        return scored.loc[(scored['TPR'] - scored['FPR']).idxmax()]
+    ranked = allowed.sort_values(['TPR', 'FPR', 'Min_Samples', 'Threshold'], ascending=[False, True, False, True],
+                                 kind='stable')
+    best = ranked.iloc[0]
+    tied = ranked[(ranked['TPR'] == best['TPR']) & (ranked['FPR'] == best['FPR']) &
+                  (ranked['Min_Samples'] == best['Min_Samples'])]
+    return tied.iloc[(len(tied) - 1) // 2]
+
+
+def render_tuning(grid, recorded, best, plot_file):
+    """Detection / false positive rate over the threshold per min sample, the ROC, and the traffic trade-off"""
+    plt = load_pyplot()
+    fig, axes = plt.subplots(1, 3, figsize=(20, 6))
+    fig.suptitle('Blackhole Mitigation: Offline PDR-Threshold Tuning', fontsize=14, fontweight='bold')
+    colors = plt.rcParams['axes.prop_cycle'].by_key()['color']
+
+    for i, (min_samples, curve) in enumerate(grid.groupby('Min_Samples', sort=True)):
+        color = colors[i % len(colors)]
+        axes[0].plot(curve['Threshold'], curve['TPR'], color=color, label=f'detection, min {min_samples}')
+        axes[0].plot(curve['Threshold'], curve['FPR'], color=color, linestyle='--')
+        order = np.argsort(curve['FPR'].to_numpy(), kind='stable')
+        axes[1].plot(curve['FPR'].to_numpy()[order], curve['TPR'].to_numpy()[order], color=color,
+                     marker='.', markersize=3, label=f'min {min_samples} packets')
+        if best is not None and min_samples == best['Min_Samples']:
+            axes[2].plot(curve['Threshold'], curve['Attack_Drops_Isolated'], color='firebrick',
+                         label='attack drops isolated')
+            axes[2].plot(curve['Threshold'], curve['Honest_Traffic_Diverted'], color='steelblue',
+                         label='honest traffic diverted')
+            axes[2].set_title(f'Traffic Trade-off (min {min_samples} packets)')
+
+    axes[0].axvline(RECORDED_THRESHOLD, color='gray', linestyle=':', label='routing.cc default')
+    if not np.isnan(recorded[0]):
+        axes[1].scatter([recorded[1]], [recorded[0]], color='black', marker='x', s=80, zorder=5,
+                        label='recorded verdicts')
+    if best is not None:
+        for ax in (axes[0], axes[2]):
+            ax.axvline(best['Threshold'], color='black', linestyle='-.', alpha=0.7, label='recommended')
+        axes[1].scatter([best['FPR']], [best['TPR']], color='gold', edgecolor='black', marker='*', s=200,
+                        zorder=6, label='recommended')
+
+    axes[0].set_xlabel('PDR Threshold')
+    axes[0].set_ylabel('Rate (solid: detection, dashed: false positive)')
+    axes[0].set_title('Detection / False Positive Rate')
+    axes[1].plot([0, 1], [0, 1], color='gray', linestyle='--', alpha=0.5)
+    axes[1].set_xlabel('False Positive Rate (relays)')
+    axes[1].set_ylabel('Detection Rate (attackers)')
+    axes[1].set_title('ROC over Thresholds')
+    axes[2].set_xlabel('PDR Threshold')
+    axes[2].set_ylabel('Share')
+    for ax in axes:
+        ax.legend(fontsize=8)
+        ax.grid(alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig(plot_file, dpi=300, bbox_inches='tight')
+    print(f"  ✓ Tuning plot saved to: {plot_file}")
+    plt.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Tune the blackhole PDR threshold offline from recorded runs')
+    parser.add_argument('results_dir', help='Results directory or results_dataset.py dataset')
+    parser.add_argument('--where', action='append', metavar='KEY=V1[,V2]',
+                        help='Partition filter when results_dir is a dataset (repeatable)')
+    parser.add_argument('--thresholds', default='0:1:0.01',
+                        help="PDR thresholds, 'start:stop:step' or 'a,b,c' (default: 0:1:0.01)")
+    parser.add_argument('--min-samples', default=','.join(str(m) for m in DEFAULT_MIN_SAMPLES),
+                        help='Minimum packets via a node before it can be blacklisted (default: %(default)s)')
+    parser.add_argument('--max-fpr', type=float, default=DEFAULT_MAX_FPR,
+                        help=f'False positive rate the recommended setting may not exceed (default: {DEFAULT_MAX_FPR})')
+    parser.add_argument('--output-dir', '-o', help='Where to write tables and plots (default: results_dir)')
+    parser.add_argument('--no-plots', action='store_true', help='Write the tables only')
+    args = parser.parse_args(argv)
+
+    from results_dataset import open_source
+    from scenario_catalog import ScenarioCatalog, run_key
+
+    if not os.path.isdir(args.results_dir):
+        print(f"❌ Not a directory: {args.results_dir}")
+        return 1
+    try:
+        thresholds = parse_grid(args.thresholds)
+        min_samples = [int(m) for m in args.min_samples.split(',') if m.strip()]
+        dataset, filters = open_source(args.results_dir, args.where)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    catalog = dataset.catalog(**filters) if dataset is not None else ScenarioCatalog.discover(args.results_dir)
+    files_by_run = {run_key(run): run.files for run in catalog}
+
+    counters = NodeCounters.load(files_by_run)
+    if not counters.runs:
+        print("⚠ No run has a blackhole-mitigation-results.csv")
+        return 1
+    print(f"🎯 {len(counters.runs)} run(s): {int(counters.attacker.sum())} attacker(s), "
+          f"{int((counters.sent > 0).sum())} relay(s) with traffic; "
+          f"{len(thresholds)} threshold(s) x {len(min_samples)} min sample(s)")
+
+    grid = counters.grid(thresholds, min_samples)
+    runs = counters.run_table().join(snapshot_recovery(files_by_run), on='Run')
+    recorded = counters.recorded_rates()
+    best = recommend(grid, args.max_fpr)
+
+    print(f"\n  Recorded verdicts (threshold {RECORDED_THRESHOLD:g}, min {RECORDED_MIN_SAMPLES}): "
+          f"detection {recorded[0]:.3f}, false positive rate {recorded[1]:.3f}")
+    if runs['RecoveryPct'].notna().any():
+        print(f"  Recorded recovery: PDR {runs['PDRBefore'].mean():.3f} -> {runs['PDRAfter'].mean():.3f} "
+              f"({runs['RecoveryPct'].mean():.1f}% mean), detection at {runs['DetectionTime'].mean():.1f}s")
+    replayed = grid[(grid['Threshold'] == RECORDED_THRESHOLD) & (grid['Min_Samples'] == RECORDED_MIN_SAMPLES)]
+    if not replayed.empty:
+        row = replayed.iloc[0]
+        print(f"  Replayed default rule:  detection {row['TPR']:.3f}, false positive rate {row['FPR']:.3f}")
+    if best is not None:
+        print(f"\n✅ Recommended: threshold {best['Threshold']:g}, min {int(best['Min_Samples'])} packets -> "
+              f"detection {best['TPR']:.3f}, false positive rate {best['FPR']:.3f}, precision "
+              f"{best['Precision']:.3f} (max FPR {args.max_fpr:g})")
+
+    output_dir = args.output_dir or args.results_dir
+    os.makedirs(output_dir, exist_ok=True)
+    grid.to_csv(os.path.join(output_dir, 'blackhole_threshold_grid.csv'), index=False)
+    runs.to_csv(os.path.join(output_dir, 'blackhole_threshold_runs.csv'), index=False)
+    print(f"\n✅ Saved blackhole_threshold_grid.csv and blackhole_threshold_runs.csv to {output_dir}")
+    if not args.no_plots:
+        render_tuning(grid, recorded, best, os.path.join(output_dir, 'blackhole_threshold_tuning.png'))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,205 @@
+"""
+Sparse Node Communication Matrix
+================================
+
+Source x destination packet counts kept in CSR form over compact node codes,
+so the communication matrix of a fleet of thousands of nodes costs memory in
+proportion to the flows that actually exist rather than N x N cells.
+
+Node IDs are mapped to codes 0..N-1 (sorted IDs), each packet to the cell
+code src * N + dst, and cells are counted with np.bincount (np.unique once
+N x N is too large for a dense count array).  Delivered packets are counted
+alongside, so per-flow PDR can be read straight from the artifact.
+
+Views for plotting:
+
+- top_k(k):          the k nodes with the most sent + received traffic
+- rollup(labels):    nodes merged into groups (role_groups(): RSUs kept
+                     individually, vehicles rolled up into blocks)
+- plot_view(n):      contiguous blocks of nodes so at most n rows are drawn
+
+save_npz() writes the matrix in the scipy.sparse.save_npz CSR layout (plus
+node IDs, labels and delivered counts), so it loads with
+scipy.sparse.load_npz as well as with CommMatrix.load_npz.
+
+Author: VANET Security Research
+Date: October 2025
+"""
+
+import numpy as np
+
+# Largest N x N for which cells are counted with a dense np.bincount
+DENSE_BINCOUNT_MAX_CELLS = 1 << 24
+
+# Vehicle count in routing.cc (N_Vehicles); node IDs below it are vehicles,
+# the rest RSUs
+DEFAULT_VEHICLES = 18
+
+
+class CommMatrix:
+    """Sparse packet-count matrix in CSR form (rows = source, columns = destination)"""
+
+    def __init__(self, nodes, labels, indptr, indices, packets, delivered):
+        self.nodes = np.asarray(nodes, dtype=np.uint32)
+        self.labels = np.asarray(labels, dtype=str)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.packets = np.asarray(packets, dtype=np.int64)
+        self.delivered = np.asarray(delivered, dtype=np.int64)
+
+    @classmethod
+    def _from_coo(cls, rows, cols, n, packets=None, delivered=None, nodes=None, labels=None):
+        """Sum (row, col) entries (one packet each when packets is None) into CSR"""
+        rows = np.asarray(rows, dtype=np.int64)
+        cells = rows * n + np.asarray(cols, dtype=np.int64)
+
+        if n * n <= DENSE_BINCOUNT_MAX_CELLS:
+            counts = np.bincount(cells, weights=packets, minlength=n * n)
+            present = np.flatnonzero(counts)
+            counts = counts[present]
+            delivered_counts = (np.bincount(cells, weights=delivered, minlength=n * n)[present]
+                                if delivered is not None else np.zeros(len(present)))
+        else:
+            present, inverse = np.unique(cells, return_inverse=True)
+            counts = np.bincount(inverse, weights=packets, minlength=len(present))
+            delivered_counts = (np.bincount(inverse, weights=delivered, minlength=len(present))
+                                if delivered is not None else np.zeros(len(present)))
+
+        row_of_cell = present // n
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(row_of_cell, minlength=n), out=indptr[1:])
+        nodes = np.arange(n, dtype=np.uint32) if nodes is None else nodes
+        labels = nodes.astype(str) if labels is None else labels
+        return cls(nodes, labels, indptr, present % n, np.rint(counts), np.rint(delivered_counts))
+
+    @classmethod
+    def from_pairs(cls, src, dst, delivered=None, nodes=None):
+        """Build from per-packet source/destination node IDs (and Delivered flags)"""
+        src = np.asarray(src, dtype=np.uint32)
+        dst = np.asarray(dst, dtype=np.uint32)
+        if nodes is None:
+            nodes = np.unique(np.concatenate([src, dst]))
+        nodes = np.asarray(nodes, dtype=np.uint32)
+        weights = None if delivered is None else np.asarray(delivered, dtype=np.float64)
+        return cls._from_coo(np.searchsorted(nodes, src), np.searchsorted(nodes, dst), len(nodes),
+                             delivered=weights, nodes=nodes)
+
+    @classmethod
+    def from_dataframe(cls, df):
+        """Build from a packet trace with SourceNode / DestNode (/ Delivered) columns"""
+        delivered = df['Delivered'].to_numpy(dtype=bool) if 'Delivered' in df.columns else None
+        return cls.from_pairs(df['SourceNode'].to_numpy(), df['DestNode'].to_numpy(), delivered)
+
+    @property
+    def n_nodes(self):
+        return len(self.nodes)
+
+    @property
+    def nnz(self):
+        """Number of (source, destination) pairs that exchanged packets"""
+        return len(self.indices)
+
+    def coo(self):
+        """(row codes, column codes) of the stored cells"""
+        return np.repeat(np.arange(self.n_nodes), np.diff(self.indptr)), self.indices
+
+    def sent(self):
+        """Packets sent per node code"""
+        rows, _ = self.coo()
+        return np.bincount(rows, weights=self.packets, minlength=self.n_nodes).astype(np.int64)
+
+    def received(self):
+        """Packets addressed to each node code"""
+        return np.bincount(self.indices, weights=self.packets, minlength=self.n_nodes).astype(np.int64)
+
+    def to_dense(self, dtype=np.float32):
+        """N x N array of packet counts (only sensible for small N)"""
+        dense = np.zeros((self.n_nodes, self.n_nodes), dtype=dtype)
+        rows, cols = self.coo()
+        dense[rows, cols] = self.packets
+        return dense
+
+    def merge(self, other):
+        """New matrix holding the counts of both (node sets are united)"""
+        nodes = np.union1d(self.nodes, other.nodes).astype(np.uint32)
+        rows_a, cols_a = self.coo()
+        rows_b, cols_b = other.coo()
+        rows = np.concatenate([np.searchsorted(nodes, self.nodes[rows_a]),
+                               np.searchsorted(nodes, other.nodes[rows_b])])
+        cols = np.concatenate([np.searchsorted(nodes, self.nodes[cols_a]),
+                               np.searchsorted(nodes, other.nodes[cols_b])])
+        return CommMatrix._from_coo(rows, cols, len(nodes),
+                                    np.concatenate([self.packets, other.packets]).astype(np.float64),
+                                    np.concatenate([self.delivered, other.delivered]).astype(np.float64),
+                                    nodes=nodes)
+
+    def rollup(self, groups, names):
+        """
+        Merge nodes into groups: groups[code] is the group index of each node
+        code and names[i] the label of group i.
+        """
+        groups = np.asarray(groups, dtype=np.int64)
+        rows, cols = self.coo()
+        return CommMatrix._from_coo(groups[rows], groups[cols], len(names),
+                                    self.packets.astype(np.float64), self.delivered.astype(np.float64),
+                                    labels=np.asarray(names, dtype=str))
+
+    def top_k(self, k):
+        """Sub-matrix of the k nodes with the most sent + received packets"""
+        if k >= self.n_nodes:
+            return self
+        traffic = self.sent() + self.received()
+        keep = np.sort(np.argsort(-traffic, kind='stable')[:k])
+        remap = np.full(self.n_nodes, -1, dtype=np.int64)
+        remap[keep] = np.arange(len(keep))
+        rows, cols = self.coo()
+        mask = (remap[rows] >= 0) & (remap[cols] >= 0)
+        return CommMatrix._from_coo(remap[rows[mask]], remap[cols[mask]], len(keep),
+                                    self.packets[mask].astype(np.float64),
+                                    self.delivered[mask].astype(np.float64),
+                                    nodes=self.nodes[keep], labels=self.labels[keep])
+
+    def plot_view(self, max_nodes):
+        """Self, or a rollup into at most max_nodes contiguous blocks of nodes"""
+        if self.n_nodes <= max_nodes:
+            return self
+        groups = np.arange(self.n_nodes) * max_nodes // self.n_nodes
+        starts = np.flatnonzero(np.r_[True, groups[1:] != groups[:-1]])
+        ends = np.r_[starts[1:], self.n_nodes] - 1
+        names = [f'{self.labels[s]}-{self.labels[e]}' for s, e in zip(starts, ends)]
+        return self.rollup(groups, names)
+
+    def save_npz(self, path):
+        """Write in the scipy.sparse CSR layout plus nodes / labels / delivered"""
+        np.savez_compressed(path, format=np.array(b'csr'), shape=np.array([self.n_nodes, self.n_nodes]),
+                            data=self.packets, indices=self.indices, indptr=self.indptr,
+                            nodes=self.nodes, labels=self.labels, delivered=self.delivered)
+
+    @classmethod
+    def load_npz(cls, path):
+        """Inverse of save_npz()"""
+        with np.load(path) as arrays:
+            return cls(arrays['nodes'], arrays['labels'], arrays['indptr'], arrays['indices'],
+                       arrays['data'], arrays['delivered'])
+
+
+def role_groups(nodes, n_vehicles=DEFAULT_VEHICLES, vehicle_group=10):
+    """
+    Rollup groups keeping every RSU (ID >= n_vehicles) on its own and merging
+    vehicles into blocks of vehicle_group consecutive IDs.  Returns
+    (group index per node code, group names) for CommMatrix.rollup().
+    """
+    nodes = np.asarray(nodes, dtype=np.int64)
+    vehicle = nodes < n_vehicles
+    keys = np.where(vehicle, nodes // vehicle_group, n_vehicles + nodes)
+    unique_keys, groups = np.unique(keys, return_inverse=True)
+
+    names = []
+    for key in unique_keys:
+        if key < n_vehicles:
+            first = key * vehicle_group
+            last = min(first + vehicle_group, n_vehicles) - 1
+            names.append(f'V{first}' if first == last else f'V{first}-{last}')
+        else:
+            names.append(f'RSU {key - n_vehicles}')
+    return groups, names
@@ -14,15 +14,174 @@ Date: October 2025
 """
 
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 import numpy as np
 from pathlib import Path
+import argparse
 import sys
+import time
+
+from delay_histograms import DelayDistribution
+from packet_loader import load_packet_csv, load_packet_sketches
+from packet_metrics import (BLACKHOLE, WORMHOLE, delay_percentiles, empty_sketches, merge_sketches,
+                            packet_sketches, packet_stats, summarize)
+from plot_scheduler import RenderJob, load_pyplot, print_render_timings, render_figures
+from results_dataset import ResultsDataset, parse_filters
+from scenario_catalog import PACKET_FILE, unique_labels
+
+# Packet columns the comparison reads (projection when loading from a results dataset)
+COMPARISON_COLUMNS = ['Delivered', 'DelayMs', 'WormholeOnPath', 'BlackholeOnPath']
+
+# Figure style, applied by load_pyplot() when a figure is drawn
+PLOT_RC = {'figure.figsize': (14, 8), 'font.size': 11}
+
+
+# ----------------------------------------------------------------------------
+# Figure renderers
+#
+# Module-level so plot_scheduler can run them in worker processes; each takes
+# only the pre-aggregated values its figure needs.
+# ----------------------------------------------------------------------------
+
+def render_pdr_comparison(scenarios, pdr_values, output_dir):
+    """Render PDR bars per scenario"""
+    plt = load_pyplot(PLOT_RC)
+    fig, ax = plt.subplots(figsize=(10, 6))
+    bars = ax.bar(scenarios, pdr_values, color=['#2ecc71', '#e74c3c', '#3498db'], 
+                 alpha=0.8, edgecolor='black', linewidth=2)
+    
+    # Add value labels
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+               f'{height:.1f}%',
+               ha='center', va='bottom', fontweight='bold', fontsize=13)
+    
+    ax.set_ylabel('Packet Delivery Ratio (%)', fontweight='bold', fontsize=13)
+    ax.set_title('PDR Comparison Across Scenarios', fontweight='bold', fontsize=15, pad=20)
+    ax.set_ylim(0, 110)
+    ax.grid(axis='y', alpha=0.3)
+    
+    plt.tight_layout()
+    plt.savefig(f'{output_dir}/pdr_scenario_comparison.png', dpi=300, bbox_inches='tight')
+    print(f"✅ Saved: {output_dir}/pdr_scenario_comparison.png")
+    plt.close()
+
+
+def render_delay_comparison(scenarios, delay_values, output_dir):
+    """Render average delay bars per scenario"""
+    plt = load_pyplot(PLOT_RC)
+    fig, ax = plt.subplots(figsize=(10, 6))
+    bars = ax.bar(scenarios, delay_values, color=['#2ecc71', '#e74c3c', '#3498db'],
+                 alpha=0.8, edgecolor='black', linewidth=2)
+    
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+               f'{height:.2f}ms',
+               ha='center', va='bottom', fontweight='bold', fontsize=13)
+    
+    ax.set_ylabel('Average End-to-End Delay (ms)', fontweight='bold', fontsize=13)
+    ax.set_title('Delay Comparison Across Scenarios', fontweight='bold', fontsize=15, pad=20)
+    ax.grid(axis='y', alpha=0.3)
+    
+    plt.tight_layout()
+    plt.savefig(f'{output_dir}/delay_scenario_comparison.png', dpi=300, bbox_inches='tight')
+    print(f"✅ Saved: {output_dir}/delay_scenario_comparison.png")
+    plt.close()
+
+
+def render_delay_distributions(edges, histograms, output_dir):
+    """Render overlaid per-scenario delay histograms from precomputed counts on shared edges"""
+    plt = load_pyplot(PLOT_RC)
+    fig, ax = plt.subplots(figsize=(12, 6))
+    
+    colors = ['#2ecc71', '#e74c3c', '#3498db', '#f39c12', '#9b59b6']
+    
+    for i, name, counts in histograms:
+        ax.stairs(counts, edges, fill=True, alpha=0.5,
+                  label=name, color=colors[i % len(colors)], edgecolor='black')
+    
+    ax.set_xlabel('End-to-End Delay (ms)', fontweight='bold', fontsize=13)
+    ax.set_ylabel('Frequency', fontweight='bold', fontsize=13)
+    ax.set_title('Delay Distribution Comparison', fontweight='bold', fontsize=15, pad=20)
+    ax.legend(fontsize=12)
+    ax.grid(axis='y', alpha=0.3)
+    
+    plt.tight_layout()
+    plt.savefig(f'{output_dir}/delay_distribution_comparison.png', dpi=300, bbox_inches='tight')
+    print(f"✅ Saved: {output_dir}/delay_distribution_comparison.png")
+    plt.close()
+
+
+def render_metrics_radar(radar, output_dir):
+    """Render the multi-metric radar chart from normalized values"""
+    plt = load_pyplot(PLOT_RC)
+    # Normalize metrics for radar chart (0-100 scale)
+    categories = ['PDR', 'Delay\n(inverted)', 'Delivery\nRate']
+    
+    fig, ax = plt.subplots(figsize=(10, 10), subplot_kw=dict(projection='polar'))
+    
+    angles = np.linspace(0, 2 * np.pi, len(categories), endpoint=False).tolist()
+    angles += angles[:1]  # Complete the circle
+    
+    colors = ['#2ecc71', '#e74c3c', '#3498db', '#f39c12']
+    
+    for i, (name, values) in enumerate(radar):
+        values = values + values[:1]  # Complete the circle
+        
+        ax.plot(angles, values, 'o-', linewidth=2, label=name, 
+               color=colors[i % len(colors)], markersize=8)
+        ax.fill(angles, values, alpha=0.15, color=colors[i % len(colors)])
+    
+    ax.set_xticks(angles[:-1])
+    ax.set_xticklabels(categories, fontsize=12, fontweight='bold')
+    ax.set_ylim(0, 100)
+    ax.set_title('Multi-Metric Performance Comparison', fontweight='bold', 
+                fontsize=15, pad=30)
+    ax.legend(loc='upper right', bbox_to_anchor=(1.3, 1.1), fontsize=11)
+    ax.grid(True)
+    
+    plt.tight_layout()
+    plt.savefig(f'{output_dir}/metrics_radar_comparison.png', dpi=300, bbox_inches='tight')
+    print(f"✅ Saved: {output_dir}/metrics_radar_comparison.png")
+    plt.close()
+
+
+def render_improvement_percentage(scenarios, pdr_improvements, delay_improvements, baseline_name, output_dir):
+    """Render PDR/delay improvement bars relative to the baseline"""
+    plt = load_pyplot(PLOT_RC)
+    x = np.arange(len(scenarios))
+    width = 0.35
+    
+    fig, ax = plt.subplots(figsize=(10, 6))
+    bars1 = ax.bar(x - width/2, pdr_improvements, width, label='PDR Improvement', 
+                  color='#2ecc71', alpha=0.8, edgecolor='black', linewidth=1.5)
+    bars2 = ax.bar(x + width/2, delay_improvements, width, label='Delay Reduction',
+                  color='#3498db', alpha=0.8, edgecolor='black', linewidth=1.5)
+    
+    # Add value labels
+    for bars in [bars1, bars2]:
+        for bar in bars:
+            height = bar.get_height()
+            ax.text(bar.get_x() + bar.get_width()/2., height,
+                   f'{height:+.1f}%',
+                   ha='center', va='bottom' if height > 0 else 'top',
+                   fontweight='bold', fontsize=11)
+    
+    ax.set_ylabel('Improvement (%)', fontweight='bold', fontsize=13)
+    ax.set_title(f'Performance Improvement Relative to {baseline_name}', 
+                fontweight='bold', fontsize=15, pad=20)
+    ax.set_xticks(x)
+    ax.set_xticklabels(scenarios)
+    ax.legend(fontsize=12)
+    ax.axhline(y=0, color='black', linestyle='--', linewidth=1)
+    ax.grid(axis='y', alpha=0.3)
+    
+    plt.tight_layout()
+    plt.savefig(f'{output_dir}/improvement_percentage.png', dpi=300, bbox_inches='tight')
+    print(f"✅ Saved: {output_dir}/improvement_percentage.png")
+    plt.close()
 
-sns.set_style("whitegrid")
-plt.rcParams['figure.figsize'] = (14, 8)
-plt.rcParams['font.size'] = 11
 
 class ScenarioComparator:
     """Compare multiple simulation scenarios"""
@@ -30,12 +189,15 @@ class ScenarioComparator:
     def __init__(self):
         self.scenarios = {}
         self.metrics_comparison = {}
+        # Per-scenario delay sketches (packet_metrics.packet_sketches)
+        self.sketches = {}
     
     def load_scenario(self, name, csv_file):
         """Load a scenario CSV file"""
         try:
-            df = pd.read_csv(csv_file)
+            df = load_packet_csv(csv_file)
             self.scenarios[name] = df
+            self.sketches[name] = load_packet_sketches(csv_file, df)
             print(f"✅ Loaded '{name}': {len(df)} packets from {csv_file}")
             return True
         except FileNotFoundError:
@@ -45,19 +207,48 @@ class ScenarioComparator:
             print(f"❌ Error loading {csv_file}: {e}")
             return False
     
+    def load_dataset(self, dataset, **filters):
+        """
+        Load every run of a results_dataset.ResultsDataset matching the
+        partition filters, reading only COMPARISON_COLUMNS of each trace and
+        the delay sketches stored at ingest.
+        """
+        runs = [run for run in dataset.catalog(**filters) if PACKET_FILE in run.files]
+        loaded = 0
+        for run, name in zip(runs, unique_labels(runs)):
+            part = dataset.part_of(run.files[PACKET_FILE])
+            try:
+                df = pd.DataFrame(part.load_columns(COMPARISON_COLUMNS), copy=False)
+                accumulator = part.accumulator()
+            except (OSError, ValueError, KeyError) as e:
+                print(f"❌ Error loading {part.path}: {e}")
+                continue
+            self.scenarios[name] = df
+            if accumulator is not None:
+                self.sketches[name] = accumulator.sketches
+            print(f"✅ Loaded '{name}': {len(df)} packets from {part.path}")
+            loaded += 1
+        return loaded
+    
     def calculate_scenario_metrics(self, name, df):
         """Calculate metrics for a single scenario"""
-        total = len(df)
-        delivered = df['Delivered'].sum()
+        stats = packet_stats(df)
+        overall = summarize(stats)
+        if name not in self.sketches:
+            self.sketches[name] = packet_sketches(df)
+        tail = delay_percentiles(self.sketches[name])
         
         metrics = {
-            'Total Packets': total,
-            'Delivered': delivered,
-            'Dropped': total - delivered,
-            'PDR (%)': (delivered / total * 100) if total > 0 else 0,
-            'Avg Delay (ms)': df[df['Delivered'] == 1]['DelayMs'].mean(),
-            'Wormhole Affected': df['WormholeOnPath'].sum(),
-            'Blackhole Affected': df['BlackholeOnPath'].sum(),
+            'Total Packets': overall['packets'],
+            'Delivered': overall['delivered'],
+            'Dropped': overall['dropped'],
+            'PDR (%)': overall['pdr'] * 100,
+            'Avg Delay (ms)': overall['delay_mean'],
+            'P50 Delay (ms)': tail['p50'],
+            'P95 Delay (ms)': tail['p95'],
+            'P99 Delay (ms)': tail['p99'],
+            'Wormhole Affected': summarize(stats, WORMHOLE)['packets'],
+            'Blackhole Affected': summarize(stats, BLACKHOLE)['packets'],
         }
         
         return metrics
@@ -80,123 +271,72 @@ class ScenarioComparator:
                     print(f"   {metric:.<35} {value:>10}")
             print()
     
+    def pooled_delay_percentiles(self, names=None):
+        """p50/p95/p99 delay (ms) over any set of scenarios, merged from their sketches"""
+        pooled = empty_sketches()
+        for name in (self.sketches if names is None else names):
+            merge_sketches(pooled, self.sketches[name])
+        return delay_percentiles(pooled)
+    
     def plot_pdr_comparison(self, output_dir='comparison_plots'):
         """Compare PDR across scenarios"""
         Path(output_dir).mkdir(exist_ok=True)
-        
+        render_pdr_comparison(*self._pdr_comparison_data(), output_dir)
+    
+    def _pdr_comparison_data(self):
+        """Scenario names and their PDR values"""
         scenarios = list(self.metrics_comparison.keys())
-        pdr_values = [self.metrics_comparison[s]['PDR (%)'] for s in scenarios]
-        
-        fig, ax = plt.subplots(figsize=(10, 6))
-        bars = ax.bar(scenarios, pdr_values, color=['#2ecc71', '#e74c3c', '#3498db'], 
-                     alpha=0.8, edgecolor='black', linewidth=2)
-        
-        # Add value labels
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                   f'{height:.1f}%',
-                   ha='center', va='bottom', fontweight='bold', fontsize=13)
-        
-        ax.set_ylabel('Packet Delivery Ratio (%)', fontweight='bold', fontsize=13)
-        ax.set_title('PDR Comparison Across Scenarios', fontweight='bold', fontsize=15, pad=20)
-        ax.set_ylim(0, 110)
-        ax.grid(axis='y', alpha=0.3)
-        
-        plt.tight_layout()
-        plt.savefig(f'{output_dir}/pdr_scenario_comparison.png', dpi=300, bbox_inches='tight')
-        print(f"✅ Saved: {output_dir}/pdr_scenario_comparison.png")
-        plt.close()
+        return scenarios, [self.metrics_comparison[s]['PDR (%)'] for s in scenarios]
     
     def plot_delay_comparison(self, output_dir='comparison_plots'):
         """Compare delay across scenarios"""
         Path(output_dir).mkdir(exist_ok=True)
-        
+        render_delay_comparison(*self._delay_comparison_data(), output_dir)
+    
+    def _delay_comparison_data(self):
+        """Scenario names and their average delays"""
         scenarios = list(self.metrics_comparison.keys())
-        delay_values = [self.metrics_comparison[s]['Avg Delay (ms)'] for s in scenarios]
-        
-        fig, ax = plt.subplots(figsize=(10, 6))
-        bars = ax.bar(scenarios, delay_values, color=['#2ecc71', '#e74c3c', '#3498db'],
-                     alpha=0.8, edgecolor='black', linewidth=2)
-        
-        for bar in bars:
-            height = bar.get_height()
-            ax.text(bar.get_x() + bar.get_width()/2., height,
-                   f'{height:.2f}ms',
-                   ha='center', va='bottom', fontweight='bold', fontsize=13)
-        
-        ax.set_ylabel('Average End-to-End Delay (ms)', fontweight='bold', fontsize=13)
-        ax.set_title('Delay Comparison Across Scenarios', fontweight='bold', fontsize=15, pad=20)
-        ax.grid(axis='y', alpha=0.3)
-        
-        plt.tight_layout()
-        plt.savefig(f'{output_dir}/delay_scenario_comparison.png', dpi=300, bbox_inches='tight')
-        print(f"✅ Saved: {output_dir}/delay_scenario_comparison.png")
-        plt.close()
+        return scenarios, [self.metrics_comparison[s]['Avg Delay (ms)'] for s in scenarios]
     
     def plot_delay_distributions(self, output_dir='comparison_plots'):
         """Plot delay distributions for all scenarios"""
         Path(output_dir).mkdir(exist_ok=True)
-        
-        fig, ax = plt.subplots(figsize=(12, 6))
-        
-        colors = ['#2ecc71', '#e74c3c', '#3498db', '#f39c12', '#9b59b6']
-        
-        for i, (name, df) in enumerate(self.scenarios.items()):
-            delivered = df[df['Delivered'] == 1]
-            if len(delivered) > 0:
-                ax.hist(delivered['DelayMs'], bins=50, alpha=0.5, 
-                       label=name, color=colors[i % len(colors)], edgecolor='black')
-        
-        ax.set_xlabel('End-to-End Delay (ms)', fontweight='bold', fontsize=13)
-        ax.set_ylabel('Frequency', fontweight='bold', fontsize=13)
-        ax.set_title('Delay Distribution Comparison', fontweight='bold', fontsize=15, pad=20)
-        ax.legend(fontsize=12)
-        ax.grid(axis='y', alpha=0.3)
-        
-        plt.tight_layout()
-        plt.savefig(f'{output_dir}/delay_distribution_comparison.png', dpi=300, bbox_inches='tight')
-        print(f"✅ Saved: {output_dir}/delay_distribution_comparison.png")
-        plt.close()
+        render_delay_distributions(*self._delay_distribution_data(), output_dir)
+    
+    def delay_distribution(self):
+        """Delivered-delay histograms of all scenarios on one set of edges, with summaries"""
+        groups = []
+        for name, df in self.scenarios.items():
+            delivered = df['Delivered'].to_numpy(dtype=bool)
+            groups.append((name, df['DelayMs'].to_numpy(dtype=np.float64)[delivered]))
+        return DelayDistribution.from_groups(groups)
+    
+    def _delay_distribution_data(self):
+        """Shared 50-bin edges and per-scenario (index, name, counts) of delivered delays"""
+        distribution = self.delay_distribution()
+        index = {name: i for i, name in enumerate(self.scenarios)}
+        return distribution.edges, [(index[name], name, counts) for name, counts in distribution.histograms()]
+    
+    def export_delay_summary(self, output_file='scenario_delay_summary.csv'):
+        """Export per-scenario delay quantiles, whiskers and outlier counts"""
+        table = self.delay_distribution().summary_table().rename(columns={'Label': 'Scenario'})
+        table.to_csv(output_file, index=False)
+        print(f"✅ Delay summary exported to: {output_file}")
     
     def plot_metrics_radar(self, output_dir='comparison_plots'):
         """Create radar chart comparing multiple metrics"""
         Path(output_dir).mkdir(exist_ok=True)
-        
-        # Normalize metrics for radar chart (0-100 scale)
-        categories = ['PDR', 'Delay\n(inverted)', 'Delivery\nRate']
-        
-        fig, ax = plt.subplots(figsize=(10, 10), subplot_kw=dict(projection='polar'))
-        
-        angles = np.linspace(0, 2 * np.pi, len(categories), endpoint=False).tolist()
-        angles += angles[:1]  # Complete the circle
-        
-        colors = ['#2ecc71', '#e74c3c', '#3498db', '#f39c12']
-        
-        for i, (name, metrics) in enumerate(self.metrics_comparison.items()):
+        render_metrics_radar(self._metrics_radar_data(), output_dir)
+    
+    def _metrics_radar_data(self):
+        """Normalized (0-100) radar values per scenario"""
+        radar = []
+        for name, metrics in self.metrics_comparison.items():
             pdr = metrics['PDR (%)']
             delay_inverted = 100 - min(metrics['Avg Delay (ms)'], 100)  # Invert delay
             delivery_rate = (metrics['Delivered'] / metrics['Total Packets']) * 100
-            
-            values = [pdr, delay_inverted, delivery_rate]
-            values += values[:1]  # Complete the circle
-            
-            ax.plot(angles, values, 'o-', linewidth=2, label=name, 
-                   color=colors[i % len(colors)], markersize=8)
-            ax.fill(angles, values, alpha=0.15, color=colors[i % len(colors)])
-        
-        ax.set_xticks(angles[:-1])
-        ax.set_xticklabels(categories, fontsize=12, fontweight='bold')
-        ax.set_ylim(0, 100)
-        ax.set_title('Multi-Metric Performance Comparison', fontweight='bold', 
-                    fontsize=15, pad=30)
-        ax.legend(loc='upper right', bbox_to_anchor=(1.3, 1.1), fontsize=11)
-        ax.grid(True)
-        
-        plt.tight_layout()
-        plt.savefig(f'{output_dir}/metrics_radar_comparison.png', dpi=300, bbox_inches='tight')
-        print(f"✅ Saved: {output_dir}/metrics_radar_comparison.png")
-        plt.close()
+            radar.append((name, [pdr, delay_inverted, delivery_rate]))
+        return radar
     
     def plot_improvement_percentage(self, baseline_name, output_dir='comparison_plots'):
         """Plot improvement percentages relative to baseline"""
@@ -206,6 +346,10 @@ class ScenarioComparator:
             print(f"❌ Baseline '{baseline_name}' not found!")
             return
         
+        render_improvement_percentage(*self._improvement_data(baseline_name), baseline_name, output_dir)
+    
+    def _improvement_data(self, baseline_name):
+        """PDR and delay improvement (%) of each scenario relative to the baseline"""
         baseline_pdr = self.metrics_comparison[baseline_name]['PDR (%)']
         baseline_delay = self.metrics_comparison[baseline_name]['Avg Delay (ms)']
         
@@ -221,37 +365,7 @@ class ScenarioComparator:
                 pdr_improvements.append(pdr_imp)
                 delay_improvements.append(delay_imp)
         
-        x = np.arange(len(scenarios))
-        width = 0.35
-        
-        fig, ax = plt.subplots(figsize=(10, 6))
-        bars1 = ax.bar(x - width/2, pdr_improvements, width, label='PDR Improvement', 
-                      color='#2ecc71', alpha=0.8, edgecolor='black', linewidth=1.5)
-        bars2 = ax.bar(x + width/2, delay_improvements, width, label='Delay Reduction',
-                      color='#3498db', alpha=0.8, edgecolor='black', linewidth=1.5)
-        
-        # Add value labels
-        for bars in [bars1, bars2]:
-            for bar in bars:
-                height = bar.get_height()
-                ax.text(bar.get_x() + bar.get_width()/2., height,
-                       f'{height:+.1f}%',
-                       ha='center', va='bottom' if height > 0 else 'top',
-                       fontweight='bold', fontsize=11)
-        
-        ax.set_ylabel('Improvement (%)', fontweight='bold', fontsize=13)
-        ax.set_title(f'Performance Improvement Relative to {baseline_name}', 
-                    fontweight='bold', fontsize=15, pad=20)
-        ax.set_xticks(x)
-        ax.set_xticklabels(scenarios)
-        ax.legend(fontsize=12)
-        ax.axhline(y=0, color='black', linestyle='--', linewidth=1)
-        ax.grid(axis='y', alpha=0.3)
-        
-        plt.tight_layout()
-        plt.savefig(f'{output_dir}/improvement_percentage.png', dpi=300, bbox_inches='tight')
-        print(f"✅ Saved: {output_dir}/improvement_percentage.png")
-        plt.close()
+        return scenarios, pdr_improvements, delay_improvements
     
     def export_comparison_table(self, output_file='scenario_comparison.csv'):
         """Export comparison table as CSV"""
@@ -259,47 +373,80 @@ class ScenarioComparator:
         df.to_csv(output_file)
         print(f"✅ Comparison table saved: {output_file}")
     
-    def generate_all_comparisons(self, baseline_name=None, output_dir='comparison_plots'):
-        """Generate all comparison plots"""
+    def generate_all_comparisons(self, baseline_name=None, output_dir='comparison_plots', jobs=1):
+        """Generate all comparison plots (jobs > 1 renders them in parallel)"""
         print("\n📊 Generating comparison plots...")
         print("-" * 80)
         
-        self.plot_pdr_comparison(output_dir)
-        self.plot_delay_comparison(output_dir)
-        self.plot_delay_distributions(output_dir)
-        self.plot_metrics_radar(output_dir)
+        Path(output_dir).mkdir(exist_ok=True)
+        render_jobs = [
+            RenderJob('pdr_scenario_comparison.png', render_pdr_comparison,
+                      (*self._pdr_comparison_data(), output_dir)),
+            RenderJob('delay_scenario_comparison.png', render_delay_comparison,
+                      (*self._delay_comparison_data(), output_dir)),
+            RenderJob('delay_distribution_comparison.png', render_delay_distributions,
+                      (*self._delay_distribution_data(), output_dir)),
+            RenderJob('metrics_radar_comparison.png', render_metrics_radar,
+                      (self._metrics_radar_data(), output_dir)),
+        ]
         
         if baseline_name:
-            self.plot_improvement_percentage(baseline_name, output_dir)
+            if baseline_name in self.metrics_comparison:
+                render_jobs.append(RenderJob('improvement_percentage.png', render_improvement_percentage,
+                                             (*self._improvement_data(baseline_name), baseline_name, output_dir)))
+            else:
+                print(f"❌ Baseline '{baseline_name}' not found!")
+        
+        start = time.perf_counter()
+        timings = render_figures(render_jobs, jobs)
+        wall = time.perf_counter() - start
         
         print("-" * 80)
+        print_render_timings(timings, wall, jobs)
         print(f"✅ All comparison plots saved to '{output_dir}/'\n")
 
-
 def main():
     """Main execution"""
+    parser = argparse.ArgumentParser(description='Compare packet-delivery-analysis.csv files from different scenarios')
+    parser.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Figures to render in parallel (0 = all cores, default: 1)')
+    parser.add_argument('--no-plots', '--metrics-only', dest='no_plots', action='store_true',
+                        help='Compare and export the table only (never imports matplotlib/seaborn)')
+    parser.add_argument('--dataset', help='Compare runs of a results_dataset.py dataset instead of local CSVs')
+    parser.add_argument('--where', action='append', metavar='KEY=V1[,V2]',
+                        help='Partition filter for --dataset (repeatable), e.g. --where attack=wormhole')
+    args = parser.parse_args()
+    
     print("\n" + "="*80)
     print("🔬 VANET Scenario Comparison Tool")
     print("="*80 + "\n")
     
     comparator = ScenarioComparator()
     
-    # Example: Load three scenarios
-    print("📂 Loading scenario files...\n")
-    
-    # Scenario 1: Baseline (no attack)
-    if Path('baseline.csv').exists():
-        comparator.load_scenario('Baseline (No Attack)', 'baseline.csv')
-    elif Path('packet-delivery-analysis.csv').exists():
-        comparator.load_scenario('Scenario 1', 'packet-delivery-analysis.csv')
-    
-    # Scenario 2: Attack only
-    if Path('wormhole_attack.csv').exists():
-        comparator.load_scenario('Wormhole Attack', 'wormhole_attack.csv')
-    
-    # Scenario 3: Attack + Mitigation
-    if Path('wormhole_mitigated.csv').exists():
-        comparator.load_scenario('With Mitigation', 'wormhole_mitigated.csv')
+    if args.dataset:
+        print(f"📂 Loading runs from dataset {args.dataset}...\n")
+        try:
+            comparator.load_dataset(ResultsDataset(args.dataset), **parse_filters(args.where))
+        except (OSError, ValueError) as e:
+            print(f"❌ {e}")
+            return
+    else:
+        # Example: Load three scenarios
+        print("📂 Loading scenario files...\n")
+        
+        # Scenario 1: Baseline (no attack)
+        if Path('baseline.csv').exists():
+            comparator.load_scenario('Baseline (No Attack)', 'baseline.csv')
+        elif Path('packet-delivery-analysis.csv').exists():
+            comparator.load_scenario('Scenario 1', 'packet-delivery-analysis.csv')
+        
+        # Scenario 2: Attack only
+        if Path('wormhole_attack.csv').exists():
+            comparator.load_scenario('Wormhole Attack', 'wormhole_attack.csv')
+        
+        # Scenario 3: Attack + Mitigation
+        if Path('wormhole_mitigated.csv').exists():
+            comparator.load_scenario('With Mitigation', 'wormhole_mitigated.csv')
     
     if len(comparator.scenarios) == 0:
         print("❌ No CSV files found!")
@@ -326,17 +473,21 @@ def main():
     
     # Generate visualizations
     baseline = list(comparator.scenarios.keys())[0] if 'Baseline' in str(comparator.scenarios.keys()) else None
-    comparator.generate_all_comparisons(baseline_name=baseline)
+    if not args.no_plots:
+        comparator.generate_all_comparisons(baseline_name=baseline, jobs=args.jobs)
     
     # Export results
     comparator.export_comparison_table()
+    comparator.export_delay_summary()
     
     print("="*80)
     print("✅ Comparison Complete!")
     print("="*80)
     print("\n📁 Generated Files:")
-    print("   📊 Comparison plots: comparison_plots/*.png")
+    if not args.no_plots:
+        print("   📊 Comparison plots: comparison_plots/*.png")
     print("   📈 Comparison table: scenario_comparison.csv")
+    print("   📦 Delay summary: scenario_delay_summary.csv")
     print("\n💡 Use these comparisons in your research paper!\n")
 
 
@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Detection Accuracy: Ground Truth vs Mitigation Verdicts
+=======================================================
+
+Joins what the attack managers in routing.cc know (who attacked) with what
+the detectors decided, for every run of a sweep at once:
+
+    blackhole   blackhole-attack-results.csv      NodeID,Active,...,StartTime,...
+                blackhole-mitigation-results.csv  NodeID,...,Blacklisted,BlacklistTime
+                -> per-node join ('node' basis): exact confusion matrix and
+                   per-node detection latency BlacklistTime - StartTime
+    sybil       sybil-attack-results.csv          TotalSybilNodes
+                sybil-detection-results.csv       TotalNodesMonitored, SybilNodesDetected
+    wormhole    packet-delivery-analysis.csv      flows with WormholeOnPath packets
+                wormhole-detection-results.csv    TotalFlows, FlowsDetected
+
+The sybil and wormhole detectors only export counts, so their matrices are
+built from counts ('count' basis): TP = min(flagged, attackers), which is
+an upper bound on the true positives.  A run with a verdicts file but no
+attack file had no attacker of that kind, so every alarm is a false
+positive.  Attackers that no traffic went through never appear in the
+verdicts and count as missed.
+
+All per-node rows of all runs are concatenated and joined on a packed
+(run, node) key with one sort; confusion cells are counted with a single
+np.bincount over run x cell.  Files are read on a thread pool.
+
+Recall is the Detection_Rate and FP / (FP + TN) the False_Positive_Rate
+that analyze_attack_results.py reports, in preference to the snapshot
+estimates.
+
+Usage:
+    python3 detection_accuracy.py <results_dir | dataset> [--where KEY=V1[,V2]]
+
+Author: VANET Security Research
+Date: October 2025
+"""
+
+import argparse
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from metric_values import DEFAULT_IO_THREADS, read_metric_file
+from packet_metrics import flow_keys
+
+BLACKHOLE_ATTACK_FILE = 'blackhole-attack-results.csv'
+BLACKHOLE_MITIGATION_FILE = 'blackhole-mitigation-results.csv'
+SYBIL_ATTACK_FILE = 'sybil-attack-results.csv'
+SYBIL_DETECTION_FILE = 'sybil-detection-results.csv'
+WORMHOLE_DETECTION_FILE = 'wormhole-detection-results.csv'
+PACKET_FILE = 'packet-delivery-analysis.csv'
+
+# Per-run accuracy table columns
+ACCURACY_COLUMNS = ['Run', 'Attack', 'Basis', 'Attackers', 'Monitored', 'TP', 'FP', 'FN', 'TN',
+                    'Precision', 'Recall', 'False_Positive_Rate', 'F1',
+                    'Detection_Latency_Mean_s', 'Detection_Latency_Median_s', 'Detection_Latency_Max_s']
+
+# Per-node table columns (node basis only)
+NODE_COLUMNS = ['Run', 'Attack', 'NodeID', 'Attacker', 'Flagged', 'Attack_Start_s', 'Flag_Time_s',
+                'Detection_Latency_s']
+
+# Which row speaks for a run that has several: exact joins first
+_BASIS_PREFERENCE = ('node', 'count')
+
+
+def read_node_csv(csv_file, columns):
+    """
+    {column: float64 array} of the requested columns of a per-node CSV, or
+    None if the file is unreadable or lacks a column.  Rows with too few
+    fields are skipped.
+    """
+    try:
+        with open(csv_file, 'r', newline='') as f:
+            header = [name.strip() for name in f.readline().strip().split(',')]
+            rows = [line.rstrip('\r\n').split(',') for line in f if line.strip()]
+    except (OSError, UnicodeDecodeError):
+        return None
+    try:
+        index = [header.index(column) for column in columns]
+    except ValueError:
+        return None
+    rows = [row for row in rows if len(row) >= len(header)]
+    try:
+        return {column: np.array([row[i] for row in rows], dtype=np.float64) for column, i in zip(columns, index)}
+    except ValueError:
+        return None
+
+
+def _read_all(paths, reader, n_threads):
+    """reader(path) of every path (None entries stay None), on a thread pool"""
+    todo = [i for i, path in enumerate(paths) if path is not None]
+    results = [None] * len(paths)
+    if todo:
+        with ThreadPoolExecutor(max_workers=max(1, min(n_threads, len(todo)))) as pool:
+            for i, result in zip(todo, pool.map(reader, [paths[i] for i in todo])):
+                results[i] = result
+    return results
+
+
+def _stack(tables, columns):
+    """Concatenate per-run column dicts into (run index, {column: values})"""
+    present = [(i, table) for i, table in enumerate(tables) if table is not None]
+    runs = np.concatenate([np.full(len(table[columns[0]]), i, dtype=np.int64) for i, table in present]) \
+        if present else np.zeros(0, dtype=np.int64)
+    values = {column: np.concatenate([table[column] for _, table in present]) if present else np.zeros(0)
+              for column in columns}
+    return runs, values
+
+
+def _rates(tp, fp, fn, tn):
+    """Precision, recall, false positive rate and F1 (NaN where undefined)"""
+    tp, fp, fn, tn = (np.asarray(x, dtype=np.float64) for x in (tp, fp, fn, tn))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        precision = np.where(tp + fp > 0, tp / (tp + fp), np.nan)
+        recall = np.where(tp + fn > 0, tp / (tp + fn), np.nan)
+        fpr = np.where(fp + tn > 0, fp / (fp + tn), np.nan)
+        f1 = np.where(2 * tp + fp + fn > 0, 2 * tp / (2 * tp + fp + fn), np.nan)
+    return precision, recall, fpr, f1
+
+
+def _accuracy_frame(runs, attack, basis, attackers, monitored, tp, fp, fn, tn, latency=None):
+    """Accuracy rows for parallel per-run arrays"""
+    precision, recall, fpr, f1 = _rates(tp, fp, fn, tn)
+    frame = pd.DataFrame({
+        'Run': list(runs), 'Attack': attack, 'Basis': basis,
+        'Attackers': attackers, 'Monitored': monitored, 'TP': tp, 'FP': fp, 'FN': fn, 'TN': tn,
+        'Precision': precision, 'Recall': recall, 'False_Positive_Rate': fpr, 'F1': f1,
+    })
+    for column in ('Detection_Latency_Mean_s', 'Detection_Latency_Median_s', 'Detection_Latency_Max_s'):
+        frame[column] = np.nan if latency is None else latency[column].reindex(frame['Run']).to_numpy()
+    return frame
+
+
+def join_blackhole_nodes(files_by_run, verdict_columns=('Blacklisted', 'BlacklistTime'),
+                         n_threads=DEFAULT_IO_THREADS):
+    """
+    Per-node outer join of blackhole-attack-results.csv (ground truth) and
+    blackhole-mitigation-results.csv of every run with the latter.
+
+    Returns (names, scored, nodes): names are those runs, scored the indices
+    of the runs whose mitigation file could be read, and nodes a dict of
+    per-node arrays: Run (index into names), NodeID, Attacker, Listed (the
+    node is in the mitigation file), Attack_Start_s and verdict_columns
+    (NaN for attackers that carried no traffic).
+    """
+    names = [run for run, files in files_by_run.items() if BLACKHOLE_MITIGATION_FILE in files]
+    verdict_columns = ['NodeID', *verdict_columns]
+    truth = _read_all([files_by_run[run].get(BLACKHOLE_ATTACK_FILE) for run in names],
+                      lambda path: read_node_csv(path, ['NodeID', 'StartTime']), n_threads)
+    verdicts = _read_all([files_by_run[run][BLACKHOLE_MITIGATION_FILE] for run in names],
+                         lambda path: read_node_csv(path, verdict_columns), n_threads)
+    t_run, t = _stack(truth, ['NodeID', 'StartTime'])
+    v_run, v = _stack(verdicts, verdict_columns)
+
+    # Packed (run, node) keys; duplicates within a file keep their first row
+    stride = int(max(t['NodeID'].max(initial=0), v['NodeID'].max(initial=0))) + 1
+    t_key, t_first = np.unique(t_run * stride + t['NodeID'].astype(np.int64), return_index=True)
+    v_key, v_first = np.unique(v_run * stride + v['NodeID'].astype(np.int64), return_index=True)
+    keys = np.union1d(t_key, v_key)
+    # Runs whose verdict file could not be read have no verdicts to score
+    scored = np.unique(v_run)
+    keys = keys[np.isin(keys // stride, scored)]
+
+    t_pos = np.minimum(np.searchsorted(t_key, keys), max(len(t_key) - 1, 0))
+    attacker = (t_key[t_pos] == keys) if len(t_key) else np.zeros(len(keys), dtype=bool)
+    v_pos = np.minimum(np.searchsorted(v_key, keys), max(len(v_key) - 1, 0))
+    listed = (v_key[v_pos] == keys) if len(v_key) else np.zeros(len(keys), dtype=bool)
+    v_rows = v_first[v_pos] if len(v_key) else v_pos
+
+    nodes = {
+        'Run': keys // stride, 'NodeID': keys % stride, 'Attacker': attacker, 'Listed': listed,
+        'Attack_Start_s': np.where(attacker, t['StartTime'][t_first[t_pos]] if len(t_key) else np.nan, np.nan),
+    }
+    for column in verdict_columns[1:]:
+        nodes[column] = np.where(listed, v[column][v_rows] if len(v_key) else np.nan, np.nan)
+    return names, scored, nodes
+
+
+def blackhole_accuracy(files_by_run, n_threads=DEFAULT_IO_THREADS):
+    """
+    (accuracy, nodes) of every run with a blackhole-mitigation-results.csv:
+    one accuracy row per run and one row per node seen in either file.
+    """
+    names, scored, joined = join_blackhole_nodes(files_by_run, n_threads=n_threads)
+    if not len(scored):
+        return pd.DataFrame(columns=ACCURACY_COLUMNS), pd.DataFrame(columns=NODE_COLUMNS)
+
+    run, attacker = joined['Run'], joined['Attacker']
+    flagged = joined['Listed'] & (joined['Blacklisted'] > 0)
+    start = joined['Attack_Start_s']
+    flag_time = np.where(flagged, joined['BlacklistTime'], np.nan)
+    latency = np.where(attacker & flagged, flag_time - start, np.nan)
+
+    # Confusion cells: 0 TN, 1 FP, 2 FN, 3 TP
+    cells = np.bincount(run * 4 + attacker * 2 + flagged, minlength=len(names) * 4).reshape(len(names), 4)
+    nodes = pd.DataFrame({
+        'Run': pd.Categorical.from_codes(run, categories=names), 'Attack': 'blackhole',
+        'NodeID': joined['NodeID'].astype(np.int64), 'Attacker': attacker, 'Flagged': flagged,
+        'Attack_Start_s': start, 'Flag_Time_s': flag_time, 'Detection_Latency_s': latency,
+    })
+    detected = nodes.dropna(subset=['Detection_Latency_s']).groupby('Run', observed=True)['Detection_Latency_s']
+    latency_stats = pd.DataFrame({'Detection_Latency_Mean_s': detected.mean(),
+                                  'Detection_Latency_Median_s': detected.median(),
+                                  'Detection_Latency_Max_s': detected.max()})
+
+    cells = cells[scored]
+    attackers = np.bincount(run[attacker], minlength=len(names))[scored]
+    monitored = np.bincount(run[joined['Listed']], minlength=len(names))[scored]
+    accuracy = _accuracy_frame([names[i] for i in scored], 'blackhole', 'node', attackers, monitored,
+                               cells[:, 3], cells[:, 1], cells[:, 2], cells[:, 0], latency_stats)
+    nodes['Run'] = nodes['Run'].astype(str)
+    return accuracy, nodes
+
+
+def _count_accuracy(runs, attack, attackers, monitored, flagged):
+    """Count-basis rows: TP = min(flagged, attackers), the rest follow from the totals"""
+    attackers = np.minimum(np.asarray(attackers, dtype=np.int64), monitored)
+    flagged = np.minimum(np.asarray(flagged, dtype=np.int64), monitored)
+    tp = np.minimum(flagged, attackers)
+    fp = flagged - tp
+    fn = attackers - tp
+    tn = np.maximum(monitored - attackers - fp, 0)
+    return _accuracy_frame(runs, attack, 'count', attackers, monitored, tp, fp, fn, tn)
+
+
+def _enabled(metrics):
+    return bool(metrics) and metrics.get('DetectionEnabled', True) is True
+
+
+def sybil_accuracy(files_by_run, n_threads=DEFAULT_IO_THREADS):
+    """Count-basis accuracy of every run whose sybil detector was enabled"""
+    names = [run for run, files in files_by_run.items() if SYBIL_DETECTION_FILE in files]
+    detections = _read_all([files_by_run[run][SYBIL_DETECTION_FILE] for run in names], read_metric_file, n_threads)
+    attacks = _read_all([files_by_run[run].get(SYBIL_ATTACK_FILE) for run in names], read_metric_file, n_threads)
+    rows = [(run, (attack or {}).get('TotalSybilNodes', 0), detection.get('TotalNodesMonitored', 0),
+             detection.get('SybilNodesDetected', 0))
+            for run, detection, attack in zip(names, detections, attacks)
+            if _enabled(detection) and detection.get('TotalNodesMonitored', 0) > 0]
+    if not rows:
+        return pd.DataFrame(columns=ACCURACY_COLUMNS)
+    runs, attackers, monitored, flagged = zip(*rows)
+    return _count_accuracy(runs, 'sybil', attackers, np.asarray(monitored, dtype=np.int64), flagged)
+
+
+def wormhole_flows(packet_file):
+    """Number of (source, destination) flows with at least one WormholeOnPath packet"""
+    from results_dataset import load_packet_columns
+
+    df = load_packet_columns(packet_file, ['SourceNode', 'DestNode', 'WormholeOnPath'])
+    if 'WormholeOnPath' not in df.columns or len(df) == 0:
+        return 0
+    on_path = df['WormholeOnPath'].to_numpy(dtype=bool)
+    return len(np.unique(flow_keys(df)[on_path]))
+
+
+def wormhole_accuracy(files_by_run, n_threads=DEFAULT_IO_THREADS):
+    """
+    Count-basis accuracy of every run whose wormhole detector was enabled,
+    with the attacked flows taken from the run's packet trace.
+    """
+    names = [run for run, files in files_by_run.items()
+             if WORMHOLE_DETECTION_FILE in files and PACKET_FILE in files_by_run[run]]
+    detections = _read_all([files_by_run[run][WORMHOLE_DETECTION_FILE] for run in names], read_metric_file, n_threads)
+    enabled = [(run, detection) for run, detection in zip(names, detections)
+               if _enabled(detection) and detection.get('TotalFlows', 0) > 0]
+    if not enabled:
+        return pd.DataFrame(columns=ACCURACY_COLUMNS)
+    attacked = _read_all([files_by_run[run][PACKET_FILE] for run, _ in enabled], wormhole_flows, n_threads)
+    runs = [run for run, _ in enabled]
+    monitored = np.array([detection['TotalFlows'] for _, detection in enabled], dtype=np.int64)
+    flagged = [detection.get('FlowsDetected', 0) for _, detection in enabled]
+    return _count_accuracy(runs, 'wormhole', attacked, monitored, flagged)
+
+
+def detection_accuracy(files_by_run, n_threads=DEFAULT_IO_THREADS):
+    """
+    (accuracy, nodes) over every run of files_by_run ({run: {csv name:
+    path}}, e.g. RunInfo.files): one accuracy row per run and attack type
+    whose detector left results, and the per-node blackhole join.
+    """
+    blackhole, nodes = blackhole_accuracy(files_by_run, n_threads)
+    frames = [frame for frame in (blackhole, sybil_accuracy(files_by_run, n_threads),
+                                  wormhole_accuracy(files_by_run, n_threads)) if not frame.empty]
+    accuracy = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=ACCURACY_COLUMNS)
+    return accuracy[ACCURACY_COLUMNS], nodes
+
+
+def run_detection_summary(accuracy):
+    """
+    One row per run: Detection_Rate, False_Positive_Rate, Precision and
+    Detection_Latency_s (median) from its most exact accuracy row.
+    """
+    columns = ['Detection_Rate', 'False_Positive_Rate', 'Precision', 'Detection_Latency_s']
+    if accuracy.empty:
+        return pd.DataFrame(columns=columns)
+    ranked = accuracy.assign(
+        Detection_Rate=accuracy['Recall'],
+        Detection_Latency_s=accuracy['Detection_Latency_Median_s'],
+        _rank=accuracy['Basis'].map({basis: i for i, basis in enumerate(_BASIS_PREFERENCE)}),
+    ).sort_values('_rank', kind='stable')
+    return ranked.groupby('Run', sort=False)[columns].first()
+
+
+def print_accuracy(accuracy):
+    """Confusion counts and rates per run"""
+    for _, row in accuracy.iterrows():
+        latency = row['Detection_Latency_Median_s']
+        latency = f", median latency {latency:.2f}s" if pd.notna(latency) else ''
+        print(f"  {row['Run']} [{row['Attack']}, {row['Basis']}]: TP {row['TP']} FP {row['FP']} "
+              f"FN {row['FN']} TN {row['TN']} | precision {row['Precision']:.3f} recall {row['Recall']:.3f} "
+              f"FPR {row['False_Positive_Rate']:.3f}{latency}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Detection accuracy of every run in a results directory')
+    parser.add_argument('results_dir', help='Results directory or results_dataset.py dataset')
+    parser.add_argument('--where', action='append', metavar='KEY=V1[,V2]',
+                        help='Partition filter when results_dir is a dataset (repeatable)')
+    parser.add_argument('--output-dir', '-o', help='Where to write the tables (default: results_dir)')
+    args = parser.parse_args(argv)
+
+    from results_dataset import open_source
+    from scenario_catalog import ScenarioCatalog, run_key
+
+    if not os.path.isdir(args.results_dir):
+        print(f"❌ Not a directory: {args.results_dir}")
+        return 1
+    try:
+        dataset, filters = open_source(args.results_dir, args.where)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    catalog = dataset.catalog(**filters) if dataset is not None else ScenarioCatalog.discover(args.results_dir)
+    accuracy, nodes = detection_accuracy({run_key(run): run.files for run in catalog})
+    if accuracy.empty:
+        print("⚠ No run has detector results to score")
+        return 0
+
+    print(f"🔍 Detection accuracy of {accuracy['Run'].nunique()} run(s):")
+    print_accuracy(accuracy)
+    output_dir = args.output_dir or args.results_dir
+    os.makedirs(output_dir, exist_ok=True)
+    accuracy.to_csv(os.path.join(output_dir, 'detection_accuracy.csv'), index=False)
+    nodes.to_csv(os.path.join(output_dir, 'detection_nodes.csv'), index=False)
+    print(f"\n✅ Saved detection_accuracy.csv and detection_nodes.csv to {output_dir}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
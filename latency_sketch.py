@@ -0,0 +1,166 @@
+"""
+Mergeable Latency Sketches
+==========================
+
+Compact quantile sketches for end-to-end delay (DelayMs), so tail latency
+(p50/p95/p99) can be reported for any combination of runs without holding
+every delay in memory or rereading the raw packet traces.
+
+Delays are counted in logarithmic buckets (HDR / DDSketch style): bucket k
+covers (gamma^(k-1), gamma^k] with gamma = (1 + a) / (1 - a), so every
+quantile is returned within relative error a (1% by default).  Merging two
+sketches is just adding their bucket counts, which makes the result
+independent of how the trace was chunked or how runs are grouped.
+
+GroupedSketch keeps one such histogram per integer key (attack category code,
+packed flow key, ...) in sparse (key, bucket, count) form.
+
+Author: VANET Security Research
+Date: October 2025
+"""
+
+import numpy as np
+
+RELATIVE_ACCURACY = 0.01
+
+# Delays at or below this (ms) share the lowest bucket
+MIN_DELAY_MS = 1e-3
+
+# Percentiles reported by the analyzers
+PERCENTILES = (50, 95, 99)
+
+
+def _gamma(relative_accuracy):
+    return (1 + relative_accuracy) / (1 - relative_accuracy)
+
+
+def bucket_index(values, relative_accuracy=RELATIVE_ACCURACY):
+    """Logarithmic bucket of each delay value"""
+    values = np.maximum(np.asarray(values, dtype=np.float64), MIN_DELAY_MS)
+    return np.ceil(np.log(values) / np.log(_gamma(relative_accuracy))).astype(np.int32)
+
+
+def bucket_value(buckets, relative_accuracy=RELATIVE_ACCURACY):
+    """Representative delay of a bucket (within relative_accuracy of any member)"""
+    gamma = _gamma(relative_accuracy)
+    return 2 * np.power(gamma, np.asarray(buckets, dtype=np.float64)) / (gamma + 1)
+
+
+class LatencySketch:
+    """Quantile sketch of a single delay population"""
+
+    def __init__(self, relative_accuracy=RELATIVE_ACCURACY, buckets=None, counts=None):
+        """Start empty, or from parallel arrays of bucket indices and counts"""
+        self.relative_accuracy = relative_accuracy
+        self.buckets = np.zeros(0, dtype=np.int32) if buckets is None else np.asarray(buckets, dtype=np.int32)
+        self.counts = np.zeros(0, dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+
+    @property
+    def count(self):
+        """Number of delays in the sketch"""
+        return int(self.counts.sum())
+
+    def add(self, values):
+        """Fold an array of delays (ms) into the sketch"""
+        values = np.asarray(values)
+        if len(values) == 0:
+            return self
+        buckets, counts = np.unique(bucket_index(values, self.relative_accuracy), return_counts=True)
+        return self.merge(LatencySketch(self.relative_accuracy, buckets, counts))
+
+    def merge(self, other):
+        """Fold another sketch (same accuracy) into this one"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        buckets = np.concatenate([self.buckets, other.buckets])
+        counts = np.concatenate([self.counts, other.counts])
+        self.buckets, inverse = np.unique(buckets, return_inverse=True)
+        self.counts = np.bincount(inverse, weights=counts, minlength=len(self.buckets)).astype(np.int64)
+        return self
+
+    def quantile(self, q):
+        """Delay at quantile q (0-1), NaN for an empty sketch"""
+        total = self.count
+        if total == 0:
+            return np.nan
+        rank = q * (total - 1)
+        i = int(np.searchsorted(np.cumsum(self.counts), rank, side='right'))
+        i = min(i, len(self.buckets) - 1)
+        return float(bucket_value(self.buckets[i], self.relative_accuracy))
+
+    def percentiles(self, percentiles=PERCENTILES):
+        """{'p50': ..., 'p95': ..., 'p99': ...} in ms"""
+        return {f'p{p:g}': self.quantile(p / 100) for p in percentiles}
+
+
+class GroupedSketch:
+    """One latency sketch per integer key, stored as sorted (key, bucket, count) triples"""
+
+    def __init__(self, relative_accuracy=RELATIVE_ACCURACY, keys=None, buckets=None, counts=None):
+        self.relative_accuracy = relative_accuracy
+        self.keys = np.zeros(0, dtype=np.uint64) if keys is None else np.asarray(keys, dtype=np.uint64)
+        self.buckets = np.zeros(0, dtype=np.int32) if buckets is None else np.asarray(buckets, dtype=np.int32)
+        self.counts = np.zeros(0, dtype=np.int64) if counts is None else np.asarray(counts, dtype=np.int64)
+
+    @classmethod
+    def from_values(cls, keys, values, relative_accuracy=RELATIVE_ACCURACY):
+        """Build from per-delay keys and delays"""
+        buckets = bucket_index(values, relative_accuracy)
+        sketch = cls(relative_accuracy, keys, buckets, np.ones(len(buckets), dtype=np.int64))
+        return sketch._reduce()
+
+    def _reduce(self):
+        """Sort by (key, bucket) and sum duplicate entries"""
+        if len(self.keys) == 0:
+            return self
+        order = np.lexsort((self.buckets, self.keys))
+        keys, buckets, counts = self.keys[order], self.buckets[order], self.counts[order]
+        starts = np.flatnonzero(np.r_[True, (keys[1:] != keys[:-1]) | (buckets[1:] != buckets[:-1])])
+        self.keys = keys[starts]
+        self.buckets = buckets[starts]
+        self.counts = np.add.reduceat(counts, starts)
+        return self
+
+    def merge(self, other):
+        """Fold another grouped sketch (same accuracy) into this one"""
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError("Cannot merge sketches with different relative accuracy")
+        self.keys = np.concatenate([self.keys, other.keys])
+        self.buckets = np.concatenate([self.buckets, other.buckets])
+        self.counts = np.concatenate([self.counts, other.counts])
+        return self._reduce()
+
+    def groups(self):
+        """Keys that have at least one delay"""
+        return np.unique(self.keys)
+
+    def select(self, keys=None):
+        """Merge the sketches of the given keys (all keys when None) into one LatencySketch"""
+        if keys is None:
+            mask = slice(None)
+        else:
+            mask = np.isin(self.keys, np.asarray(keys, dtype=np.uint64))
+        sketch = LatencySketch(self.relative_accuracy, self.buckets[mask], self.counts[mask])
+        return sketch.merge(LatencySketch(self.relative_accuracy))
+
+    def quantiles(self, q):
+        """(keys, delay at quantile q of each key's sketch), for all keys at once"""
+        if len(self.keys) == 0:
+            return self.keys, np.zeros(0)
+        starts = np.flatnonzero(np.r_[True, self.keys[1:] != self.keys[:-1]])
+        ends = np.r_[starts[1:], len(self.keys)] - 1
+        cumulative = np.cumsum(self.counts)
+        before = cumulative[starts] - self.counts[starts]
+        totals = cumulative[ends] - before
+        rank = before + q * (totals - 1)
+        i = np.minimum(np.searchsorted(cumulative, rank, side='right'), ends)
+        return self.keys[starts], bucket_value(self.buckets[i], self.relative_accuracy)
+
+    def to_arrays(self, prefix):
+        """Arrays for np.savez, named <prefix>_keys/_buckets/_counts"""
+        return {f'{prefix}_keys': self.keys, f'{prefix}_buckets': self.buckets, f'{prefix}_counts': self.counts}
+
+    @classmethod
+    def from_arrays(cls, arrays, prefix, relative_accuracy=RELATIVE_ACCURACY):
+        """Inverse of to_arrays()"""
+        return cls(relative_accuracy, arrays[f'{prefix}_keys'], arrays[f'{prefix}_buckets'], arrays[f'{prefix}_counts'])
@@ -0,0 +1,97 @@
+"""
+Metric,Value Result File Reader
+===============================
+
+About a dozen exporters in routing.cc (WormholeDetector, SybilAttackManager,
+ReplayAttackApp, the trusted-certification / RSSI / resource-testing /
+incentive-scheme modules, ...) write two-column files:
+
+    Metric,Value
+    DetectionEnabled,true
+    FlowsDetected,12
+    AvgLatencyIncrease_percent,41.7
+
+read_metric_file() parses one with plain string operations into a dict of
+typed values (bool, int, float, else str), without pandas overhead per file.
+load_metric_table() reads every such file of many runs on a thread pool and
+returns one wide run x metric DataFrame, with columns named
+<file stem>.<Metric>, e.g. 'wormhole-detection-results.FlowsDetected'.
+
+Files are recognised by their 'Metric,Value' header; any other CSV of a run
+is skipped after reading its first line.
+
+Author: VANET Security Research
+Date: October 2025
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+METRIC_HEADER = 'Metric,Value'
+
+# Threads reading result files (I/O bound, so more than the core count is fine)
+DEFAULT_IO_THREADS = 16
+
+
+def parse_value(text):
+    """'true'/'false' -> bool, then int, then float, else the stripped string"""
+    text = text.strip()
+    lowered = text.lower()
+    if lowered in ('true', 'false'):
+        return lowered == 'true'
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def read_metric_file(csv_file):
+    """{Metric: typed value} of a Metric,Value file, or None for any other file"""
+    try:
+        with open(csv_file, 'r', newline='') as f:
+            if f.readline().strip() != METRIC_HEADER:
+                return None
+            metrics = {}
+            for line in f:
+                name, sep, value = line.rstrip('\r\n').partition(',')
+                if sep and name:
+                    metrics[name.strip()] = parse_value(value)
+            return metrics
+    except (OSError, UnicodeDecodeError):
+        return None
+
+
+def metric_column(file_name, metric):
+    """Wide-table column name of a metric read from file_name"""
+    stem = file_name[:-4] if file_name.endswith('.csv') else file_name
+    return f'{stem}.{metric}'
+
+
+def load_metric_table(files_by_run, n_threads=DEFAULT_IO_THREADS):
+    """
+    One row per run, one column per (file, metric) found.
+
+    files_by_run maps a run key to {file name: path} (RunInfo.files); the
+    index of the result is the run key, in the given order.
+    """
+    import pandas as pd
+
+    tasks = [(run, name, path) for run, files in files_by_run.items() for name, path in files.items()]
+    rows = {run: {} for run in files_by_run}
+    if not tasks:
+        return pd.DataFrame(index=pd.Index([], name='Run'))
+
+    with ThreadPoolExecutor(max_workers=max(1, min(n_threads, len(tasks)))) as pool:
+        parsed = pool.map(read_metric_file, [path for _, _, path in tasks])
+        for (run, name, _), metrics in zip(tasks, parsed):
+            if metrics:
+                rows[run].update({metric_column(os.path.basename(name), metric): value
+                                  for metric, value in metrics.items()})
+
+    table = pd.DataFrame.from_dict(rows, orient='index')
+    table.index.name = 'Run'
+    return table
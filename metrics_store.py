@@ -0,0 +1,173 @@
+"""
+Persistent Per-Run Metrics Store
+================================
+
+SQLite manifest of reduced runs kept in a results directory
+(metrics_store.sqlite).  Each packet-delivery-analysis.csv is recorded with
+its size, mtime and SHA-256 next to its PacketAccumulator (per-category
+stats, latency sketches, time bins), so re-running an analyzer only parses
+runs that are new or whose content changed.  Everything else - including
+summary_statistics.csv and mitigation_effectiveness_summary.csv - is rebuilt
+from the stored reductions without touching the packet CSVs.
+
+A run whose mtime changed but whose size and hash did not (e.g. copied or
+touched) is revalidated by hashing alone and is not re-parsed.
+
+Author: VANET Security Research
+Date: October 2025
+"""
+
+import hashlib
+import io
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+from packet_loader import DEFAULT_CHUNK_ROWS, reduce_packet_csv, reduce_packet_csvs, source_signature
+from packet_metrics import PacketAccumulator
+
+STORE_FILE = 'metrics_store.sqlite'
+STORE_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS manifest (
+    path        TEXT PRIMARY KEY,
+    size        INTEGER NOT NULL,
+    mtime_ns    INTEGER NOT NULL,
+    sha256      TEXT NOT NULL,
+    reduced_at  REAL NOT NULL,
+    packets     INTEGER NOT NULL,
+    accumulator BLOB NOT NULL
+)
+"""
+
+
+def file_sha256(path, block_size=1 << 20):
+    """Hex SHA-256 of a file's content"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _pack(accumulator):
+    buffer = io.BytesIO()
+    np.savez(buffer, **accumulator.to_arrays())
+    return buffer.getvalue()
+
+
+def _unpack(blob):
+    with np.load(io.BytesIO(blob)) as arrays:
+        return PacketAccumulator.from_arrays({name: arrays[name] for name in arrays.files})
+
+
+def reduce_and_hash(csv_file, streaming=False, chunksize=DEFAULT_CHUNK_ROWS, use_cache=True):
+    """Worker: (signature, sha256, accumulator) of one run, signature taken before reading"""
+    signature = source_signature(csv_file)
+    digest = file_sha256(csv_file)
+    return signature, digest, reduce_packet_csv(csv_file, streaming, chunksize, use_cache)
+
+
+class MetricsStore:
+    """Manifest of reduced runs in <results_dir>/metrics_store.sqlite"""
+
+    def __init__(self, results_dir):
+        self.results_dir = results_dir
+        self.path = os.path.join(results_dir, STORE_FILE)
+        self.conn = sqlite3.connect(self.path)
+        version = self.conn.execute('PRAGMA user_version').fetchone()[0]
+        if version != STORE_VERSION:
+            # Stored blobs from another layout are useless; start over
+            self.conn.execute('DROP TABLE IF EXISTS manifest')
+            self.conn.execute(f'PRAGMA user_version = {STORE_VERSION}')
+        self.conn.execute(_SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+    def _relpath(self, csv_file):
+        return os.path.relpath(os.path.abspath(csv_file), os.path.abspath(self.results_dir))
+
+    def get(self, csv_file):
+        """Stored PacketAccumulator of a run, or None if it is missing or changed"""
+        row = self.conn.execute(
+            'SELECT size, mtime_ns, sha256, accumulator FROM manifest WHERE path = ?',
+            (self._relpath(csv_file),)).fetchone()
+        if row is None:
+            return None
+
+        size, mtime_ns, sha256, blob = row
+        signature = source_signature(csv_file)
+        if signature['size'] != size:
+            return None
+        if signature['mtime_ns'] != mtime_ns:
+            if file_sha256(csv_file) != sha256:
+                return None
+            self.conn.execute('UPDATE manifest SET mtime_ns = ? WHERE path = ?',
+                              (signature['mtime_ns'], self._relpath(csv_file)))
+            self.conn.commit()
+        return _unpack(blob)
+
+    def put(self, csv_file, accumulator, signature, sha256):
+        """Record a run's reduction under the signature/hash it was computed from"""
+        self.conn.execute(
+            'INSERT OR REPLACE INTO manifest VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (self._relpath(csv_file), signature['size'], signature['mtime_ns'], sha256,
+             time.time(), accumulator.rows, _pack(accumulator)))
+        self.conn.commit()
+
+    def reduce_runs(self, csv_files, n_jobs=1, streaming=False, chunksize=DEFAULT_CHUNK_ROWS):
+        """
+        Like packet_loader.reduce_packet_csvs, but serve unchanged runs from the store.
+
+        Yields (key, accumulator, error); stored runs come first, then the
+        re-reduced ones as their workers finish.
+        """
+        stale = {}
+        for key, csv_file in dict(csv_files).items():
+            try:
+                accumulator = self.get(csv_file)
+            except (OSError, ValueError, KeyError, sqlite3.Error):
+                accumulator = None
+            if accumulator is None:
+                stale[key] = csv_file
+            else:
+                yield key, accumulator, None
+
+        if stale:
+            print(f"  ↻ Reducing {len(stale)} new/changed run(s); "
+                  f"{len(dict(csv_files)) - len(stale)} served from {STORE_FILE}")
+        for key, result, error in reduce_packet_csvs(stale, n_jobs, streaming, chunksize,
+                                                      reducer=reduce_and_hash):
+            if error is not None:
+                yield key, None, error
+                continue
+            signature, sha256, accumulator = result
+            self.put(stale[key], accumulator, signature, sha256)
+            yield key, accumulator, None
+
+
+def reduce_runs(results_dir, csv_files, n_jobs=1, streaming=False, chunksize=DEFAULT_CHUNK_ROWS, use_store=True):
+    """
+    Reduce runs through the results directory's store (falls back to plain
+    reduction when use_store is False or the store cannot be opened).
+    """
+    store = None
+    if use_store:
+        try:
+            store = MetricsStore(results_dir)
+        except sqlite3.Error as e:
+            print(f"⚠ Could not open {STORE_FILE} in {results_dir}: {e}")
+
+    if store is None:
+        yield from reduce_packet_csvs(csv_files, n_jobs, streaming, chunksize)
+        return
+
+    try:
+        yield from store.reduce_runs(csv_files, n_jobs, streaming, chunksize)
+    finally:
+        store.close()
@@ -0,0 +1,420 @@
+"""
+Typed, Cached Loader for Packet Trace CSVs
+==========================================
+
+Shared loader used by every analysis script to read packet-delivery-analysis.csv.
+
+The first load parses the CSV with narrow dtypes (uint32 IDs, bool flags,
+float32 times) and writes a columnar sidecar next to it: one .npy file per
+column plus a small meta.json keyed on the CSV's size and mtime.  Later loads
+memory-map those arrays instead of re-parsing the text, so reloading a
+multi-GB trace is near-instant and needs about a quarter of the memory.
+
+Delay quantile sketches (per category and per flow) are persisted the same
+way, in <csv>.sketch.npz, so tail latency can be merged across runs later
+without touching the packets again.
+
+reduce_packet_csvs() loads and reduces many runs in a process pool; only the
+compact per-run reductions travel back, so at most one full DataFrame per
+worker is alive at any time.
+
+CsvTail reads only the rows appended to a CSV since the previous call, in
+bounded blocks, for following a trace while the simulation is still writing
+it.
+
+Author: VANET Security Research
+Date: October 2025
+"""
+
+import io
+import json
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from latency_sketch import RELATIVE_ACCURACY, GroupedSketch
+from packet_metrics import PacketAccumulator, packet_sketches
+from plot_scheduler import resolve_jobs
+
+# Narrow dtypes for the columns written by PacketTracker::ExportToCSV in routing.cc
+PACKET_DTYPES = {
+    'PacketID': np.uint32,
+    'SourceNode': np.uint32,
+    'DestNode': np.uint32,
+    'SendTime': np.float32,
+    'ReceiveTime': np.float32,
+    'DelayMs': np.float32,
+    'Delivered': np.bool_,
+    'WormholeOnPath': np.bool_,
+    'BlackholeOnPath': np.bool_,
+}
+
+CACHE_SUFFIX = '.colcache'
+CACHE_VERSION = 1
+SKETCH_SUFFIX = '.sketch.npz'
+
+# Rows per chunk in streaming mode
+DEFAULT_CHUNK_ROWS = 1_000_000
+
+# Bytes parsed per CsvTail.read_new() call (about DEFAULT_CHUNK_ROWS trace rows)
+TAIL_BLOCK_BYTES = 64 * 2**20
+
+
+def cache_dir_for(csv_file):
+    """Return the sidecar cache directory used for a CSV file"""
+    return str(csv_file) + CACHE_SUFFIX
+
+
+def sketch_file_for(csv_file):
+    """Return the sidecar file holding a CSV's latency sketches"""
+    return str(csv_file) + SKETCH_SUFFIX
+
+
+def source_signature(csv_file):
+    """Identify a CSV by size and modification time"""
+    st = os.stat(csv_file)
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def _parse_dtypes(columns):
+    """Dtypes to request from the CSV parser for the columns present"""
+    dtypes = {}
+    for col in columns:
+        dtype = PACKET_DTYPES.get(col)
+        if dtype is None:
+            continue
+        # Flags are written as 0/1, so parse them as bytes and convert after
+        dtypes[col] = np.uint8 if dtype is np.bool_ else dtype
+    return dtypes
+
+
+def read_packet_csv(csv_file, **kwargs):
+    """Parse a packet CSV with narrow dtypes (no caching)"""
+    header = pd.read_csv(csv_file, nrows=0).columns
+    df = pd.read_csv(csv_file, dtype=_parse_dtypes(header), **kwargs)
+    return apply_packet_dtypes(df)
+
+
+def apply_packet_dtypes(df):
+    """Convert known packet columns of an already-parsed frame to narrow dtypes"""
+    for col, dtype in PACKET_DTYPES.items():
+        if col in df.columns and df[col].dtype != dtype:
+            df[col] = df[col].astype(dtype)
+    return df
+
+
+def _read_cache(cache_dir, signature):
+    """Memory-map a valid sidecar cache, or return None if it is missing/stale"""
+    meta_file = os.path.join(cache_dir, 'meta.json')
+    try:
+        with open(meta_file) as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if meta.get('version') != CACHE_VERSION or meta.get('source') != signature:
+        return None
+
+    try:
+        columns = {
+            col: np.load(os.path.join(cache_dir, f'{i}.npy'), mmap_mode='r')
+            for i, col in enumerate(meta['columns'])
+        }
+    except (OSError, ValueError):
+        return None
+    return pd.DataFrame(columns, copy=False)
+
+
+def _write_cache(df, cache_dir, signature):
+    """Write the sidecar cache atomically (build in a temp dir, then rename)"""
+    parent = os.path.dirname(os.path.abspath(cache_dir))
+    tmp_dir = tempfile.mkdtemp(prefix='.colcache-', dir=parent)
+    try:
+        for i, col in enumerate(df.columns):
+            np.save(os.path.join(tmp_dir, f'{i}.npy'), df[col].to_numpy())
+        meta = {
+            'version': CACHE_VERSION,
+            'source': signature,
+            'rows': len(df),
+            'columns': list(df.columns),
+        }
+        with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+        if os.path.isdir(cache_dir):
+            shutil.rmtree(cache_dir)
+        os.replace(tmp_dir, cache_dir)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+def load_packet_csv(csv_file, use_cache=True):
+    """
+    Load a packet trace with narrow dtypes, reusing the columnar sidecar when valid.
+
+    Raises FileNotFoundError if the CSV does not exist, like pd.read_csv.
+    """
+    signature = source_signature(csv_file)
+    if not use_cache:
+        return read_packet_csv(csv_file)
+
+    cache_dir = cache_dir_for(csv_file)
+    df = _read_cache(cache_dir, signature)
+    if df is not None:
+        return df
+
+    df = read_packet_csv(csv_file)
+    try:
+        _write_cache(df, cache_dir, signature)
+    except OSError as e:
+        print(f"⚠ Could not write column cache for {csv_file}: {e}")
+    return df
+
+
+def iter_packet_chunks(csv_file, chunksize=DEFAULT_CHUNK_ROWS, use_cache=True):
+    """
+    Yield the trace as typed DataFrames of at most chunksize rows.
+
+    A valid sidecar cache is sliced through its memory map; otherwise the CSV
+    is parsed incrementally, so peak memory is bounded by chunksize rather
+    than by trace size.  No cache is written in this mode.
+    """
+    signature = source_signature(csv_file)
+    if use_cache:
+        cached = _read_cache(cache_dir_for(csv_file), signature)
+        if cached is not None:
+            for start in range(0, len(cached), chunksize):
+                yield cached.iloc[start:start + chunksize]
+            return
+
+    header = pd.read_csv(csv_file, nrows=0).columns
+    with pd.read_csv(csv_file, dtype=_parse_dtypes(header), chunksize=chunksize) as reader:
+        for chunk in reader:
+            yield apply_packet_dtypes(chunk)
+
+
+def stream_packet_stats(csv_file, chunksize=DEFAULT_CHUNK_ROWS, use_cache=True, time_bin_s=1.0, series=None):
+    """
+    Reduce a trace chunk by chunk into a PacketAccumulator (and persist its sketches).
+
+    series, if given (a time_series.TimeSeriesAccumulator), is fed the same
+    chunks, so the trace is binned without a second read.
+    """
+    signature = source_signature(csv_file)
+    accumulator = PacketAccumulator(time_bin_s=time_bin_s)
+    for chunk in iter_packet_chunks(csv_file, chunksize, use_cache):
+        accumulator.update(chunk)
+        if series is not None:
+            series.update(chunk)
+    if not accumulator.columns:
+        accumulator.columns = list(pd.read_csv(csv_file, nrows=0).columns)
+    if use_cache:
+        try:
+            save_packet_sketches(csv_file, accumulator.sketches, signature)
+        except OSError as e:
+            print(f"⚠ Could not write latency sketches for {csv_file}: {e}")
+    return accumulator
+
+
+def _read_sketches(sketch_file, signature):
+    """Load valid persisted sketches, or return None if missing/stale"""
+    try:
+        with np.load(sketch_file) as arrays:
+            meta = read_npz_meta(arrays)
+            if (meta.get('version') != CACHE_VERSION or meta.get('source') != signature
+                    or meta.get('relative_accuracy') != RELATIVE_ACCURACY):
+                return None
+            return {name: GroupedSketch.from_arrays(arrays, name, RELATIVE_ACCURACY)
+                    for name in meta['sketches']}
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def save_packet_sketches(csv_file, sketches, signature=None):
+    """Persist a run's sketches next to its CSV (atomic rename)"""
+    if signature is None:
+        signature = source_signature(csv_file)
+    sketch_file = sketch_file_for(csv_file)
+    meta = {
+        'version': CACHE_VERSION,
+        'source': signature,
+        'relative_accuracy': RELATIVE_ACCURACY,
+        'sketches': list(sketches),
+    }
+    arrays = {}
+    for name, sketch in sketches.items():
+        arrays.update(sketch.to_arrays(name))
+    save_npz_atomic(sketch_file, meta, arrays)
+
+
+def read_npz_meta(arrays):
+    """JSON meta entry of a sidecar written by save_npz_atomic()"""
+    return json.loads(str(arrays['meta']))
+
+
+def save_npz_atomic(npz_file, meta, arrays):
+    """np.savez arrays plus a JSON meta entry, via a temporary file and atomic rename"""
+    fd, tmp_file = tempfile.mkstemp(prefix='.sidecar-', suffix='.npz',
+                                    dir=os.path.dirname(os.path.abspath(npz_file)))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            np.savez(f, meta=json.dumps(meta), **arrays)
+        os.replace(tmp_file, npz_file)
+    except Exception:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+        raise
+
+
+def load_packet_sketches(csv_file, df=None, use_cache=True):
+    """
+    Delay sketches of a run, reusing <csv>.sketch.npz when it is current.
+
+    When the sidecar is missing or stale the sketches are built from df (or
+    from the CSV if df is None) and written back.
+    """
+    signature = source_signature(csv_file)
+    if use_cache:
+        sketches = _read_sketches(sketch_file_for(csv_file), signature)
+        if sketches is not None:
+            return sketches
+
+    if df is None:
+        df = load_packet_csv(csv_file, use_cache=use_cache)
+    sketches = packet_sketches(df)
+    if use_cache:
+        try:
+            save_packet_sketches(csv_file, sketches, signature)
+        except OSError as e:
+            print(f"⚠ Could not write latency sketches for {csv_file}: {e}")
+    return sketches
+
+
+def reduce_packet_csv(csv_file, streaming=False, chunksize=DEFAULT_CHUNK_ROWS, use_cache=True):
+    """
+    Load one run and reduce it to a PacketAccumulator (stats, sketches, time bins).
+
+    The DataFrame is dropped before returning, so the result is small enough
+    to send back from a worker process.
+    """
+    if streaming:
+        return stream_packet_stats(csv_file, chunksize, use_cache)
+
+    signature = source_signature(csv_file)
+    df = load_packet_csv(csv_file, use_cache)
+    accumulator = PacketAccumulator().update(df)
+    if not accumulator.columns:
+        accumulator.columns = list(df.columns)
+    if use_cache:
+        try:
+            save_packet_sketches(csv_file, accumulator.sketches, signature)
+        except OSError as e:
+            print(f"⚠ Could not write latency sketches for {csv_file}: {e}")
+    return accumulator
+
+
+def reduce_packet_csvs(csv_files, n_jobs=1, streaming=False, chunksize=DEFAULT_CHUNK_ROWS, use_cache=True,
+                       reducer=reduce_packet_csv):
+    """
+    Reduce several runs concurrently, yielding (key, accumulator, error) as each finishes.
+
+    csv_files maps a caller-chosen key to a CSV path.  With n_jobs=1 runs are
+    reduced in-process in the given order; otherwise in a pool of n_jobs
+    processes (0 = all cores), one run per worker at a time.  error is the
+    exception raised for that run (accumulator is then None).  reducer may
+    replace reduce_packet_csv with a picklable function of the same signature.
+    """
+    csv_files = dict(csv_files)
+    n_jobs = min(resolve_jobs(n_jobs), len(csv_files))
+
+    if n_jobs <= 1:
+        for key, csv_file in csv_files.items():
+            try:
+                yield key, reducer(csv_file, streaming, chunksize, use_cache), None
+            except Exception as e:
+                yield key, None, e
+        return
+
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        futures = {pool.submit(reducer, csv_file, streaming, chunksize, use_cache): key
+                   for key, csv_file in csv_files.items()}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                yield key, future.result(), None
+            except Exception as e:
+                yield key, None, e
+
+
+class CsvTail:
+    """Incremental reader for a CSV that is still being appended to"""
+    
+    def __init__(self, csv_file, typed=True, block_bytes=TAIL_BLOCK_BYTES):
+        """
+        typed=True applies the packet-trace dtypes to known columns;
+        block_bytes caps how much of the file one read_new() call reads.
+        """
+        self.csv_file = csv_file
+        self.typed = typed
+        self.block_bytes = block_bytes
+        self._reset()
+    
+    def _reset(self):
+        self.offset = 0
+        self.header = None
+        self.partial = b''
+        self.file_id = None
+        # Bytes of the file not yet read, as of the last read_new()
+        self.remaining = 0
+    
+    def read_new(self):
+        """
+        Return (rows, restarted) for the lines completed since the last call.
+        
+        rows is a DataFrame (possibly empty) or None while the file does not
+        exist.  Only whole lines are parsed; a trailing partial line waits for
+        the next call.  At most block_bytes are read per call; while
+        self.remaining > 0 the caller is behind and should call again.  If
+        the file shrank or was replaced, reading restarts from the top and
+        restarted is True.
+        """
+        try:
+            st = os.stat(self.csv_file)
+        except FileNotFoundError:
+            return None, False
+        
+        restarted = False
+        file_id = (st.st_dev, st.st_ino)
+        if self.file_id is not None and (file_id != self.file_id or st.st_size < self.offset):
+            self._reset()
+            restarted = True
+        self.file_id = file_id
+        
+        with open(self.csv_file, 'rb') as f:
+            f.seek(self.offset)
+            data = f.read(self.block_bytes)
+        self.offset += len(data)
+        self.remaining = max(st.st_size - self.offset, 0)
+        
+        data = self.partial + data
+        end = data.rfind(b'\n') + 1
+        self.partial = data[end:]
+        lines = data[:end]
+        
+        if self.header is None:
+            if not lines:
+                return None, restarted
+            newline = lines.index(b'\n') + 1
+            self.header, lines = lines[:newline], lines[newline:]
+        
+        columns = self.header.decode().strip().split(',')
+        if not lines:
+            return pd.DataFrame(columns=columns), restarted
+        
+        dtype = _parse_dtypes(columns) if self.typed else None
+        rows = pd.read_csv(io.BytesIO(self.header + lines), dtype=dtype)
+        return (apply_packet_dtypes(rows) if self.typed else rows), restarted
@@ -0,0 +1,318 @@
+"""
+Single-Pass Packet Metrics Kernel
+=================================
+
+Reduces a packet trace (packet-delivery-analysis.csv columns) to per-category
+statistics in one vectorized pass, without building filtered sub-DataFrames.
+
+Every packet gets a category code from its two attack flags:
+
+    0 = normal, 1 = wormhole only, 2 = blackhole only, 3 = both
+
+Counts, delivered counts and delay moments are reduced per code with
+np.bincount; the wormhole / blackhole / normal / overall views used by the
+analyzers are then combined from those four rows.
+
+packet_sketches() adds mergeable delay quantile sketches (latency_sketch.py)
+per category and per (source, destination) flow for tail-latency reporting.
+
+Author: VANET Security Research
+Date: October 2025
+"""
+
+import numpy as np
+
+from latency_sketch import GroupedSketch
+
+N_CATEGORIES = 4
+
+# Category codes making up each view (a packet may be on both attack paths)
+ALL = (0, 1, 2, 3)
+NORMAL = (0,)
+WORMHOLE = (1, 3)
+BLACKHOLE = (2, 3)
+
+
+def column_values(df, name, dtype):
+    """Column as a NumPy array, or None when the trace does not have it"""
+    if name not in df.columns:
+        return None
+    return df[name].to_numpy(dtype=dtype, copy=False)
+
+
+def category_codes(df):
+    """Per-packet category code derived from WormholeOnPath / BlackholeOnPath"""
+    codes = np.zeros(len(df), dtype=np.uint8)
+    wormhole = column_values(df, 'WormholeOnPath', bool)
+    blackhole = column_values(df, 'BlackholeOnPath', bool)
+    if wormhole is not None:
+        codes |= wormhole
+    if blackhole is not None:
+        codes |= blackhole.astype(np.uint8) << 1
+    return codes
+
+
+def flow_keys(df):
+    """Per-packet flow key packing (SourceNode, DestNode) into one uint64"""
+    src = column_values(df, 'SourceNode', np.uint64)
+    dst = column_values(df, 'DestNode', np.uint64)
+    if src is None or dst is None:
+        return np.zeros(len(df), dtype=np.uint64)
+    return (src << np.uint64(32)) | dst
+
+
+def unpack_flow_keys(keys):
+    """Inverse of flow_keys(): (source, destination) node arrays"""
+    keys = np.asarray(keys, dtype=np.uint64)
+    return (keys >> np.uint64(32)).astype(np.uint32), (keys & np.uint64(0xFFFFFFFF)).astype(np.uint32)
+
+
+def empty_stats():
+    """Statistics of an empty trace (identity element for merging)"""
+    return {
+        'packets': np.zeros(N_CATEGORIES, dtype=np.int64),
+        'delivered': np.zeros(N_CATEGORIES, dtype=np.int64),
+        'delay_sum': np.zeros(N_CATEGORIES),
+        'delay_m2': np.zeros(N_CATEGORIES),
+        'delay_min': np.full(N_CATEGORIES, np.inf),
+        'delay_max': np.full(N_CATEGORIES, -np.inf),
+        'send_min': np.inf,
+        'receive_max': -np.inf,
+    }
+
+
+def packet_stats(df):
+    """
+    Reduce a packet trace to per-category counts and delay moments.
+
+    Delay moments only cover delivered packets.  'delay_m2' is the sum of
+    squared deviations from each category's mean, so categories can be
+    combined (and traces merged) without losing precision.
+    """
+    stats = empty_stats()
+    if len(df) == 0:
+        return stats
+
+    codes = category_codes(df)
+    delivered = column_values(df, 'Delivered', bool)
+    if delivered is None:
+        delivered = np.zeros(len(df), dtype=bool)
+
+    stats['packets'] = np.bincount(codes, minlength=N_CATEGORIES)
+    stats['delivered'] = np.bincount(codes, weights=delivered, minlength=N_CATEGORIES).astype(np.int64)
+
+    delay = column_values(df, 'DelayMs', np.float64)
+    if delay is not None and delivered.any():
+        d_codes = codes[delivered]
+        d_delay = delay[delivered]
+        n = stats['delivered']
+        stats['delay_sum'] = np.bincount(d_codes, weights=d_delay, minlength=N_CATEGORIES)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = stats['delay_sum'] / n
+        dev = d_delay - means[d_codes]
+        stats['delay_m2'] = np.bincount(d_codes, weights=dev * dev, minlength=N_CATEGORIES)
+        np.minimum.at(stats['delay_min'], d_codes, d_delay)
+        np.maximum.at(stats['delay_max'], d_codes, d_delay)
+
+    send = column_values(df, 'SendTime', np.float64)
+    receive = column_values(df, 'ReceiveTime', np.float64)
+    if send is not None:
+        stats['send_min'] = float(send.min())
+    if receive is not None:
+        stats['receive_max'] = float(receive.max())
+
+    return stats
+
+
+def summarize(stats, categories=ALL):
+    """
+    Combine the per-category rows of packet_stats() into one view.
+
+    Returns plain Python numbers: packets, delivered, dropped, pdr (0-1) and
+    delay mean/min/max/std (ms, NaN when nothing was delivered; std uses
+    ddof=1 like pandas).
+    """
+    idx = list(categories)
+    packets = int(stats['packets'][idx].sum())
+    delivered = int(stats['delivered'][idx].sum())
+    n = stats['delivered'][idx].astype(np.float64)
+    delay_sum = stats['delay_sum'][idx]
+
+    view = {
+        'packets': packets,
+        'delivered': delivered,
+        'dropped': packets - delivered,
+        'pdr': delivered / packets if packets > 0 else 0.0,
+        'delay_mean': np.nan,
+        'delay_min': np.nan,
+        'delay_max': np.nan,
+        'delay_std': np.nan,
+    }
+    if delivered == 0:
+        return view
+
+    mean = delay_sum.sum() / delivered
+    # Chan et al. parallel combination of per-category sums of squares
+    has = n > 0
+    cat_means = delay_sum[has] / n[has]
+    m2 = stats['delay_m2'][idx][has].sum() + (n[has] * (cat_means - mean) ** 2).sum()
+
+    view['delay_mean'] = float(mean)
+    view['delay_min'] = float(stats['delay_min'][idx].min())
+    view['delay_max'] = float(stats['delay_max'][idx].max())
+    view['delay_std'] = float(np.sqrt(m2 / (delivered - 1))) if delivered > 1 else np.nan
+    return view
+
+
+def delivered_throughput_mbps(stats, packet_size_bytes=512, duration=None):
+    """Approximate goodput from delivered packets over the trace's time span"""
+    if duration is None:
+        duration = stats['receive_max'] - stats['send_min']
+    if not np.isfinite(duration) or duration <= 0:
+        return 0.0
+    delivered = int(stats['delivered'].sum())
+    return (delivered * packet_size_bytes * 8) / (duration * 1_000_000)
+
+
+def merge_stats(a, b):
+    """
+    Merge two packet_stats() results into a new one.
+
+    Delay moments are combined with the parallel Welford (Chan et al.)
+    update, so merging chunk statistics gives the same result as reducing
+    the concatenated trace.
+    """
+    merged = empty_stats()
+    na = a['delivered'].astype(np.float64)
+    nb = b['delivered'].astype(np.float64)
+    n = na + nb
+    with np.errstate(invalid='ignore', divide='ignore'):
+        delta = np.where(nb > 0, b['delay_sum'] / nb, 0) - np.where(na > 0, a['delay_sum'] / na, 0)
+        cross = np.where(n > 0, delta * delta * na * nb / n, 0)
+
+    merged['packets'] = a['packets'] + b['packets']
+    merged['delivered'] = a['delivered'] + b['delivered']
+    merged['delay_sum'] = a['delay_sum'] + b['delay_sum']
+    merged['delay_m2'] = a['delay_m2'] + b['delay_m2'] + cross
+    merged['delay_min'] = np.minimum(a['delay_min'], b['delay_min'])
+    merged['delay_max'] = np.maximum(a['delay_max'], b['delay_max'])
+    merged['send_min'] = min(a['send_min'], b['send_min'])
+    merged['receive_max'] = max(a['receive_max'], b['receive_max'])
+    return merged
+
+
+def empty_sketches():
+    """Sketches of an empty trace (identity element for merging)"""
+    return {'category': GroupedSketch(), 'flow': GroupedSketch()}
+
+
+def packet_sketches(df):
+    """
+    Delay quantile sketches of the delivered packets of a trace.
+
+    Returns {'category': GroupedSketch keyed by category code,
+             'flow': GroupedSketch keyed by flow_keys()}.
+    """
+    sketches = empty_sketches()
+    delivered = column_values(df, 'Delivered', bool)
+    delay = column_values(df, 'DelayMs', np.float64)
+    if len(df) == 0 or delivered is None or delay is None or not delivered.any():
+        return sketches
+
+    d_delay = delay[delivered]
+    sketches['category'] = GroupedSketch.from_values(category_codes(df)[delivered], d_delay)
+    sketches['flow'] = GroupedSketch.from_values(flow_keys(df)[delivered], d_delay)
+    return sketches
+
+
+def merge_sketches(a, b):
+    """Merge two packet_sketches() results into a"""
+    for name, sketch in b.items():
+        a[name].merge(sketch)
+    return a
+
+
+def delay_percentiles(sketches, categories=ALL):
+    """p50/p95/p99 delay (ms) of a category view, NaN when nothing was delivered"""
+    return sketches['category'].select(categories).percentiles()
+
+
+def _add_padded(total, part):
+    """Element-wise sum of two 1-D count arrays of possibly different length"""
+    if len(part) > len(total):
+        total, part = part, total
+    total = total.copy()
+    total[:len(part)] += part
+    return total
+
+
+class PacketAccumulator:
+    """Mergeable running reduction of a packet trace read in chunks"""
+    
+    def __init__(self, time_bin_s=1.0):
+        """Start empty; SendTime is tallied into fixed time_bin_s-wide bins"""
+        self.time_bin_s = time_bin_s
+        self.columns = []
+        self.stats = empty_stats()
+        self.sketches = empty_sketches()
+        self.sent_by_bin = np.zeros(0, dtype=np.int64)
+        self.delivered_by_bin = np.zeros(0, dtype=np.int64)
+    
+    @property
+    def rows(self):
+        """Number of packets folded in so far"""
+        return int(self.stats['packets'].sum())
+    
+    def update(self, chunk):
+        """Fold one DataFrame chunk into the running totals"""
+        if not self.columns:
+            self.columns = list(chunk.columns)
+        self.stats = merge_stats(self.stats, packet_stats(chunk))
+        merge_sketches(self.sketches, packet_sketches(chunk))
+        
+        if 'SendTime' in chunk.columns and len(chunk) > 0:
+            bins = (chunk['SendTime'].to_numpy(dtype=np.float64) // self.time_bin_s).astype(np.int64)
+            bins = np.maximum(bins, 0)
+            self.sent_by_bin = _add_padded(self.sent_by_bin, np.bincount(bins))
+            delivered = column_values(chunk, 'Delivered', bool)
+            if delivered is not None:
+                self.delivered_by_bin = _add_padded(
+                    self.delivered_by_bin, np.bincount(bins[delivered], minlength=len(self.sent_by_bin)))
+        return self
+    
+    def to_arrays(self):
+        """Flat dict of arrays (for np.savez) that from_arrays() restores"""
+        arrays = {f'stats_{name}': np.asarray(value) for name, value in self.stats.items()}
+        for name, sketch in self.sketches.items():
+            arrays.update(sketch.to_arrays(f'sketch_{name}'))
+        arrays['sent_by_bin'] = self.sent_by_bin
+        arrays['delivered_by_bin'] = self.delivered_by_bin
+        arrays['time_bin_s'] = np.asarray(self.time_bin_s)
+        arrays['columns'] = np.asarray(self.columns, dtype=str)
+        return arrays
+    
+    @classmethod
+    def from_arrays(cls, arrays):
+        """Inverse of to_arrays()"""
+        accumulator = cls(time_bin_s=float(arrays['time_bin_s']))
+        for name, value in empty_stats().items():
+            stored = arrays[f'stats_{name}']
+            accumulator.stats[name] = stored if np.ndim(value) else float(stored)
+        for name in accumulator.sketches:
+            accumulator.sketches[name] = GroupedSketch.from_arrays(arrays, f'sketch_{name}')
+        accumulator.sent_by_bin = arrays['sent_by_bin']
+        accumulator.delivered_by_bin = arrays['delivered_by_bin']
+        accumulator.columns = [str(col) for col in arrays['columns']]
+        return accumulator
+    
+    def merge(self, other):
+        """Fold another accumulator (same time_bin_s) into this one"""
+        if other.time_bin_s != self.time_bin_s:
+            raise ValueError("Cannot merge accumulators with different time bins")
+        if not self.columns:
+            self.columns = list(other.columns)
+        self.stats = merge_stats(self.stats, other.stats)
+        merge_sketches(self.sketches, other.sketches)
+        self.sent_by_bin = _add_padded(self.sent_by_bin, other.sent_by_bin)
+        self.delivered_by_bin = _add_padded(self.delivered_by_bin, other.delivered_by_bin)
+        return self
@@ -0,0 +1,101 @@
+"""
+Parallel Figure Rendering
+=========================
+
+Runs independent figure renderers in a process pool on the Agg backend.
+
+Each job is a module-level render function plus the small, pre-aggregated
+arguments it needs (bar heights, histogram counts, box statistics, ...), so
+workers never receive a full packet DataFrame.  With n_jobs=1 the figures are
+rendered in-process, one after another, exactly as before.
+
+Renderers get pyplot from load_pyplot() when they run, so matplotlib and
+seaborn are only imported by code paths that draw a figure; metrics-only
+runs of the analyzers never load them.
+
+Author: VANET Security Research
+Date: October 2025
+"""
+
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+# name: label used in the timing report; func: picklable module-level
+# renderer; args: positional arguments passed to func
+RenderJob = namedtuple('RenderJob', ['name', 'func', 'args'])
+
+
+def resolve_jobs(n_jobs):
+    """Translate a --jobs value into a worker count (0 or less = all cores)"""
+    if n_jobs is None or n_jobs <= 0:
+        return os.cpu_count() or 1
+    return n_jobs
+
+
+def load_pyplot(rc_params=None):
+    """
+    matplotlib.pyplot with the seaborn whitegrid style and rc_params applied.
+
+    matplotlib and seaborn are imported here, on the first figure, instead of
+    at module load.
+    """
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+    sns.set_style("whitegrid")
+    if rc_params:
+        plt.rcParams.update(rc_params)
+    return plt
+
+
+def _init_worker():
+    """Worker initializer: headless rendering only"""
+    import matplotlib
+    matplotlib.use('Agg', force=True)
+
+
+def _timed_render(func, args):
+    """Run one renderer and return its wall-clock time in seconds"""
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def render_figures(jobs, n_jobs=1):
+    """
+    Render every job and return {name: seconds}.
+
+    A failing figure is reported and skipped; the remaining figures still
+    render.  Failed figures are absent from the returned timings.
+    """
+    n_jobs = min(resolve_jobs(n_jobs), len(jobs))
+    timings = {}
+
+    if n_jobs <= 1:
+        for job in jobs:
+            try:
+                timings[job.name] = _timed_render(job.func, job.args)
+            except Exception as e:
+                print(f"❌ Failed to render {job.name}: {e}")
+        return timings
+
+    with ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker) as pool:
+        futures = {pool.submit(_timed_render, job.func, job.args): job.name for job in jobs}
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                timings[name] = future.result()
+            except Exception as e:
+                print(f"❌ Failed to render {name}: {e}")
+
+    # Report in submission order regardless of completion order
+    return {job.name: timings[job.name] for job in jobs if job.name in timings}
+
+
+def print_render_timings(timings, wall_seconds, n_jobs):
+    """Print the per-figure timing report"""
+    print(f"⏱  Render timings ({resolve_jobs(n_jobs)} job(s), {wall_seconds:.2f}s wall):")
+    for name, seconds in timings.items():
+        print(f"   {name:.<40} {seconds:>7.2f}s")
+    print(f"   {'Total figure time':.<40} {sum(timings.values()):>7.2f}s")
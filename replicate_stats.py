@@ -0,0 +1,160 @@
+"""
+Replicate Statistics and Bootstrap Confidence Intervals
+=======================================================
+
+Seeds of one sweep point (same sweep directory, architecture, attack,
+percentage and mitigation setting) are replicates of a single scenario.
+The analyzers reduce every run to a few numbers (PDR, delay, loss,
+throughput, ...) and this module turns the per-run values of each scenario
+into a mean and a percentile bootstrap confidence interval.
+
+The bootstrap works on those reduced statistics only, never on packets,
+and is vectorized across scenarios and metrics: each resample draws run
+indices for every scenario at once (a padded scenario x run matrix with a
+validity mask), and all metrics of a run are resampled together, so
+columns that are per-pair differences (with - without mitigation of the
+same seed) give paired-difference intervals.  10,000 resamples of 100
+scenarios x 4 metrics take about a second on one core.
+
+Scenarios with fewer than MIN_CI_RUNS runs get the mean and a NaN
+interval (so ci_verdict() gives '?').  With 2-3 seeds the percentile
+bootstrap of the mean is just the span of the seed values, so its
+"interval" would only say whether every seed had the same sign; a
+zero-width interval for a single seed would overstate it even more.
+
+Author: VANET Security Research
+Date: October 2025
+"""
+
+import numpy as np
+
+DEFAULT_RESAMPLES = 10000
+DEFAULT_CONFIDENCE = 0.95
+# Fixed so that tables are reproducible run to run
+DEFAULT_SEED = 20251001
+
+# Fewest runs for which an interval is reported; below this the bootstrap
+# collapses to the seed min/max
+MIN_CI_RUNS = 5
+
+# Resamples drawn per vectorized step (bounds the index array size)
+RESAMPLE_BLOCK = 1000
+
+
+def bootstrap_means(groups, n_resamples=DEFAULT_RESAMPLES, confidence=DEFAULT_CONFIDENCE, seed=DEFAULT_SEED,
+                    min_runs=MIN_CI_RUNS):
+    """
+    Mean and bootstrap CI of each column of each group.
+
+    groups is a list of (n_runs, n_metrics) arrays (1-D arrays are one
+    metric).  Returns (n, mean, low, high): n is (n_groups,), the others
+    (n_groups, n_metrics); low/high are NaN for groups of fewer than
+    min_runs runs (and always for single runs).
+    """
+    groups = [np.asarray(g, dtype=np.float64) for g in groups]
+    groups = [g.reshape(len(g), -1) for g in groups]
+    n_groups = len(groups)
+    n_metrics = groups[0].shape[1] if groups else 0
+    sizes = np.array([len(g) for g in groups], dtype=np.int64)
+    if n_groups == 0:
+        empty = np.zeros((0, n_metrics))
+        return sizes, empty, empty, empty
+    if (sizes == 0).any():
+        raise ValueError("Every group needs at least one run")
+
+    width = int(sizes.max())
+    padded = np.zeros((n_groups, width, n_metrics))
+    for i, g in enumerate(groups):
+        padded[i, :len(g)] = g
+    mean = padded.sum(axis=1) / sizes[:, None]
+
+    low = np.full((n_groups, n_metrics), np.nan)
+    high = np.full((n_groups, n_metrics), np.nan)
+    replicated = sizes >= max(2, min_runs)
+    if not replicated.any() or n_resamples <= 0:
+        return sizes, mean, low, high
+
+    # Only groups with replicates are resampled, padded to their widest
+    sub_sizes = sizes[replicated]
+    sub_width = int(sub_sizes.max())
+    flat = padded[replicated, :sub_width].reshape(-1, n_metrics)
+    offsets = (np.arange(len(sub_sizes)) * sub_width)[:, None]
+    valid = (np.arange(sub_width)[None, :] < sub_sizes[:, None])[..., None]
+
+    rng = np.random.default_rng(seed)
+    resampled = np.empty((n_resamples, len(sub_sizes), n_metrics))
+    for start in range(0, n_resamples, RESAMPLE_BLOCK):
+        count = min(RESAMPLE_BLOCK, n_resamples - start)
+        # Uniform run index below each group's own size; padding slots are masked out
+        index = (rng.random((count, len(sub_sizes), sub_width)) * sub_sizes[:, None]).astype(np.int64)
+        draws = flat[index + offsets]
+        resampled[start:start + count] = (draws * valid).sum(axis=2) / sub_sizes[:, None]
+
+    alpha = (1 - confidence) / 2
+    low[replicated], high[replicated] = np.quantile(resampled, [alpha, 1 - alpha], axis=0)
+    return sizes, mean, low, high
+
+
+def ci_table(labels, groups, columns, label_column='Scenario', n_resamples=DEFAULT_RESAMPLES,
+             confidence=DEFAULT_CONFIDENCE, seed=DEFAULT_SEED, min_runs=MIN_CI_RUNS):
+    """
+    DataFrame with one row per group: label_column, N_Runs, and for every
+    metric column <col> (mean), <col>_CI_Low and <col>_CI_High.
+    """
+    import pandas as pd
+
+    sizes, mean, low, high = bootstrap_means(groups, n_resamples, confidence, seed, min_runs)
+    table = {label_column: list(labels), 'N_Runs': sizes}
+    for j, column in enumerate(columns):
+        table[column] = mean[:, j] if len(sizes) else []
+        table[f'{column}_CI_Low'] = low[:, j] if len(sizes) else []
+        table[f'{column}_CI_High'] = high[:, j] if len(sizes) else []
+    return pd.DataFrame(table)
+
+
+def grouped_ci_table(df, group_column, columns, n_resamples=DEFAULT_RESAMPLES, confidence=DEFAULT_CONFIDENCE,
+                     seed=DEFAULT_SEED, min_runs=MIN_CI_RUNS):
+    """ci_table() of the rows of df grouped by group_column (groups in order of first appearance)"""
+    labels, groups = [], []
+    for label, rows in df.groupby(group_column, sort=False)[list(columns)]:
+        labels.append(label)
+        groups.append(rows.to_numpy(dtype=np.float64))
+    return ci_table(labels, groups, columns, group_column, n_resamples, confidence, seed, min_runs)
+
+
+def error_bars(table, column):
+    """Asymmetric (2, n) yerr of a ci_table column; 0 where there is no interval"""
+    mean = table[column].to_numpy(dtype=np.float64)
+    below = mean - table[f'{column}_CI_Low'].to_numpy(dtype=np.float64)
+    above = table[f'{column}_CI_High'].to_numpy(dtype=np.float64) - mean
+    return np.nan_to_num(np.vstack([below, above]), nan=0.0)
+
+
+def ci_verdict(low, high, higher_is_better=True):
+    """
+    '✓' if the CI lies entirely on the better side of 0, '✗' if entirely
+    worse, '~' if it spans 0, '?' without an interval (fewer than MIN_CI_RUNS runs)
+    """
+    if not (np.isfinite(low) and np.isfinite(high)):
+        return '?'
+    if not higher_is_better:
+        low, high = -high, -low
+    if low > 0:
+        return '✓'
+    if high < 0:
+        return '✗'
+    return '~'
+
+
+def format_ci(mean, low, high, fmt='.2f'):
+    """'1.23 [0.98, 1.51]', or just the mean without an interval"""
+    if np.isfinite(low) and np.isfinite(high):
+        return f'{mean:{fmt}} [{low:{fmt}}, {high:{fmt}}]'
+    return f'{mean:{fmt}}'
+
+
+def latex_ci(mean, low, high, fmt='.2f'):
+    """Table cell with the mean and, when available, a small-print CI"""
+    if np.isfinite(low) and np.isfinite(high):
+        return f'{mean:{fmt}} {{\\scriptsize[{low:{fmt}}, {high:{fmt}}]}}'
+    return f'{mean:{fmt}}'
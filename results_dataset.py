@@ -0,0 +1,563 @@
+#!/usr/bin/env python3
+"""
+Partitioned Cross-Sweep Results Dataset
+=======================================
+
+One dataset directory collects the runs of any number of result
+directories (sdvn_attack_results_<timestamp>, sdvn_mitigation_comparison_
+<timestamp>, sweep_runner.py output, ...), partitioned Hive-style by run
+identity:
+
+    <dataset>/_dataset.json
+    <dataset>/attack=blackhole/percentage=10/mitigation=false/
+              architecture=__HIVE_DEFAULT_PARTITION__/seed=1/part-<id>/
+        meta.json       run identity, source sweep, file signatures, columns
+        packets/        packet trace, one <column>.npy per column (memory-mapped)
+        metrics.npz     reduced PacketAccumulator (stats, sketches, time bins)
+        files/          the run's other CSVs (Metric,Value results, snapshots)
+
+A value missing from the run name (no percentage for the baseline, no
+architecture tag, no seed) is stored as __HIVE_DEFAULT_PARTITION__ and reads
+back as None.
+
+Queries prune on the directory names: only the partition directories that
+match the filters are listed, and only the requested .npy columns of the
+surviving parts are opened.  Filters take a value, a list of values or a
+predicate, e.g. dataset.scan(['DelayMs'], attack='blackhole',
+percentage=[10, 20], seed=lambda s: s < 5).  The analyzers read a dataset
+through catalog() and reduce_runs(), which serves the stored reductions
+without touching packets at all.
+
+Re-ingesting a results directory only rewrites runs whose files changed.
+
+Usage:
+    python3 results_dataset.py ingest <dataset> <results_dir> [<results_dir> ...] [--jobs N]
+    python3 results_dataset.py query <dataset> [--where attack=blackhole --where percentage=10,20] [-o out.csv]
+
+Author: VANET Security Research
+Date: October 2025
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from packet_loader import PACKET_DTYPES, load_packet_csv, source_signature
+from packet_metrics import PacketAccumulator, summarize
+from plot_scheduler import resolve_jobs
+from scenario_catalog import PACKET_FILE, RunInfo, ScenarioCatalog, run_key
+
+DATASET_FILE = '_dataset.json'
+DATASET_VERSION = 1
+
+# Partition keys, outermost first
+PARTITION_KEYS = ('attack', 'percentage', 'mitigation', 'architecture', 'seed')
+NULL_PARTITION = '__HIVE_DEFAULT_PARTITION__'
+
+PART_PREFIX = 'part-'
+PART_META = 'meta.json'
+PACKETS_DIR = 'packets'
+METRICS_FILE = 'metrics.npz'
+FILES_DIR = 'files'
+
+
+# ----------------------------------------------------------------------------
+# Partition values
+# ----------------------------------------------------------------------------
+
+def encode_value(value):
+    """Directory spelling of a partition value"""
+    if value is None:
+        return NULL_PARTITION
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+
+def decode_value(key, text):
+    """Typed partition value of a directory name component (inverse of encode_value)"""
+    if text == NULL_PARTITION or text.lower() in ('none', 'null'):
+        return None
+    if key == 'mitigation':
+        lowered = text.lower()
+        if lowered not in ('true', 'false'):
+            raise ValueError(f"mitigation must be true or false, not '{text}'")
+        return lowered == 'true'
+    if key in ('percentage', 'seed'):
+        return int(text)
+    return text
+
+
+def partition_values(run):
+    """{key: value} of a RunInfo"""
+    return {key: getattr(run, key) for key in PARTITION_KEYS}
+
+
+def partition_path(values):
+    """Relative directory of a partition, e.g. attack=wormhole/percentage=10/..."""
+    return os.path.join(*(f'{key}={encode_value(values[key])}' for key in PARTITION_KEYS))
+
+
+def _matches(value, wanted):
+    """Filter semantics: predicate, collection membership, or equality"""
+    if callable(wanted):
+        return bool(wanted(value))
+    if isinstance(wanted, (list, tuple, set, frozenset)):
+        return value in wanted
+    return value == wanted
+
+
+def _check_filters(filters):
+    unknown = set(filters) - set(PARTITION_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown partition key(s): {', '.join(sorted(unknown))} "
+                         f"(expected {', '.join(PARTITION_KEYS)})")
+
+
+def parse_filters(expressions):
+    """
+    {key: [values]} from 'key=v1[,v2...]' strings (the --where options);
+    'none' / 'null' select the missing-value partition.
+    """
+    filters = {}
+    for expression in expressions or []:
+        key, sep, values = expression.partition('=')
+        key = key.strip()
+        if not sep or key not in PARTITION_KEYS:
+            raise ValueError(f"Bad filter '{expression}' (expected key=value[,value] with key in "
+                             f"{', '.join(PARTITION_KEYS)})")
+        filters.setdefault(key, []).extend(decode_value(key, v.strip()) for v in values.split(','))
+    return filters
+
+
+def is_dataset(path):
+    """True if path is the root of a results dataset"""
+    return os.path.isfile(os.path.join(path, DATASET_FILE))
+
+
+# ----------------------------------------------------------------------------
+# Ingest
+# ----------------------------------------------------------------------------
+
+def _part_id(source):
+    """Stable part directory name of a source run (its absolute path)"""
+    return PART_PREFIX + hashlib.sha1(os.path.abspath(source).encode()).hexdigest()[:16]
+
+
+def _read_meta(part_dir):
+    try:
+        with open(os.path.join(part_dir, PART_META)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def ingest_run(dataset_root, run, source, sweep):
+    """
+    Write one run into its partition (worker function).
+
+    source is the run's absolute path (directory or flat-file prefix), sweep
+    the sweep it came from.  Returns (status, part path, packets) with status
+    'added', 'updated' or 'unchanged'; a part whose files still have the
+    recorded size and mtime is left alone.
+    """
+    part_dir = os.path.join(dataset_root, partition_path(partition_values(run)), _part_id(source))
+    signatures = {name: source_signature(path) for name, path in sorted(run.files.items())}
+    old_meta = _read_meta(part_dir)
+    if old_meta is not None and old_meta.get('version') == DATASET_VERSION and old_meta.get('files') == signatures:
+        return 'unchanged', part_dir, old_meta.get('rows', 0)
+
+    os.makedirs(os.path.dirname(part_dir), exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix='.part-', dir=os.path.dirname(part_dir))
+    try:
+        columns, rows = [], 0
+        csv_file = run.files.get(PACKET_FILE)
+        if csv_file is not None:
+            df = load_packet_csv(csv_file)
+            packets_dir = os.path.join(tmp_dir, PACKETS_DIR)
+            os.mkdir(packets_dir)
+            for column in df.columns:
+                np.save(os.path.join(packets_dir, f'{column}.npy'), df[column].to_numpy())
+            columns, rows = list(df.columns), len(df)
+            accumulator = PacketAccumulator().update(df)
+            if not accumulator.columns:
+                accumulator.columns = columns
+            np.savez(os.path.join(tmp_dir, METRICS_FILE), **accumulator.to_arrays())
+            del df
+
+        other_files = {name: path for name, path in run.files.items() if name != PACKET_FILE}
+        if other_files:
+            os.mkdir(os.path.join(tmp_dir, FILES_DIR))
+            for name, path in other_files.items():
+                shutil.copy2(path, os.path.join(tmp_dir, FILES_DIR, name))
+
+        meta = {
+            'version': DATASET_VERSION,
+            'run_id': run.run_id,
+            'index': run.index,
+            'sweep': sweep,
+            'source': source,
+            'partition': {key: partition_values(run)[key] for key in PARTITION_KEYS},
+            'files': signatures,
+            'rows': rows,
+            'columns': columns,
+        }
+        with open(os.path.join(tmp_dir, PART_META), 'w') as f:
+            json.dump(meta, f, indent=1)
+
+        if os.path.isdir(part_dir):
+            shutil.rmtree(part_dir)
+        os.replace(tmp_dir, part_dir)
+    except Exception:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    return ('updated' if old_meta is not None else 'added'), part_dir, rows
+
+
+# ----------------------------------------------------------------------------
+# Dataset
+# ----------------------------------------------------------------------------
+
+class DatasetPart:
+    """One ingested run: its partition values, directory and meta.json"""
+
+    def __init__(self, values, path, meta):
+        self.values = values
+        self.path = path
+        self.meta = meta
+
+    @property
+    def columns(self):
+        return self.meta.get('columns', [])
+
+    @property
+    def packets_dir(self):
+        return os.path.join(self.path, PACKETS_DIR)
+
+    def has_packets(self):
+        return bool(self.meta.get('columns'))
+
+    def load_columns(self, columns=None):
+        """{column: memory-mapped array} of the requested (default: all) packet columns"""
+        available = self.columns
+        wanted = available if columns is None else [c for c in columns if c in available]
+        return {column: np.load(os.path.join(self.packets_dir, f'{column}.npy'), mmap_mode='r')
+                for column in wanted}
+
+    def accumulator(self):
+        """Stored PacketAccumulator, or None for a run without a packet trace"""
+        metrics_file = os.path.join(self.path, METRICS_FILE)
+        if not os.path.exists(metrics_file):
+            return None
+        with np.load(metrics_file) as arrays:
+            return PacketAccumulator.from_arrays({name: arrays[name] for name in arrays.files})
+
+    def files(self):
+        """{csv name: path} of the run's stored CSVs besides the packet trace"""
+        files_dir = os.path.join(self.path, FILES_DIR)
+        if not os.path.isdir(files_dir):
+            return {}
+        return {name: os.path.join(files_dir, name) for name in sorted(os.listdir(files_dir))}
+
+
+class ResultsDataset:
+    """Hive-partitioned dataset of ingested runs"""
+
+    def __init__(self, root, create=False):
+        self.root = root
+        meta_file = os.path.join(root, DATASET_FILE)
+        if not os.path.exists(meta_file):
+            if not create:
+                raise FileNotFoundError(f"No results dataset at {root} (missing {DATASET_FILE})")
+            os.makedirs(root, exist_ok=True)
+            with open(meta_file, 'w') as f:
+                json.dump({'version': DATASET_VERSION, 'partitioning': list(PARTITION_KEYS)}, f, indent=1)
+        with open(meta_file) as f:
+            meta = json.load(f)
+        if meta.get('version') != DATASET_VERSION or meta.get('partitioning') != list(PARTITION_KEYS):
+            raise ValueError(f"Unsupported dataset layout in {meta_file}")
+
+    # -- ingest ---------------------------------------------------------------
+
+    def ingest(self, results_dir, n_jobs=1):
+        """
+        Add every run discovered under results_dir, n_jobs runs at a time
+        (0 = all cores).  Returns {'added': n, 'updated': n, 'unchanged': n, 'failed': n}.
+        """
+        catalog = ScenarioCatalog.discover(results_dir)
+        sweep_root = os.path.basename(os.path.abspath(results_dir))
+        tasks = []
+        for run in catalog:
+            source = os.path.join(os.path.abspath(results_dir), run_key(run))
+            sweep = os.path.normpath(os.path.join(sweep_root, os.path.dirname(run_key(run))))
+            tasks.append((run, source, sweep))
+
+        counts = {'added': 0, 'updated': 0, 'unchanged': 0, 'failed': 0}
+        n_jobs = min(resolve_jobs(n_jobs), len(tasks))
+        for run, outcome, error in self._ingest_tasks(tasks, n_jobs):
+            if error is not None:
+                counts['failed'] += 1
+                print(f"  ✗ {run.run_id}: {error}")
+                continue
+            status, part_dir, rows = outcome
+            counts[status] += 1
+            if status != 'unchanged':
+                print(f"  ✓ {status.title()}: {os.path.relpath(part_dir, self.root)} ({rows} packets)")
+        return counts
+
+    def _ingest_tasks(self, tasks, n_jobs):
+        """Yield (run, (status, part, rows), error) per task, in a process pool when n_jobs > 1"""
+        if n_jobs <= 1:
+            for run, source, sweep in tasks:
+                try:
+                    yield run, ingest_run(self.root, run, source, sweep), None
+                except Exception as e:
+                    yield run, None, e
+            return
+
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            futures = {pool.submit(ingest_run, self.root, run, source, sweep): run
+                       for run, source, sweep in tasks}
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result(), None
+                except Exception as e:
+                    yield futures[future], None, e
+
+    # -- query ----------------------------------------------------------------
+
+    def partitions(self, **filters):
+        """
+        [(values, directory)] of the leaf partitions matching filters.
+
+        Each level lists only the subdirectories whose value passes its
+        filter, so pruned subtrees are never opened.
+        """
+        _check_filters(filters)
+        level = [({}, self.root)]
+        for key in PARTITION_KEYS:
+            prefix = f'{key}='
+            next_level = []
+            for values, directory in level:
+                try:
+                    names = sorted(os.listdir(directory))
+                except OSError:
+                    continue
+                for name in names:
+                    if not name.startswith(prefix):
+                        continue
+                    value = decode_value(key, name[len(prefix):])
+                    if key in filters and not _matches(value, filters[key]):
+                        continue
+                    next_level.append((dict(values, **{key: value}), os.path.join(directory, name)))
+            level = next_level
+        return level
+
+    def parts(self, **filters):
+        """DatasetPart of every ingested run in the matching partitions"""
+        parts = []
+        for values, directory in self.partitions(**filters):
+            leaf = []
+            for name in os.listdir(directory):
+                if not name.startswith(PART_PREFIX):
+                    continue
+                meta = _read_meta(os.path.join(directory, name))
+                if meta is not None and meta.get('version') == DATASET_VERSION:
+                    leaf.append(DatasetPart(values, os.path.join(directory, name), meta))
+            parts += sorted(leaf, key=lambda part: (part.meta['sweep'], part.meta['run_id']))
+        return parts
+
+    def part_of(self, packets_dir):
+        """DatasetPart owning a catalog() run's RunInfo.files[PACKET_FILE], or None"""
+        path = os.path.dirname(os.path.abspath(packets_dir))
+        meta = _read_meta(path)
+        if meta is None or meta.get('version') != DATASET_VERSION:
+            return None
+        return DatasetPart(meta['partition'], path, meta)
+
+    def scan(self, columns=None, **filters):
+        """
+        Packet rows of the matching runs as one DataFrame, with only the
+        requested columns (default: all) plus 'Run', 'Sweep' and the
+        partition keys.  Runs without any requested column are skipped.
+        """
+        import pandas as pd
+
+        frames = []
+        for part in self.parts(**filters):
+            if not part.has_packets():
+                continue
+            arrays = part.load_columns(columns)
+            if not arrays:
+                continue
+            frame = pd.DataFrame(arrays, copy=False)
+            frame.insert(0, 'Run', part.meta['run_id'])
+            frame.insert(1, 'Sweep', part.meta['sweep'])
+            for i, key in enumerate(PARTITION_KEYS):
+                frame.insert(2 + i, key, part.values[key])
+            frames.append(frame)
+
+        if not frames:
+            wanted = list(columns) if columns is not None else list(PACKET_DTYPES)
+            return pd.DataFrame(columns=['Run', 'Sweep', *PARTITION_KEYS, *wanted])
+        table = pd.concat(frames, ignore_index=True)
+        for key in ('Run', 'Sweep', 'attack', 'architecture'):
+            table[key] = table[key].astype('category')
+        return table
+
+    def catalog(self, **filters):
+        """
+        ScenarioCatalog of the matching runs, for the analyzers.
+
+        Each run's directory is '<sweep>/<run id>', so seeds of one sweep
+        point group as replicates and equal labels from different sweeps are
+        told apart.  files holds the stored CSVs plus PACKET_FILE pointing at
+        the part's packets/ directory, which reduce_runs() understands.
+        """
+        runs, seen = [], set()
+        for part in self.parts(**filters):
+            meta = part.meta
+            directory = os.path.join(meta['sweep'], meta['run_id'])
+            if directory in seen:
+                # The same sweep name ingested from two places
+                directory = os.path.join(f"{meta['sweep']}#{os.path.basename(part.path)[len(PART_PREFIX):]}",
+                                         meta['run_id'])
+            seen.add(directory)
+            files = part.files()
+            if part.has_packets():
+                files[PACKET_FILE] = part.packets_dir
+            runs.append(RunInfo(run_id=meta['run_id'], directory=directory, layout='dir', index=meta['index'],
+                                files=files, **part.values))
+        runs.sort(key=lambda r: (os.path.dirname(r.directory), r.index, -1 if r.seed is None else r.seed, r.run_id))
+        return ScenarioCatalog(self.root, runs)
+
+    def reduce_runs(self, packet_dirs):
+        """
+        Stored PacketAccumulator of each run, with the (key, accumulator,
+        error) protocol of metrics_store.reduce_runs; packet_dirs maps a
+        caller key to RunInfo.files[PACKET_FILE] of a catalog() run.
+        """
+        for key, packets_dir in dict(packet_dirs).items():
+            part = self.part_of(packets_dir)
+            try:
+                accumulator = part.accumulator() if part is not None else None
+            except (OSError, ValueError, KeyError) as e:
+                yield key, None, e
+                continue
+            if accumulator is None:
+                yield key, None, FileNotFoundError(f"No stored reduction for {packets_dir}")
+            else:
+                yield key, accumulator, None
+
+    def summary(self, **filters):
+        """
+        One row per matching run from the stored reductions only: partition
+        keys, sweep, run id, packets, delivered, PDR and mean delay.
+        """
+        import pandas as pd
+
+        rows = []
+        for part in self.parts(**filters):
+            accumulator = part.accumulator()
+            if accumulator is None:
+                continue
+            overall = summarize(accumulator.stats)
+            rows.append(dict(part.values, Sweep=part.meta['sweep'], Run=part.meta['run_id'],
+                             Packets=overall['packets'], Delivered=overall['delivered'],
+                             PDR=overall['pdr'], Avg_Delay_ms=overall['delay_mean']))
+        return pd.DataFrame(rows, columns=[*PARTITION_KEYS, 'Sweep', 'Run', 'Packets', 'Delivered',
+                                           'PDR', 'Avg_Delay_ms'])
+
+
+def load_packet_columns(packet_file, columns):
+    """
+    DataFrame of the available columns among those requested of a run's
+    RunInfo.files[PACKET_FILE]: a packet CSV (through the column cache) or
+    the packets/ directory of a dataset part (memory-mapped).
+    """
+    import pandas as pd
+
+    if os.path.isdir(packet_file):
+        part = DatasetPart({}, os.path.dirname(os.path.abspath(packet_file)),
+                           _read_meta(os.path.dirname(os.path.abspath(packet_file))) or {})
+        return pd.DataFrame(part.load_columns(columns), copy=False)
+    df = load_packet_csv(packet_file)
+    return df[[column for column in columns if column in df.columns]]
+
+
+def open_source(path, where=None):
+    """
+    (dataset, filters) if path is a results dataset, else (None, {}); the
+    analyzers call this on their results_dir argument.  Raises ValueError on
+    --where filters for a plain results directory.
+    """
+    filters = parse_filters(where)
+    if is_dataset(path):
+        return ResultsDataset(path), filters
+    if filters:
+        raise ValueError("--where only applies to a results dataset (see results_dataset.py ingest)")
+    return None, {}
+
+
+# ----------------------------------------------------------------------------
+# Command line
+# ----------------------------------------------------------------------------
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Partitioned dataset of SDVN results across sweeps')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    ingest = commands.add_parser('ingest', help='Add the runs of result directories to a dataset')
+    ingest.add_argument('dataset')
+    ingest.add_argument('results_dirs', nargs='+')
+    ingest.add_argument('--jobs', '-j', type=int, default=1,
+                        help='Runs ingested in parallel processes (0 = all cores, default: 1)')
+
+    query = commands.add_parser('query', help='Per-run PDR and delay of the matching partitions')
+    query.add_argument('dataset')
+    query.add_argument('--where', action='append', metavar='KEY=V1[,V2]',
+                       help=f"Partition filter, repeatable; keys: {', '.join(PARTITION_KEYS)}")
+    query.add_argument('--output', '-o', help='Write the table to this CSV file')
+    args = parser.parse_args(argv)
+
+    if args.command == 'ingest':
+        dataset = ResultsDataset(args.dataset, create=True)
+        totals = {'added': 0, 'updated': 0, 'unchanged': 0, 'failed': 0}
+        for results_dir in args.results_dirs:
+            if not os.path.isdir(results_dir):
+                print(f"❌ Not a directory: {results_dir}")
+                totals['failed'] += 1
+                continue
+            print(f"📥 Ingesting {results_dir}")
+            for status, count in dataset.ingest(results_dir, args.jobs).items():
+                totals[status] += count
+        print(f"\n✅ {totals['added']} added, {totals['updated']} updated, "
+              f"{totals['unchanged']} unchanged, {totals['failed']} failed → {args.dataset}")
+        return 1 if totals['failed'] else 0
+
+    try:
+        dataset = ResultsDataset(args.dataset)
+        filters = parse_filters(args.where)
+    except (OSError, ValueError) as e:
+        print(f"❌ {e}")
+        return 1
+    table = dataset.summary(**filters)
+    if table.empty:
+        print("⚠ No runs match")
+        return 0
+    print(table.to_string(index=False, float_format=lambda v: f'{v:.4f}'))
+    if args.output:
+        table.to_csv(args.output, index=False)
+        print(f"\n✅ {len(table)} run(s) written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
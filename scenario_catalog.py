@@ -0,0 +1,208 @@
+"""
+Scenario Discovery
+==================
+
+Builds a catalog of simulation runs by scanning a results root and parsing
+run identity from the names written by the test scripts:
+
+    test_sdvn_attacks.sh (flat files)
+        test4_sdvn_blackhole_10_packet-delivery-analysis.csv
+
+    test_sdvn_attacks_with_without_mitigation.sh (one directory per run)
+        test07_blackhole_10_with_mitigation/packet-delivery-analysis.csv
+
+    sweep_runner.py (either layout, architecture tag and seed always present)
+        test02_distributed_wormhole_10_no_mitigation_seed3/...
+
+Each name yields the test index, architecture tag (sdvn/vanet, or the
+routing.cc --architecture name centralized/distributed/hybrid; optional),
+attack type, attacker percentage, mitigation on/off and an optional seed
+suffix (_seed3 or _run3), so new sweep points such as blackhole 30%, replay
+or per-seed repetitions are picked up without editing the analyzers.
+
+Author: VANET Security Research
+Date: October 2025
+"""
+
+import os
+import re
+from collections import namedtuple
+
+_RUN_ID = (r'test(?P<index>\d+)'
+           r'(?:_(?P<architecture>sdvn|vanet|centralized|distributed|hybrid))?'
+           r'_(?P<attack>[a-z]+)'
+           r'(?:_(?P<percentage>\d+))?'
+           r'(?:_(?P<mitigation>no|with)_mitigation)?'
+           r'(?:_(?:seed|run)(?P<seed>\d+))?')
+
+RUN_DIR_PATTERN = re.compile(rf'^{_RUN_ID}$')
+RUN_FILE_PATTERN = re.compile(rf'^{_RUN_ID}_(?P<file>[a-z0-9-]+\.csv)$')
+
+PACKET_FILE = 'packet-delivery-analysis.csv'
+
+# run_id: name prefix shared by the run's files; directory: relative to the
+# results root ('' for the root itself); layout: 'flat' or 'dir';
+# mitigation: True/False, or None when the name does not say;
+# files: {csv name without prefix: absolute path}
+RunInfo = namedtuple('RunInfo', ['run_id', 'directory', 'layout', 'index', 'architecture', 'attack',
+                                 'percentage', 'mitigation', 'seed', 'files'])
+
+
+def _parse_identity(match):
+    groups = match.groupdict()
+    mitigation = groups['mitigation']
+    return {
+        'index': int(groups['index']),
+        'architecture': groups['architecture'],
+        'attack': groups['attack'],
+        'percentage': int(groups['percentage']) if groups['percentage'] else None,
+        'mitigation': None if mitigation is None else mitigation == 'with',
+        'seed': int(groups['seed']) if groups['seed'] else None,
+    }
+
+
+def _sweep_dir(run):
+    """Directory holding the run (the parent of a run directory)"""
+    return os.path.dirname(run.directory) if run.layout == 'dir' else run.directory
+
+
+def run_key(run):
+    """Path-like identifier of a run relative to the results root"""
+    return run.directory if run.layout == 'dir' else os.path.join(run.directory, run.run_id)
+
+
+def run_label(run, include_mitigation=True):
+    """Human-readable scenario name, e.g. 'Wormhole 10%' or 'Baseline (No Attack)'"""
+    if run.attack == 'baseline':
+        label = 'Baseline (No Attack)'
+    else:
+        label = run.attack.title()
+        if run.percentage is not None:
+            label += f' {run.percentage}%'
+        if include_mitigation and run.mitigation is not None:
+            label += ' (With Mitigation)' if run.mitigation else ' (No Mitigation)'
+    if run.seed is not None:
+        label += f' [seed {run.seed}]'
+    return label
+
+
+def replicate_key(run):
+    """Scenario identity shared by the seeds of one sweep point"""
+    return _sweep_dir(run), run.architecture, run.attack, run.percentage, run.mitigation
+
+
+def replicate_labels(runs, include_mitigation=True):
+    """
+    Seedless run_label() of each run, qualified by architecture and sweep
+    directory where different scenarios would share a label.
+    """
+    labels = [run_label(run._replace(seed=None), include_mitigation) for run in runs]
+    scenarios = {}
+    for run, label in zip(runs, labels):
+        scenarios.setdefault(label, set()).add(replicate_key(run))
+    qualified = []
+    for run, label in zip(runs, labels):
+        if len(scenarios[label]) > 1:
+            where = ', '.join(part for part in (run.architecture, _sweep_dir(run)) if part)
+            label = f'{label} @ {where or "."}'
+        qualified.append(label)
+    return qualified
+
+
+def unique_labels(runs, include_mitigation=True):
+    """run_label() of each run, qualified by its sweep directory where labels collide"""
+    labels = [run_label(run, include_mitigation) for run in runs]
+    counts = {}
+    for label in labels:
+        counts[label] = counts.get(label, 0) + 1
+    return [f'{label} @ {run_key(run)}' if counts[label] > 1 else label
+            for run, label in zip(runs, labels)]
+
+
+class ScenarioCatalog:
+    """Indexed list of discovered runs"""
+
+    def __init__(self, results_root, runs):
+        self.results_root = results_root
+        self.runs = runs
+        self.by_id = {(run.directory, run.run_id): run for run in runs}
+
+    @classmethod
+    def discover(cls, results_root, recursive=True):
+        """Scan results_root (and, if recursive, its subdirectories) for runs"""
+        found = {}
+        for dirpath, dirnames, filenames in os.walk(results_root):
+            rel_dir = os.path.relpath(dirpath, results_root)
+            rel_dir = '' if rel_dir == '.' else rel_dir
+
+            # Flat layout: <run_id>_<file>.csv directly in this directory
+            for filename in filenames:
+                match = RUN_FILE_PATTERN.match(filename)
+                if match is None:
+                    continue
+                run_id = filename[:match.start('file') - 1]
+                key = (rel_dir, run_id)
+                if key not in found:
+                    found[key] = dict(_parse_identity(match), run_id=run_id, directory=rel_dir,
+                                      layout='flat', files={})
+                found[key]['files'][match.group('file')] = os.path.join(dirpath, filename)
+
+            # Directory layout: <run_id>/<file>.csv
+            run_dirs = []
+            for dirname in dirnames:
+                match = RUN_DIR_PATTERN.match(dirname)
+                if match is None:
+                    continue
+                run_dirs.append(dirname)
+                run_path = os.path.join(dirpath, dirname)
+                files = {name: os.path.join(run_path, name) for name in sorted(os.listdir(run_path))
+                         if name.endswith('.csv') and os.path.isfile(os.path.join(run_path, name))}
+                if files:
+                    found[(rel_dir, dirname)] = dict(_parse_identity(match), run_id=dirname,
+                                                     directory=os.path.join(rel_dir, dirname),
+                                                     layout='dir', files=files)
+
+            if not recursive:
+                break
+            # Run directories are leaves; caches and hidden dirs are never runs
+            dirnames[:] = sorted(d for d in dirnames
+                                 if d not in run_dirs and not d.startswith('.') and not d.endswith('.colcache'))
+
+        runs = [RunInfo(**fields) for fields in found.values()]
+        runs.sort(key=lambda r: (_sweep_dir(r), r.index, -1 if r.seed is None else r.seed, r.run_id))
+        return cls(results_root, runs)
+
+    def __len__(self):
+        return len(self.runs)
+
+    def __iter__(self):
+        return iter(self.runs)
+
+    def select(self, **criteria):
+        """Runs whose fields equal every given value, e.g. select(attack='wormhole', mitigation=True)"""
+        return [run for run in self.runs
+                if all(getattr(run, field) == value for field, value in criteria.items())]
+
+    def replicates(self):
+        """{replicate_key: [runs]} grouping the seeds of each scenario, in catalog order"""
+        groups = {}
+        for run in self.runs:
+            groups.setdefault(replicate_key(run), []).append(run)
+        return groups
+
+    def baseline(self):
+        """First baseline run, or None"""
+        baselines = self.select(attack='baseline')
+        return baselines[0] if baselines else None
+
+    def mitigation_pairs(self):
+        """
+        (without_run, with_run) for every attack point that has both a
+        no-mitigation and a with-mitigation run in the same sweep directory.
+        """
+        def point(r):
+            return _sweep_dir(r), r.architecture, r.attack, r.percentage, r.seed
+        
+        with_runs = {point(r): r for r in self.runs if r.mitigation is True}
+        return [(run, with_runs[point(run)]) for run in self.runs
+                if run.mitigation is False and point(run) in with_runs]
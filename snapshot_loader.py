@@ -0,0 +1,232 @@
+"""
+Periodic Snapshot CSV Loader
+============================
+
+Reads the time-series snapshot files written by the performance monitors in
+routing.cc, which the packet analyzers never looked at:
+
+    SDVNPerformanceMonitor::ExportToCSV            ('sdvn')
+        Timestamp,Scenario,PacketsSent,...,OverheadRatio,MetadataUplink,
+        DeltaDownlink,...,WormholesDetected,FalsePositives,DetectionTime
+    SDVNBlackholePerformanceMonitor::ExportToCSV   ('blackhole')
+        Time,Scenario,...,BlackholesDetected,FalsePositives,FalseNegatives,
+        PDRBefore,PDRAfter,RecoveryPct,DetectionTime,MitigationTime
+    SDVNSybilPerformanceMonitor::ExportToCSV       ('sybil')
+        Time(s),PDR(%),Latency_Avg(ms),Overhead(%),...,DetectionAccuracy(%),...
+
+The file names are chosen by the caller in routing.cc, so the format is
+recognised from the header.  Each schema is read with explicit dtypes and
+its columns renamed to one normalized vocabulary (Time, PDR, OverheadRatio,
+Detected, FalsePositives, ...); percentages are converted to fractions so
+all three formats compare directly.
+
+load_snapshots() reads every snapshot file of a set of runs into one long
+DataFrame, and snapshot_summary() reduces it to the per-run Routing_Overhead,
+Detection_Rate and False_Positive_Rate used by analyze_attack_results.py.
+
+Author: VANET Security Research
+Date: October 2025
+"""
+
+import numpy as np
+import pandas as pd
+
+# Per schema: {CSV column: (normalized column, dtype, scale)}
+SNAPSHOT_SCHEMAS = {
+    'sdvn': {
+        'Timestamp': ('Time', np.float64, 1),
+        'Scenario': ('Scenario', str, 1),
+        'PacketsSent': ('PacketsSent', np.int64, 1),
+        'PacketsReceived': ('PacketsReceived', np.int64, 1),
+        'PacketsDropped': ('PacketsDropped', np.int64, 1),
+        'PDR': ('PDR', np.float64, 1),
+        'AvgLatency': ('AvgLatencyMs', np.float64, 1),
+        'MinLatency': ('MinLatencyMs', np.float64, 1),
+        'MaxLatency': ('MaxLatencyMs', np.float64, 1),
+        'ControlPackets': ('ControlPackets', np.int64, 1),
+        'DataPackets': ('DataPackets', np.int64, 1),
+        'TotalPackets': ('TotalPackets', np.int64, 1),
+        'OverheadRatio': ('OverheadRatio', np.float64, 1),
+        'MetadataUplink': ('MetadataUplink', np.int64, 1),
+        'DeltaDownlink': ('DeltaDownlink', np.int64, 1),
+        'MitigationPackets': ('MitigationPackets', np.int64, 1),
+        'WormholeIntercepted': ('WormholeIntercepted', np.int64, 1),
+        'WormholeTunneled': ('WormholeTunneled', np.int64, 1),
+        'WormholeDropped': ('WormholeDropped', np.int64, 1),
+        'WormholesDetected': ('Detected', np.int64, 1),
+        'FalsePositives': ('FalsePositives', np.int64, 1),
+        'DetectionTime': ('DetectionTime', np.float64, 1),
+    },
+    'blackhole': {
+        'Time': ('Time', np.float64, 1),
+        'Scenario': ('Scenario', str, 1),
+        'PacketsSent': ('PacketsSent', np.int64, 1),
+        'PacketsReceived': ('PacketsReceived', np.int64, 1),
+        'PacketsDropped': ('PacketsDropped', np.int64, 1),
+        'PDR': ('PDR', np.float64, 1),
+        'AvgLatencyMs': ('AvgLatencyMs', np.float64, 1),
+        'MinLatencyMs': ('MinLatencyMs', np.float64, 1),
+        'MaxLatencyMs': ('MaxLatencyMs', np.float64, 1),
+        'ControlPackets': ('ControlPackets', np.int64, 1),
+        'DataPackets': ('DataPackets', np.int64, 1),
+        'OverheadRatio': ('OverheadRatio', np.float64, 1),
+        'BlackholeDrops': ('BlackholeDrops', np.int64, 1),
+        'AffectedFlows': ('AffectedFlows', np.int64, 1),
+        'BlackholesDetected': ('Detected', np.int64, 1),
+        'FalsePositives': ('FalsePositives', np.int64, 1),
+        'FalseNegatives': ('FalseNegatives', np.int64, 1),
+        'PDRBefore': ('PDRBefore', np.float64, 1),
+        'PDRAfter': ('PDRAfter', np.float64, 1),
+        'RecoveryPct': ('RecoveryPct', np.float64, 1),
+        'DetectionTime': ('DetectionTime', np.float64, 1),
+        'MitigationTime': ('MitigationTime', np.float64, 1),
+    },
+    'sybil': {
+        'Time(s)': ('Time', np.float64, 1),
+        'PDR(%)': ('PDR', np.float64, 0.01),
+        'Latency_Avg(ms)': ('AvgLatencyMs', np.float64, 1),
+        'Overhead(%)': ('OverheadRatio', np.float64, 0.01),
+        'FakeIdentities': ('FakeIdentities', np.int64, 1),
+        'FakeMetadata': ('FakeMetadata', np.int64, 1),
+        'ControllerPollution(%)': ('ControllerPollution', np.float64, 0.01),
+        'AffectedFlows': ('AffectedFlows', np.int64, 1),
+        'IdentitiesDetected': ('Detected', np.int64, 1),
+        'NodesBlacklisted': ('NodesBlacklisted', np.int64, 1),
+        'DetectionAccuracy(%)': ('DetectionAccuracy', np.float64, 0.01),
+        'CorruptedEntries': ('CorruptedEntries', np.int64, 1),
+        'InvalidRoutes': ('InvalidRoutes', np.int64, 1),
+        'PacketsSent': ('PacketsSent', np.int64, 1),
+        'PacketsDelivered': ('PacketsReceived', np.int64, 1),
+        'PacketsDropped': ('PacketsDropped', np.int64, 1),
+    },
+}
+
+# Header columns that identify each schema (checked in this order)
+_SIGNATURES = {
+    'blackhole': {'Time', 'BlackholesDetected', 'FalseNegatives', 'RecoveryPct'},
+    'sdvn': {'Timestamp', 'OverheadRatio', 'WormholesDetected'},
+    'sybil': {'Time(s)', 'PDR(%)', 'ControllerPollution(%)'},
+}
+
+# Run files that are never snapshots (per-packet / per-node exports)
+NON_SNAPSHOT_FILES = {'packet-delivery-analysis.csv'}
+
+# Schema whose detection counters describe the run's attack, most specific first
+_DETECTION_PREFERENCE = ('blackhole', 'sybil', 'sdvn')
+
+
+def sniff_schema(csv_file):
+    """Snapshot schema name of a CSV from its header line, or None"""
+    try:
+        with open(csv_file, 'r', newline='') as f:
+            header = {column.strip() for column in f.readline().strip().split(',')}
+    except (OSError, UnicodeDecodeError):
+        return None
+    for schema, signature in _SIGNATURES.items():
+        if signature <= header:
+            return schema
+    return None
+
+
+def read_snapshot_csv(csv_file, schema=None):
+    """One snapshot file as a DataFrame in the normalized columns (plus 'Schema')"""
+    schema = schema or sniff_schema(csv_file)
+    if schema is None:
+        raise ValueError(f"{csv_file} is not a known snapshot format")
+    columns = SNAPSHOT_SCHEMAS[schema]
+
+    header = pd.read_csv(csv_file, nrows=0).columns
+    present = [column for column in header if column in columns]
+    df = pd.read_csv(csv_file, usecols=present,
+                     dtype={column: (str if columns[column][1] is str else np.float64) for column in present})
+
+    out = {}
+    for column in present:
+        name, dtype, scale = columns[column]
+        values = df[column]
+        if dtype is not str:
+            values = values * scale if scale != 1 else values
+            if dtype is np.int64:
+                values = values.fillna(0).round().astype(np.int64)
+        out[name] = values
+    frame = pd.DataFrame(out)
+    frame.insert(0, 'Schema', schema)
+    return frame
+
+
+def snapshot_files(run_files):
+    """{path: schema} of the snapshot CSVs among a run's files ({name: path})"""
+    found = {}
+    for name, path in run_files.items():
+        if name in NON_SNAPSHOT_FILES:
+            continue
+        schema = sniff_schema(path)
+        if schema is not None:
+            found[path] = schema
+    return found
+
+
+def load_snapshots(files_by_run):
+    """
+    Read the snapshot files of many runs in one pass.
+
+    files_by_run maps a run key to {path: schema}; the result is one long
+    DataFrame with a leading 'Run' column (empty when there are no files).
+    """
+    frames = []
+    for run, files in files_by_run.items():
+        for path, schema in files.items():
+            try:
+                frame = read_snapshot_csv(path, schema)
+            except (OSError, ValueError, pd.errors.ParserError) as e:
+                print(f"  ⚠ Could not read snapshot file {path}: {e}")
+                continue
+            frame.insert(0, 'Run', run)
+            frames.append(frame)
+    if not frames:
+        return pd.DataFrame(columns=['Run', 'Schema', 'Time'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def _ratio(numerator, denominator):
+    return np.divide(numerator, denominator, out=np.full(len(numerator), np.nan), where=denominator > 0)
+
+
+def snapshot_summary(snapshots):
+    """
+    Per-run Routing_Overhead, Detection_Rate, False_Positive_Rate and
+    Detection_Time_s from each run's final snapshot.
+
+    Detection_Rate is detected / (detected + false negatives) where the
+    blackhole monitor reports false negatives, and DetectionAccuracy for the
+    sybil monitor; the SDVN monitor has no ground truth, so it leaves it NaN.
+    False_Positive_Rate is the share of alarms that were false,
+    FalsePositives / (detected + FalsePositives).  When a run has several
+    snapshot files the most attack-specific one supplies the detection
+    metrics; overhead comes from any monitor that reports it.
+    """
+    columns = ['Routing_Overhead', 'Detection_Rate', 'False_Positive_Rate', 'Detection_Time_s']
+    if snapshots.empty:
+        return pd.DataFrame(columns=columns)
+
+    final = snapshots.sort_values('Time', kind='stable').groupby(['Run', 'Schema'], sort=False).tail(1)
+    final = final.reindex(columns=final.columns.union(
+        ['OverheadRatio', 'Detected', 'FalsePositives', 'FalseNegatives', 'DetectionAccuracy', 'DetectionTime'],
+        sort=False))
+
+    detected = final['Detected'].to_numpy(dtype=np.float64)
+    false_pos = final['FalsePositives'].to_numpy(dtype=np.float64)
+    false_neg = final['FalseNegatives'].to_numpy(dtype=np.float64)
+    recall = _ratio(detected, detected + false_neg)
+    detection_rate = np.where(final['Schema'] == 'sybil', final['DetectionAccuracy'], recall)
+
+    final = final.assign(
+        Routing_Overhead=final['OverheadRatio'],
+        Detection_Rate=detection_rate,
+        False_Positive_Rate=_ratio(false_pos, detected + false_pos),
+        Detection_Time_s=final['DetectionTime'].where(final['DetectionTime'] > 0),
+        _rank=final['Schema'].map({schema: i for i, schema in enumerate(_DETECTION_PREFERENCE)}),
+    ).sort_values('_rank', kind='stable')
+
+    # First non-null value per run in preference order
+    return final.groupby('Run', sort=False)[columns].first()
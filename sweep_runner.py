@@ -0,0 +1,547 @@
+#!/usr/bin/env python3
+"""
+Parallel Simulation Sweep Runner
+================================
+
+Replaces the serial drivers test_sdvn_attacks.sh and
+test_sdvn_attacks_with_without_mitigation.sh.  routing.cc writes its result
+CSVs into the current directory, which is what forced those scripts to run
+one case at a time; here every job runs in its own scratch directory, so
+up to --jobs simulations run at once.
+
+A JSON grid is expanded into jobs, one per combination of
+
+    attacks x percentages x mitigation x n_vehicles x architectures x seeds
+
+(the baseline once per n_vehicles x architecture x seed).  Each job gets the
+same flags the shell scripts pass for that attack plus --RngRun=<seed>, runs
+with a timeout (its whole process group is killed on expiry) and is retried
+up to --retries times in a fresh scratch directory.  Its CSVs are then moved
+into the layout the analyzers discover (scenario_catalog):
+
+    layout 'dir'   OUT/test02_distributed_wormhole_10_no_mitigation_seed3/packet-delivery-analysis.csv
+    layout 'flat'  OUT/test02_distributed_wormhole_10_no_mitigation_seed3_packet-delivery-analysis.csv
+
+with the console output in OUT/<run id>_output.txt.  Axes the run name
+cannot carry (n_vehicles and sim_time with more than one value) become
+sweep subdirectories, e.g. OUT/vehicles40/, so seeds still group correctly.
+
+Every finished job is appended to OUT/sweep_ledger.jsonl; running the same
+sweep again skips jobs the ledger marks done, so an interrupted sweep
+resumes where it stopped (--restart ignores the ledger).  Ctrl+C cancels the
+queued jobs and kills the running simulations' process groups; those jobs
+are left out of the ledger, so the rerun starts them again.
+
+The simulator is started as --executable "CMD" (a built routing binary, run
+inside './waf shell' so the ns-3 libraries resolve) or through
+--waf PATH (./waf --run "routing ..." --cwd=<scratch>; build first, as
+parallel waf invocations would otherwise all try to build).  For tests,
+'sweep_runner.py stub' stands in for the binary: like ns-3's CommandLine it
+rejects flags routing.cc does not register (cmd.AddValue), and it writes
+synthetic CSVs (synthetic_traces.py) into its working directory.
+
+Grid file example (--example-grid prints it):
+
+    {"attacks": ["wormhole", "blackhole", "sybil", "combined"],
+     "percentages": [10, 20], "mitigation": [false, true],
+     "n_vehicles": [18], "architectures": [0], "seeds": [1, 2, 3],
+     "sim_time": 100, "n_rsus": 10, "baseline": true, "extra_args": {}}
+
+Usage:
+    python3 sweep_runner.py GRID.json -o OUT --executable "build/scratch/routing" [-j N]
+                            [--timeout S] [--retries N] [--layout dir|flat] [--dry-run] [--restart]
+    python3 sweep_runner.py GRID.json -o OUT --executable "python3 sweep_runner.py stub --rows 2000"
+
+Author: VANET Security Research
+Date: October 2025
+"""
+
+import argparse
+import itertools
+import json
+import os
+import re
+import shlex
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from plot_scheduler import resolve_jobs
+
+LEDGER_FILE = 'sweep_ledger.jsonl'
+SCRATCH_DIR = '.scratch'
+
+DEFAULT_TIMEOUT_S = 3600
+DEFAULT_RETRIES = 1
+
+# Non-CSV result files the shell drivers also collected
+EXTRA_RESULT_FILES = ('DlRsrpSinrStats.txt', 'UlSinrStats.txt', 'DlRlcStats.txt')
+
+# Source the stub reads the registered flags from
+ROUTING_SOURCE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'routing.cc')
+
+# ns-3 global values CommandLine accepts besides routing.cc's own flags
+NS3_GLOBAL_FLAGS = ('RngRun', 'RngSeed', 'SimulatorImplementationType', 'SchedulerType', 'ChecksumEnabled')
+
+# routing.cc --architecture values and the tag used in run names
+ARCHITECTURES = {0: 'centralized', 1: 'distributed', 2: 'hybrid'}
+
+EXAMPLE_GRID = {
+    'attacks': ['wormhole', 'blackhole', 'sybil', 'combined'],
+    'percentages': [10, 20],
+    'mitigation': [False, True],
+    'n_vehicles': [18],
+    'architectures': [0],
+    'seeds': [1, 2, 3],
+    'sim_time': 100,
+    'n_rsus': 10,
+    'baseline': True,
+    'extra_args': {},
+}
+
+# Attack flags as passed by the shell drivers; '{fraction}' is the percentage / 100
+_WORMHOLE = {'present_wormhole_attack_nodes': True, 'use_enhanced_wormhole': True, 'attack_percentage': '{fraction}'}
+_BLACKHOLE = {'present_blackhole_attack_nodes': True, 'enable_blackhole_attack': True,
+              'blackhole_attack_percentage': '{fraction}', 'blackhole_advertise_fake_routes': True}
+_SYBIL = {'present_sybil_attack_nodes': True, 'enable_sybil_attack': True, 'sybil_attack_percentage': '{fraction}',
+          'sybil_advertise_fake_routes': True, 'sybil_clone_legitimate_nodes': True}
+ATTACK_FLAGS = {
+    'wormhole': _WORMHOLE,
+    'blackhole': _BLACKHOLE,
+    'sybil': _SYBIL,
+    'combined': {**_WORMHOLE, **_BLACKHOLE, **_SYBIL},
+}
+
+# Detection / mitigation switches per attack (all true or all false) and
+# switches only passed when mitigation is on; routing.cc has no separate
+# blackhole detection flag (enable_blackhole_mitigation covers both)
+_MITIGATION_SWITCHES = {
+    'wormhole': ['enable_wormhole_detection', 'enable_wormhole_mitigation'],
+    'blackhole': ['enable_blackhole_mitigation'],
+    'sybil': ['enable_sybil_detection', 'enable_sybil_mitigation'],
+}
+_SYBIL_EXTRAS = ['enable_sybil_mitigation_advanced', 'use_trusted_certification', 'use_rssi_detection']
+MITIGATION_FLAGS = {
+    'wormhole': (_MITIGATION_SWITCHES['wormhole'], []),
+    'blackhole': (_MITIGATION_SWITCHES['blackhole'], []),
+    'sybil': (_MITIGATION_SWITCHES['sybil'], _SYBIL_EXTRAS),
+    'combined': (sum(_MITIGATION_SWITCHES.values(), []), _SYBIL_EXTRAS),
+}
+
+# run_id: name written into the output tree; sweep_dir: subdirectory of the
+# output root ('' for the root); args: simulator flags
+Job = namedtuple('Job', ['run_id', 'sweep_dir', 'args'])
+
+
+class SweepInterrupted(Exception):
+    """Raised in a worker whose job was stopped by SweepRunner.stop()"""
+
+
+def _flag(name, value):
+    if isinstance(value, bool):
+        value = 'true' if value else 'false'
+    return f'--{name}={value}'
+
+
+def _run_id(index, architecture, attack, percentage, mitigation, seed):
+    parts = [f'test{index:02d}', ARCHITECTURES.get(architecture, f'arch{architecture}'), attack]
+    if attack != 'baseline':
+        parts += [str(percentage), 'with_mitigation' if mitigation else 'no_mitigation']
+    return '_'.join(parts) + f'_seed{seed}'
+
+
+def expand_grid(grid):
+    """Jobs of a grid dict (see EXAMPLE_GRID), in a stable order"""
+    unknown = [attack for attack in grid.get('attacks', []) if attack not in ATTACK_FLAGS]
+    if unknown:
+        raise ValueError(f"Unknown attack(s) {', '.join(unknown)} (expected {', '.join(ATTACK_FLAGS)})")
+
+    # Scenario index shared by every seed / architecture of a scenario, as in the shell drivers
+    scenarios = [('baseline', None, None)] if grid.get('baseline', True) else []
+    scenarios += [(attack, percentage, mitigation) for attack in grid.get('attacks', [])
+                  for percentage in grid.get('percentages', [10])
+                  for mitigation in grid.get('mitigation', [False, True])]
+
+    vehicles = list(grid.get('n_vehicles', [18]))
+    sim_times = grid.get('sim_time', 100)
+    sim_times = list(sim_times) if isinstance(sim_times, list) else [sim_times]
+
+    jobs = []
+    for n_vehicles, sim_time, architecture, seed in itertools.product(
+            vehicles, sim_times, grid.get('architectures', [0]), grid.get('seeds', [1])):
+        sweep_dir = os.path.join(f'vehicles{n_vehicles}' if len(vehicles) > 1 else '',
+                                 f'simtime{sim_time:g}' if len(sim_times) > 1 else '')
+        common = {
+            'simTime': sim_time,
+            'N_Vehicles': n_vehicles,
+            'N_RSUs': grid.get('n_rsus', 10),
+            'architecture': architecture,
+            'enable_packet_tracking': True,
+        }
+        for index, (attack, percentage, mitigation) in enumerate(scenarios, start=1):
+            flags = dict(common)
+            if attack != 'baseline':
+                fraction = f'{percentage / 100:g}'
+                flags.update({name: value.format(fraction=fraction) if isinstance(value, str) else value
+                              for name, value in ATTACK_FLAGS[attack].items()})
+                switches, extras = MITIGATION_FLAGS[attack]
+                flags.update({name: bool(mitigation) for name in switches})
+                if mitigation:
+                    flags.update({name: True for name in extras})
+            flags.update(grid.get('extra_args', {}))
+            flags['RngRun'] = seed
+            jobs.append(Job(_run_id(index, architecture, attack, percentage, mitigation, seed),
+                            os.path.normpath(sweep_dir) if sweep_dir else '',
+                            [_flag(name, value) for name, value in flags.items()]))
+    return jobs
+
+
+def job_key(job):
+    """Ledger key of a job (its path in the output tree)"""
+    return os.path.join(job.sweep_dir, job.run_id)
+
+
+class JobLedger:
+    """Append-only JSON-lines record of finished jobs, shared by the worker threads"""
+
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def completed(self):
+        """Keys of jobs whose latest record says 'done'"""
+        status = {}
+        try:
+            with open(self.path, 'r') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # torn last line of an interrupted sweep
+                    status[record['job']] = record['status']
+        except OSError:
+            return set()
+        return {key for key, value in status.items() if value == 'done'}
+
+    def record(self, **fields):
+        line = json.dumps(dict(fields, time=time.strftime('%Y-%m-%dT%H:%M:%S'))) + '\n'
+        with self.lock:
+            with open(self.path, 'a') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+
+
+class SweepRunner:
+    """Runs jobs in scratch directories and collects their results under output_dir"""
+
+    def __init__(self, output_dir, command, waf=False, layout='dir', timeout_s=DEFAULT_TIMEOUT_S,
+                 retries=DEFAULT_RETRIES):
+        self.output_dir = output_dir
+        # Argument list of the simulator (with waf=True: the waf script)
+        self.command = command
+        self.waf = waf
+        self.layout = layout
+        self.timeout_s = timeout_s
+        self.retries = retries
+        self.ledger = JobLedger(os.path.join(output_dir, LEDGER_FILE))
+        # Running simulations by pid; stop() kills them and refuses new ones
+        self.processes = {}
+        self.process_lock = threading.Lock()
+        self.stopping = False
+
+    def command_for(self, job, cwd):
+        """Argument list that starts one job's simulation in cwd"""
+        if self.waf:
+            return [*self.command, '--run', shlex.join(['routing', *job.args]), f'--cwd={cwd}']
+        return [*self.command, *job.args]
+
+    def _execute(self, job, cwd, attempt, log):
+        """Run one attempt; returns (returncode or None on timeout)"""
+        env = dict(os.environ, SWEEP_JOB=job_key(job), SWEEP_ATTEMPT=str(attempt))
+        with self.process_lock:
+            if self.stopping:
+                raise SweepInterrupted(job_key(job))
+            process = subprocess.Popen(self.command_for(job, cwd), cwd=cwd, stdout=log, stderr=subprocess.STDOUT,
+                                       env=env, start_new_session=True)
+            self.processes[process.pid] = process
+        try:
+            return process.wait(timeout=self.timeout_s)
+        except subprocess.TimeoutExpired:
+            # waf runs the simulation as a grandchild, so stop the whole group
+            _kill_group(process)
+            process.wait()
+            return None
+        finally:
+            with self.process_lock:
+                self.processes.pop(process.pid, None)
+
+    def stop(self):
+        """Kill every running simulation's process group and start no new ones"""
+        with self.process_lock:
+            self.stopping = True
+            for process in self.processes.values():
+                _kill_group(process)
+
+    def _collect(self, job, scratch):
+        """Move a finished job's result files into the output tree; returns their names"""
+        names = sorted(name for name in os.listdir(scratch)
+                       if (name.endswith('.csv') or name in EXTRA_RESULT_FILES)
+                       and os.path.isfile(os.path.join(scratch, name)))
+        if not names:
+            return names
+        sweep_path = os.path.join(self.output_dir, job.sweep_dir)
+        os.makedirs(sweep_path, exist_ok=True)
+        if self.layout == 'dir':
+            # Results appear all at once, so a run directory is never half-populated
+            staging = os.path.join(scratch, '.collect')
+            os.makedirs(staging)
+            for name in names:
+                os.replace(os.path.join(scratch, name), os.path.join(staging, name))
+            target = os.path.join(sweep_path, job.run_id)
+            if os.path.isdir(target):
+                shutil.rmtree(target)
+            shutil.move(staging, target)
+        else:
+            for name in names:
+                shutil.move(os.path.join(scratch, name), os.path.join(sweep_path, f'{job.run_id}_{name}'))
+        return names
+
+    def run_job(self, job):
+        """Run a job with retries; returns its ledger record"""
+        scratch_root = os.path.join(self.output_dir, SCRATCH_DIR, job.sweep_dir, job.run_id)
+        log_file = os.path.join(self.output_dir, job.sweep_dir, f'{job.run_id}_output.txt')
+        os.makedirs(os.path.dirname(log_file), exist_ok=True)
+        start = time.perf_counter()
+        status, error, files = 'failed', None, []
+
+        for attempt in range(1, self.retries + 2):
+            scratch = os.path.join(scratch_root, f'attempt{attempt}')
+            shutil.rmtree(scratch, ignore_errors=True)
+            os.makedirs(scratch)
+            with open(log_file, 'w' if attempt == 1 else 'a') as log:
+                log.write(f"=== {job_key(job)} attempt {attempt} ===\n")
+                log.flush()
+                returncode = self._execute(job, scratch, attempt, log)
+            if self.stopping:
+                # Killed by stop(): no ledger record, so a rerun starts the job again
+                raise SweepInterrupted(job_key(job))
+            if returncode is None:
+                error = f'timed out after {self.timeout_s:g}s'
+            elif returncode != 0:
+                error = f'exit status {returncode}'
+            else:
+                files = self._collect(job, scratch)
+                if files:
+                    status, error = 'done', None
+                    break
+                error = 'no result files written'
+        shutil.rmtree(scratch_root, ignore_errors=True)
+
+        record = dict(job=job_key(job), status=status, attempts=attempt, error=error, files=files,
+                      seconds=round(time.perf_counter() - start, 3), args=job.args)
+        self.ledger.record(**record)
+        return record
+
+    def run(self, jobs, n_jobs=1, restart=False):
+        """
+        Run every job not already done, n_jobs at a time; returns the ledger
+        records of this run.  On KeyboardInterrupt the queued jobs are
+        cancelled and the running ones killed before it is re-raised.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        done = set() if restart else self.ledger.completed()
+        pending = [job for job in jobs if job_key(job) not in done]
+        skipped = len(jobs) - len(pending)
+        workers = min(resolve_jobs(n_jobs), max(1, len(pending)))
+        print(f"🚀 {len(pending)} job(s) to run on {workers} worker(s)"
+              + (f", {skipped} already done (ledger)" if skipped else ''))
+
+        records = []
+        pool = ThreadPoolExecutor(max_workers=workers)
+        try:
+            futures = {pool.submit(self.run_job, job): job for job in pending}
+            for finished, future in enumerate(as_completed(futures), start=1):
+                record = future.result()
+                records.append(record)
+                mark = '✓' if record['status'] == 'done' else '✗'
+                retried = f", {record['attempts']} attempts" if record['attempts'] > 1 else ''
+                detail = f"{len(record['files'])} file(s)" if record['status'] == 'done' else record['error']
+                print(f"  {mark} [{finished}/{len(pending)}] {record['job']} ({record['seconds']:.1f}s{retried}) "
+                      f"- {detail}")
+        except KeyboardInterrupt:
+            # Leaving the pool's with-block would wait for every queued job
+            pool.shutdown(wait=False, cancel_futures=True)
+            self.stop()
+            raise
+        finally:
+            pool.shutdown(wait=True)
+            shutil.rmtree(os.path.join(self.output_dir, SCRATCH_DIR), ignore_errors=True)
+        return records
+
+
+def _kill_group(process):
+    """SIGKILL a simulation's whole process group (it may already have exited)"""
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+def resolve_command(command):
+    """Make relative paths in a command absolute, since jobs run in their scratch directories"""
+    def is_local_path(arg):
+        return (os.sep in arg or arg.endswith('.py')) and not os.path.isabs(arg) and os.path.exists(arg)
+
+    return [os.path.abspath(arg) if is_local_path(arg) else arg for arg in command]
+
+
+def registered_flags(source=ROUTING_SOURCE):
+    """Flags routing.cc registers with cmd.AddValue() plus NS3_GLOBAL_FLAGS, or None if source is unreadable"""
+    try:
+        with open(source, 'r', errors='replace') as f:
+            text = f.read()
+    except OSError:
+        return None
+    return set(re.findall(r'\bcmd\.AddValue\s*\(\s*"(\w+)"', text)) | set(NS3_GLOBAL_FLAGS)
+
+
+def stub_main(argv):
+    """
+    Stand-in for the routing binary: parse the ns-3 flags and write
+    synthetic result CSVs into the current directory.
+    """
+    from synthetic_traces import MITIGATION_TREE, generate_run
+
+    parser = argparse.ArgumentParser(prog='sweep_runner.py stub', description='Fake routing binary for tests')
+    parser.add_argument('--rows', type=int, default=2000, help='Packets per synthetic trace')
+    parser.add_argument('--fail-attempts', type=int, default=0,
+                        help='Exit with status 1 while SWEEP_ATTEMPT <= this (exercises retries)')
+    parser.add_argument('--sleep', type=float, default=0.0, help='Seconds to sleep first (exercises timeouts)')
+    parser.add_argument('--routing-source', default=ROUTING_SOURCE,
+                        help='routing.cc whose cmd.AddValue() flags are accepted (default: next to this script)')
+    args, ns3_args = parser.parse_known_args(argv)
+
+    flags = {}
+    for arg in ns3_args:
+        name, _, value = arg.lstrip('-').partition('=')
+        flags[name] = value
+
+    known = registered_flags(args.routing_source)
+    if known is None:
+        print(f"stub: cannot read {args.routing_source}; flags are not checked")
+    else:
+        # Like ns-3's CommandLine, which exits on arguments nobody registered
+        unknown = [name for name in flags if name not in known and '::' not in name]
+        if unknown:
+            print(f"stub: invalid command-line argument(s) (not registered in routing.cc): "
+                  f"{', '.join('--' + name for name in unknown)}")
+            sys.exit(1)
+
+    if args.sleep:
+        time.sleep(args.sleep)
+    if int(os.environ.get('SWEEP_ATTEMPT', '1')) <= args.fail_attempts:
+        print("stub: simulated failure")
+        sys.exit(1)
+
+    def fraction(switch, percentage):
+        return float(flags.get(percentage, 0)) if flags.get(switch) == 'true' else 0.0
+
+    # Mitigated runs keep the attacked share of MITIGATION_TREE's with-mitigation runs
+    mitigated = MITIGATION_TREE[2][1] / MITIGATION_TREE[1][1]
+    wormhole = fraction('present_wormhole_attack_nodes', 'attack_percentage')
+    blackhole = fraction('enable_blackhole_attack', 'blackhole_attack_percentage')
+    if flags.get('enable_wormhole_mitigation') == 'true':
+        wormhole *= mitigated
+    if flags.get('enable_blackhole_mitigation') == 'true':
+        blackhole *= mitigated
+    generate_run('.', args.rows, int(flags.get('N_Vehicles', 18)) + int(flags.get('N_RSUs', 10)),
+                 wormhole, blackhole, float(flags.get('simTime', 100)), int(flags.get('RngRun', 1)))
+    print(f"stub: wrote synthetic results ({args.rows} packets, wormhole {wormhole:g}, blackhole {blackhole:g})")
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == 'stub':
+        return stub_main(argv[1:])
+
+    parser = argparse.ArgumentParser(description='Run a grid of routing simulations in parallel')
+    parser.add_argument('grid', nargs='?', help='JSON grid file (see --example-grid)')
+    parser.add_argument('--output', '-o', default=None,
+                        help='Results directory (default: sdvn_sweep_<timestamp>)')
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument('--executable', help='Simulator command, e.g. "build/scratch/routing"')
+    source.add_argument('--waf', help='Path to waf; runs ./waf --run "routing ..." --cwd=<scratch>')
+    parser.add_argument('--jobs', '-j', type=int, default=0,
+                        help='Simulations run at once (0 = all cores, default: 0)')
+    parser.add_argument('--timeout', type=float, default=DEFAULT_TIMEOUT_S,
+                        help=f'Seconds before a simulation is killed (default: {DEFAULT_TIMEOUT_S})')
+    parser.add_argument('--retries', type=int, default=DEFAULT_RETRIES,
+                        help=f'Extra attempts for a failed job (default: {DEFAULT_RETRIES})')
+    parser.add_argument('--layout', choices=['dir', 'flat'], default='dir',
+                        help="'dir': one directory per run (default); 'flat': <run>_<file>.csv")
+    parser.add_argument('--dry-run', action='store_true', help='List the jobs and their commands only')
+    parser.add_argument('--restart', action='store_true', help='Ignore the ledger and rerun every job')
+    parser.add_argument('--example-grid', action='store_true', help='Print an example grid file and exit')
+    args = parser.parse_args(argv)
+
+    if args.example_grid:
+        print(json.dumps(EXAMPLE_GRID, indent=2))
+        return
+    if args.grid is None:
+        parser.error('a grid file is required')
+    if not args.executable and not args.waf and not args.dry_run:
+        parser.error('one of --executable or --waf is required')
+
+    try:
+        with open(args.grid, 'r') as f:
+            grid = json.load(f)
+        jobs = expand_grid(grid)
+    except (OSError, ValueError) as e:
+        print(f"❌ Could not read grid {args.grid}: {e}")
+        sys.exit(1)
+
+    output_dir = args.output or time.strftime('sdvn_sweep_%Y%m%d_%H%M%S')
+    command = resolve_command(shlex.split(args.executable) if args.executable else [args.waf or './waf'])
+    runner = SweepRunner(os.path.abspath(output_dir), command, waf=bool(args.waf), layout=args.layout,
+                         timeout_s=args.timeout, retries=args.retries)
+
+    print("=" * 70)
+    print("🔬 SDVN Simulation Sweep")
+    print("=" * 70)
+    print(f"  Grid: {args.grid} -> {len(jobs)} job(s)")
+    print(f"  Results: {output_dir}/ (layout '{args.layout}')")
+
+    if args.dry_run:
+        for job in jobs:
+            print(f"  {job_key(job)}: {shlex.join(runner.command_for(job, '<scratch>'))}")
+        return
+
+    start = time.perf_counter()
+    try:
+        records = runner.run(jobs, args.jobs, args.restart)
+    except KeyboardInterrupt:
+        print(f"\n⏹ Sweep interrupted after {time.perf_counter() - start:.1f}s; running jobs were killed")
+        print(f"📒 Ledger: {os.path.join(output_dir, LEDGER_FILE)} (rerun the same command to resume)")
+        sys.exit(130)
+    failed = [record for record in records if record['status'] != 'done']
+
+    print("-" * 70)
+    print(f"⏱  {len(records) - len(failed)} done, {len(failed)} failed in {time.perf_counter() - start:.1f}s")
+    print(f"📒 Ledger: {os.path.join(output_dir, LEDGER_FILE)} (rerun the same command to resume)")
+    if failed:
+        print("✗ Failed jobs (see <run>_output.txt):")
+        for record in failed:
+            print(f"   {record['job']}: {record['error']}")
+        sys.exit(1)
+    analyzer = 'analyze_mitigation_comparison.py' if args.layout == 'dir' else 'analyze_attack_results.py'
+    print(f"\n💡 Next: python3 {analyzer} {output_dir}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Synthetic Trace Generator
+=========================
+
+Writes statistically realistic stand-ins for the CSVs exported by routing.cc,
+so the analysis scripts can be exercised and benchmarked at any scale without
+an ns-3 build:
+
+- packet-delivery-analysis.csv   (PacketTracker::ExportToCSV)
+- wormhole-attack-results.csv    (WormholeAttackManager::ExportStatistics)
+- blackhole-attack-results.csv   (BlackholeAttackManager::ExportStatistics)
+- blackhole-mitigation-results.csv (BlackholeMitigationManager::ExportStatistics)
+
+Attack exposure is drawn per (source, destination) flow, so the same flows
+stay on attacked routes for the whole run.  Normal packets are delivered
+~85% of the time with log-normal delay (median ~8 ms); wormhole-tunneled
+packets add a ~20 ms detour but are rarely dropped; packets routed through a
+blackhole are delivered only ~25% of the time.
+
+Packet traces are written in chunks, so 100M-row files need bounded memory.
+
+Usage:
+    python3 synthetic_traces.py OUTPUT_DIR [--rows N] [--nodes N]
+                                [--wormhole F] [--blackhole F] [--seed S]
+    python3 synthetic_traces.py ROOT --tree attack|mitigation [--rows N] ...
+
+Author: VANET Security Research
+Date: October 2025
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+PACKET_COLUMNS = ['PacketID', 'SourceNode', 'DestNode', 'SendTime', 'ReceiveTime', 'DelayMs',
+                  'Delivered', 'WormholeOnPath', 'BlackholeOnPath']
+
+# Delivery probability and delay model per exposure (ms)
+NORMAL_PDR = 0.85
+WORMHOLE_PDR = 0.84
+BLACKHOLE_PDR = 0.25
+BASE_DELAY_MEDIAN_MS = 8.0
+BASE_DELAY_SIGMA = 0.6
+TUNNEL_DELAY_MEDIAN_MS = 20.0
+TUNNEL_DELAY_SIGMA = 0.3
+
+# Probability that a packet of an exposed flow actually takes the attacked route
+ROUTE_STICKINESS = 0.8
+
+DEFAULT_CHUNK_ROWS = 1_000_000
+
+# (run id, wormhole fraction, blackhole fraction) written by --tree;
+# names follow test_sdvn_attacks.sh / test_sdvn_attacks_with_without_mitigation.sh
+ATTACK_TREE = [
+    ('test1_sdvn_baseline', 0.0, 0.0),
+    ('test2_sdvn_wormhole_10', 0.1, 0.0),
+    ('test3_sdvn_wormhole_20', 0.2, 0.0),
+    ('test4_sdvn_blackhole_10', 0.0, 0.1),
+    ('test5_sdvn_blackhole_20', 0.0, 0.2),
+    ('test6_sdvn_sybil_10', 0.0, 0.0),
+    ('test7_sdvn_combined_10', 0.1, 0.1),
+]
+MITIGATION_TREE = [
+    ('test01_baseline', 0.0, 0.0),
+    ('test02_wormhole_10_no_mitigation', 0.1, 0.0),
+    ('test03_wormhole_10_with_mitigation', 0.03, 0.0),
+    ('test04_wormhole_20_no_mitigation', 0.2, 0.0),
+    ('test05_wormhole_20_with_mitigation', 0.06, 0.0),
+    ('test06_blackhole_10_no_mitigation', 0.0, 0.1),
+    ('test07_blackhole_10_with_mitigation', 0.0, 0.03),
+    ('test08_blackhole_20_no_mitigation', 0.0, 0.2),
+    ('test09_blackhole_20_with_mitigation', 0.0, 0.06),
+    ('test10_sybil_10_no_mitigation', 0.0, 0.0),
+    ('test11_sybil_10_with_mitigation', 0.0, 0.0),
+    ('test12_combined_10_no_mitigation', 0.1, 0.1),
+    ('test13_combined_10_with_mitigation', 0.03, 0.03),
+]
+
+
+def _flow_exposure(rng, n_nodes, wormhole_fraction, blackhole_fraction):
+    """Per-flow (n_nodes x n_nodes) attack exposure flags"""
+    wormhole = rng.random((n_nodes, n_nodes)) < wormhole_fraction
+    blackhole = rng.random((n_nodes, n_nodes)) < blackhole_fraction
+    return wormhole, blackhole
+
+
+def _packet_chunk(rng, first_id, n, n_nodes, start, end, exposure):
+    """One chunk of packet records, sent between start and end seconds, as a DataFrame"""
+    src = rng.integers(0, n_nodes, n, dtype=np.uint32)
+    dst = rng.integers(0, n_nodes - 1, n, dtype=np.uint32)
+    dst += (dst >= src).astype(np.uint32)  # never send to self
+    send = np.round(np.sort(rng.uniform(start, end, n)), 6)
+
+    wormhole = exposure[0][src, dst] & (rng.random(n) < ROUTE_STICKINESS)
+    blackhole = exposure[1][src, dst] & (rng.random(n) < ROUTE_STICKINESS)
+
+    pdr = np.where(blackhole, BLACKHOLE_PDR, np.where(wormhole, WORMHOLE_PDR, NORMAL_PDR))
+    delivered = rng.random(n) < pdr
+
+    delay = rng.lognormal(np.log(BASE_DELAY_MEDIAN_MS), BASE_DELAY_SIGMA, n)
+    delay += wormhole * rng.lognormal(np.log(TUNNEL_DELAY_MEDIAN_MS), TUNNEL_DELAY_SIGMA, n)
+    delay = np.where(delivered, np.round(delay, 4), 0.0)
+    receive = np.where(delivered, np.round(send + delay / 1000.0, 6), 0.0)
+
+    return pd.DataFrame({
+        'PacketID': np.arange(first_id, first_id + n, dtype=np.uint64),
+        'SourceNode': src,
+        'DestNode': dst,
+        'SendTime': send,
+        'ReceiveTime': receive,
+        'DelayMs': delay,
+        'Delivered': delivered.astype(np.uint8),
+        'WormholeOnPath': wormhole.astype(np.uint8),
+        'BlackholeOnPath': blackhole.astype(np.uint8),
+    })
+
+
+def generate_packet_trace(csv_file, n_packets, n_nodes=28, wormhole_fraction=0.1, blackhole_fraction=0.0,
+                          sim_time=100.0, seed=0, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Write a packet-delivery-analysis.csv with n_packets rows"""
+    rng = np.random.default_rng(seed)
+    exposure = _flow_exposure(rng, n_nodes, wormhole_fraction, blackhole_fraction)
+
+    # Each chunk covers the next slice of the run, so send times stay ordered
+    n_chunks = max(1, -(-n_packets // chunk_rows))
+    bounds = np.linspace(1.0, sim_time, n_chunks + 1)
+    written = 0
+    with open(csv_file, 'w', newline='') as f:
+        f.write(','.join(PACKET_COLUMNS) + '\n')
+        for i in range(n_chunks):
+            n = min(chunk_rows, n_packets - written)
+            chunk = _packet_chunk(rng, written, n, n_nodes, bounds[i], bounds[i + 1], exposure)
+            chunk.to_csv(f, header=False, index=False)
+            written += n
+    return csv_file
+
+
+def generate_wormhole_results(csv_file, n_nodes=28, wormhole_fraction=0.1, n_packets=100_000, seed=0):
+    """Write a wormhole-attack-results.csv (one row per tunnel plus the TOTAL row)"""
+    rng = np.random.default_rng(seed + 1)
+    n_tunnels = max(1, int(round(n_nodes * wormhole_fraction / 2)))
+    nodes = rng.choice(n_nodes, size=min(n_nodes, 2 * n_tunnels), replace=False)
+
+    intercepted = rng.poisson(max(1.0, n_packets * wormhole_fraction / n_tunnels), n_tunnels)
+    tunneled = rng.binomial(intercepted, 0.97)
+    dropped = intercepted - tunneled
+    routing = rng.binomial(intercepted, 0.35)
+    data = intercepted - routing
+    total_delay = tunneled * rng.lognormal(np.log(TUNNEL_DELAY_MEDIAN_MS / 1000.0), TUNNEL_DELAY_SIGMA, n_tunnels)
+    avg_delay = np.where(tunneled > 0, total_delay / np.maximum(tunneled, 1), 0.0)
+
+    rows = pd.DataFrame({
+        'TunnelID': np.arange(n_tunnels).astype(str),
+        'NodeA': nodes[0::2][:n_tunnels].astype(str),
+        'NodeB': nodes[1::2][:n_tunnels].astype(str),
+        'PacketsIntercepted': intercepted,
+        'PacketsTunneled': tunneled,
+        'PacketsDropped': dropped,
+        'RoutingAffected': routing,
+        'DataAffected': data,
+        'AvgDelay': avg_delay,
+    })
+    total_tunneled = int(tunneled.sum())
+    rows.loc[len(rows)] = ['TOTAL', 'ALL', 'ALL', int(intercepted.sum()), total_tunneled, int(dropped.sum()),
+                           int(routing.sum()), int(data.sum()),
+                           total_delay.sum() / total_tunneled if total_tunneled > 0 else 0.0]
+    rows.to_csv(csv_file, index=False)
+    return csv_file
+
+
+def _blackhole_nodes(rng, n_nodes, blackhole_fraction):
+    """The attacking nodes; drawn first from the seed + 2 stream so both blackhole CSVs agree"""
+    n_blackholes = int(round(n_nodes * blackhole_fraction))
+    return np.sort(rng.choice(n_nodes, size=n_blackholes, replace=False))
+
+
+def generate_blackhole_attack_results(csv_file, n_nodes=28, blackhole_fraction=0.1, n_packets=100_000,
+                                      sim_time=100.0, seed=0):
+    """Write a blackhole-attack-results.csv (one row per attacking node, active from t=0)"""
+    rng = np.random.default_rng(seed + 2)
+    blackholes = _blackhole_nodes(rng, n_nodes, blackhole_fraction)
+    n = len(blackholes)
+    dropped = rng.poisson(max(1.0, 3.0 * n_packets / n_nodes * 0.9), n)
+
+    rows = pd.DataFrame({
+        'NodeID': blackholes,
+        'Active': np.ones(n, dtype=int),
+        'DataPacketsDropped': dropped,
+        'RREPsDropped': rng.poisson(20, n),
+        'FakeRREPsGenerated': rng.poisson(50, n),
+        'RoutesAttracted': rng.poisson(30, n),
+        'StartTime': np.zeros(n),
+        'StopTime': np.full(n, sim_time),
+        'Duration': np.full(n, sim_time),
+    })
+    rows.to_csv(csv_file, index=False)
+    return csv_file
+
+
+def generate_blackhole_mitigation_results(csv_file, n_nodes=28, blackhole_fraction=0.1, n_packets=100_000,
+                                          sim_time=100.0, seed=0):
+    """Write a blackhole-mitigation-results.csv (per relay node delivery and blacklist state)"""
+    rng = np.random.default_rng(seed + 2)
+    blackholes = _blackhole_nodes(rng, n_nodes, blackhole_fraction)
+
+    node_ids = np.arange(n_nodes)
+    sent_via = rng.poisson(max(1.0, 3.0 * n_packets / n_nodes), n_nodes)
+    is_blackhole = np.isin(node_ids, blackholes)
+    pdr = np.where(is_blackhole, rng.uniform(0.0, 0.2, n_nodes), rng.beta(40, 6, n_nodes))
+    delivered = rng.binomial(sent_via, pdr)
+
+    # Detection: most blackholes are blacklisted after a few seconds, a few
+    # honest relays are blacklisted too (false positives)
+    blacklisted = np.where(is_blackhole, rng.random(n_nodes) < 0.9, rng.random(n_nodes) < 0.03)
+    blacklist_time = np.where(blacklisted, np.round(rng.uniform(5.0, sim_time / 2, n_nodes), 3), 0)
+
+    rows = pd.DataFrame({
+        'NodeID': node_ids,
+        'PacketsSentVia': sent_via,
+        'PacketsDelivered': delivered,
+        'PacketsDropped': sent_via - delivered,
+        'PDR': np.where(sent_via > 0, delivered / np.maximum(sent_via, 1) * 100, 0.0),
+        'Blacklisted': blacklisted.astype(int),
+        'BlacklistTime': blacklist_time,
+    })
+    rows[rows['PacketsSentVia'] > 0].to_csv(csv_file, index=False)
+    return csv_file
+
+
+def generate_run(output_dir, n_packets, n_nodes=28, wormhole_fraction=0.1, blackhole_fraction=0.0,
+                 sim_time=100.0, seed=0, prefix=''):
+    """Write the CSVs of one run into output_dir (file names prefixed with prefix)"""
+    os.makedirs(output_dir, exist_ok=True)
+
+    def path(name):
+        return os.path.join(output_dir, prefix + name)
+
+    generate_packet_trace(path('packet-delivery-analysis.csv'), n_packets, n_nodes, wormhole_fraction,
+                          blackhole_fraction, sim_time, seed)
+    if wormhole_fraction > 0:
+        generate_wormhole_results(path('wormhole-attack-results.csv'), n_nodes, wormhole_fraction, n_packets, seed)
+    if blackhole_fraction > 0:
+        generate_blackhole_attack_results(path('blackhole-attack-results.csv'), n_nodes, blackhole_fraction,
+                                          n_packets, sim_time, seed)
+        generate_blackhole_mitigation_results(path('blackhole-mitigation-results.csv'), n_nodes,
+                                              blackhole_fraction, n_packets, sim_time, seed)
+
+
+def generate_results_tree(root, layout='attack', n_packets=100_000, n_nodes=28, sim_time=100.0, seed=0):
+    """
+    Write a full results directory in the layout of one of the test scripts.
+
+    layout='attack' writes flat <run>_<file>.csv files (test_sdvn_attacks.sh);
+    layout='mitigation' writes one directory per run
+    (test_sdvn_attacks_with_without_mitigation.sh).
+    """
+    runs = ATTACK_TREE if layout == 'attack' else MITIGATION_TREE
+    for i, (run_id, wormhole, blackhole) in enumerate(runs):
+        if layout == 'attack':
+            generate_run(root, n_packets, n_nodes, wormhole, blackhole, sim_time, seed + i, prefix=f'{run_id}_')
+        else:
+            generate_run(os.path.join(root, run_id), n_packets, n_nodes, wormhole, blackhole, sim_time, seed + i)
+    return root
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic routing.cc CSV outputs')
+    parser.add_argument('output_dir', help='Directory to write into')
+    parser.add_argument('--rows', type=int, default=100_000, help='Packets per trace (default: 100000)')
+    parser.add_argument('--nodes', type=int, default=28, help='Number of nodes (default: 28)')
+    parser.add_argument('--wormhole', type=float, default=0.1,
+                        help='Fraction of flows routed through a wormhole (default: 0.1)')
+    parser.add_argument('--blackhole', type=float, default=0.0,
+                        help='Fraction of flows routed through a blackhole (default: 0.0)')
+    parser.add_argument('--sim-time', type=float, default=100.0, help='Simulated seconds (default: 100)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tree', choices=['attack', 'mitigation'],
+                        help='Write a whole results directory in the layout of that test script')
+    args = parser.parse_args()
+
+    if args.nodes < 2 or args.rows < 1:
+        print("Error: need at least 2 nodes and 1 row")
+        sys.exit(1)
+
+    if args.tree:
+        generate_results_tree(args.output_dir, args.tree, args.rows, args.nodes, args.sim_time, args.seed)
+        print(f"✓ Wrote {args.tree} results tree to {args.output_dir}/ ({args.rows} packets per run)")
+    else:
+        generate_run(args.output_dir, args.rows, args.nodes, args.wormhole, args.blackhole, args.sim_time, args.seed)
+        print(f"✓ Wrote synthetic run to {args.output_dir}/ ({args.rows} packets)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,271 @@
+"""
+PDR / Goodput / Delay Time Series
+=================================
+
+Bins a packet trace on a fixed time grid (e.g. 10 ms) with integer bin
+indices and np.bincount, per attack category (packet_metrics codes):
+
+- sent / delivered packets by SendTime bin   -> PDR series
+- delivered packets by ReceiveTime bin       -> goodput series
+- delay sketch per (SendTime bin, category)  -> p50/p95/p99 delay series
+
+TimeSeriesAccumulator is mergeable like PacketAccumulator, so a trace can be
+binned chunk by chunk, e.g. in the same pass as stream_packet_stats() or
+from the rows CsvTail hands back while following a trace.  Counts can be
+smoothed with a trailing sliding window or an exponentially weighted moving
+average (time constant window_s); PDR is then the ratio of the smoothed
+delivered and sent counts, so sparse bins do not swing it.  Delay
+percentiles are always per bin.
+
+Binned series are cached next to the CSV in
+<csv>.timeseries-<resolution>s.npz, keyed like the other sidecars on the
+CSV's size and mtime.
+
+Author: VANET Security Research
+Date: October 2025
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from latency_sketch import PERCENTILES, RELATIVE_ACCURACY, GroupedSketch
+from packet_loader import (CACHE_VERSION, DEFAULT_CHUNK_ROWS, iter_packet_chunks, read_npz_meta, save_npz_atomic,
+                           source_signature)
+from packet_metrics import ALL, BLACKHOLE, N_CATEGORIES, NORMAL, WORMHOLE, category_codes, column_values
+
+DEFAULT_RESOLUTION_S = 0.1
+
+# Packet size assumed for goodput (as in packet_metrics.delivered_throughput_mbps)
+PACKET_SIZE_BYTES = 512
+
+WINDOWS = ('none', 'sliding', 'ewma')
+
+# Series written per view, in column order
+VIEWS = {
+    'All': ALL,
+    'Normal': NORMAL,
+    'Wormhole': WORMHOLE,
+    'Blackhole': BLACKHOLE,
+}
+
+
+def timeseries_file_for(csv_file, resolution_s):
+    """Return the sidecar file holding a CSV's binned series at one resolution"""
+    return f'{csv_file}.timeseries-{resolution_s:g}s.npz'
+
+
+def _time_bins(times, resolution_s):
+    return np.maximum(np.floor_divide(times, resolution_s), 0).astype(np.int64)
+
+
+def _category_counts(bins, codes):
+    """(N_CATEGORIES, n_bins) packet counts"""
+    if len(bins) == 0:
+        return np.zeros((N_CATEGORIES, 0), dtype=np.int64)
+    counts = np.bincount(bins * N_CATEGORIES + codes, minlength=(int(bins.max()) + 1) * N_CATEGORIES)
+    return counts.reshape(-1, N_CATEGORIES).T
+
+
+def _add_grid(a, b):
+    """Sum of two (N_CATEGORIES, n) count grids of possibly different widths"""
+    if a.shape[1] < b.shape[1]:
+        a, b = b, a
+    total = a.copy()
+    total[:, :b.shape[1]] += b
+    return total
+
+
+class TimeSeriesAccumulator:
+    """Mergeable per-category counts and delay sketches on a fixed time grid"""
+
+    def __init__(self, resolution_s=DEFAULT_RESOLUTION_S):
+        self.resolution_s = resolution_s
+        self.sent = np.zeros((N_CATEGORIES, 0), dtype=np.int64)
+        self.delivered = np.zeros((N_CATEGORIES, 0), dtype=np.int64)
+        self.received = np.zeros((N_CATEGORIES, 0), dtype=np.int64)
+        # Keyed by send bin * N_CATEGORIES + category code
+        self.delay = GroupedSketch()
+
+    @property
+    def n_bins(self):
+        return max(self.sent.shape[1], self.received.shape[1])
+
+    def update(self, chunk):
+        """Fold one DataFrame chunk into the series"""
+        send = column_values(chunk, 'SendTime', np.float64)
+        if send is None or len(chunk) == 0:
+            return self
+        codes = category_codes(chunk).astype(np.int64)
+        bins = _time_bins(send, self.resolution_s)
+        self.sent = _add_grid(self.sent, _category_counts(bins, codes))
+
+        delivered = column_values(chunk, 'Delivered', bool)
+        if delivered is None:
+            return self
+        self.delivered = _add_grid(self.delivered, _category_counts(bins[delivered], codes[delivered]))
+
+        receive = column_values(chunk, 'ReceiveTime', np.float64)
+        if receive is not None:
+            self.received = _add_grid(self.received, _category_counts(
+                _time_bins(receive[delivered], self.resolution_s), codes[delivered]))
+
+        delay = column_values(chunk, 'DelayMs', np.float64)
+        if delay is not None and delivered.any():
+            keys = (bins[delivered] * N_CATEGORIES + codes[delivered]).astype(np.uint64)
+            self.delay.merge(GroupedSketch.from_values(keys, delay[delivered]))
+        return self
+
+    def merge(self, other):
+        """Fold another accumulator (same resolution) into this one"""
+        if other.resolution_s != self.resolution_s:
+            raise ValueError("Cannot merge time series with different resolutions")
+        self.sent = _add_grid(self.sent, other.sent)
+        self.delivered = _add_grid(self.delivered, other.delivered)
+        self.received = _add_grid(self.received, other.received)
+        self.delay.merge(other.delay)
+        return self
+
+    def to_arrays(self):
+        """Flat dict of arrays (for np.savez) that from_arrays() restores"""
+        arrays = {'sent': self.sent, 'delivered': self.delivered, 'received': self.received}
+        arrays.update(self.delay.to_arrays('delay'))
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays, resolution_s):
+        """Inverse of to_arrays()"""
+        series = cls(resolution_s)
+        series.sent = arrays['sent']
+        series.delivered = arrays['delivered']
+        series.received = arrays['received']
+        series.delay = GroupedSketch.from_arrays(arrays, 'delay', RELATIVE_ACCURACY)
+        return series
+
+    def counts(self, name, categories=ALL):
+        """Per-bin totals of 'sent', 'delivered' or 'received' over the given category codes"""
+        grid = getattr(self, name)
+        total = np.zeros(self.n_bins, dtype=np.int64)
+        total[:grid.shape[1]] = grid[list(categories)].sum(axis=0)
+        return total
+
+    def delay_percentile(self, q, categories=ALL):
+        """Per-bin delay (ms) at quantile q over the given category codes, NaN for empty bins"""
+        series = np.full(self.n_bins, np.nan)
+        mask = np.isin(self.delay.keys % np.uint64(N_CATEGORIES), np.asarray(categories, dtype=np.uint64))
+        if not mask.any():
+            return series
+        by_bin = GroupedSketch(RELATIVE_ACCURACY, self.delay.keys[mask] // np.uint64(N_CATEGORIES),
+                               self.delay.buckets[mask], self.delay.counts[mask])._reduce()
+        bins, values = by_bin.quantiles(q)
+        series[bins.astype(np.int64)] = values
+        return series
+
+
+def smooth(counts, window='none', window_s=1.0, resolution_s=DEFAULT_RESOLUTION_S):
+    """
+    Trailing sliding-window sum (window='sliding') or EWMA with time constant
+    window_s (window='ewma') of a count series; window='none' returns it as is.
+    """
+    counts = np.asarray(counts, dtype=np.float64)
+    if window == 'sliding':
+        width = max(1, int(round(window_s / resolution_s)))
+        cumulative = np.r_[0.0, np.cumsum(counts)]
+        ends = np.arange(1, len(counts) + 1)
+        return cumulative[ends] - cumulative[np.maximum(ends - width, 0)]
+    if window == 'ewma':
+        alpha = 1.0 - np.exp(-resolution_s / window_s)
+        return pd.Series(counts).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    if window != 'none':
+        raise ValueError(f"Unknown window {window!r} (expected one of {', '.join(WINDOWS)})")
+    return counts
+
+
+def series_table(series, window='none', window_s=1.0, percentiles=PERCENTILES):
+    """
+    One row per time bin: Time (bin start, s) and, for every view with
+    traffic, <View>_Sent/_Delivered/_PDR/_GoodputMbps/_DelayP<p>Ms columns.
+    """
+    res = series.resolution_s
+    table = {'Time': np.arange(series.n_bins) * res}
+    for view, categories in VIEWS.items():
+        sent = series.counts('sent', categories)
+        if sent.sum() == 0:
+            continue
+        sent_w = smooth(sent, window, window_s, res)
+        delivered_w = smooth(series.counts('delivered', categories), window, window_s, res)
+        received_w = smooth(series.counts('received', categories), window, window_s, res)
+        # Seconds covered by each smoothed value
+        span = np.full(series.n_bins, res)
+        if window == 'sliding':
+            span = smooth(np.ones(series.n_bins), window, window_s, res) * res
+        table[f'{view}_Sent'] = sent_w
+        table[f'{view}_Delivered'] = delivered_w
+        table[f'{view}_PDR'] = np.divide(delivered_w * 100, sent_w, out=np.full(series.n_bins, np.nan),
+                                         where=sent_w > 0)
+        table[f'{view}_GoodputMbps'] = received_w * PACKET_SIZE_BYTES * 8 / (span * 1_000_000)
+        for p in percentiles:
+            table[f'{view}_DelayP{p:g}Ms'] = series.delay_percentile(p / 100, categories)
+    return pd.DataFrame(table)
+
+
+def _read_series(series_file, signature, resolution_s):
+    """Load a valid cached series, or return None if missing/stale"""
+    try:
+        with np.load(series_file) as arrays:
+            meta = read_npz_meta(arrays)
+            if (meta.get('version') != CACHE_VERSION or meta.get('source') != signature
+                    or meta.get('resolution_s') != resolution_s
+                    or meta.get('relative_accuracy') != RELATIVE_ACCURACY):
+                return None
+            return TimeSeriesAccumulator.from_arrays(arrays, resolution_s)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def cached_time_series(csv_file, resolution_s=DEFAULT_RESOLUTION_S):
+    """A run's sidecar series at resolution_s if it is current, else None"""
+    return _read_series(timeseries_file_for(csv_file, resolution_s), source_signature(csv_file), resolution_s)
+
+
+def save_time_series(csv_file, series, signature=None):
+    """Persist a run's binned series next to its CSV (atomic rename)"""
+    if signature is None:
+        signature = source_signature(csv_file)
+    meta = {
+        'version': CACHE_VERSION,
+        'source': signature,
+        'resolution_s': series.resolution_s,
+        'relative_accuracy': RELATIVE_ACCURACY,
+    }
+    save_npz_atomic(timeseries_file_for(csv_file, series.resolution_s), meta, series.to_arrays())
+
+
+def load_time_series(csv_file, resolution_s=DEFAULT_RESOLUTION_S, df=None, chunksize=DEFAULT_CHUNK_ROWS,
+                     use_cache=True):
+    """
+    Binned series of a run, reusing the sidecar when it is current.
+
+    Otherwise the series is built from df, or chunk by chunk from the CSV
+    when df is None, and written back.
+    """
+    signature = source_signature(csv_file)
+    if use_cache:
+        series = _read_series(timeseries_file_for(csv_file, resolution_s), signature, resolution_s)
+        if series is not None:
+            return series
+
+    series = TimeSeriesAccumulator(resolution_s)
+    if df is not None:
+        series.update(df)
+    else:
+        for chunk in iter_packet_chunks(csv_file, chunksize, use_cache):
+            series.update(chunk)
+
+    if use_cache:
+        try:
+            save_time_series(csv_file, series, signature)
+        except OSError as e:
+            print(f"⚠ Could not write time series cache for {os.path.basename(csv_file)}: {e}")
+    return series
@@ -3,39 +3,203 @@
 wormhole_analysis.py
 Analyze wormhole attack statistics from CSV output
 
+The CSV is parsed once into a typed, columnar TunnelTable (one NumPy array
+per column, TOTAL row split out) and the per-tunnel rates are computed
+vectorized at parse time.  Several CSVs (e.g. the 10% and 20% runs of a
+sweep) can be given at once for per-run and pooled statistics.
+
 Usage:
     python3 wormhole_analysis.py wormhole-attack-results.csv
     python3 wormhole_analysis.py wormhole-attack-results.csv --plot
+    python3 wormhole_analysis.py results/*wormhole-attack-results.csv
+    python3 wormhole_analysis.py batch results_root/ [-j N] [-o DIR]
+    python3 wormhole_analysis.py batch 'sweeps/**/*wormhole-*-results.csv'
+
+The batch subcommand finds every run with a wormhole-attack-results.csv or
+wormhole-detection-results.csv (scenario_catalog naming), parses them in a
+process pool, writes per-tunnel, per-run and per-attack-rate tables (seeds
+pooled) and renders one headless figure per run plus a per-rate summary,
+also in parallel.
 """
 
+import os
 import sys
 import csv
+import glob
+import time
 import argparse
-from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from metric_values import read_metric_file
+from plot_scheduler import RenderJob, print_render_timings, render_figures, resolve_jobs
+from scenario_catalog import (RUN_DIR_PATTERN, ScenarioCatalog, run_key, run_label as scenario_label,
+                              unique_labels)
+
+RESULTS_FILE = 'wormhole-attack-results.csv'
+DETECTION_FILE = 'wormhole-detection-results.csv'
+TOTAL_ROW = 'TOTAL'
+
+# CSV column -> (TunnelTable attribute, dtype)
+COLUMNS = {
+    'TunnelID': ('tunnel_id', np.int32),
+    'NodeA': ('node_a', np.int32),
+    'NodeB': ('node_b', np.int32),
+    'PacketsIntercepted': ('intercepted', np.int64),
+    'PacketsTunneled': ('tunneled', np.int64),
+    'PacketsDropped': ('dropped', np.int64),
+    'RoutingAffected': ('routing', np.int64),
+    'DataAffected': ('data', np.int64),
+    'AvgDelay': ('avg_delay', np.float64),
+}
+
+COUNT_COLUMNS = ('PacketsIntercepted', 'PacketsTunneled', 'PacketsDropped', 'RoutingAffected', 'DataAffected')
+
+def _percent(numerator, denominator):
+    """numerator / denominator * 100, 0 where the denominator is 0"""
+    numerator = np.asarray(numerator, dtype=np.float64)
+    return np.divide(numerator * 100, denominator, out=np.zeros_like(numerator), where=np.asarray(denominator) > 0)
+
+class TunnelTable:
+    """Per-tunnel statistics of one or more runs as typed column arrays"""
+
+    __slots__ = ('runs', 'run') + tuple(attr for attr, _ in COLUMNS.values()) + ('success_rate', 'drop_rate')
+
+    def __init__(self, columns, run=None, runs=None):
+        """columns maps every COLUMNS attribute to an array; run indexes runs per tunnel"""
+        for attr, dtype in COLUMNS.values():
+            setattr(self, attr, np.asarray(columns[attr], dtype=dtype))
+        n = len(self.tunnel_id)
+        self.run = np.zeros(n, dtype=np.int32) if run is None else np.asarray(run, dtype=np.int32)
+        self.runs = list(runs) if runs is not None else ['']
+        # Derived rates (%), once for all tunnels
+        self.success_rate = _percent(self.tunneled, self.intercepted)
+        self.drop_rate = _percent(self.dropped, self.intercepted)
+
+    def __len__(self):
+        return len(self.tunnel_id)
+
+    @classmethod
+    def concat(cls, tables, runs):
+        """One table of several runs' tables (tables[i] belongs to runs[i])"""
+        columns = {attr: np.concatenate([getattr(t, attr) for t in tables]) if tables else np.zeros(0)
+                   for attr, _ in COLUMNS.values()}
+        run = np.concatenate([np.full(len(t), i, dtype=np.int32) for i, t in enumerate(tables)]) if tables else None
+        return cls(columns, run, runs)
+
+    def labels(self):
+        """Tunnel labels for tables and plots ('<run>:<id>' when there are several runs)"""
+        if len(self.runs) == 1:
+            return [str(i) for i in self.tunnel_id]
+        return [f'{self.runs[r]}:{i}' for r, i in zip(self.run, self.tunnel_id)]
+
+    def totals(self, mask=None):
+        """Aggregate row in the CSV vocabulary (AvgDelay weighted by tunneled packets)"""
+        mask = slice(None) if mask is None else mask
+        tunneled = self.tunneled[mask]
+        total = {
+            'PacketsIntercepted': int(self.intercepted[mask].sum()),
+            'PacketsTunneled': int(tunneled.sum()),
+            'PacketsDropped': int(self.dropped[mask].sum()),
+            'RoutingAffected': int(self.routing[mask].sum()),
+            'DataAffected': int(self.data[mask].sum()),
+        }
+        delay_sum = float((self.avg_delay[mask] * tunneled).sum())
+        total['AvgDelay'] = delay_sum / total['PacketsTunneled'] if total['PacketsTunneled'] > 0 else 0.0
+        return total
+
+    def per_run(self):
+        """Per-run sums and rates as {column: array}, one entry per run"""
+        n_runs = len(self.runs)
+
+        def by_run(values):
+            return np.bincount(self.run, weights=values, minlength=n_runs)
+
+        intercepted = by_run(self.intercepted).astype(np.int64)
+        tunneled = by_run(self.tunneled).astype(np.int64)
+        return {
+            'Run': np.array(self.runs, dtype=object),
+            'Tunnels': np.bincount(self.run, minlength=n_runs),
+            'ActiveTunnels': np.bincount(self.run[self.intercepted > 0], minlength=n_runs),
+            'PacketsIntercepted': intercepted,
+            'PacketsTunneled': tunneled,
+            'PacketsDropped': by_run(self.dropped).astype(np.int64),
+            'RoutingAffected': by_run(self.routing).astype(np.int64),
+            'DataAffected': by_run(self.data).astype(np.int64),
+            'AvgDelay': np.divide(by_run(self.avg_delay * self.tunneled), tunneled,
+                                  out=np.zeros(n_runs), where=tunneled > 0),
+            'SuccessRate': _percent(tunneled, intercepted),
+        }
+
+    def most_active(self):
+        """Row index of the tunnel with the most intercepted packets, or None"""
+        return int(np.argmax(self.intercepted)) if len(self) else None
+
+def parse_csv(filename, run=''):
+    """
+    Parse the wormhole statistics CSV file.
+
+    Returns (TunnelTable, aggregate) where aggregate is the TOTAL row as a
+    dict of typed values in the CSV vocabulary, or None when it is missing.
+    """
+    with open(filename, 'r', newline='') as f:
+        reader = csv.reader(f)
+        header = [column.strip() for column in next(reader)]
+        rows = [row for row in reader if row]
+
+    missing = [column for column in COLUMNS if column not in header]
+    if missing:
+        raise ValueError(f"missing column(s): {', '.join(missing)}")
+    positions = [header.index(column) for column in COLUMNS]
 
-def parse_csv(filename):
-    """Parse the wormhole statistics CSV file"""
-    tunnels = []
     aggregate = None
-    
-    with open(filename, 'r') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            if row['TunnelID'] == 'TOTAL':
-                aggregate = row
-            else:
-                tunnels.append(row)
-    
-    return tunnels, aggregate
+    tunnel_rows = []
+    for row in rows:
+        if row[positions[0]].strip() == TOTAL_ROW:
+            aggregate = {column: COLUMNS[column][1](row[header.index(column)]).item()
+                         for column in COUNT_COLUMNS + ('AvgDelay',)}
+        else:
+            tunnel_rows.append([row[p] for p in positions])
+
+    # Convert whole columns at once (string array -> typed array)
+    cells = np.array(tunnel_rows, dtype=str).reshape(len(tunnel_rows), len(COLUMNS))
+    columns = {attr: cells[:, i].astype(np.float64 if dtype is np.float64 else np.int64)
+               for i, (attr, dtype) in enumerate(COLUMNS.values())}
+    return TunnelTable(columns, runs=[run]), aggregate
+
+def run_label(filename):
+    """Run name of a results file: its '<run>_' prefix, else its directory name"""
+    base = os.path.basename(filename)
+    if base.endswith('_' + RESULTS_FILE):
+        return base[:-len(RESULTS_FILE) - 1]
+    return os.path.basename(os.path.dirname(os.path.abspath(filename))) or base
+
+def parse_csvs(filenames):
+    """
+    Parse several results files into one TunnelTable (tunnel.run indexes the
+    run labels) and {run label: TOTAL row or None}.
+    """
+    labels = [run_label(name) for name in filenames]
+    if len(set(labels)) < len(labels):
+        # Two files resolve to the same run name: label by path instead
+        labels = [os.path.relpath(name) for name in filenames]
+
+    tables, aggregates = [], {}
+    for name, label in zip(filenames, labels):
+        table, aggregate = parse_csv(name, label)
+        tables.append(table)
+        aggregates[label] = aggregate
+    return TunnelTable.concat(tables, labels), aggregates
 
 def print_statistics(tunnels, aggregate):
     """Print formatted statistics"""
     print("\n" + "="*70)
     print("  WORMHOLE ATTACK ANALYSIS")
     print("="*70)
-    
+
     print(f"\nTotal Tunnels: {len(tunnels)}")
-    
+
     if aggregate:
         print("\nAGGREGATE STATISTICS:")
         print(f"  Total Packets Intercepted: {aggregate['PacketsIntercepted']}")
@@ -43,122 +207,140 @@ def print_statistics(tunnels, aggregate):
         print(f"  Total Packets Dropped: {aggregate['PacketsDropped']}")
         print(f"  Routing Packets Affected: {aggregate['RoutingAffected']}")
         print(f"  Data Packets Affected: {aggregate['DataAffected']}")
-        print(f"  Average Tunneling Delay: {float(aggregate['AvgDelay']):.9f} seconds")
-        
+        print(f"  Average Tunneling Delay: {aggregate['AvgDelay']:.9f} seconds")
+
         # Calculate success rate
-        total = int(aggregate['PacketsIntercepted'])
-        tunneled = int(aggregate['PacketsTunneled'])
+        total = aggregate['PacketsIntercepted']
+        tunneled = aggregate['PacketsTunneled']
         if total > 0:
             success_rate = (tunneled / total) * 100
             print(f"  Tunneling Success Rate: {success_rate:.2f}%")
-    
+
     print("\nPER-TUNNEL STATISTICS:")
     print("-"*70)
     print(f"{'ID':<5} {'Nodes':<12} {'Intercept':<10} {'Tunnel':<10} {'Drop':<8} {'Success%':<10}")
     print("-"*70)
-    
-    for tunnel in tunnels:
-        tunnel_id = tunnel['TunnelID']
-        nodes = f"{tunnel['NodeA']}-{tunnel['NodeB']}"
-        intercepted = int(tunnel['PacketsIntercepted'])
-        tunneled = int(tunnel['PacketsTunneled'])
-        dropped = int(tunnel['PacketsDropped'])
-        
-        if intercepted > 0:
-            success = (tunneled / intercepted) * 100
-        else:
-            success = 0.0
-        
-        print(f"{tunnel_id:<5} {nodes:<12} {intercepted:<10} {tunneled:<10} {dropped:<8} {success:<10.2f}")
-    
+
+    for label, node_a, node_b, intercepted, tunneled, dropped, success in zip(
+            tunnels.labels(), tunnels.node_a, tunnels.node_b, tunnels.intercepted, tunnels.tunneled,
+            tunnels.dropped, tunnels.success_rate):
+        nodes = f"{node_a}-{node_b}"
+        print(f"{label:<5} {nodes:<12} {intercepted:<10} {tunneled:<10} {dropped:<8} {success:<10.2f}")
+
+    print("="*70)
+
+def print_run_statistics(tunnels):
+    """Print one line per run and the pooled totals"""
+    stats = tunnels.per_run()
+    print("\n" + "="*70)
+    print("  PER-RUN STATISTICS")
     print("="*70)
+    width = max([len('Run')] + [len(run) for run in stats['Run']])
+    print(f"{'Run':<{width}} {'Tunnels':>8} {'Active':>7} {'Intercept':>10} {'Tunnel':>9} {'Drop':>7} {'Success%':>9}")
+    print("-"*(width + 56))
+    for i, run in enumerate(stats['Run']):
+        print(f"{run:<{width}} {stats['Tunnels'][i]:>8} {stats['ActiveTunnels'][i]:>7} "
+              f"{stats['PacketsIntercepted'][i]:>10} {stats['PacketsTunneled'][i]:>9} "
+              f"{stats['PacketsDropped'][i]:>7} {stats['SuccessRate'][i]:>9.2f}")
+
+    pooled = tunnels.totals()
+    success = _percent(pooled['PacketsTunneled'], pooled['PacketsIntercepted'])
+    print("-"*(width + 56))
+    print(f"{'POOLED':<{width}} {len(tunnels):>8} {int((tunnels.intercepted > 0).sum()):>7} "
+          f"{pooled['PacketsIntercepted']:>10} {pooled['PacketsTunneled']:>9} "
+          f"{pooled['PacketsDropped']:>7} {float(success):>9.2f}")
+    print("="*70)
+
+def write_run_statistics(tunnels, output_file):
+    """Write the per-run statistics (plus a POOLED row) as CSV"""
+    stats = tunnels.per_run()
+    pooled = tunnels.totals()
+    pooled.update({
+        'Run': 'POOLED',
+        'Tunnels': len(tunnels),
+        'ActiveTunnels': int((tunnels.intercepted > 0).sum()),
+        'SuccessRate': float(_percent(pooled['PacketsTunneled'], pooled['PacketsIntercepted'])),
+    })
+    with open(output_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(list(stats))
+        for i in range(len(stats['Run'])):
+            writer.writerow([stats[column][i] for column in stats])
+        writer.writerow([pooled[column] for column in stats])
+    print(f"Per-run statistics saved to: {output_file}")
 
 def analyze_attack_effectiveness(tunnels, aggregate):
     """Analyze the effectiveness of the wormhole attack"""
     print("\n" + "="*70)
     print("  ATTACK EFFECTIVENESS ANALYSIS")
     print("="*70)
-    
+
     if not aggregate:
         print("No aggregate data available")
         return
-    
-    total_intercepted = int(aggregate['PacketsIntercepted'])
-    total_tunneled = int(aggregate['PacketsTunneled'])
-    total_dropped = int(aggregate['PacketsDropped'])
-    routing_affected = int(aggregate['RoutingAffected'])
-    data_affected = int(aggregate['DataAffected'])
-    
+
+    total_intercepted = aggregate['PacketsIntercepted']
+    total_tunneled = aggregate['PacketsTunneled']
+    total_dropped = aggregate['PacketsDropped']
+    routing_affected = aggregate['RoutingAffected']
+    data_affected = aggregate['DataAffected']
+
     print(f"\n1. INTERCEPTION RATE")
     print(f"   Total packets intercepted: {total_intercepted}")
     if total_intercepted > 0:
         print(f"   Routing packets: {routing_affected} ({(routing_affected/total_intercepted)*100:.1f}%)")
         print(f"   Data packets: {data_affected} ({(data_affected/total_intercepted)*100:.1f}%)")
-    
+
     print(f"\n2. TUNNELING EFFECTIVENESS")
     if total_intercepted > 0:
         tunnel_rate = (total_tunneled / total_intercepted) * 100
         drop_rate = (total_dropped / total_intercepted) * 100
         print(f"   Successfully tunneled: {total_tunneled} ({tunnel_rate:.2f}%)")
         print(f"   Dropped: {total_dropped} ({drop_rate:.2f}%)")
-    
+
     print(f"\n3. ATTACK IMPACT")
     if total_intercepted > 0:
         print(f"   Routing protocol impact: {routing_affected} packets")
         print(f"   Data traffic impact: {data_affected} packets")
-        
+
         if routing_affected > 0:
             print(f"   → Likely causing topology disruption")
         if data_affected > 0:
             print(f"   → Likely causing throughput degradation")
-    
+
     print(f"\n4. TUNNEL DISTRIBUTION")
-    active_tunnels = sum(1 for t in tunnels if int(t['PacketsIntercepted']) > 0)
+    active_tunnels = int((tunnels.intercepted > 0).sum())
     print(f"   Active tunnels: {active_tunnels}/{len(tunnels)}")
-    
+
     if len(tunnels) > 0:
         avg_per_tunnel = total_intercepted / len(tunnels)
         print(f"   Avg packets per tunnel: {avg_per_tunnel:.2f}")
-    
+
     # Find most active tunnel
-    if tunnels:
-        most_active = max(tunnels, key=lambda t: int(t['PacketsIntercepted']))
+    most_active = tunnels.most_active()
+    if most_active is not None:
         print(f"\n5. MOST ACTIVE TUNNEL")
-        print(f"   Tunnel ID: {most_active['TunnelID']}")
-        print(f"   Nodes: {most_active['NodeA']} <-> {most_active['NodeB']}")
-        print(f"   Packets intercepted: {most_active['PacketsIntercepted']}")
-    
+        print(f"   Tunnel ID: {tunnels.labels()[most_active]}")
+        print(f"   Nodes: {tunnels.node_a[most_active]} <-> {tunnels.node_b[most_active]}")
+        print(f"   Packets intercepted: {tunnels.intercepted[most_active]}")
+
     print("="*70)
 
-def plot_statistics(tunnels, aggregate):
-    """Generate plots using matplotlib"""
-    try:
-        import matplotlib.pyplot as plt
-        import numpy as np
-    except ImportError:
-        print("\nMatplotlib not available. Install with: pip install matplotlib")
-        return
-    
-    print("\nGenerating plots...")
-    
+def _draw_tunnel_figure(plt, tunnel_ids, node_pairs, columns, aggregate, title='Wormhole Attack Analysis'):
+    """2x2 tunnel figure from per-tunnel column arrays; returns the Figure"""
     # Create figure with subplots
     fig, axes = plt.subplots(2, 2, figsize=(14, 10))
-    fig.suptitle('Wormhole Attack Analysis', fontsize=16, fontweight='bold')
-    
+    fig.suptitle(title, fontsize=16, fontweight='bold')
+
     # Plot 1: Packets per tunnel
     ax1 = axes[0, 0]
-    tunnel_ids = [t['TunnelID'] for t in tunnels]
-    intercepted = [int(t['PacketsIntercepted']) for t in tunnels]
-    tunneled = [int(t['PacketsTunneled']) for t in tunnels]
-    dropped = [int(t['PacketsDropped']) for t in tunnels]
-    
     x = np.arange(len(tunnel_ids))
     width = 0.25
-    
-    ax1.bar(x - width, intercepted, width, label='Intercepted', color='orange')
-    ax1.bar(x, tunneled, width, label='Tunneled', color='green')
-    ax1.bar(x + width, dropped, width, label='Dropped', color='red')
-    
+
+    ax1.bar(x - width, columns['intercepted'], width, label='Intercepted', color='orange')
+    ax1.bar(x, columns['tunneled'], width, label='Tunneled', color='green')
+    ax1.bar(x + width, columns['dropped'], width, label='Dropped', color='red')
+
     ax1.set_xlabel('Tunnel ID')
     ax1.set_ylabel('Packet Count')
     ax1.set_title('Packets per Tunnel')
@@ -166,80 +348,312 @@ def plot_statistics(tunnels, aggregate):
     ax1.set_xticklabels(tunnel_ids)
     ax1.legend()
     ax1.grid(True, alpha=0.3)
-    
+
     # Plot 2: Success rate per tunnel
     ax2 = axes[0, 1]
-    success_rates = []
-    for t in tunnels:
-        inter = int(t['PacketsIntercepted'])
-        tunn = int(t['PacketsTunneled'])
-        if inter > 0:
-            success_rates.append((tunn / inter) * 100)
-        else:
-            success_rates.append(0)
-    
-    ax2.bar(tunnel_ids, success_rates, color='skyblue')
+    ax2.bar(tunnel_ids, columns['success_rate'], color='skyblue')
     ax2.set_xlabel('Tunnel ID')
     ax2.set_ylabel('Success Rate (%)')
     ax2.set_title('Tunneling Success Rate')
     ax2.set_ylim([0, 105])
     ax2.grid(True, alpha=0.3)
-    
+
     # Plot 3: Packet type distribution
-    if aggregate:
+    if aggregate and aggregate['RoutingAffected'] + aggregate['DataAffected'] > 0:
         ax3 = axes[1, 0]
-        routing = int(aggregate['RoutingAffected'])
-        data = int(aggregate['DataAffected'])
-        
+        routing = aggregate['RoutingAffected']
+        data = aggregate['DataAffected']
+
         labels = ['Routing\nPackets', 'Data\nPackets']
         sizes = [routing, data]
         colors = ['#ff9999', '#66b3ff']
         explode = (0.1, 0)
-        
+
         ax3.pie(sizes, explode=explode, labels=labels, colors=colors,
                 autopct='%1.1f%%', shadow=True, startangle=90)
         ax3.set_title('Affected Packet Types')
-    
+
     # Plot 4: Tunnel activity heatmap
     ax4 = axes[1, 1]
-    node_pairs = [f"{t['NodeA']}-{t['NodeB']}" for t in tunnels]
-    activity = [int(t['PacketsIntercepted']) for t in tunnels]
-    
-    colors_map = plt.cm.YlOrRd(np.linspace(0.3, 0.9, len(tunnels)))
-    bars = ax4.barh(node_pairs, activity, color=colors_map)
+    colors_map = plt.cm.YlOrRd(np.linspace(0.3, 0.9, len(tunnel_ids)))
+    ax4.barh(node_pairs, columns['intercepted'], color=colors_map)
     ax4.set_xlabel('Packets Intercepted')
     ax4.set_ylabel('Node Pair')
     ax4.set_title('Tunnel Activity')
     ax4.grid(True, alpha=0.3, axis='x')
-    
+
     plt.tight_layout()
-    
+    return fig
+
+def _figure_args(tunnels):
+    """(tunnel labels, node-pair labels, plotted columns) of a TunnelTable"""
+    tunnel_ids = tunnels.labels()
+    node_pairs = [f"{a}-{b}" for a, b in zip(tunnels.node_a, tunnels.node_b)]
+    if len(tunnels.runs) > 1:
+        node_pairs = [f"{label.rsplit(':', 1)[0]}:{pair}" for label, pair in zip(tunnel_ids, node_pairs)]
+    columns = {name: getattr(tunnels, name) for name in ('intercepted', 'tunneled', 'dropped', 'success_rate')}
+    return tunnel_ids, node_pairs, columns
+
+def plot_statistics(tunnels, aggregate):
+    """Generate plots using matplotlib"""
+    try:
+        import matplotlib.pyplot as plt
+    except ImportError:
+        print("\nMatplotlib not available. Install with: pip install matplotlib")
+        return
+
+    print("\nGenerating plots...")
+
+    _draw_tunnel_figure(plt, *_figure_args(tunnels), aggregate)
+
     # Save figure
     output_file = 'wormhole_analysis.png'
     plt.savefig(output_file, dpi=300, bbox_inches='tight')
     print(f"Plot saved to: {output_file}")
-    
+
     plt.show()
 
+def render_tunnel_figure(tunnel_ids, node_pairs, columns, aggregate, title, output_file):
+    """Headless tunnel figure for the batch mode (picklable RenderJob function)"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig = _draw_tunnel_figure(plt, tunnel_ids, node_pairs, columns, aggregate, title)
+    fig.savefig(output_file, dpi=150, bbox_inches='tight')
+    plt.close(fig)
+
+def render_rate_figure(rates, output_file):
+    """Per-attack-rate summary (interception, tunneling success, detection) as bar charts"""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+
+    fig, axes = plt.subplots(1, 3, figsize=(16, 5))
+    fig.suptitle('Wormhole Attack by Attack Rate', fontsize=14, fontweight='bold')
+    labels = list(rates['Scenario'])
+    panels = (
+        ('InterceptedPerRun', 'Packets Intercepted per Run', 'Packets', 'orange'),
+        ('SuccessRate', 'Tunneling Success Rate', 'Success Rate (%)', 'skyblue'),
+        ('DetectionRatio', 'Flows Detected / Flows Affected', 'Detection (%)', 'seagreen'),
+    )
+    for ax, (column, title, ylabel, color) in zip(axes, panels):
+        ax.bar(labels, np.nan_to_num(rates[column]), color=color)
+        ax.set_title(title)
+        ax.set_ylabel(ylabel)
+        plt.setp(ax.get_xticklabels(), rotation=30, ha='right')
+        ax.grid(True, alpha=0.3, axis='y')
+    axes[1].set_ylim([0, 105])
+    axes[2].set_ylim([0, 105])
+
+    plt.tight_layout()
+    fig.savefig(output_file, dpi=150, bbox_inches='tight')
+    plt.close(fig)
+
+def find_runs(source):
+    """
+    Runs (scenario_catalog.RunInfo) with a wormhole attack or detection file,
+    from a results root or from a glob matching such files.
+    """
+    if os.path.isdir(source):
+        runs = list(ScenarioCatalog.discover(source))
+    else:
+        matches = {os.path.abspath(path) for path in glob.glob(source, recursive=True)}
+        # Discover the directories holding the matched files, keep the matched runs
+        roots = set()
+        for path in matches:
+            parent = os.path.dirname(path)
+            roots.add(os.path.dirname(parent) if RUN_DIR_PATTERN.match(os.path.basename(parent)) else parent)
+        runs = [run for root in sorted(roots) for run in ScenarioCatalog.discover(root, recursive=False)
+                if matches.intersection(os.path.abspath(p) for p in run.files.values())]
+    return [run for run in runs if RESULTS_FILE in run.files or DETECTION_FILE in run.files]
+
+def _load_run(run):
+    """(TunnelTable or None, TOTAL row, detection metrics) of one run; runs in a worker"""
+    tunnels, aggregate = None, None
+    if RESULTS_FILE in run.files:
+        tunnels, aggregate = parse_csv(run.files[RESULTS_FILE])
+    detection = read_metric_file(run.files[DETECTION_FILE]) if DETECTION_FILE in run.files else None
+    return tunnels, aggregate, detection
+
+def load_runs(runs, jobs=1):
+    """Parse every run's files, jobs at a time in worker processes (results in run order)"""
+    n_jobs = min(resolve_jobs(jobs), len(runs))
+    if n_jobs <= 1:
+        return [_load_run(run) for run in runs]
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        return list(pool.map(_load_run, runs, chunksize=max(1, len(runs) // (4 * n_jobs))))
+
+def rate_statistics(runs, tunnels, detections):
+    """
+    Per attack rate (attack, percentage, mitigation; seeds pooled):
+    {column: array} with run counts, packet sums and rates, and the
+    detector's FlowsDetected / FlowsAffected ratio.
+    """
+    keys = [(run.architecture or '', run.attack, run.percentage or 0, run.mitigation is True) for run in runs]
+    rate_keys = sorted(set(keys))
+    group = np.array([rate_keys.index(key) for key in keys], dtype=np.int64)
+    n = len(rate_keys)
+    # Label of each rate from its first run, without the seed
+    names = {key: scenario_label(run._replace(seed=None)) for key, run in zip(keys, runs)}
+
+    def by_rate(values):
+        values = np.asarray(values, dtype=np.float64)
+        valid = ~np.isnan(values)
+        return np.bincount(group[valid], weights=values[valid], minlength=n)
+
+    per_run = tunnels.per_run()
+    has_tunnels = np.array([RESULTS_FILE in run.files for run in runs])
+    runs_with_tunnels = np.bincount(group[has_tunnels], minlength=n)
+    intercepted = by_rate(per_run['PacketsIntercepted'])
+    tunneled = by_rate(per_run['PacketsTunneled'])
+
+    def detection_column(metric):
+        return np.array([np.nan if d is None or metric not in d else float(d[metric]) for d in detections])
+
+    detected = by_rate(detection_column('FlowsDetected'))
+    affected = by_rate(detection_column('FlowsAffected'))
+    blacklisted = detection_column('NodesBlacklisted')
+    with_detection = np.bincount(group[~np.isnan(blacklisted)], minlength=n)
+
+    return {
+        'Scenario': np.array([names[key] for key in rate_keys], dtype=object),
+        'Runs': np.bincount(group, minlength=n),
+        'Tunnels': by_rate(per_run['Tunnels']).astype(np.int64),
+        'PacketsIntercepted': intercepted.astype(np.int64),
+        'PacketsTunneled': tunneled.astype(np.int64),
+        'PacketsDropped': by_rate(per_run['PacketsDropped']).astype(np.int64),
+        'InterceptedPerRun': np.divide(intercepted, runs_with_tunnels, out=np.zeros(n), where=runs_with_tunnels > 0),
+        'SuccessRate': _percent(tunneled, intercepted),
+        'FlowsDetected': detected.astype(np.int64),
+        'FlowsAffected': affected.astype(np.int64),
+        'DetectionRatio': np.divide(detected * 100, affected, out=np.full(n, np.nan), where=affected > 0),
+        'NodesBlacklistedPerRun': np.divide(by_rate(blacklisted), with_detection, out=np.full(n, np.nan),
+                                            where=with_detection > 0),
+    }
+
+def _write_columns(columns, output_file):
+    """Write a {column: array} table as CSV"""
+    with open(output_file, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(list(columns))
+        n = len(next(iter(columns.values()))) if columns else 0
+        for i in range(n):
+            writer.writerow([columns[column][i] for column in columns])
+
+def _figure_name(run):
+    """Figure file of a run, named after its path relative to the results root"""
+    return 'wormhole_' + run_key(run).replace(os.sep, '__') + '.png'
+
+def batch_analyze(source, jobs=1, output_dir=None, plots=True):
+    """Parse, aggregate and plot every wormhole run under a results root or glob"""
+    runs = find_runs(source)
+    if not runs:
+        print(f"⚠ No {RESULTS_FILE} or {DETECTION_FILE} files found for: {source}")
+        return None
+    output_dir = output_dir or (source if os.path.isdir(source) else '.')
+    os.makedirs(output_dir, exist_ok=True)
+
+    start = time.perf_counter()
+    loaded = load_runs(runs, jobs)
+    labels = unique_labels(runs)
+    empty = TunnelTable({attr: np.zeros(0) for attr, _ in COLUMNS.values()})
+    tunnels = TunnelTable.concat([t if t is not None else empty for t, _, _ in loaded], labels)
+    detections = [d for _, _, d in loaded]
+    print(f"✓ Parsed {len(runs)} run(s), {len(tunnels)} tunnel(s) in {time.perf_counter() - start:.2f}s")
+
+    print_run_statistics(tunnels)
+    rates = rate_statistics(runs, tunnels, detections)
+    print("\nPER-ATTACK-RATE STATISTICS (seeds pooled):")
+    for i, scenario in enumerate(rates['Scenario']):
+        detection = rates['DetectionRatio'][i]
+        print(f"  {scenario:<34} runs {rates['Runs'][i]:>3}  intercepted/run {rates['InterceptedPerRun'][i]:>9.1f}"
+              f"  success {rates['SuccessRate'][i]:6.2f}%"
+              f"  detected {'n/a' if np.isnan(detection) else f'{detection:.1f}%'}")
+
+    tunnel_file = os.path.join(output_dir, 'wormhole_batch_tunnels.csv')
+    _write_columns({
+        'Run': [labels[r] for r in tunnels.run],
+        'TunnelID': tunnels.tunnel_id,
+        'NodeA': tunnels.node_a,
+        'NodeB': tunnels.node_b,
+        **{column: getattr(tunnels, COLUMNS[column][0]) for column in COUNT_COLUMNS + ('AvgDelay',)},
+        'SuccessRate': tunnels.success_rate,
+        'DropRate': tunnels.drop_rate,
+    }, tunnel_file)
+    run_file = os.path.join(output_dir, 'wormhole_batch_runs.csv')
+    write_run_statistics(tunnels, run_file)
+    rate_file = os.path.join(output_dir, 'wormhole_batch_rates.csv')
+    _write_columns(rates, rate_file)
+    print(f"Per-tunnel statistics saved to: {tunnel_file}")
+    print(f"Per-rate statistics saved to: {rate_file}")
+
+    if plots:
+        figure_dir = os.path.join(output_dir, 'wormhole_figures')
+        os.makedirs(figure_dir, exist_ok=True)
+        render_jobs = [RenderJob('wormhole_attack_rates.png', render_rate_figure,
+                                 (rates, os.path.join(figure_dir, 'wormhole_attack_rates.png')))]
+        for i, (table, aggregate, _) in enumerate(loaded):
+            if table is None or len(table) == 0:
+                continue
+            name = _figure_name(runs[i])
+            render_jobs.append(RenderJob(name, render_tunnel_figure,
+                                         (*_figure_args(table), aggregate or table.totals(),
+                                          f'Wormhole Attack Analysis: {labels[i]}', os.path.join(figure_dir, name))))
+        start = time.perf_counter()
+        timings = render_figures(render_jobs, jobs)
+        print_render_timings(timings, time.perf_counter() - start, jobs)
+        print(f"Figures saved to: {figure_dir}")
+    return rates
+
+def batch_main(argv):
+    parser = argparse.ArgumentParser(prog='wormhole_analysis.py batch',
+                                     description='Analyze every wormhole run of a sweep (headless)')
+    parser.add_argument('source', help='Results root directory, or a glob of wormhole result CSVs (quote it)')
+    parser.add_argument('--jobs', '-j', type=int, default=0,
+                        help='Worker processes for parsing and rendering (0 = all cores, default)')
+    parser.add_argument('--output-dir', '-o', help='Where to write tables and figures (default: the results root)')
+    parser.add_argument('--no-plots', action='store_true', help='Skip figure rendering')
+
+    args = parser.parse_args(argv)
+    if batch_analyze(args.source, args.jobs, args.output_dir, plots=not args.no_plots) is None:
+        sys.exit(1)
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'batch':
+        batch_main(sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(description='Analyze wormhole attack statistics')
-    parser.add_argument('csvfile', help='CSV file with wormhole statistics')
+    parser.add_argument('csvfile', nargs='+', help='CSV file(s) with wormhole statistics')
     parser.add_argument('--plot', action='store_true', help='Generate plots')
-    
+    parser.add_argument('--output', '-o', help='Write per-run and pooled statistics to this CSV')
+
     args = parser.parse_args()
-    
+
     try:
-        tunnels, aggregate = parse_csv(args.csvfile)
-    except FileNotFoundError:
-        print(f"Error: File '{args.csvfile}' not found")
+        tunnels, aggregates = parse_csvs(args.csvfile)
+    except FileNotFoundError as e:
+        print(f"Error: File '{e.filename}' not found")
         sys.exit(1)
     except Exception as e:
         print(f"Error parsing CSV: {e}")
         sys.exit(1)
-    
+
+    if len(args.csvfile) == 1:
+        aggregate = next(iter(aggregates.values()))
+    else:
+        # Pooled over all runs, from the typed tunnel columns
+        aggregate = tunnels.totals()
+
     print_statistics(tunnels, aggregate)
+    if len(args.csvfile) > 1:
+        print_run_statistics(tunnels)
     analyze_attack_effectiveness(tunnels, aggregate)
-    
+
+    if args.output:
+        write_run_statistics(tunnels, args.output)
+
     if args.plot:
         plot_statistics(tunnels, aggregate)
 
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Offline Replay of Latency-Based Wormhole Detection
+==================================================
+
+WormholeDetector (routing.cc) flags a flow on the first delivered packet,
+from the third on, at which the flow's running mean delay exceeds
+BaselineLatency x LatencyThresholdMultiplier; the baseline is the mean of
+the per-flow average delays.  wormhole-detection-results.csv records one
+(multiplier, baseline) pair per simulation, so this module replays the rule
+on a stored packet-delivery-analysis.csv for any number of settings, and
+scores every setting against the WormholeOnPath ground truth (a flow is
+attacked if any of its packets went through a tunnel).
+
+Settings are a grid of threshold multipliers x baseline windows: with
+window W the baseline is learned from the packets received before W and
+flows are judged from W on.  The recorded BaselineLatency_ms of the run's
+wormhole-detection-results.csv, when present, is replayed as well.
+
+The trace is prepared once: delivered packets sorted by (flow, receive
+time), per-flow running means from one cumulative sum, and per window a
+segmented running maximum of the judged means (one maximum.accumulate with
+per-flow offsets).  That array is non-decreasing over the whole trace, so
+the first packet exceeding a threshold, for every flow and every
+multiplier, is one np.searchsorted call.
+
+Per setting: confusion counts over flows, TPR / FPR (the ROC curve of each
+window), flows detected vs actually affected, and detection delay (flag
+time minus the flow's first tunneled packet).
+
+Usage:
+    python3 wormhole_replay.py packet-delivery-analysis.csv [--windows 5,10,20] [--multipliers 1:5:0.02]
+    python3 wormhole_replay.py <results_dir | dataset> [--where KEY=V1[,V2]] [-o DIR] [--no-plots]
+
+Author: VANET Security Research
+Date: October 2025
+"""
+
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from metric_values import read_metric_file
+from packet_metrics import flow_keys
+from plot_scheduler import load_pyplot
+
+# Multipliers 1.0 .. 5.0 in steps of 0.02, and baseline learning windows (s)
+DEFAULT_MULTIPLIERS = np.round(np.arange(1.0, 5.0 + 1e-9, 0.02), 2)
+DEFAULT_WINDOWS = (5.0, 10.0, 20.0, 30.0)
+
+# IsFlowSuspicious needs this many packets before judging a flow
+MIN_PACKETS = 3
+
+# Bounds the flows x multipliers query arrays
+QUERY_BLOCK = 4_000_000
+
+TRACE_COLUMNS = ['SourceNode', 'DestNode', 'SendTime', 'ReceiveTime', 'DelayMs', 'Delivered', 'WormholeOnPath']
+DETECTION_FILE = 'wormhole-detection-results.csv'
+PACKET_FILE = 'packet-delivery-analysis.csv'
+
+REPLAY_COLUMNS = ['Run', 'Baseline', 'Window_s', 'Baseline_ms', 'Multiplier', 'Threshold_ms',
+                  'Flows', 'Flows_Affected', 'Flows_Detected', 'TP', 'FP', 'FN', 'TN', 'TPR', 'FPR', 'Precision',
+                  'Detection_Delay_Mean_s', 'Detection_Delay_Median_s']
+
+
+class FlowDelayTrace:
+    """Delivered packets of one trace in (flow, receive time) order with per-flow running mean delays"""
+
+    def __init__(self, flow, receive_time, running_mean, count, starts, attacked, onset):
+        # Per delivered packet, flows numbered 0..n_flows-1 and contiguous
+        self.flow = flow
+        self.receive_time = receive_time
+        self.running_mean = running_mean
+        # 1-based position of the packet within its flow
+        self.count = count
+        # Per flow: first packet index (n_flows + 1 entries), ground truth, first tunneled send time
+        self.starts = starts
+        self.attacked = attacked
+        self.onset = onset
+
+    @property
+    def n_flows(self):
+        return len(self.starts) - 1
+
+    @classmethod
+    def from_frame(cls, df):
+        """From a packet trace DataFrame with TRACE_COLUMNS (WormholeOnPath and SendTime optional)"""
+        keys = flow_keys(df)
+        delivered = df['Delivered'].to_numpy() > 0 if 'Delivered' in df.columns else np.ones(len(df), dtype=bool)
+        delay = df['DelayMs'].to_numpy(dtype=np.float64)
+        delivered &= np.isfinite(delay)
+        flows, inverse = np.unique(keys[delivered], return_inverse=True)
+
+        receive = df['ReceiveTime'].to_numpy(dtype=np.float64)[delivered]
+        order = np.lexsort((receive, inverse))
+        flow = inverse[order]
+        receive = receive[order]
+        delay = delay[delivered][order]
+        sizes = np.bincount(flow, minlength=len(flows))
+        starts = np.concatenate([[0], np.cumsum(sizes)])
+        count = np.arange(len(flow)) - starts[flow] + 1
+        total = np.cumsum(delay)
+        running_mean = (total - (total - delay)[starts[flow]]) / count
+
+        # Ground truth over all packets of the monitored flows, delivered or not
+        attacked = np.zeros(len(flows), dtype=bool)
+        onset = np.full(len(flows), np.nan)
+        if 'WormholeOnPath' in df.columns:
+            tunneled = df['WormholeOnPath'].to_numpy() > 0
+            position = np.searchsorted(flows, keys[tunneled])
+            known = position < len(flows)
+            known[known] = flows[position[known]] == keys[tunneled][known]
+            attacked[position[known]] = True
+            if 'SendTime' in df.columns:
+                np.fmin.at(onset, position[known], df['SendTime'].to_numpy(dtype=np.float64)[tunneled][known])
+        return cls(flow, receive, running_mean, count, starts, attacked, onset)
+
+    def baseline(self, window):
+        """Mean of the per-flow average delays over packets received before window (NaN if no flow qualifies)"""
+        before = np.bincount(self.flow[self.receive_time < window], minlength=self.n_flows)
+        ready = before >= MIN_PACKETS
+        if not ready.any():
+            return np.nan
+        return float(self.running_mean[self.starts[:-1][ready] + before[ready] - 1].mean())
+
+    def first_exceeding(self, thresholds, judge_from=0.0):
+        """
+        (n_flows, n_thresholds) receive time of the first packet judged
+        (from judge_from on, MIN_PACKETS in) whose running mean exceeds each
+        threshold; NaN where the flow is never flagged.
+        """
+        thresholds = np.asarray(thresholds, dtype=np.float64)
+        flagged = np.full((self.n_flows, len(thresholds)), np.nan)
+        if self.n_flows == 0 or len(thresholds) == 0:
+            return flagged
+        judged = (self.count >= MIN_PACKETS) & (self.receive_time >= judge_from)
+        # Offsets keep each flow's running maximum above every earlier flow's
+        span = max(float(self.running_mean.max(initial=0.0)), float(thresholds.max())) + 2.0
+        offset = np.arange(self.n_flows) * span
+        peak = np.maximum.accumulate(np.where(judged, self.running_mean, -1.0) + offset[self.flow])
+        ends = self.starts[1:]
+
+        block = max(1, QUERY_BLOCK // self.n_flows)
+        for start in range(0, len(thresholds), block):
+            query = offset[:, None] + thresholds[None, start:start + block]
+            position = np.searchsorted(peak, query.ravel(), side='right').reshape(query.shape)
+            hit = position < ends[:, None]
+            flagged[:, start:start + block][hit] = self.receive_time[position[hit]]
+        return flagged
+
+    def replay(self, multipliers, baseline_ms, judge_from=0.0):
+        """Confusion counts, rates and detection delays per multiplier for one baseline (ms)"""
+        multipliers = np.asarray(multipliers, dtype=np.float64)
+        flagged_at = self.first_exceeding(multipliers * baseline_ms, judge_from)
+        detected = ~np.isnan(flagged_at)
+        attacked = self.attacked[:, None]
+        tp = (detected & attacked).sum(axis=0)
+        fp = (detected & ~attacked).sum(axis=0)
+        positives = int(self.attacked.sum())
+        negatives = self.n_flows - positives
+        delay = np.where(detected & attacked, flagged_at - self.onset[:, None], np.nan)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            precision = np.where(tp + fp > 0, tp / (tp + fp), np.nan)
+            tpr = tp / positives if positives else np.full(len(tp), np.nan)
+            fpr = fp / negatives if negatives else np.full(len(fp), np.nan)
+        has_delay = (~np.isnan(delay)).any(axis=0)
+        delay_mean = np.full(len(multipliers), np.nan)
+        delay_median = np.full(len(multipliers), np.nan)
+        delay_mean[has_delay] = np.nanmean(delay[:, has_delay], axis=0)
+        delay_median[has_delay] = np.nanmedian(delay[:, has_delay], axis=0)
+        return pd.DataFrame({
+            'Baseline_ms': baseline_ms, 'Multiplier': multipliers, 'Threshold_ms': multipliers * baseline_ms,
+            'Flows': self.n_flows, 'Flows_Affected': positives, 'Flows_Detected': tp + fp,
+            'TP': tp, 'FP': fp, 'FN': positives - tp, 'TN': negatives - fp,
+            'TPR': tpr, 'FPR': fpr, 'Precision': precision,
+            'Detection_Delay_Mean_s': delay_mean, 'Detection_Delay_Median_s': delay_median,
+        })
+
+    def sweep(self, multipliers=DEFAULT_MULTIPLIERS, windows=DEFAULT_WINDOWS, recorded_baseline_ms=None):
+        """replay() of every (window, multiplier), plus the recorded baseline judged from t=0 when given"""
+        frames = []
+        for window in windows:
+            baseline_ms = self.baseline(window)
+            if np.isnan(baseline_ms):
+                continue
+            frames.append(self.replay(multipliers, baseline_ms, judge_from=window)
+                          .assign(Baseline='window', Window_s=float(window)))
+        if recorded_baseline_ms is not None and recorded_baseline_ms > 0:
+            frames.append(self.replay(multipliers, recorded_baseline_ms).assign(Baseline='recorded', Window_s=np.nan))
+        if not frames:
+            return pd.DataFrame(columns=REPLAY_COLUMNS[1:])
+        return pd.concat(frames, ignore_index=True)
+
+
+def recorded_setting(detection_file):
+    """(LatencyThresholdMultiplier, BaselineLatency_ms) of a wormhole-detection-results.csv, None if unknown"""
+    metrics = read_metric_file(detection_file) if detection_file else {}
+    multiplier = metrics.get('LatencyThresholdMultiplier')
+    baseline = metrics.get('BaselineLatency_ms')
+    if multiplier is None or baseline is None:
+        return None
+    return float(multiplier), float(baseline)
+
+
+def replay_run(packet_file, detection_file=None, multipliers=DEFAULT_MULTIPLIERS, windows=DEFAULT_WINDOWS):
+    """sweep() of one run's packet trace (a CSV or a results_dataset packets/ directory)"""
+    from results_dataset import load_packet_columns
+
+    trace = FlowDelayTrace.from_frame(load_packet_columns(packet_file, TRACE_COLUMNS))
+    recorded = recorded_setting(detection_file)
+    return trace.sweep(multipliers, windows, recorded[1] if recorded else None)
+
+
+def pooled_curves(replay):
+    """Confusion counts summed over runs per setting, with pooled TPR / FPR / precision"""
+    keys = ['Baseline', 'Window_s', 'Multiplier']
+    pooled = replay.groupby(keys, dropna=False, sort=False)[['Flows_Affected', 'Flows_Detected', 'TP', 'FP', 'FN',
+                                                            'TN']].sum().reset_index()
+    with np.errstate(invalid='ignore', divide='ignore'):
+        pooled['TPR'] = pooled['TP'] / (pooled['TP'] + pooled['FN'])
+        pooled['FPR'] = pooled['FP'] / (pooled['FP'] + pooled['TN'])
+        pooled['Precision'] = pooled['TP'] / (pooled['TP'] + pooled['FP'])
+    delays = replay.groupby(keys, dropna=False, sort=False)['Detection_Delay_Median_s'].median()
+    return pooled.merge(delays.reset_index(), on=keys, how='left')
+
+
+def roc_auc(fpr, tpr):
+    """Trapezoidal area under the (FPR, TPR) points, closed with (0, 0) and (1, 1)"""
+    points = sorted(zip(np.nan_to_num(fpr), np.nan_to_num(tpr)))
+    x = np.array([0.0] + [p[0] for p in points] + [1.0])
+    y = np.array([0.0] + [p[1] for p in points] + [1.0])
+    return float(np.sum(np.diff(x) * (y[1:] + y[:-1]) / 2))
+
+
+def operating_points(pooled):
+    """Per baseline setting: AUC and the multiplier maximising TPR - FPR (Youden's J)"""
+    rows = []
+    for (baseline, window), curve in pooled.groupby(['Baseline', 'Window_s'], dropna=False, sort=False):
+        j = (curve['TPR'] - curve['FPR']).fillna(-np.inf).to_numpy()
+        best = curve.iloc[int(np.argmax(j))]
+        rows.append({'Baseline': baseline, 'Window_s': window, 'AUC': roc_auc(curve['FPR'], curve['TPR']),
+                     'Best_Multiplier': best['Multiplier'], 'TPR': best['TPR'], 'FPR': best['FPR'],
+                     'Precision': best['Precision'], 'Detection_Delay_Median_s': best['Detection_Delay_Median_s']})
+    return pd.DataFrame(rows)
+
+
+def _setting_label(baseline, window):
+    return 'recorded baseline' if baseline == 'recorded' else f'window {window:g}s'
+
+
+def render_replay(pooled, recorded, plot_file):
+    """ROC curve per baseline setting, detection delay and flows detected vs affected over the multiplier"""
+    plt = load_pyplot()
+    fig, axes = plt.subplots(1, 3, figsize=(20, 6))
+    fig.suptitle('Wormhole Latency Detection: Offline Threshold Replay', fontsize=14, fontweight='bold')
+
+    for (baseline, window), curve in pooled.groupby(['Baseline', 'Window_s'], dropna=False, sort=False):
+        label = _setting_label(baseline, window)
+        order = np.argsort(curve['FPR'].to_numpy())
+        axes[0].plot(curve['FPR'].to_numpy()[order], curve['TPR'].to_numpy()[order], marker='.', markersize=3,
+                     label=f"{label} (AUC {roc_auc(curve['FPR'], curve['TPR']):.3f})")
+        axes[1].plot(curve['Multiplier'], curve['Detection_Delay_Median_s'], label=label)
+        axes[2].plot(curve['Multiplier'], curve['Flows_Detected'], label=f'detected, {label}')
+    affected = pooled.groupby('Multiplier')['Flows_Affected'].max()
+    axes[2].plot(affected.index, affected.to_numpy(), 'k--', label='affected (ground truth)')
+    for multiplier in recorded:
+        for ax in axes[1:]:
+            ax.axvline(multiplier, color='gray', linestyle=':', alpha=0.7)
+
+    axes[0].plot([0, 1], [0, 1], color='gray', linestyle='--', alpha=0.5)
+    axes[0].set_xlabel('False Positive Rate (flows)')
+    axes[0].set_ylabel('True Positive Rate (flows)')
+    axes[0].set_title('ROC over Threshold Multipliers')
+    axes[1].set_xlabel('Threshold Multiplier')
+    axes[1].set_ylabel('Median Detection Delay (s)')
+    axes[1].set_title('Detection Delay')
+    axes[2].set_xlabel('Threshold Multiplier')
+    axes[2].set_ylabel('Flows')
+    axes[2].set_title('Flows Detected vs Affected')
+    for ax in axes:
+        ax.legend(fontsize=8)
+        ax.grid(alpha=0.3)
+
+    plt.tight_layout()
+    plt.savefig(plot_file, dpi=300, bbox_inches='tight')
+    print(f"  ✓ Replay plot saved to: {plot_file}")
+    plt.close()
+
+
+def parse_grid(text):
+    """'start:stop:step' (inclusive) or a comma-separated list"""
+    if ':' in text:
+        start, stop, step = (float(part) for part in text.split(':'))
+        return np.round(np.arange(start, stop + step / 2, step), 6)
+    return np.array([float(part) for part in text.split(',')])
+
+
+def _find_runs(sources, where):
+    """[(run name, packet file, detection file or None)] of packet CSVs, results directories or datasets"""
+    from results_dataset import open_source
+    from scenario_catalog import ScenarioCatalog, run_key
+
+    runs = []
+    for source in sources:
+        if os.path.isfile(source):
+            detection = os.path.join(os.path.dirname(source), DETECTION_FILE)
+            runs.append((os.path.basename(source), source, detection if os.path.isfile(detection) else None))
+            continue
+        dataset, filters = open_source(source, where)
+        catalog = dataset.catalog(**filters) if dataset is not None else ScenarioCatalog.discover(source)
+        runs.extend((run_key(run), run.files[PACKET_FILE], run.files.get(DETECTION_FILE))
+                    for run in catalog if PACKET_FILE in run.files)
+    return runs
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Replay latency-based wormhole detection over threshold settings')
+    parser.add_argument('sources', nargs='+', help='Packet trace CSV(s), results directories or datasets')
+    parser.add_argument('--multipliers', default='1:5:0.02',
+                        help="Threshold multipliers, 'start:stop:step' or 'a,b,c' (default: 1:5:0.02)")
+    parser.add_argument('--windows', default=','.join(f'{w:g}' for w in DEFAULT_WINDOWS),
+                        help='Baseline learning windows in seconds (default: %(default)s)')
+    parser.add_argument('--where', action='append', metavar='KEY=V1[,V2]',
+                        help='Partition filter when a source is a results_dataset.py dataset (repeatable)')
+    parser.add_argument('--output-dir', '-o', help='Where to write tables and plots (default: the first source)')
+    parser.add_argument('--no-plots', action='store_true', help='Write the tables only')
+    args = parser.parse_args(argv)
+
+    try:
+        multipliers = parse_grid(args.multipliers)
+        windows = [float(w) for w in args.windows.split(',') if w.strip()]
+        runs = _find_runs(args.sources, args.where)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    if not runs:
+        print("⚠ No packet traces found")
+        return 1
+
+    print(f"🔁 Replaying {len(multipliers)} multiplier(s) x {len(windows)} window(s) over {len(runs)} trace(s)")
+    frames, recorded = [], set()
+    for name, packet_file, detection_file in runs:
+        setting = recorded_setting(detection_file)
+        if setting is not None:
+            recorded.add(setting[0])
+        frame = replay_run(packet_file, detection_file, multipliers, windows)
+        if frame.empty:
+            print(f"  ⚠ {name}: too few delivered packets to learn a baseline")
+            continue
+        frames.append(frame.assign(Run=name)[REPLAY_COLUMNS])
+        print(f"  ✓ {name}: {int(frame['Flows'].iloc[0])} flows, {int(frame['Flows_Affected'].iloc[0])} attacked")
+    if not frames:
+        return 1
+
+    replay = pd.concat(frames, ignore_index=True)
+    pooled = pooled_curves(replay)
+    points = operating_points(pooled)
+    print("\nBest operating point per baseline setting (max TPR - FPR, all traces pooled):")
+    for _, row in points.iterrows():
+        delay = row['Detection_Delay_Median_s']
+        delay = f", median delay {delay:.2f}s" if pd.notna(delay) else ''
+        print(f"  {_setting_label(row['Baseline'], row['Window_s']):<18} AUC {row['AUC']:.3f} | "
+              f"x{row['Best_Multiplier']:g}: TPR {row['TPR']:.3f} FPR {row['FPR']:.3f}{delay}")
+
+    first = args.sources[0]
+    output_dir = args.output_dir or (os.path.dirname(first) or '.' if os.path.isfile(first) else first)
+    os.makedirs(output_dir, exist_ok=True)
+    replay.to_csv(os.path.join(output_dir, 'wormhole_replay.csv'), index=False)
+    points.to_csv(os.path.join(output_dir, 'wormhole_replay_operating_points.csv'), index=False)
+    print(f"\n✅ Saved wormhole_replay.csv and wormhole_replay_operating_points.csv to {output_dir}")
+    if not args.no_plots:
+        render_replay(pooled, sorted(recorded), os.path.join(output_dir, 'wormhole_replay.png'))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())